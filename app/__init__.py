@@ -10,7 +10,6 @@ import secrets
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 
-import sqlalchemy as sa
 from flask import Flask, request, redirect, session, g, jsonify
 from flask_login import LoginManager, current_user
 from flask_migrate import Migrate
@@ -26,6 +25,8 @@ from sqlalchemy.exc import SQLAlchemyError
 
 from app.utils.security import sanitize_html
 from app.extensions.cache import cache, init_cache
+from app.extensions.db_routing import RoutingSession, configure_replica_bind, init_db_routing
+from app.extensions.pool_telemetry import configure_pool_class, init_pool_telemetry
 from app.utils.performance_middleware import (
     get_request_tracker,
     register_performance_middleware,
@@ -120,9 +121,60 @@ app.config['GOOGLE_SERVICE_ACCOUNT_FILE'] = os.getenv('GOOGLE_SERVICE_ACCOUNT_FI
 app.config['GOOGLE_MEETING_ROOM_EMAIL'] = os.getenv('GOOGLE_MEETING_ROOM_EMAIL')
 app.config['PORTAL_STATS_CACHE_TIMEOUT'] = int(os.getenv('PORTAL_STATS_CACHE_TIMEOUT', '300'))
 app.config['NOTIFICATION_COUNT_CACHE_TIMEOUT'] = int(os.getenv('NOTIFICATION_COUNT_CACHE_TIMEOUT', '60'))
+app.config['AUDIT_ASYNC_WRITES'] = os.getenv('AUDIT_ASYNC_WRITES', '1') == '1'
+app.config['AUDIT_QUEUE_MAXSIZE'] = int(os.getenv('AUDIT_QUEUE_MAXSIZE', '5000'))
+app.config['AUDIT_BATCH_SIZE'] = int(os.getenv('AUDIT_BATCH_SIZE', '200'))
+app.config['AUDIT_FLUSH_INTERVAL'] = float(os.getenv('AUDIT_FLUSH_INTERVAL', '1.0'))
+app.config['AUDIT_HOT_MONTHS'] = int(os.getenv('AUDIT_HOT_MONTHS', '12'))
+app.config['TASK_HISTORY_BUFFERED'] = os.getenv('TASK_HISTORY_BUFFERED', '1') == '1'
+app.config['SCHEMA_STARTUP_CHECK'] = os.getenv('SCHEMA_STARTUP_CHECK', '1') == '1'
+app.config['REPLICA_DATABASE_URI'] = os.getenv('REPLICA_DATABASE_URI')
+app.config['REPLICA_READ_YOUR_WRITES_SECONDS'] = float(os.getenv('REPLICA_READ_YOUR_WRITES_SECONDS', '10'))
+app.config['REPLICA_HEALTH_CHECK_INTERVAL'] = float(os.getenv('REPLICA_HEALTH_CHECK_INTERVAL', '15'))
+app.config['REPLICA_MAX_LAG_SECONDS'] = float(os.getenv('REPLICA_MAX_LAG_SECONDS', '30'))
 app.config['SLOW_REQUEST_THRESHOLD_MS'] = float(os.getenv('SLOW_REQUEST_THRESHOLD_MS', '750'))
+app.config['SQL_QUERY_BUDGET_DEFAULT'] = int(os.getenv('SQL_QUERY_BUDGET_DEFAULT', '100'))
+app.config['SQL_N_PLUS_ONE_THRESHOLD'] = int(os.getenv('SQL_N_PLUS_ONE_THRESHOLD', '10'))
+# raise | warn | off; vazio = raise em debug/testes, warn em producao
+app.config['SQL_BUDGET_MODE'] = os.getenv('SQL_BUDGET_MODE', '')
+app.config['POOL_TELEMETRY'] = os.getenv('POOL_TELEMETRY', '1') == '1'
+# Loga conexoes retidas por mais que isso (0 = nunca)
+app.config['POOL_HOLD_WARNING_MS'] = float(os.getenv('POOL_HOLD_WARNING_MS', '5000'))
+# Le tambem as colunas JSON antigas do inventario; desligar apos o backfill
+app.config['INVENTARIO_FILES_JSON_FALLBACK'] = os.getenv('INVENTARIO_FILES_JSON_FALLBACK', '1') == '1'
+app.config['CHUNK_PREFETCH_ENABLED'] = os.getenv('CHUNK_PREFETCH_ENABLED', '1') == '1'
+app.config['CHUNK_PREFETCH_DEPTH'] = int(os.getenv('CHUNK_PREFETCH_DEPTH', '2'))
+app.config['CHUNK_PREFETCH_MAX_DEPTH'] = int(os.getenv('CHUNK_PREFETCH_MAX_DEPTH', '6'))
+app.config['CHUNK_PREFETCH_LOOKAHEAD_SECONDS'] = float(os.getenv('CHUNK_PREFETCH_LOOKAHEAD_SECONDS', '10'))
+app.config['CHUNK_PREFETCH_CACHE_SECONDS'] = int(os.getenv('CHUNK_PREFETCH_CACHE_SECONDS', '120'))
+# Fracao de um nucleo (janela de 10 s) que o prefetch pode usar por processo
+app.config['CHUNK_PREFETCH_CPU_BUDGET'] = float(os.getenv('CHUNK_PREFETCH_CPU_BUDGET', '0.25'))
+# Limite de requisicoes a API da Acessorias, dividido por todas as threads do sync
+app.config['ACESSORIAS_RATE_PER_SECOND'] = float(os.getenv('ACESSORIAS_RATE_PER_SECOND', '5'))
+app.config['ACESSORIAS_RATE_BURST'] = int(os.getenv('ACESSORIAS_RATE_BURST', '5'))
+# Run do sync sem sinal de vida ha mais que isso e considerada abandonada e retomada
+app.config['ACESSORIAS_SYNC_STALE_SECONDS'] = int(os.getenv('ACESSORIAS_SYNC_STALE_SECONDS', '1800'))
+# Cache em disco (SQLite) das respostas da Acessorias; TTL por endpoint para respostas sem ETag/Last-Modified
+app.config['ACESSORIAS_HTTP_CACHE_ENABLED'] = os.getenv('ACESSORIAS_HTTP_CACHE_ENABLED', '1') == '1'
+app.config['ACESSORIAS_HTTP_CACHE_PATH'] = os.getenv(
+    'ACESSORIAS_HTTP_CACHE_PATH', os.path.join(app.instance_path, 'acessorias_http_cache.sqlite3')
+)
+app.config['ACESSORIAS_HTTP_CACHE_TTLS'] = os.getenv('ACESSORIAS_HTTP_CACHE_TTLS', 'deliveries=900,companies=3600')
+# Consulta de CNPJ: cache em disco (positivo/negativo), hedge entre provedores e corte de provedor lento
+app.config['CNPJ_CACHE_PATH'] = os.getenv('CNPJ_CACHE_PATH', os.path.join(app.instance_path, 'cnpj_cache.sqlite3'))
+app.config['CNPJ_CACHE_TTL_SECONDS'] = int(os.getenv('CNPJ_CACHE_TTL_SECONDS', str(7 * 24 * 3600)))
+app.config['CNPJ_NEGATIVE_CACHE_TTL_SECONDS'] = int(os.getenv('CNPJ_NEGATIVE_CACHE_TTL_SECONDS', str(24 * 3600)))
+app.config['CNPJ_HEDGE_DELAY_MS'] = float(os.getenv('CNPJ_HEDGE_DELAY_MS', '800'))
+app.config['CNPJ_LOOKUP_TIMEOUT_SECONDS'] = float(os.getenv('CNPJ_LOOKUP_TIMEOUT_SECONDS', '10'))
+app.config['CNPJ_SLOW_PROVIDER_MS'] = float(os.getenv('CNPJ_SLOW_PROVIDER_MS', '4000'))
 app.config['MEETING_CALENDAR_PAST_DAYS'] = int(os.getenv('MEETING_CALENDAR_PAST_DAYS', '60'))
 app.config['MEETING_CALENDAR_FUTURE_DAYS'] = int(os.getenv('MEETING_CALENDAR_FUTURE_DAYS', str(365 * 3)))
+# Espelho local da agenda da sala (calendar_event_mirror): idade antes de um sync
+# incremental em segundo plano, intervalo do job, espera apos falha e lease do sync
+app.config['CALENDAR_MIRROR_MAX_AGE_SECONDS'] = int(os.getenv('CALENDAR_MIRROR_MAX_AGE_SECONDS', '60'))
+app.config['CALENDAR_MIRROR_SYNC_MINUTES'] = int(os.getenv('CALENDAR_MIRROR_SYNC_MINUTES', '5'))
+app.config['CALENDAR_MIRROR_RETRY_SECONDS'] = int(os.getenv('CALENDAR_MIRROR_RETRY_SECONDS', '30'))
+app.config['CALENDAR_MIRROR_LEASE_SECONDS'] = int(os.getenv('CALENDAR_MIRROR_LEASE_SECONDS', '120'))
 app.config['APP_VERSION'] = os.getenv('APP_VERSION')
 app.config['PWA_VERSION'] = os.getenv('PWA_VERSION')
 
@@ -130,7 +182,13 @@ if not app.config['ENFORCE_HTTPS']:
     os.environ['OAUTHLIB_INSECURE_TRANSPORT'] = '1'
 
 csrf = CSRFProtect(app)
-db = SQLAlchemy(app)
+# Relatorios e exportacoes podem ler de um replica (REPLICA_DATABASE_URI)
+configure_replica_bind(app)
+# Espera no checkout e tempo de retencao por endpoint/job (/health/db-pool)
+configure_pool_class(app)
+db = SQLAlchemy(app, session_options={'class_': RoutingSession})
+init_db_routing(app)
+init_pool_telemetry(app)
 migrate = Migrate(app, db)
 login_manager = LoginManager(app)
 login_manager.login_view = 'login'
@@ -466,554 +524,16 @@ def _sanitize_filter(value, allow_data_images: bool = False):
 
 with app.app_context():
     # Import models inside the application context so SQLAlchemy metadata
-    # knows about every table before ``create_all``/inspector logic runs.
+    # knows about every table before the schema fingerprint is computed.
     from app.models import tables as _models  # noqa: F401
+    from app.services.schema_fingerprint import ensure_schema_on_startup
 
-    db.create_all()
-
+    # Uma consulta compara o schema com o codigo; DDL so via scripts/sync_schema.py
     try:
-        inspector = sa.inspect(db.engine)
-
-        if inspector.has_table("societario_processos") and db.engine.dialect.name == "mysql":
-            tipo_column = next(
-                (
-                    col
-                    for col in inspector.get_columns("societario_processos")
-                    if col.get("name") == "tipo_processo"
-                ),
-                None,
-            )
-            desired_tipo_values = [item.value for item in _models.ProcessoSocietarioTipo]
-            if tipo_column is not None:
-                tipo_type_str = str(tipo_column.get("type", ""))
-                if any(value not in tipo_type_str for value in desired_tipo_values):
-                    enum_tipos_sql = ", ".join(f"'{value}'" for value in desired_tipo_values)
-                    with db.engine.begin() as conn:
-                        conn.execute(
-                            sa.text(
-                                f"""
-                                ALTER TABLE societario_processos
-                                MODIFY COLUMN tipo_processo ENUM({enum_tipos_sql})
-                                NOT NULL
-                                """
-                            )
-                        )
-
-            status_column = next(
-                (
-                    col
-                    for col in inspector.get_columns("societario_processos")
-                    if col.get("name") == "status"
-                ),
-                None,
-            )
-            desired_status_values = [item.value for item in _models.ProcessoSocietarioStatus]
-            if status_column is not None:
-                status_type_str = str(status_column.get("type", ""))
-                if any(value not in status_type_str for value in desired_status_values):
-                    enum_values_sql = ", ".join(f"'{value}'" for value in desired_status_values)
-                    with db.engine.begin() as conn:
-                        conn.execute(
-                            sa.text(
-                                f"""
-                                ALTER TABLE societario_processos
-                                MODIFY COLUMN status ENUM({enum_values_sql})
-                                NOT NULL DEFAULT '{_models.ProcessoSocietarioStatus.VIABILIDADE.value}'
-                                """
-                            )
-                        )
-
-        if not inspector.has_table("diretoria_feedbacks"):
-            diretoria_feedback_table = db.metadata.tables.get("diretoria_feedbacks")
-            if diretoria_feedback_table is not None:
-                try:
-                    diretoria_feedback_table.create(bind=db.engine)
-                except SQLAlchemyError as exc:
-                    app.logger.warning(
-                        "Falha ao criar tabela diretoria_feedbacks automaticamente: %s",
-                        exc,
-                    )
-
-        meeting_columns = {col["name"] for col in inspector.get_columns("reunioes")}
-        if "course_id" not in meeting_columns:
-            with db.engine.begin() as conn:
-                conn.execute(
-                    sa.text(
-                        "ALTER TABLE reunioes ADD COLUMN course_id INTEGER NULL"
-                    )
-                )
-                conn.execute(
-                    sa.text(
-                        """
-                        ALTER TABLE reunioes
-                        ADD CONSTRAINT fk_reunioes_course_id_courses
-                        FOREIGN KEY (course_id) REFERENCES courses (id)
-                        ON DELETE SET NULL
-                        """
-                    )
-                )
-
-        diretoria_columns = {
-            col["name"] for col in inspector.get_columns("diretoria_events")
-        }
-        if "photos" not in diretoria_columns:
-            with db.engine.begin() as conn:
-                conn.execute(
-                    sa.text(
-                        "ALTER TABLE diretoria_events ADD COLUMN photos JSON NULL"
-                    )
-                )
-
-        if inspector.has_table("announcements"):
-            announcement_columns = {
-                col["name"] for col in inspector.get_columns("announcements")
-            }
-            if "content" not in announcement_columns:
-                with db.engine.begin() as conn:
-                    conn.execute(
-                        sa.text(
-                            "ALTER TABLE announcements ADD COLUMN content TEXT NULL"
-                        )
-                    )
-                    conn.execute(
-                        sa.text(
-                            "UPDATE announcements SET content = '' WHERE content IS NULL"
-                        )
-                    )
-                    conn.execute(
-                        sa.text(
-                            "ALTER TABLE announcements MODIFY COLUMN content TEXT NOT NULL"
-                        )
-                    )
-            if "attachment_name" not in announcement_columns:
-                with db.engine.begin() as conn:
-                    conn.execute(
-                        sa.text(
-                            "ALTER TABLE announcements ADD COLUMN attachment_name VARCHAR(255) NULL"
-                        )
-                    )
-
-        if inspector.has_table("client_announcements"):
-            client_columns = {
-                col["name"] for col in inspector.get_columns("client_announcements")
-            }
-            if "code" not in client_columns:
-                with db.engine.begin() as conn:
-                    conn.execute(
-                        sa.text(
-                            "ALTER TABLE client_announcements ADD COLUMN code VARCHAR(50) NULL"
-                        )
-                    )
-            if "status" not in client_columns:
-                with db.engine.begin() as conn:
-                    conn.execute(
-                        sa.text(
-                            "ALTER TABLE client_announcements ADD COLUMN status VARCHAR(20) NOT NULL DEFAULT 'Aguardando Envio'"
-                        )
-                    )
-                    conn.execute(
-                        sa.text(
-                            "UPDATE client_announcements SET status = 'Enviado' WHERE status IS NULL OR status = ''"
-                        )
-                    )
-            if "send_date" not in client_columns:
-                dialect = db.engine.url.get_backend_name()
-                with db.engine.begin() as conn:
-                    if dialect == "sqlite":
-                        conn.execute(
-                            sa.text("ALTER TABLE client_announcements ADD COLUMN send_date DATE")
-                        )
-                        conn.execute(
-                            sa.text(
-                                """
-                                UPDATE client_announcements
-                                SET send_date = COALESCE(DATE(created_at), DATE('now'))
-                                WHERE send_date IS NULL
-                                """
-                            )
-                        )
-                        # SQLite cannot easily enforce NOT NULL via ALTER without table rewrite; rely on app-level default.
-                    else:
-                        conn.execute(
-                            sa.text(
-                                "ALTER TABLE client_announcements ADD COLUMN send_date DATE NULL"
-                            )
-                        )
-                        conn.execute(
-                            sa.text(
-                                """
-                                UPDATE client_announcements
-                                SET send_date = COALESCE(DATE(created_at), CURDATE())
-                                WHERE send_date IS NULL
-                                """
-                            )
-                        )
-                        conn.execute(
-                            sa.text(
-                                "ALTER TABLE client_announcements MODIFY COLUMN send_date DATE NOT NULL"
-                            )
-                        )
-            if "last_notification_date" not in client_columns:
-                with db.engine.begin() as conn:
-                    conn.execute(
-                        sa.text(
-                            "ALTER TABLE client_announcements ADD COLUMN last_notification_date DATE NULL"
-                        )
-                    )
-
-        attachments_table_exists = inspector.has_table("announcement_attachments")
-        if not attachments_table_exists and inspector.has_table("announcements"):
-            with db.engine.begin() as conn:
-                conn.execute(
-                    sa.text(
-                        """
-                        CREATE TABLE announcement_attachments (
-                            id INTEGER NOT NULL AUTO_INCREMENT,
-                            announcement_id INTEGER NOT NULL,
-                            file_path VARCHAR(255) NOT NULL,
-                            original_name VARCHAR(255) NULL,
-                            mime_type VARCHAR(128) NULL,
-                            created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
-                            PRIMARY KEY (id),
-                            CONSTRAINT fk_announcement_attachments_announcement_id_announcements
-                                FOREIGN KEY (announcement_id) REFERENCES announcements (id)
-                                ON DELETE CASCADE
-                        )
-                        """
-                    )
-                )
-            attachments_table_exists = True
-
-        if attachments_table_exists:
-            attachment_columns = {
-                col["name"] for col in inspector.get_columns("announcement_attachments")
-            }
-            if "mime_type" not in attachment_columns:
-                with db.engine.begin() as conn:
-                    conn.execute(
-                        sa.text(
-                            "ALTER TABLE announcement_attachments ADD COLUMN mime_type VARCHAR(128) NULL"
-                        )
-                    )
-            if "created_at" not in attachment_columns:
-                with db.engine.begin() as conn:
-                    conn.execute(
-                        sa.text(
-                            """
-                            ALTER TABLE announcement_attachments
-                            ADD COLUMN created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
-                            """
-                        )
-                    )
-
-        if attachments_table_exists and inspector.has_table("announcements"):
-            with db.engine.begin() as conn:
-                legacy_attachments = conn.execute(
-                    sa.text(
-                        """
-                        SELECT a.id AS announcement_id,
-                               a.attachment_path AS file_path,
-                               a.attachment_name AS original_name,
-                               a.created_at AS created_at
-                        FROM announcements AS a
-                        WHERE a.attachment_path IS NOT NULL
-                          AND NOT EXISTS (
-                              SELECT 1 FROM announcement_attachments aa
-                              WHERE aa.announcement_id = a.id
-                          )
-                        """
-                    )
-                )
-
-                for row in legacy_attachments.mappings():
-                    conn.execute(
-                        sa.text(
-                            """
-                            INSERT INTO announcement_attachments (
-                                announcement_id,
-                                file_path,
-                                original_name,
-                                mime_type,
-                                created_at
-                            ) VALUES (
-                                :announcement_id,
-                                :file_path,
-                                :original_name,
-                                NULL,
-                                COALESCE(:created_at, NOW())
-                            )
-                            """
-                        ),
-                        {
-                            "announcement_id": row["announcement_id"],
-                            "file_path": row["file_path"],
-                            "original_name": row["original_name"],
-                            "created_at": row["created_at"],
-                        },
-                    )
-
-        tag_links_table_exists = inspector.has_table("announcement_tag_links")
-        tags_table_exists = inspector.has_table("tags")
-        if (
-            not tag_links_table_exists
-            and inspector.has_table("announcements")
-            and tags_table_exists
-        ):
-            with db.engine.begin() as conn:
-                conn.execute(
-                    sa.text(
-                        """
-                        CREATE TABLE announcement_tag_links (
-                            announcement_id INTEGER NOT NULL,
-                            tag_id INTEGER NOT NULL,
-                            PRIMARY KEY (announcement_id, tag_id),
-                            CONSTRAINT fk_announcement_tag_links_announcement_id_announcements
-                                FOREIGN KEY (announcement_id) REFERENCES announcements (id)
-                                ON DELETE CASCADE,
-                            CONSTRAINT fk_announcement_tag_links_tag_id_tags
-                                FOREIGN KEY (tag_id) REFERENCES tags (id)
-                                ON DELETE CASCADE
-                        )
-                        """
-                    )
-                )
-
-        if inspector.has_table("task_notifications"):
-            notification_columns = {
-                col["name"] for col in inspector.get_columns("task_notifications")
-            }
-            if "type" not in notification_columns:
-                with db.engine.begin() as conn:
-                    conn.execute(
-                        sa.text(
-                            "ALTER TABLE task_notifications ADD COLUMN type VARCHAR(20) "
-                            "NOT NULL DEFAULT 'task'"
-                        )
-                    )
-                    conn.execute(
-                        sa.text(
-                            "UPDATE task_notifications SET type = 'task' WHERE type IS NULL"
-                        )
-                    )
-            if "announcement_id" not in notification_columns and inspector.has_table(
-                "announcements"
-            ):
-                existing_fks = inspector.get_foreign_keys("task_notifications")
-                has_announcement_fk = any(
-                    fk.get("constrained_columns") == ["announcement_id"]
-                    for fk in existing_fks
-                )
-                with db.engine.begin() as conn:
-                    conn.execute(
-                        sa.text(
-                            "ALTER TABLE task_notifications ADD COLUMN announcement_id INTEGER NULL"
-                        )
-                    )
-                    if not has_announcement_fk:
-                        conn.execute(
-                            sa.text(
-                                """
-                                ALTER TABLE task_notifications
-                                ADD CONSTRAINT fk_task_notifications_announcement_id_announcements
-                                FOREIGN KEY (announcement_id) REFERENCES announcements (id)
-                                ON DELETE CASCADE
-                                """
-                                )
-                            )
-            task_id_column = next(
-                (col for col in inspector.get_columns("task_notifications") if col["name"] == "task_id"),
-                None,
-            )
-            if task_id_column and not task_id_column.get("nullable", True):
-                with db.engine.begin() as conn:
-                    conn.execute(
-                        sa.text(
-                            "ALTER TABLE task_notifications MODIFY COLUMN task_id INTEGER NULL"
-                        )
-                    )
-
-        if inspector.has_table("operational_procedures"):
-            procedure_columns = {
-                col["name"]: col for col in inspector.get_columns("operational_procedures")
-            }
-
-            descricao_column = procedure_columns.get("descricao")
-            description_column = procedure_columns.get("description")
-
-            if (
-                db.engine.dialect.name == "mysql"
-                and not descricao_column
-                and description_column
-            ):
-                # Legacy databases still use the old ``description`` column name; rename it for compatibility.
-                with db.engine.begin() as conn:
-                    conn.execute(
-                        sa.text(
-                            "ALTER TABLE operational_procedures CHANGE COLUMN description descricao LONGTEXT NULL"
-                        )
-                    )
-                descricao_column = description_column
-
-            if (
-                db.engine.dialect.name == "mysql"
-                and descricao_column
-                and "longtext" not in str(descricao_column["type"]).lower()
-            ):
-                with db.engine.begin() as conn:
-                    conn.execute(
-                        sa.text(
-                            "ALTER TABLE operational_procedures MODIFY COLUMN descricao LONGTEXT NULL"
-                        )
-                    )
-
-        # Migration: Add contatos column to tbl_empresas and migrate data from departamentos
-        if inspector.has_table("tbl_empresas"):
-            empresa_columns = {
-                col["name"] for col in inspector.get_columns("tbl_empresas")
-            }
-            if "ativo" not in empresa_columns:
-                with db.engine.begin() as conn:
-                    conn.execute(
-                        sa.text(
-                            """
-                            ALTER TABLE tbl_empresas
-                            ADD COLUMN ativo TINYINT(1) NOT NULL DEFAULT 1
-                            """
-                        )
-                    )
-                    conn.execute(
-                        sa.text(
-                            "UPDATE tbl_empresas SET ativo = 1 WHERE ativo IS NULL"
-                        )
-                    )
-            if "tipo_empresa" not in empresa_columns:
-                with db.engine.begin() as conn:
-                    conn.execute(
-                        sa.text(
-                            "ALTER TABLE tbl_empresas "
-                            "ADD COLUMN tipo_empresa VARCHAR(20) NULL"
-                        )
-                    )
-                    conn.execute(
-                        sa.text(
-                            "UPDATE tbl_empresas "
-                            "SET tipo_empresa = 'Matriz' "
-                            "WHERE tipo_empresa IS NULL"
-                        )
-                    )
-                    conn.execute(
-                        sa.text(
-                            "ALTER TABLE tbl_empresas "
-                            "MODIFY COLUMN tipo_empresa VARCHAR(20) "
-                            "NOT NULL DEFAULT 'Matriz'"
-                        )
-                    )
-            if "contatos" not in empresa_columns:
-                with db.engine.begin() as conn:
-                    # Add contatos column to tbl_empresas
-                    conn.execute(
-                        sa.text(
-                            "ALTER TABLE tbl_empresas ADD COLUMN contatos VARCHAR(255) NULL"
-                        )
-                    )
-
-                    # Migrate contatos from departamento fiscal to empresa
-                    # Only migrate if departamentos table exists
-                    if inspector.has_table("departamentos"):
-                        conn.execute(
-                            sa.text(
-                                """
-                                UPDATE tbl_empresas e
-                                INNER JOIN departamentos d ON d.empresa_id = e.id
-                                SET e.contatos = d.contatos
-                                WHERE d.tipo = 'fiscal' AND d.contatos IS NOT NULL
-                                """
-                            )
-                        )
-
-        # Migration: Ensure tbl_inventario has all required columns
-        if inspector.has_table("tbl_inventario"):
-            inventario_columns = {
-                col["name"] for col in inspector.get_columns("tbl_inventario")
-            }
-            if "fechamento_tadeu_2025" not in inventario_columns:
-                with db.engine.begin() as conn:
-                    conn.execute(
-                        sa.text(
-                            "ALTER TABLE tbl_inventario ADD COLUMN fechamento_tadeu_2025 DECIMAL(12, 2) NULL"
-                        )
-                    )
-            if "cfop_files" not in inventario_columns:
-                with db.engine.begin() as conn:
-                    conn.execute(
-                        sa.text(
-                            "ALTER TABLE tbl_inventario ADD COLUMN cfop_files JSON NULL"
-                        )
-                    )
-            if "cfop_consolidado_files" not in inventario_columns:
-                with db.engine.begin() as conn:
-                    conn.execute(
-                        sa.text(
-                            "ALTER TABLE tbl_inventario ADD COLUMN cfop_consolidado_files JSON NULL"
-                        )
-                    )
-            if "cliente_files" not in inventario_columns:
-                with db.engine.begin() as conn:
-                    conn.execute(
-                        sa.text(
-                            "ALTER TABLE tbl_inventario ADD COLUMN cliente_files JSON NULL"
-                        )
-                    )
-
-            inventario_indexes = {
-                idx.get("name")
-                for idx in inspector.get_indexes("tbl_inventario")
-                if idx.get("name")
-            }
-            inventario_index_ddl = {
-                "idx_inventario_status_empresa": (
-                    "CREATE INDEX idx_inventario_status_empresa ON tbl_inventario (status, empresa_id)"
-                ),
-                "idx_inventario_encerramento": (
-                    "CREATE INDEX idx_inventario_encerramento ON tbl_inventario (encerramento_fiscal)"
-                ),
-                "idx_inventario_status_composite": (
-                    "CREATE INDEX idx_inventario_status_composite ON tbl_inventario (status, empresa_id)"
-                ),
-            }
-            for index_name, ddl in inventario_index_ddl.items():
-                if index_name not in inventario_indexes:
-                    with db.engine.begin() as conn:
-                        conn.execute(sa.text(ddl))
-
-        if inspector.has_table("tbl_empresas"):
-            empresa_indexes = {
-                idx.get("name")
-                for idx in inspector.get_indexes("tbl_empresas")
-                if idx.get("name")
-            }
-            empresa_index_ddl = {
-                "idx_empresas_ativo_tipo": (
-                    "CREATE INDEX idx_empresas_ativo_tipo ON tbl_empresas (ativo, tipo_empresa)"
-                ),
-                "idx_empresas_ativo_tributacao": (
-                    "CREATE INDEX idx_empresas_ativo_tributacao ON tbl_empresas (ativo, tributacao)"
-                ),
-                "idx_empresas_tributacao_ativo": (
-                    "CREATE INDEX idx_empresas_tributacao_ativo ON tbl_empresas (tributacao, ativo)"
-                ),
-                "idx_empresas_codigo_ativo": (
-                    "CREATE INDEX idx_empresas_codigo_ativo ON tbl_empresas (codigo_empresa, ativo)"
-                ),
-            }
-            for index_name, ddl in empresa_index_ddl.items():
-                if index_name not in empresa_indexes:
-                    with db.engine.begin() as conn:
-                        conn.execute(sa.text(ddl))
-
+        ensure_schema_on_startup()
     except SQLAlchemyError as exc:
         app.logger.warning(
-            "Não foi possível garantir as colunas obrigatórias: %s", exc
+            "Não foi possível verificar o schema do banco: %s", exc
         )
 
     # Setup performance middleware (needs to be inside app context to access db.engine)
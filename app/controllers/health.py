@@ -1,6 +1,6 @@
 """Health check endpoints for monitoring and load balancers."""
 
-from flask import jsonify
+from flask import jsonify, request
 from sqlalchemy import text
 from datetime import datetime
 from app import app, db, limiter
@@ -42,6 +42,18 @@ def health_check():
         }
         return jsonify(health_status), 503
 
+    # 1b. Read replica (optional): unhealthy replica only degrades, reads fall back to primary
+    if "replica" in db.engines:
+        from app.extensions.db_routing import get_replica_engine, replica_health
+
+        replica_ok = get_replica_engine() is not None
+        health_status["checks"]["replica"] = {
+            "status": "ok" if replica_ok else "warning",
+            **replica_health.as_dict(),
+        }
+        if not replica_ok:
+            health_status["status"] = "degraded"
+
     # 2. Memory check (warn if >85% used)
     try:
         memory = psutil.virtual_memory()
@@ -142,6 +154,10 @@ def db_pool_status():
     Returns detailed information about the database connection pool
     including pool size, checked out connections, and overflow.
     Used for diagnosing connection pool exhaustion issues.
+
+    ``telemetry`` adds checkout wait and hold time histograms for this
+    worker since startup, the ``?top=N`` (default 10) endpoints/jobs that
+    held connections the longest and the connections held right now.
     """
     try:
         pool = db.engine.pool
@@ -174,6 +190,12 @@ def db_pool_status():
                 pool_status["status"] = "critical"
                 pool_status["message"] = f"Connection pool is nearly exhausted at {utilization:.1f}% utilization"
 
+        if app.config.get("POOL_TELEMETRY", True):
+            from app.extensions.pool_telemetry import pool_telemetry
+
+            top = min(max(request.args.get("top", 10, type=int), 1), 100)
+            pool_status["telemetry"] = pool_telemetry.snapshot(top=top)
+
         # Add realtime broadcaster stats if available
         try:
             from app.services.realtime import get_broadcaster
@@ -123,7 +123,6 @@ from app.forms import (
     OperationalProcedureForm,
 )
 import os, json, re, secrets, filetype, time, calendar
-import requests
 from urllib.parse import urlparse
 from werkzeug.utils import secure_filename
 from uuid import uuid4
@@ -131,9 +130,6 @@ from sqlalchemy import or_, cast, String, text
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError, OperationalError
 import sqlalchemy as sa
 from sqlalchemy.orm import joinedload, aliased
-from google_auth_oauthlib.flow import Flow
-from google.oauth2 import id_token
-from google.auth.transport.requests import Request
 from app.services.courses import CourseStatus, get_courses_overview
 from app.services.google_calendar import get_calendar_timezone
 from app.services.calendar_cache import calendar_cache
@@ -22,7 +22,7 @@ from flask import (
     url_for,
 )
 from flask_login import current_user, login_required
-from sqlalchemy import func, or_
+from sqlalchemy import or_
 from sqlalchemy.orm import joinedload
 from werkzeug.utils import secure_filename
 
@@ -33,25 +33,38 @@ from app.controllers.routes._decorators import (
     has_report_access,
     meeting_only_access_check,
 )
-from app.controllers.routes.blueprints.notifications import _invalidate_notification_cache
 from app.forms import AnnouncementForm
 from app.models.tables import (
     Announcement,
     AnnouncementAttachment,
-    AuditLog,
     NotificationType,
     TaskNotification,
     Tag,
     User,
 )
+from app.services.audit_logs import (
+    AuditLogFilters,
+    AuditLogRow,
+    audit_log_exists,
+    first_audit_log_by_resource_user,
+)
+from app.services.notification_counters import (
+    add_unread_notifications,
+    delete_notifications,
+)
 from app.utils.permissions import is_user_admin
 from app.utils.security import sanitize_html
 from app.utils.audit import ActionType, ResourceType, log_user_action
+from app.extensions.cache import cache
 
 announcements_bp = Blueprint("announcements", __name__)
 
 ANNOUNCEMENTS_UPLOAD_SUBDIR = os.path.join("uploads", "announcements")
 
+# Reserva do primeiro clique por usuario/comunicado: cobre a janela em que o
+# registro ainda esta na fila do gravador de auditoria.
+MURAL_VIEW_CLAIM_TIMEOUT = 24 * 60 * 60
+
 
 def _can_manage_announcements() -> bool:
     """Verifica se o usuário pode gerenciar comunicados.
@@ -208,7 +221,8 @@ def _broadcast_announcement_notification(announcement: Announcement) -> None:
     ]
 
     db.session.bulk_save_objects(notifications)
-    _invalidate_notification_cache()
+    # bulk_save_objects nao dispara os eventos do mapper.
+    add_unread_notifications(user_id for (user_id,) in active_user_rows)
 
     # Broadcast notification to all affected users' SSE streams
     from app.services.realtime import get_broadcaster
@@ -274,7 +288,7 @@ def _apply_visibility_filter(query):
 
 def _build_announcement_view_status(
     announcements: list[Announcement],
-) -> tuple[dict[int, list[AuditLog]], dict[int, list[User]], dict[int, int]]:
+) -> tuple[dict[int, list[AuditLogRow]], dict[int, list[User]], dict[int, int]]:
     """Return per-announcement first viewers, non-viewers and totals."""
 
     announcement_ids = [announcement.id for announcement in announcements if announcement.id]
@@ -282,40 +296,24 @@ def _build_announcement_view_status(
         return {}, {}, {}
     audience_cache: dict[tuple[int, ...], list[User]] = {}
 
-    first_log_ids_subquery = (
-        db.session.query(func.min(AuditLog.id).label("first_log_id"))
-        .filter(
-            AuditLog.resource_type == ResourceType.ANNOUNCEMENT,
-            AuditLog.action_type == ActionType.VIEW,
-            AuditLog.action_description == "mural_card_click",
-            AuditLog.resource_id.in_(announcement_ids),
-        )
-        .group_by(AuditLog.resource_id, AuditLog.user_id)
-        .subquery()
-    )
-
-    first_view_logs = (
-        AuditLog.query.options(joinedload(AuditLog.user))
-        .filter(
-            AuditLog.id.in_(
-                db.session.query(first_log_ids_subquery.c.first_log_id)
-            )
+    first_view_logs = first_audit_log_by_resource_user(
+        AuditLogFilters(
+            resource_types=(ResourceType.ANNOUNCEMENT,),
+            action_types=(ActionType.VIEW,),
+            action_descriptions=("mural_card_click",),
+            resource_ids=announcement_ids,
         )
-        .order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
-        .all()
     )
 
-    seen_by_announcement: dict[int, dict[int, AuditLog]] = defaultdict(dict)
-    for row in first_view_logs:
-        announcement_id = row.resource_id
-        user_id = row.user_id
+    seen_by_announcement: dict[int, dict[int, AuditLogRow]] = defaultdict(dict)
+    for (announcement_id, user_id), row in first_view_logs.items():
         if not isinstance(announcement_id, int) or announcement_id not in announcement_ids:
             continue
         if not isinstance(user_id, int):
             continue
         seen_by_announcement[announcement_id][user_id] = row
 
-    viewed_logs_by_announcement: dict[int, list[AuditLog]] = {}
+    viewed_logs_by_announcement: dict[int, list[AuditLogRow]] = {}
     not_viewed_users_by_announcement: dict[int, list[User]] = {}
     viewed_totals: dict[int, int] = {}
 
@@ -500,7 +498,7 @@ def announcements():
 
     can_view_click_logs = is_user_admin(current_user) or getattr(current_user, "is_master", False)
     can_access_mural_logs = has_report_access("mural_logs")
-    announcement_view_logs: dict[int, list[AuditLog]] = {}
+    announcement_view_logs: dict[int, list[AuditLogRow]] = {}
     announcement_not_viewed_users: dict[int, list[User]] = {}
     announcement_view_totals: dict[int, int] = {}
     if can_view_click_logs:
@@ -633,7 +631,7 @@ def announcement_history():
 
     can_view_click_logs = is_user_admin(current_user) or getattr(current_user, "is_master", False)
     can_access_mural_logs = has_report_access("mural_logs")
-    announcement_view_logs: dict[int, list[AuditLog]] = {}
+    announcement_view_logs: dict[int, list[AuditLogRow]] = {}
     announcement_not_viewed_users: dict[int, list[User]] = {}
     announcement_view_totals: dict[int, int] = {}
     if can_view_click_logs:
@@ -780,9 +778,10 @@ def delete_announcement(announcement_id: int):
     if announcement.attachment_path:
         attachment_paths.append(announcement.attachment_path)
 
-    TaskNotification.query.filter_by(
+    announcement_notifications = TaskNotification.query.filter_by(
         announcement_id=announcement.id
-    ).delete(synchronize_session=False)
+    )
+    delete_notifications(announcement_notifications)
     db.session.delete(announcement)
     db.session.commit()
 
@@ -855,19 +854,25 @@ def log_mural_event():
         resource_id = announcement.id
 
         # Keep only the first view per user/card for view/not-view tracking.
-        first_view = (
-            AuditLog.query.with_entities(AuditLog.id)
-            .filter(
-                AuditLog.resource_type == ResourceType.ANNOUNCEMENT,
-                AuditLog.action_type == ActionType.VIEW,
-                AuditLog.action_description == "mural_card_click",
-                AuditLog.resource_id == resource_id,
-                AuditLog.user_id == current_user.id,
+        first_view = audit_log_exists(
+            AuditLogFilters(
+                user_ids=(current_user.id,),
+                resource_types=(ResourceType.ANNOUNCEMENT,),
+                action_types=(ActionType.VIEW,),
+                action_descriptions=("mural_card_click",),
+                resource_id=resource_id,
             )
-            .first()
         )
         if first_view:
             return jsonify({"status": "ok", "already_logged": True})
+        # The audit row is written asynchronously, so the check above cannot
+        # see a click logged a moment ago; claim the first view atomically.
+        if not cache.add(
+            f"mural_view:{current_user.id}:{resource_id}",
+            1,
+            timeout=MURAL_VIEW_CLAIM_TIMEOUT,
+        ):
+            return jsonify({"status": "ok", "already_logged": True})
 
     log_user_action(
         action_type=ActionType.VIEW,
@@ -48,6 +48,14 @@ from app.services.meeting_room import fetch_raw_events, combine_events
 from app.services.google_calendar import get_calendar_timezone
 from app.services.general_calendar import serialize_events_for_calendar, is_ana_carolina_user
 from app.services.calendar_cache import calendar_cache
+from app.services.notification_counters import get_unread_count, mark_notifications_read
+from app.services.report_rollups import discard_report_rollup_entities
+from app.services.task_tree import delete_task_trees
+from app.services.task_bulk import (
+    BulkTaskOperationError,
+    BulkTaskRequest,
+    apply_bulk_task_operation,
+)
 
 api_bp = Blueprint("api_v1", __name__, url_prefix="/api/v1")
 csrf.exempt(api_bp)
@@ -825,7 +833,7 @@ def api_delete_task(task_id: int):
         return jsonify({"error": "forbidden"}), 403
 
     try:
-        Task.query.filter(Task.id == task_id).delete(synchronize_session=False)
+        delete_task_trees([task_id])
         db.session.commit()
     except SQLAlchemyError:
         db.session.rollback()
@@ -862,6 +870,23 @@ def api_update_task_status(task_id: int):
     return jsonify(_serialize_task(task))
 
 
+@api_bp.route("/tasks/bulk", methods=["POST"])
+@token_required
+def api_bulk_tasks():
+    """Apply one operation (move, reassign, close) to a list of tasks atomically."""
+
+    try:
+        bulk_request = BulkTaskRequest.from_payload(request.get_json(silent=True))
+        result = apply_bulk_task_operation(g.api_user, bulk_request, serializer=_serialize_task)
+    except BulkTaskOperationError as exc:
+        return jsonify(exc.as_dict()), exc.http_status
+    except SQLAlchemyError:
+        current_app.logger.exception("Failed to apply bulk task operation via API")
+        return jsonify({"error": "failed_to_update_tasks"}), 500
+
+    return jsonify(result.as_dict())
+
+
 @api_bp.route("/tasks/<int:task_id>/followers", methods=["GET"])
 @token_required
 def api_list_task_followers(task_id: int):
@@ -1068,12 +1093,7 @@ def api_notifications():
         .limit(limit)
         .all()
     )
-    unread = (
-        TaskNotification.query.filter(
-            TaskNotification.user_id == g.api_user.id,
-            TaskNotification.read_at.is_(None),
-        ).count()
-    )
+    unread = get_unread_count(g.api_user.id)
     return jsonify(
         {
             "notifications": [_serialize_notification(n) for n in notifications],
@@ -1095,7 +1115,7 @@ def api_notifications_mark_read():
         query = TaskNotification.query.filter(TaskNotification.user_id == g.api_user.id)
         if notification_id:
             query = query.filter(TaskNotification.id == notification_id)
-        updated = query.update({TaskNotification.read_at: now}, synchronize_session=False)
+        updated = mark_notifications_read(query, now)
         db.session.commit()
     except SQLAlchemyError:
         db.session.rollback()
@@ -1251,12 +1271,11 @@ def api_announcement_mark_read(announcement_id: int):
 
     now = datetime.utcnow()
     try:
-        updated = (
-            TaskNotification.query.filter(
-                TaskNotification.user_id == g.api_user.id,
-                TaskNotification.announcement_id == announcement_id,
-            ).update({TaskNotification.read_at: now}, synchronize_session=False)
+        query = TaskNotification.query.filter(
+            TaskNotification.user_id == g.api_user.id,
+            TaskNotification.announcement_id == announcement_id,
         )
+        updated = mark_notifications_read(query, now)
         db.session.commit()
     except SQLAlchemyError:
         db.session.rollback()
@@ -1501,6 +1520,13 @@ def api_delete_empresa(empresa_id: int):
         return jsonify({"error": "forbidden"}), 403
 
     try:
+        # Query.delete nao dispara os eventos do mapper: a empresa e seus
+        # departamentos saem dos rollups dos relatorios na mesma transacao.
+        empresa = db.session.get(Empresa, empresa_id)
+        if empresa is not None:
+            discard_report_rollup_entities(
+                db.session.connection(), [empresa, *empresa.departamentos]
+            )
         deleted = Empresa.query.filter(Empresa.id == empresa_id).delete(synchronize_session=False)
         db.session.commit()
     except SQLAlchemyError:
@@ -1620,6 +1646,11 @@ def api_delete_department(dept_id: int):
         return jsonify({"error": "forbidden"}), 403
 
     try:
+        # Query.delete nao dispara os eventos do mapper: o departamento sai
+        # dos rollups dos relatorios na mesma transacao.
+        dept = db.session.get(Departamento, dept_id)
+        if dept is not None:
+            discard_report_rollup_entities(db.session.connection(), [dept])
         deleted = Departamento.query.filter(Departamento.id == dept_id).delete(synchronize_session=False)
         db.session.commit()
     except SQLAlchemyError:
@@ -36,14 +36,17 @@ from flask import (
     url_for,
 )
 from flask_login import current_user, login_required, login_user, logout_user
-import requests
-from google.auth.transport.requests import Request as GoogleRequest
-from google.oauth2 import id_token
 
 from app import db, limiter
 from app.forms import LoginForm
 from app.models.tables import User, Session as DbSession
 from app.controllers.routes._base import SAO_PAULO_TZ
+from app.utils.lazy_import import lazy_import
+
+# Only the OAuth callback needs these; resolved on the first Google login.
+requests = lazy_import("requests")
+google_auth_requests = lazy_import("google.auth.transport.requests")
+id_token = lazy_import("google.oauth2.id_token")
 
 # =============================================================================
 # BLUEPRINT DEFINITION
@@ -401,7 +404,7 @@ def google_callback():
 
     credentials = flow.credentials
     request_session = requests.Session()
-    token_request = GoogleRequest(session=request_session)
+    token_request = google_auth_requests.Request(session=request_session)
 
     try:
         id_info = id_token.verify_oauth2_token(
@@ -97,7 +97,6 @@ def _trigger_client_announcement_notifications(reference_date: date | None = Non
 
     now = utc3_now()
     created_notifications: list[tuple[int, TaskNotification]] = []
-    touched_users: set[int] = set()
 
     for entry in pending_entries:
         subject = (entry.subject or "").strip()
@@ -120,7 +119,6 @@ def _trigger_client_announcement_notifications(reference_date: date | None = Non
             )
             db.session.add(notification)
             created_notifications.append((user_id, notification))
-            touched_users.add(user_id)
 
         entry.last_notification_date = today
 
@@ -129,10 +127,6 @@ def _trigger_client_announcement_notifications(reference_date: date | None = Non
 
     db.session.commit()
 
-    from app.controllers.routes.blueprints.notifications import _invalidate_notification_cache
-    for user_id in touched_users:
-        _invalidate_notification_cache(user_id)
-
     try:
         from app.services.realtime import get_broadcaster
 
@@ -11,7 +11,7 @@ from flask_login import current_user, login_required
 
 from app.controllers.routes._decorators import meeting_only_access_check
 from app.controllers.routes.blueprints.societario import can_access_societario
-from app.utils.performance_middleware import track_custom_span
+from app.utils.performance_middleware import query_budget, track_custom_span
 
 core_bp = Blueprint("core", __name__)
 
@@ -35,6 +35,7 @@ def index():
 @core_bp.route("/home")
 @login_required
 @meeting_only_access_check
+@query_budget(20)
 def home():
     """Render the authenticated home page."""
     with track_custom_span("template", "render_home"):
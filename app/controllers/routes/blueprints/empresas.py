@@ -16,6 +16,7 @@ from __future__ import annotations
 import json
 import os
 import re
+import time
 from datetime import datetime, date
 from io import BytesIO
 from pathlib import Path
@@ -44,12 +45,13 @@ from sqlalchemy.orm.attributes import flag_modified
 from werkzeug.exceptions import NotFound
 
 from app import csrf, db, limiter
-from app.constants import EMPRESA_TAG_CHOICES, INVENTARIO_UPLOAD_SUBDIR
+from app.constants import EMPRESA_TAG_CHOICES
 from app.controllers.routes import decode_id, encode_id, user_has_tag
 from app.controllers.routes._base import normalize_contatos
 from app.controllers.routes._decorators import meeting_only_access_check
 from app.extensions.task_queue import submit_io_task
 from app.extensions.cache import cache, get_cache_timeout
+from app.extensions.db_routing import read_replica
 from app.services.optimized_queries import (
     get_active_users_with_tags,
     get_inventario_file_counts_by_empresa_ids,
@@ -66,8 +68,19 @@ from app.forms import (
 )
 from app.models.tables import ClienteReuniao, Departamento, Empresa, Inventario, Setor, User
 from app.services.calendar_cache import calendar_cache
+from app.services.chunk_prefetch import ChunkPrefetcher
 from app.services.cnpj import consultar_cnpj
-from app.services.reuniao_export import export_reuniao_decisoes_pdf
+from app.services.inventario_files import (
+    INVENTARIO_FILE_CATEGORIES,
+    add_inventario_file,
+    delete_inventario_file,
+    inventario_file_absolute_path,
+    inventario_has_files,
+    list_inventario_files,
+    list_inventario_files_by_empresa_ids,
+    migrate_inventario_row,
+    move_inventario_files,
+)
 from app.services.general_calendar import serialize_events_for_calendar, is_ana_carolina_user
 from app.services.google_calendar import get_calendar_timezone
 from app.services.meeting_room import (
@@ -75,13 +88,22 @@ from app.services.meeting_room import (
     fetch_raw_events,
     try_get_cached_combined_events,
 )
-from app.utils.performance_middleware import track_commit_end, track_commit_start, track_custom_span
+from app.utils.lazy_import import lazy_import
+from app.utils.performance_middleware import (
+    query_budget,
+    track_commit_end,
+    track_commit_start,
+    track_custom_span,
+)
 from app.utils.permissions import is_user_admin
 from app.utils.mailer import send_email, EmailDeliveryError
 from app.utils.security import sanitize_html
 from app.utils.audit import ActionType, ResourceType, log_user_action
 from app.utils.audit_diff import build_field_diff
 
+# python-docx, docx2pdf, fpdf and bs4 are only needed for the meeting PDF export.
+reuniao_export = lazy_import("app.services.reuniao_export")
+
 empresas_bp = Blueprint("empresas", __name__)
 
 INVENTARIO_STATUS_CHOICES = [
@@ -347,6 +369,16 @@ def _build_inventario_items_for_empresas(
     return items, file_counts_by_empresa
 
 
+def _inventario_files_for_rows(items: list[dict], is_tadeu: bool) -> dict:
+    """Lista de anexos CFOP por empresa; só a visão do Tadeu renderiza os arquivos nas linhas."""
+    if not is_tadeu or not items:
+        return {}
+    return list_inventario_files_by_empresa_ids(
+        [item["empresa"].id for item in items],
+        ("cfop", "cfop-consolidado"),
+    )
+
+
 def _build_zero_inventario_dashboard_cards(allowed_tributacoes: list[str]) -> list[dict]:
     return [
         {
@@ -436,32 +468,6 @@ def api_cnpj(cnpj):
     return jsonify(dados)
 
 
-def _filter_meeting_events_by_range(events, start_str, end_str):
-    """Filtra eventos para a janela visivel do calendario (paginacao por mes visivel).
-
-    Reduz drasticamente o payload enviado ao navegador: em vez de mandar ate 365
-    dias de reunioes, envia apenas as que tocam o intervalo [start, end] recebido
-    do FullCalendar. Comparacao por data (YYYY-MM-DD) evita lidar com timezones.
-    Sem parametros, retorna a lista completa (compatibilidade).
-    """
-    if not start_str or not end_str:
-        return events
-
-    win_start = start_str[:10]
-    win_end = end_str[:10]
-    filtered = []
-    for ev in events:
-        ev_start = (ev.get("start") or "")[:10]
-        if not ev_start:
-            # Evento sem data parseavel: mantem por seguranca
-            filtered.append(ev)
-            continue
-        ev_end = (ev.get("end") or ev.get("start") or "")[:10]
-        if ev_end >= win_start and ev_start <= win_end:
-            filtered.append(ev)
-    return filtered
-
-
 @empresas_bp.route("/api/reunioes")
 @login_required
 @csrf.exempt
@@ -472,9 +478,12 @@ def api_reunioes():
     range_start = request.args.get("start")
     range_end = request.args.get("end")
 
-    cached_events, _, _ = try_get_cached_combined_events(current_user.id, is_admin)
+    # Só a janela visível do calendário: a projeção compartilhada é fatiada por bisseção
+    cached_events, _, _ = try_get_cached_combined_events(
+        current_user.id, is_admin, range_start, range_end
+    )
     if cached_events is not None:
-        response = jsonify(_filter_meeting_events_by_range(cached_events, range_start, range_end))
+        response = jsonify(cached_events)
         response.headers["X-Calendar-Cache"] = "hit"
         return response
 
@@ -495,8 +504,8 @@ def api_reunioes():
                 raw_events = []
     calendar_tz = get_calendar_timezone()
     now = datetime.now(calendar_tz)
-    events = combine_events(raw_events, now, current_user.id, is_admin)
-    response = jsonify(_filter_meeting_events_by_range(events, range_start, range_end))
+    events = combine_events(raw_events, now, current_user.id, is_admin, range_start, range_end)
+    response = jsonify(events)
     response.headers["X-Calendar-Cache"] = "miss"
     if fallback:
         response.headers["X-Calendar-Fallback"] = fallback
@@ -580,6 +589,7 @@ def cadastrar_empresa():
 @empresas_bp.route("/listar_empresas")
 @login_required
 @meeting_only_access_check
+@query_budget(20)
 def listar_empresas():
     """List companies with optional search and pagination."""
     saved_filters = session.get("listar_empresas_filters", {})
@@ -1648,7 +1658,7 @@ def reuniao_cliente_pdf(empresa_id: str | None = None, reuniao_id: str | None =
     )
 
     try:
-        pdf_bytes, filename = export_reuniao_decisoes_pdf(reuniao)
+        pdf_bytes, filename = reuniao_export.export_reuniao_decisoes_pdf(reuniao)
     except FileNotFoundError as exc:
         current_app.logger.error("Modelo de timbrado não encontrado: %s", exc)
         abort(404, description="Modelo de timbrado não encontrado.")
@@ -1926,6 +1936,7 @@ def inventario():
 
         listall_total_rows = len(ordered_empresa_ids)
         listall_token = uuid4().hex
+        listall_token_timeout = 300
         cache.set(
             f"inventario:listall:token:{listall_token}",
             {
@@ -1933,8 +1944,21 @@ def inventario():
                 "status_filters": status_filters,
                 "user_id": current_user.id,
                 "usuarios_name_by_id": usuarios_name_by_id,
+                "expires_at": time.time() + listall_token_timeout,
             },
-            timeout=300,
+            timeout=listall_token_timeout,
+        )
+        # Os próximos lotes já começam a ser renderizados em segundo plano.
+        _inventario_chunk_prefetcher.advance(
+            listall_token,
+            loaded=min(initial_batch_size, listall_total_rows),
+            limit=max(1, min(initial_batch_size, 300)),
+            total=listall_total_rows,
+            render=_inventario_chunk_renderer(
+                listall_token,
+                (current_user.username or "").strip().lower().startswith("tadeu"),
+            ),
+            expires_at=time.time() + listall_token_timeout,
         )
         first_empresa_ids = ordered_empresa_ids[:initial_batch_size]
         empresas_map = (
@@ -1987,6 +2011,7 @@ def inventario():
         include_file_columns=False,
     )
     is_tadeu = (current_user.username or "").strip().lower().startswith("tadeu")
+    inventario_files_by_empresa = _inventario_files_for_rows(items, is_tadeu)
 
     # Buscar todos os usuários para o select de encerramento (otimizado com cache)
     dashboard_query_params = urlencode(
@@ -2004,6 +2029,7 @@ def inventario():
         "empresas/inventario.html",
         items=items,
         file_counts_by_empresa=file_counts_by_empresa,
+        inventario_files_by_empresa=inventario_files_by_empresa,
         pagination=pagination,
         status_choices=INVENTARIO_STATUS_CHOICES,
         sort=sort,
@@ -2044,6 +2070,7 @@ def inventario():
 
 @empresas_bp.route("/api/inventario/dashboard", methods=["GET"])
 @login_required
+@read_replica
 def api_inventario_dashboard():
     """Retorna cards de dashboard do inventario de forma assíncrona."""
     try:
@@ -2097,38 +2124,23 @@ def api_inventario_dashboard():
         return jsonify({"success": False, "error": "Falha ao carregar dashboard"}), 500
 
 
-@empresas_bp.route("/api/inventario/chunk", methods=["GET"])
-@login_required
-def api_inventario_chunk():
-    token = (request.args.get("token") or "").strip()
-    offset = request.args.get("offset", type=int) or 0
-    limit = request.args.get("limit", type=int) or 100
-    if not token:
-        return jsonify({"success": False, "error": "Token ausente"}), 400
-    if offset < 0:
-        offset = 0
-    limit = max(1, min(limit, 300))
+def _inventario_chunk_cache_key(token: str, offset: int, limit: int) -> str:
+    return f"inventario:listall:chunk:{token}:{offset}:{limit}"
 
-    payload = cache.get(f"inventario:listall:token:{token}")
-    if not payload:
-        return jsonify({"success": False, "error": "Sessão expirada. Recarregue a página."}), 410
-    if int(payload.get("user_id") or 0) != int(current_user.id):
-        return jsonify({"success": False, "error": "Token inválido para este usuário."}), 403
 
+_inventario_chunk_prefetcher = ChunkPrefetcher("inventario", cache_key=_inventario_chunk_cache_key)
+
+
+def _render_inventario_chunk(payload: dict, offset: int, limit: int, is_tadeu: bool) -> dict:
+    """Renderiza as linhas de um lote da listagem completa (rota e prefetch)."""
     empresa_ids: list[int] = payload.get("empresa_ids") or []
     status_filters: list[str] = payload.get("status_filters") or []
     usuarios_name_by_id: dict[int, str] = payload.get("usuarios_name_by_id") or {}
     total = len(empresa_ids)
-    chunk_cache_key = f"inventario:listall:chunk:{token}:{offset}:{limit}"
-    cached_chunk = cache.get(chunk_cache_key)
-    if cached_chunk is not None:
-        return jsonify(cached_chunk)
     chunk_ids = empresa_ids[offset: offset + limit]
 
     if not chunk_ids:
-        result = {"success": True, "html": "", "loaded": offset, "total": total, "has_more": False}
-        cache.set(chunk_cache_key, result, timeout=120)
-        return jsonify(result)
+        return {"success": True, "html": "", "loaded": offset, "total": total, "has_more": False}
 
     empresas_map = (
         Empresa.query.filter(Empresa.id.in_(chunk_ids))
@@ -2151,28 +2163,80 @@ def api_inventario_chunk():
         status_filters,
         include_file_columns=False,
     )
-    is_tadeu = (current_user.username or "").strip().lower().startswith("tadeu")
+    inventario_files_by_empresa = _inventario_files_for_rows(items, is_tadeu)
 
     if not usuarios_name_by_id:
         usuarios = get_active_users_with_tags()
         usuarios_name_by_id = {int(u.id): (u.name or "") for u in usuarios}
-    status_choices = INVENTARIO_STATUS_CHOICES
     rows_html = render_template(
         "empresas/_inventario_rows.html",
         items=items,
         file_counts_by_empresa=file_counts_by_empresa,
+        inventario_files_by_empresa=inventario_files_by_empresa,
         is_tadeu=is_tadeu,
-        status_choices=status_choices,
+        status_choices=INVENTARIO_STATUS_CHOICES,
         usuarios_name_by_id=usuarios_name_by_id,
     )
-    new_loaded = min(offset + len(items), total)
-    result = {
+    # Avança pelo lote inteiro mesmo se o filtro de status descartou linhas,
+    # senão o próximo lote repetiria ids e os offsets do prefetch desalinhariam.
+    new_loaded = min(offset + len(chunk_ids), total)
+    return {
         "success": True,
         "html": rows_html,
         "loaded": new_loaded,
         "total": total,
         "has_more": new_loaded < total,
     }
+
+
+def _inventario_chunk_renderer(token: str, is_tadeu: bool):
+    """Render de lote para o prefetch, que roda fora da requisição."""
+    app_obj = current_app._get_current_object()
+
+    def render(offset: int, limit: int) -> dict | None:
+        payload = cache.get(f"inventario:listall:token:{token}")
+        if not payload:
+            return None
+        with app_obj.test_request_context():
+            return _render_inventario_chunk(payload, offset, limit, is_tadeu)
+
+    return render
+
+
+@empresas_bp.route("/api/inventario/chunk", methods=["GET"])
+@login_required
+@read_replica
+def api_inventario_chunk():
+    token = (request.args.get("token") or "").strip()
+    offset = request.args.get("offset", type=int) or 0
+    limit = request.args.get("limit", type=int) or 100
+    if not token:
+        return jsonify({"success": False, "error": "Token ausente"}), 400
+    if offset < 0:
+        offset = 0
+    limit = max(1, min(limit, 300))
+
+    payload = cache.get(f"inventario:listall:token:{token}")
+    if not payload:
+        return jsonify({"success": False, "error": "Sessão expirada. Recarregue a página."}), 410
+    if int(payload.get("user_id") or 0) != int(current_user.id):
+        return jsonify({"success": False, "error": "Token inválido para este usuário."}), 403
+
+    is_tadeu = (current_user.username or "").strip().lower().startswith("tadeu")
+    total = len(payload.get("empresa_ids") or [])
+    _inventario_chunk_prefetcher.advance(
+        token,
+        loaded=offset + limit,
+        limit=limit,
+        total=total,
+        render=_inventario_chunk_renderer(token, is_tadeu),
+        expires_at=payload.get("expires_at"),
+    )
+    chunk_cache_key = _inventario_chunk_cache_key(token, offset, limit)
+    cached_chunk = cache.get(chunk_cache_key)
+    if cached_chunk is not None:
+        return jsonify(cached_chunk)
+    result = _render_inventario_chunk(payload, offset, limit, is_tadeu)
     cache.set(chunk_cache_key, result, timeout=120)
     return jsonify(result)
 
@@ -2361,52 +2425,17 @@ def api_inventario_update():
 
 
 
-def _coerce_file_entries(value):
-    if not value:
-        return []
-    if isinstance(value, list):
-        return value
-    if isinstance(value, dict):
-        return [value]
-    if isinstance(value, str):
-        try:
-            parsed = json.loads(value)
-        except (TypeError, ValueError):
-            return []
-        return parsed if isinstance(parsed, list) else []
-    return []
-
-
-def _has_file_entries(value):
-    """Verifica se há arquivos VÁLIDOS na lista (suporta database e disk storage)."""
-    entries = _coerce_file_entries(value)
-    if not entries:
-        return False
-
-    # Verificar se há pelo menos um arquivo válido
-    # Um arquivo válido deve ter 'filename' E ('file_data' codificado ou 'path' no disco) não vazios
-    for entry in entries:
-        if isinstance(entry, dict):
-            filename = entry.get('filename', '').strip()
-            file_data = entry.get('file_data', '').strip()
-            path = entry.get('path', '').strip()
-            if filename and (file_data or path):
-                return True
-
-    return False
-
-
 def _get_inventario_file_flags(inventario):
-    has_cfop = _has_file_entries(inventario.cfop_files) or bool(inventario.pdf_path)
-    has_cfop_consolidado = _has_file_entries(inventario.cfop_consolidado_files)
-    has_cliente = _has_file_entries(inventario.cliente_files) or bool(inventario.cliente_pdf_path)
+    has_cfop = inventario_has_files(inventario, "cfop") or bool(inventario.pdf_path)
+    has_cfop_consolidado = inventario_has_files(inventario, "cfop-consolidado")
+    has_cliente = inventario_has_files(inventario, "cliente") or bool(inventario.cliente_pdf_path)
     return has_cfop, has_cfop_consolidado, has_cliente
 
 
 def _maybe_set_status_aguardando_tadeu(inventario):
     # Regra: deve ter CFOP CONSOLIDADO + ARQUIVO CLIENTE para mudar para AGUARDANDO TADEU
-    has_cfop_consolidado = _has_file_entries(inventario.cfop_consolidado_files)
-    has_cliente = _has_file_entries(inventario.cliente_files) or bool(inventario.cliente_pdf_path)
+    has_cfop_consolidado = inventario_has_files(inventario, "cfop-consolidado")
+    has_cliente = inventario_has_files(inventario, "cliente") or bool(inventario.cliente_pdf_path)
 
     if not (has_cfop_consolidado and has_cliente):
         # Só reverter para FALTA ARQUIVO se o status nunca foi definido
@@ -2912,21 +2941,13 @@ def api_inventario_upload_pdf(empresa_id):
         if not inventario:
             inventario = Inventario(empresa_id=empresa_id, encerramento_fiscal=False)
             db.session.add(inventario)
-        had_cfop = _has_file_entries(inventario.cfop_files) or bool(inventario.pdf_path)
-        has_cliente = _has_file_entries(inventario.cliente_files) or bool(inventario.cliente_pdf_path)
+        had_cfop = inventario_has_files(inventario, "cfop") or bool(inventario.pdf_path)
+        has_cliente = inventario_has_files(inventario, "cliente") or bool(inventario.cliente_pdf_path)
 
-        # Salvar no disco ao invés de base64 no banco
-        file_info = _save_inventario_disk_file(file, empresa_id, "cfop")
-
-        # Atualizar array de arquivos
-        cfop_files = inventario.cfop_files or []
-        cfop_files.append(file_info)
-        inventario.cfop_files = cfop_files
+        # Arquivo no disco + uma linha em tbl_inventario_files
+        record = add_inventario_file(empresa_id, "cfop", file, uploaded_by=current_user.id)
         status_changed = _maybe_set_status_aguardando_tadeu(inventario)
         notify_cassio = (not had_cfop) and (not has_cliente)
-        # Marcar explicitamente que o JSON foi modificado
-        from sqlalchemy.orm.attributes import flag_modified
-        flag_modified(inventario, 'cfop_files')
 
         db.session.commit()
         if status_changed:
@@ -2938,11 +2959,11 @@ def api_inventario_upload_pdf(empresa_id):
 
         return jsonify({
             'success': True,
-            'filename': file_info.get('filename') or file.filename,
-            'uploaded_at': file_info['uploaded_at'],
-            'storage': file_info.get('storage', 'disk'),
+            'filename': record.name,
+            'uploaded_at': record.created_at.isoformat(),
+            'storage': 'disk',
             'status': inventario.status,
-            'file_index': len(cfop_files) - 1  # índice do arquivo no array
+            'file_index': len(list_inventario_files(empresa_id, "cfop")) - 1
         })
 
     except Exception as e:
@@ -2975,21 +2996,14 @@ def api_inventario_upload_cfop_consolidado(empresa_id):
             inventario = Inventario(empresa_id=empresa_id, encerramento_fiscal=False)
             db.session.add(inventario)
 
-        had_cfop = _has_file_entries(inventario.cfop_consolidado_files)
-        has_cliente = _has_file_entries(inventario.cliente_files) or bool(inventario.cliente_pdf_path)
-
-        # Salvar no disco ao invés de base64 no banco
-        file_info = _save_inventario_disk_file(file, empresa_id, "cfop-consolidado")
+        had_cfop = inventario_has_files(inventario, "cfop-consolidado")
+        has_cliente = inventario_has_files(inventario, "cliente") or bool(inventario.cliente_pdf_path)
 
-        cfop_consolidado_files = inventario.cfop_consolidado_files or []
-        cfop_consolidado_files.append(file_info)
-        inventario.cfop_consolidado_files = cfop_consolidado_files
+        # Arquivo no disco + uma linha em tbl_inventario_files
+        record = add_inventario_file(empresa_id, "cfop-consolidado", file, uploaded_by=current_user.id)
         status_changed = _maybe_set_status_aguardando_tadeu(inventario)
         notify_cassio = (not had_cfop) and (not has_cliente)
 
-        from sqlalchemy.orm.attributes import flag_modified
-        flag_modified(inventario, 'cfop_consolidado_files')
-
         db.session.commit()
         if status_changed:
             current_app.logger.info(
@@ -3001,11 +3015,11 @@ def api_inventario_upload_cfop_consolidado(empresa_id):
 
         return jsonify({
             'success': True,
-            'filename': file_info.get('filename') or file.filename,
-            'uploaded_at': file_info['uploaded_at'],
-            'storage': file_info.get('storage', 'disk'),
+            'filename': record.name,
+            'uploaded_at': record.created_at.isoformat(),
+            'storage': 'disk',
             'status': inventario.status,
-            'file_index': len(cfop_consolidado_files) - 1
+            'file_index': len(list_inventario_files(empresa_id, "cfop-consolidado")) - 1
         })
 
     except Exception as e:
@@ -3072,17 +3086,9 @@ def api_inventario_upload_cliente_file(empresa_id):
             inventario = Inventario(empresa_id=empresa_id, encerramento_fiscal=False)
             db.session.add(inventario)
 
-        # Salvar no disco ao invés de base64 no banco
-        file_info = _save_inventario_disk_file(file, empresa_id, "cliente")
-
-        # Atualizar array de arquivos
-        cliente_files = inventario.cliente_files or []
-        cliente_files.append(file_info)
-        inventario.cliente_files = cliente_files
+        # Arquivo no disco + uma linha em tbl_inventario_files
+        record = add_inventario_file(empresa_id, "cliente", file, uploaded_by=current_user.id)
         status_changed = _maybe_set_status_aguardando_tadeu(inventario)
-        # Marcar explicitamente que o JSON foi modificado
-        from sqlalchemy.orm.attributes import flag_modified
-        flag_modified(inventario, 'cliente_files')
 
         db.session.commit()
         if status_changed:
@@ -3092,11 +3098,11 @@ def api_inventario_upload_cliente_file(empresa_id):
 
         return jsonify({
             'success': True,
-            'filename': file_info.get('filename') or file.filename,
-            'uploaded_at': file_info['uploaded_at'],
-            'storage': file_info.get('storage', 'disk'),
+            'filename': record.name,
+            'uploaded_at': record.created_at.isoformat(),
+            'storage': 'disk',
             'status': inventario.status,
-            'file_index': len(cliente_files) - 1  # índice do arquivo no array
+            'file_index': len(list_inventario_files(empresa_id, "cliente")) - 1
         })
 
     except Exception as e:
@@ -3108,55 +3114,45 @@ def api_inventario_upload_cliente_file(empresa_id):
 @empresas_bp.route("/api/inventario/file/<int:empresa_id>/<file_type>/<int:file_index>", methods=["GET"])
 @login_required
 def api_inventario_get_file(empresa_id, file_type, file_index):
-    """Serve arquivo do inventário armazenado no banco de dados ou disco."""
-    import base64
-    from flask import send_file
-    import io
+    """Serve arquivo do inventário sempre a partir do disco (streaming).
 
-    try:
-        inventario = Inventario.query.filter_by(empresa_id=empresa_id).first()
+    O índice é a posição na lista de ``list_inventario_files`` (JSON legado
+    seguido de ``tbl_inventario_files``). Uma entrada legada (base64 no
+    JSON) é migrada para o disco na hora e servida de lá.
+    """
+    from flask import send_file
 
-        if not inventario:
-            return jsonify({'success': False, 'error': 'Inventário não encontrado'}), 404
+    if file_type not in INVENTARIO_FILE_CATEGORIES:
+        return jsonify({'success': False, 'error': 'Tipo de arquivo inválido'}), 400
 
-        # Selecionar array de arquivos correto
-        if file_type == 'cfop':
-            files_array = inventario.cfop_files or []
-        elif file_type == 'cfop-consolidado':
-            files_array = inventario.cfop_consolidado_files or []
-        elif file_type == 'cliente':
-            files_array = inventario.cliente_files or []
-        else:
-            return jsonify({'success': False, 'error': 'Tipo de arquivo inválido'}), 400
+    try:
+        files = list_inventario_files(empresa_id, file_type)
 
         # Verificar se o índice é válido
-        if file_index < 0 or file_index >= len(files_array):
+        if file_index < 0 or file_index >= len(files):
             return jsonify({'success': False, 'error': 'Arquivo não encontrado'}), 404
 
-        file_info = files_array[file_index]
-        storage = file_info.get("storage", "database")
-        filename = file_info.get('filename', 'arquivo')
-        mime_type = file_info.get('mime_type', 'application/octet-stream')
-
-        if storage == "disk":
-            relative_path = file_info.get("path")
-            if not relative_path:
-                return jsonify({'success': False, 'error': 'Caminho não encontrado'}), 404
-            absolute_path = os.path.join(current_app.root_path, "static", relative_path)
-            if not os.path.exists(absolute_path):
-                return jsonify({'success': False, 'error': 'Arquivo físico não encontrado'}), 404
-            return send_file(absolute_path, mimetype=mime_type, as_attachment=False, download_name=filename)
-
-        # Fallback: Database (Legacy)
-        if 'file_data' not in file_info:
-            return jsonify({'success': False, 'error': 'Dados do arquivo não encontrados'}), 404
-
-        file_data = base64.b64decode(file_info['file_data'])
+        if files[file_index]["legacy"]:
+            inventario_id = db.session.query(Inventario.id).filter(Inventario.empresa_id == empresa_id).scalar()
+            migrate_inventario_row(inventario_id)
+            files = list_inventario_files(empresa_id, file_type)
+            if file_index >= len(files):
+                return jsonify({'success': False, 'error': 'Arquivo não encontrado'}), 404
+            if files[file_index]["legacy"]:
+                return jsonify({'success': False, 'error': 'Arquivo legado corrompido'}), 422
+
+        file_info = files[file_index]
+        relative_path = file_info.get("path")
+        if not relative_path:
+            return jsonify({'success': False, 'error': 'Caminho não encontrado'}), 404
+        absolute_path = inventario_file_absolute_path(relative_path)
+        if not os.path.exists(absolute_path):
+            return jsonify({'success': False, 'error': 'Arquivo físico não encontrado'}), 404
         return send_file(
-            io.BytesIO(file_data),
-            mimetype=mime_type,
+            absolute_path,
+            mimetype=file_info["mime_type"],
             as_attachment=False,
-            download_name=filename
+            download_name=file_info["filename"],
         )
 
     except Exception as e:
@@ -3164,51 +3160,18 @@ def api_inventario_get_file(empresa_id, file_type, file_index):
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
-def _save_inventario_disk_file(uploaded_file, empresa_id: int, subdir_name: str) -> dict:
-    """Salva arquivo de inventário no disco e retorna metadados."""
-    from werkzeug.utils import secure_filename
-    from mimetypes import guess_type
-
-    original_name = secure_filename(uploaded_file.filename or "arquivo.pdf")
-    extension = os.path.splitext(original_name)[1].lower()
-    unique_name = f"{uuid4().hex}{extension}"
-
-    # Caminho relativo: uploads/inventario/<empresa_id>/<subdir>/<uuid>.<ext>
-    relative_dir = os.path.join(INVENTARIO_UPLOAD_SUBDIR, str(empresa_id), subdir_name).replace("\\", "/")
-    absolute_dir = os.path.join(current_app.root_path, "static", relative_dir)
-    os.makedirs(absolute_dir, exist_ok=True)
-
-    absolute_path = os.path.join(absolute_dir, unique_name)
-    uploaded_file.save(absolute_path)
-
-    relative_path = os.path.join(relative_dir, unique_name).replace("\\", "/")
-    mime_type = uploaded_file.mimetype or guess_type(original_name)[0] or "application/octet-stream"
-
-    return {
-        "filename": original_name,
-        "path": relative_path,
-        "uploaded_at": datetime.now().isoformat(),
-        "mime_type": mime_type,
-        "storage": "disk"
-    }
-
-
 def _serialize_inventario_file_metadata(files_array: list[dict]) -> list[dict]:
-    """Retorna apenas metadados dos anexos, sem o campo pesado file_data."""
-    items: list[dict] = []
-    for index, file_info in enumerate(files_array or []):
-        if not isinstance(file_info, dict):
-            continue
-        items.append(
-            {
-                "index": index,
-                "filename": file_info.get("filename") or "arquivo",
-                "uploaded_at": file_info.get("uploaded_at"),
-                "mime_type": file_info.get("mime_type", "application/octet-stream"),
-                "storage": file_info.get("storage", "database"),
-            }
-        )
-    return items
+    """Retorna apenas metadados dos anexos (já sem o campo pesado file_data)."""
+    return [
+        {
+            "index": index,
+            "filename": file_info["filename"],
+            "uploaded_at": file_info.get("uploaded_at"),
+            "mime_type": file_info["mime_type"],
+            "storage": file_info["storage"],
+        }
+        for index, file_info in enumerate(files_array or [])
+    ]
 
 
 @empresas_bp.route("/api/inventario/files/<int:empresa_id>", methods=["GET"])
@@ -3216,25 +3179,13 @@ def _serialize_inventario_file_metadata(files_array: list[dict]) -> list[dict]:
 def api_inventario_list_files_metadata(empresa_id):
     """Retorna metadados de anexos por empresa para carregamento sob demanda."""
     try:
-        inventario = Inventario.query.filter_by(empresa_id=empresa_id).first()
-        if not inventario:
-            return jsonify(
-                {
-                    "success": True,
-                    "cfop": [],
-                    "cfop_consolidado": [],
-                    "cliente": [],
-                }
-            )
-
+        files = list_inventario_files_by_empresa_ids([empresa_id])[empresa_id]
         return jsonify(
             {
                 "success": True,
-                "cfop": _serialize_inventario_file_metadata(inventario.cfop_files or []),
-                "cfop_consolidado": _serialize_inventario_file_metadata(
-                    inventario.cfop_consolidado_files or []
-                ),
-                "cliente": _serialize_inventario_file_metadata(inventario.cliente_files or []),
+                "cfop": _serialize_inventario_file_metadata(files["cfop"]),
+                "cfop_consolidado": _serialize_inventario_file_metadata(files["cfop-consolidado"]),
+                "cliente": _serialize_inventario_file_metadata(files["cliente"]),
             }
         )
     except Exception as exc:
@@ -3291,21 +3242,9 @@ def api_inventario_delete_cfop_file(empresa_id):
 
         inventario = Inventario.query.filter_by(empresa_id=empresa_id).first()
 
-        if not inventario or not inventario.cfop_files:
-            return jsonify({'success': False, 'error': 'Arquivo não encontrado'}), 404
-
-        # Verificar se o índice é válido
-        cfop_files = inventario.cfop_files or []
-        if file_index < 0 or file_index >= len(cfop_files):
+        if not inventario or not delete_inventario_file(inventario, "cfop", file_index):
             return jsonify({'success': False, 'error': 'Arquivo não encontrado'}), 404
 
-        # Remover arquivo do array
-        cfop_files.pop(file_index)
-        inventario.cfop_files = cfop_files
-
-        # Marcar explicitamente que o JSON foi modificado
-        from sqlalchemy.orm.attributes import flag_modified
-        flag_modified(inventario, 'cfop_files')
         _maybe_set_status_aguardando_tadeu(inventario)
         db.session.commit()
 
@@ -3330,18 +3269,9 @@ def api_inventario_delete_cfop_consolidado_file(empresa_id):
 
         inventario = Inventario.query.filter_by(empresa_id=empresa_id).first()
 
-        if not inventario or not inventario.cfop_consolidado_files:
-            return jsonify({'success': False, 'error': 'Arquivo não encontrado'}), 404
-
-        cfop_consolidado_files = inventario.cfop_consolidado_files or []
-        if file_index < 0 or file_index >= len(cfop_consolidado_files):
+        if not inventario or not delete_inventario_file(inventario, "cfop-consolidado", file_index):
             return jsonify({'success': False, 'error': 'Arquivo não encontrado'}), 404
 
-        cfop_consolidado_files.pop(file_index)
-        inventario.cfop_consolidado_files = cfop_consolidado_files
-
-        from sqlalchemy.orm.attributes import flag_modified
-        flag_modified(inventario, 'cfop_consolidado_files')
         _maybe_set_status_aguardando_tadeu(inventario)
         db.session.commit()
 
@@ -3362,26 +3292,20 @@ def api_inventario_move_cfop_to_consolidado(empresa_id):
         if not inventario:
             return jsonify({'success': False, 'error': 'Inventário não encontrado'}), 404
 
-        cfop_files = _coerce_file_entries(inventario.cfop_files)
-        if not cfop_files:
+        moved_count = move_inventario_files(inventario, "cfop", "cfop-consolidado")
+        if not moved_count:
+            db.session.rollback()
             return jsonify({'success': False, 'error': 'Nenhum arquivo CFOP para mover'}), 400
 
-        cfop_consolidado_files = _coerce_file_entries(inventario.cfop_consolidado_files)
-        cfop_consolidado_files.extend(cfop_files)
-
-        inventario.cfop_consolidado_files = cfop_consolidado_files
-        inventario.cfop_files = []
-        status_changed = _maybe_set_status_aguardando_tadeu(inventario)
-
-        from sqlalchemy.orm.attributes import flag_modified
-        flag_modified(inventario, 'cfop_consolidado_files')
-        flag_modified(inventario, 'cfop_files')
-
+        _maybe_set_status_aguardando_tadeu(inventario)
         db.session.commit()
 
+        cfop_consolidado_files = _serialize_inventario_file_metadata(
+            list_inventario_files(empresa_id, "cfop-consolidado")
+        )
         return jsonify({
             'success': True,
-            'moved_count': len(cfop_files),
+            'moved_count': moved_count,
             'status': inventario.status,
             'cfop_consolidado_files': cfop_consolidado_files,
         }), 200
@@ -3404,21 +3328,9 @@ def api_inventario_delete_cliente_file_v2(empresa_id):
 
         inventario = Inventario.query.filter_by(empresa_id=empresa_id).first()
 
-        if not inventario or not inventario.cliente_files:
+        if not inventario or not delete_inventario_file(inventario, "cliente", file_index):
             return jsonify({'success': False, 'error': 'Arquivo não encontrado'}), 404
 
-        # Verificar se o índice é válido
-        cliente_files = inventario.cliente_files or []
-        if file_index < 0 or file_index >= len(cliente_files):
-            return jsonify({'success': False, 'error': 'Arquivo não encontrado'}), 404
-
-        # Remover arquivo do array
-        cliente_files.pop(file_index)
-        inventario.cliente_files = cliente_files
-
-        # Marcar explicitamente que o JSON foi modificado
-        from sqlalchemy.orm.attributes import flag_modified
-        flag_modified(inventario, 'cliente_files')
         _maybe_set_status_aguardando_tadeu(inventario)
         db.session.commit()
 
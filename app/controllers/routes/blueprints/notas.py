@@ -30,8 +30,6 @@ from io import BytesIO
 from typing import Any
 
 import sqlalchemy as sa
-import pandas as pd
-from fpdf import FPDF
 from flask import (
     Blueprint,
     abort,
@@ -50,6 +48,7 @@ from sqlalchemy.orm import joinedload
 from app import db
 from app.controllers.routes._base import utc3_now
 from app.controllers.routes._decorators import meeting_only_access_check
+from app.extensions.db_routing import read_replica
 from app.forms import (
     PAGAMENTO_CHOICES,
     CadastroNotaForm,
@@ -64,8 +63,12 @@ from app.models.tables import (
     TaskNotification,
     User,
 )
+from app.utils.lazy_import import lazy_import
 from app.utils.permissions import is_user_admin
 
+pd = lazy_import("pandas")
+fpdf = lazy_import("fpdf")
+
 
 # =============================================================================
 # BLUEPRINT DEFINITION
@@ -208,7 +211,7 @@ def _parse_date_str(value: str | None) -> date | None:
         return None
 
 
-def _wrap_text(text: str, pdf_obj: FPDF, max_width: float) -> list[str]:
+def _wrap_text(text: str, pdf_obj: "fpdf.FPDF", max_width: float) -> list[str]:
     """Quebra texto em linhas respeitando a largura informada."""
     if text is None:
         return [""]
@@ -387,7 +390,6 @@ def _trigger_recorrente_notifications(reference_date: date | None = None) -> int
 
     now = utc3_now()
     created_notifications: list[tuple[int, TaskNotification]] = []
-    touched_users: set[int] = set()
 
     for registro in due_records:
         descricao = (registro.descricao or "").strip()
@@ -409,7 +411,6 @@ def _trigger_recorrente_notifications(reference_date: date | None = None) -> int
             )
             db.session.add(notification)
             created_notifications.append((user_id, notification))
-            touched_users.add(user_id)
         registro.ultimo_aviso = today
 
     if not created_notifications:
@@ -417,11 +418,6 @@ def _trigger_recorrente_notifications(reference_date: date | None = None) -> int
 
     db.session.commit()
 
-    # Invalida cache de notificações
-    from app.controllers.routes.blueprints.notifications import _invalidate_notification_cache
-    for user_id in touched_users:
-        _invalidate_notification_cache(user_id)
-
     # Broadcast em tempo real
     try:
         from app.services.realtime import get_broadcaster
@@ -1037,13 +1033,15 @@ def notas_totalizador():
     notas_por_acordo: dict[str, dict[str, object]] = {}
     notas_por_pagamento: dict[str, dict[str, object]] = {}
 
-    notas_list = (
-        base_query.order_by(
-            sa.func.lower(NotaDebito.empresa),
-            NotaDebito.data_emissao.desc(),
-            NotaDebito.id.desc(),
-        ).all()
-    )
+    # Apos o gatilho de notificacoes (que grava no primario)
+    with read_replica():
+        notas_list = (
+            base_query.order_by(
+                sa.func.lower(NotaDebito.empresa),
+                NotaDebito.data_emissao.desc(),
+                NotaDebito.id.desc(),
+            ).all()
+        )
 
     total_registros = 0
     total_notas = 0
@@ -1207,6 +1205,7 @@ def notas_totalizador():
 @notas_bp.route("/controle-notas/totalizador/export", methods=["GET"])
 @login_required
 @meeting_only_access_check
+@read_replica
 def notas_totalizador_export():
     """
     Exporta notas filtradas por periodo para Excel ou PDF, sem observacao.
@@ -1269,7 +1268,7 @@ def notas_totalizador_export():
         )
 
     if formato == "pdf":
-        class NotasPDF(FPDF):
+        class NotasPDF(fpdf.FPDF):
             pass
 
         pdf = NotasPDF(orientation="L")
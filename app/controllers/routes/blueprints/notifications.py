@@ -19,7 +19,7 @@ Rotas:
 Dependencias:
     - models: TaskNotification, Task, PushSubscription
     - services: realtime (broadcaster), push_notifications
-    - cache: Redis/Memcached para contadores
+    - user_notification_counters: contador de nao lidas por usuario
     - SSE: Server-Sent Events para notificacoes em tempo real
 
 Autor: Refatoracao automatizada
@@ -27,7 +27,7 @@ Data: 2024
 """
 
 from datetime import timedelta
-from typing import Any, Optional
+from typing import Any
 import json
 import os
 import time
@@ -47,11 +47,16 @@ from flask import (
 from flask_login import current_user, login_required
 from sqlalchemy.orm import joinedload
 
-from app import cache, db, limiter
+from app import db, limiter
 from app.controllers.routes._base import SAO_PAULO_TZ, utc3_now
 from app.controllers.routes._decorators import meeting_only_access_check
 from app.models.tables import NotificationType, PushSubscription, Task, TaskNotification
-from app.utils.performance_middleware import track_custom_span
+from app.services.notification_counters import (
+    delete_notifications,
+    get_unread_count,
+    mark_notifications_read,
+)
+from app.utils.performance_middleware import query_budget, track_custom_span
 
 
 # =============================================================================
@@ -62,107 +67,23 @@ notifications_bp = Blueprint('notifications', __name__)
 
 
 # =============================================================================
-# CONSTANTES PARA CACHE
-# =============================================================================
-
-_NOTIFICATION_VERSION_KEY = "notification_version"
-_NOTIFICATION_COUNT_KEY_PREFIX = "user_notifications:"
-
-
-# =============================================================================
-# HELPER FUNCTIONS - CACHE
+# HELPER FUNCTIONS - CONTADORES
 # =============================================================================
 
-def get_cache_timeout(config_key: str, default: int) -> int:
-    """
-    Obtem timeout de cache da configuracao ou usa valor padrao.
-
-    Args:
-        config_key: Chave de configuracao
-        default: Valor padrao em segundos
-
-    Returns:
-        int: Timeout em segundos
-    """
-    return current_app.config.get(config_key, default)
-
-
-def _get_notification_cache_timeout() -> int:
-    """Retorna o timeout de cache para contadores de notificacoes."""
-    return get_cache_timeout("NOTIFICATION_COUNT_CACHE_TIMEOUT", 60)
-
-
-def _get_notification_version() -> int:
-    """Retorna a versao atual do cache de notificacoes."""
-    version = cache.get(_NOTIFICATION_VERSION_KEY)
-    if version is None:
-        version = int(time.time())
-        _set_notification_version(int(version))
-    return int(version)
-
-
-def _set_notification_version(version: int) -> None:
-    """Define a versao do cache de notificacoes."""
-    ttl = max(_get_notification_cache_timeout(), 300)
-    cache.set(_NOTIFICATION_VERSION_KEY, int(version), timeout=ttl)
-
-
-def _notification_cache_key(user_id: int) -> str:
-    """Gera chave de cache versionada para notificacoes do usuario."""
-    return f"{_NOTIFICATION_COUNT_KEY_PREFIX}{_get_notification_version()}:{user_id}"
-
-
-@cache.memoize(timeout=60)
-def _memoized_unread_notifications(user_id: int) -> int:
+def _get_unread_notifications_count(user_id: int) -> int:
     """
-    Contador memoizado de notificacoes nao lidas (por usuario).
+    Recupera contagem de notificacoes nao lidas.
 
-    Args:
-        user_id: ID do usuario
-
-    Returns:
-        int: Quantidade de notificacoes nao lidas
-    """
-    return int(
-        TaskNotification.query.filter(
-            TaskNotification.user_id == user_id,
-            TaskNotification.read_at.is_(None),
-        ).count()
-    )
-
-
-def _get_unread_notifications_count(user_id: int, allow_cache: bool = True) -> int:
-    """
-    Recupera contagem de notificacoes nao lidas com suporte a cache.
+    Le o contador denormalizado em ``user_notification_counters`` (busca por
+    chave primaria), mantido na mesma transacao das gravacoes de notificacoes.
 
     Args:
         user_id: ID do usuario
-        allow_cache: Se deve usar cache
 
     Returns:
         int: Quantidade de notificacoes nao lidas
     """
-    if allow_cache:
-        return _memoized_unread_notifications(user_id)
-
-    unread = TaskNotification.query.filter(
-        TaskNotification.user_id == user_id,
-        TaskNotification.read_at.is_(None),
-    ).count()
-    return int(unread)
-
-
-def _invalidate_notification_cache(user_id: Optional[int] = None) -> None:
-    """
-    Invalida cache de notificacoes nao lidas.
-
-    Args:
-        user_id: ID do usuario (None = todos os usuarios)
-    """
-    if user_id is None:
-        cache.delete_memoized(_memoized_unread_notifications)
-        return
-    cache.delete_memoized(_memoized_unread_notifications, user_id)
+    return get_unread_count(user_id)
 
 
 # =============================================================================
@@ -315,10 +236,8 @@ def _prune_old_notifications(retention_days: int = 60) -> int:
         int: Quantidade de notificacoes removidas
     """
     threshold = utc3_now() - timedelta(days=retention_days)
-    deleted = (
-        TaskNotification.query.filter(TaskNotification.created_at < threshold)
-        .delete(synchronize_session=False)
-    )
+    expired = TaskNotification.query.filter(TaskNotification.created_at < threshold)
+    deleted = delete_notifications(expired)
     if deleted:
         db.session.commit()
     return deleted
@@ -386,6 +305,7 @@ def inject_notification_counts():
 
 @notifications_bp.route("/notifications", methods=["GET"])
 @login_required
+@query_budget(20)
 def list_notifications():
     """
     Retorna as notificacoes mais recentes do usuario (JSON).
@@ -400,6 +320,7 @@ def list_notifications():
 @notifications_bp.route("/notificacoes")
 @login_required
 @meeting_only_access_check
+@query_budget(25)
 def notifications_center():
     """
     Renderiza a pagina do centro de notificacoes.
@@ -434,7 +355,6 @@ def mark_notification_read(notification_id):
     if not notification.read_at:
         notification.read_at = utc3_now()
         db.session.commit()
-        _invalidate_notification_cache(current_user.id)
     return jsonify({"success": True})
 
 
@@ -447,18 +367,12 @@ def mark_all_notifications_read():
     Returns:
         JSON: Resultado da operacao e quantidade atualizada
     """
-    updated = (
-        TaskNotification.query.filter(
-            TaskNotification.user_id == current_user.id,
-            TaskNotification.read_at.is_(None),
-        ).update(
-            {TaskNotification.read_at: utc3_now()},
-            synchronize_session=False,
-        )
+    unread_query = TaskNotification.query.filter(
+        TaskNotification.user_id == current_user.id,
+        TaskNotification.read_at.is_(None),
     )
+    updated = mark_notifications_read(unread_query, utc3_now())
     db.session.commit()
-    if updated:
-        _invalidate_notification_cache(current_user.id)
     return jsonify({"success": True, "updated": updated or 0})
 
 
@@ -543,8 +457,7 @@ def notifications_stream():
                         for notification in new_notifications
                     ]
                     last_sent_id = max(notification.id for notification in new_notifications)
-                    # Use cache for unread count to reduce database queries
-                    unread_total = _get_unread_notifications_count(user_id, allow_cache=True)
+                    unread_total = _get_unread_notifications_count(user_id)
                     payload = json.dumps(
                         {
                             "notifications": serialized,
@@ -22,8 +22,7 @@ Autor: Refatoracao automatizada
 Data: 2024-12
 """
 
-import json
-from collections import Counter, defaultdict
+from collections import Counter
 from datetime import date, datetime, timedelta
 
 import sqlalchemy as sa
@@ -34,23 +33,37 @@ from app import db
 from app.forms import DepartamentoContabilForm, DepartamentoFiscalForm
 from app.models.tables import (
     Announcement,
-    AuditLog,
-    Departamento,
-    Empresa,
     ReportPermission,
     SAO_PAULO_TZ,
     Tag,
     Task,
     TaskPriority,
     TaskStatus,
-    TaskStatusHistory,
     User,
     Session,
 )
 from app.controllers.routes._decorators import report_access_required
+from app.extensions.db_routing import read_replica
+from app.utils.lazy_import import lazy_import
+from app.utils.performance_middleware import query_budget
+from app.services.audit_logs import (
+    AuditLogFilters,
+    latest_audit_log_by_user,
+    query_audit_logs,
+)
 from app.services.courses import CourseStatus, get_courses_overview
+from app.services.report_rollups import ReportGroup, load_report_groups
+from app.services.task_analytics import (
+    compute_age_buckets,
+    compute_task_durations,
+    load_status_history_frame,
+    load_task_frame,
+)
+from app.services.task_stats import get_task_overview_stats
 from app.controllers.routes._base import encode_id
 
+pd = lazy_import("pandas")
+
 
 # =============================================================================
 # BLUEPRINT DEFINITION
@@ -114,6 +127,17 @@ def _require_master_admin() -> None:
         abort(403)
 
 
+def _group_counts(
+    groups: dict[str, ReportGroup], label_map: dict | None = None
+) -> tuple[list[str], list[int]]:
+    """Return chart labels and counts, merging raw values mapped to one label."""
+    counts: dict[str, int] = {}
+    for raw, group in groups.items():
+        label = (label_map or {}).get(raw, raw) or "Não informado"
+        counts[label] = counts.get(label, 0) + group.count
+    return list(counts), list(counts.values())
+
+
 # =============================================================================
 # ROTAS
 # =============================================================================
@@ -127,36 +151,22 @@ def relatorios():
     return render_template("admin/relatorios.html")
 
 @relatorios_bp.route("/relatorio_empresas")
+@read_replica
 def relatorio_empresas():
     """Display aggregated company statistics."""
-    empresas = Empresa.query.with_entities(
-        Empresa.id,
-        Empresa.nome_empresa,
-        Empresa.cnpj,
-        Empresa.codigo_empresa,
-        Empresa.tributacao,
-        Empresa.sistema_utilizado,
-    ).all()
+    groups = load_report_groups("empresas")
 
     categorias = ["MEI", "Simples Nacional", "Lucro Presumido", "Lucro Real"]
     grouped = {cat: [] for cat in categorias}
-    grouped_sistemas = {}
-
-    for eid, nome, cnpj, codigo, trib, sistema in empresas:
+    for trib, group in groups.get("tributacao", {}).items():
         label = trib if trib in categorias else "Outros"
-        grouped.setdefault(label, []).append(
+        grouped.setdefault(label, []).extend(
             {
                 "id": eid,
                 "token": encode_id(eid, namespace="empresa"),
-                "nome": nome,
-                "cnpj": cnpj,
-                "codigo": codigo,
+                **detail,
             }
-        )
-
-        sistema_label = sistema.strip() if sistema else "Não informado"
-        grouped_sistemas.setdefault(sistema_label, []).append(
-            {"nome": nome, "cnpj": cnpj, "codigo": codigo}
+            for eid, detail in group.members
         )
 
     for empresas_list in grouped.values():
@@ -175,8 +185,7 @@ def relatorio_empresas():
         "total": sum(counts),
     }
 
-    sistema_labels = list(grouped_sistemas.keys())
-    sistema_counts = [len(grouped_sistemas[label]) for label in sistema_labels]
+    sistema_labels, sistema_counts = _group_counts(groups.get("sistema", {}))
     sistema_chart = {
         "type": "bar",
         "title": "Empresas por sistema utilizado",
@@ -196,43 +205,14 @@ def relatorio_empresas():
     )
 
 @relatorios_bp.route("/relatorio_fiscal")
+@read_replica
 def relatorio_fiscal():
     """Show summary charts for the fiscal department."""
-    departamentos = (
-        Departamento.query.filter_by(tipo="Departamento Fiscal")
-        .join(Empresa)
-        .with_entities(
-            Empresa.nome_empresa,
-            Empresa.codigo_empresa,
-            Departamento.formas_importacao,
-            Departamento.forma_movimento,
-            Departamento.malote_coleta,
-        )
-        .all()
-    )
+    groups = load_report_groups("fiscal")
     fiscal_form = DepartamentoFiscalForm()
     choice_map = dict(fiscal_form.formas_importacao.choices)
-    import_grouped = {}
-    envio_grouped = {}
-    malote_grouped = {}
-    for nome, codigo, formas, envio, malote in departamentos:
-        formas_list = json.loads(formas) if isinstance(formas, str) else (formas or [])
-        for f in formas_list:
-            label = choice_map.get(f, f)
-            import_grouped.setdefault(label, []).append(
-                {"nome": nome, "codigo": codigo}
-            )
-        label_envio = envio if envio else "Não informado"
-        envio_grouped.setdefault(label_envio, []).append(
-            {"nome": nome, "codigo": codigo}
-        )
-        if envio in ("Fisico", "Digital e Físico"):
-            label_malote = malote if malote else "Não informado"
-            malote_grouped.setdefault(label_malote, []).append(
-                {"nome": nome, "codigo": codigo}
-            )
-    labels_imp = list(import_grouped.keys())
-    counts_imp = [len(import_grouped[label]) for label in labels_imp]
+
+    labels_imp, counts_imp = _group_counts(groups.get("importacao", {}), choice_map)
     importacao_chart = {
         "type": "bar",
         "title": "Formas de Importação (Fiscal)",
@@ -244,8 +224,7 @@ def relatorio_fiscal():
         "total": sum(counts_imp),
     }
 
-    labels_env = list(envio_grouped.keys())
-    counts_env = [len(envio_grouped[label]) for label in labels_env]
+    labels_env, counts_env = _group_counts(groups.get("envio", {}))
     envio_chart = {
         "type": "doughnut",
         "title": "Envio de Documentos (Fiscal)",
@@ -255,8 +234,7 @@ def relatorio_fiscal():
         "total": sum(counts_env),
     }
 
-    labels_mal = list(malote_grouped.keys())
-    counts_mal = [len(malote_grouped[label]) for label in labels_mal]
+    labels_mal, counts_mal = _group_counts(groups.get("malote", {}))
     malote_chart = {
         "type": "bar",
         "title": "Coleta de Malote (Envio Físico)",
@@ -276,56 +254,15 @@ def relatorio_fiscal():
     )
 
 @relatorios_bp.route("/relatorio_contabil")
+@read_replica
 def relatorio_contabil():
     """Show summary charts for the accounting department."""
-    departamentos = (
-        Departamento.query.filter_by(tipo="Departamento Contábil")
-        .join(Empresa)
-        .with_entities(
-            Empresa.nome_empresa,
-            Empresa.codigo_empresa,
-            Departamento.metodo_importacao,
-            Departamento.forma_movimento,
-            Departamento.malote_coleta,
-            Departamento.controle_relatorios,
-        )
-        .all()
-    )
+    groups = load_report_groups("contabil")
     contabil_form = DepartamentoContabilForm()
     metodo_map = dict(contabil_form.metodo_importacao.choices)
     relatorio_map = dict(contabil_form.controle_relatorios.choices)
-    import_grouped = {}
-    envio_grouped = {}
-    malote_grouped = {}
-    relatorios_grouped = {}
-    for nome, codigo, metodo, envio, malote, relatorios in departamentos:
-        metodo_list = json.loads(metodo) if isinstance(metodo, str) else (metodo or [])
-        for m in metodo_list:
-            label = metodo_map.get(m, m)
-            import_grouped.setdefault(label, []).append(
-                {"nome": nome, "codigo": codigo}
-            )
-        label_envio = envio if envio else "Não informado"
-        envio_grouped.setdefault(label_envio, []).append(
-            {"nome": nome, "codigo": codigo}
-        )
-        if envio in ("Fisico", "Digital e Físico"):
-            label_malote = malote if malote else "Não informado"
-            malote_grouped.setdefault(label_malote, []).append(
-                {"nome": nome, "codigo": codigo}
-            )
-        rel_list = (
-            json.loads(relatorios)
-            if isinstance(relatorios, str)
-            else (relatorios or [])
-        )
-        for r in rel_list:
-            label = relatorio_map.get(r, r)
-            relatorios_grouped.setdefault(label, []).append(
-                {"nome": nome, "codigo": codigo}
-            )
-    labels_imp = list(import_grouped.keys())
-    counts_imp = [len(import_grouped[label]) for label in labels_imp]
+
+    labels_imp, counts_imp = _group_counts(groups.get("importacao", {}), metodo_map)
     importacao_chart = {
         "type": "bar",
         "title": "Métodos de Importação (Contábil)",
@@ -337,8 +274,7 @@ def relatorio_contabil():
         "total": sum(counts_imp),
     }
 
-    labels_env = list(envio_grouped.keys())
-    counts_env = [len(envio_grouped[label]) for label in labels_env]
+    labels_env, counts_env = _group_counts(groups.get("envio", {}))
     envio_chart = {
         "type": "doughnut",
         "title": "Envio de Documentos (Contábil)",
@@ -348,8 +284,7 @@ def relatorio_contabil():
         "total": sum(counts_env),
     }
 
-    labels_mal = list(malote_grouped.keys())
-    counts_mal = [len(malote_grouped[label]) for label in labels_mal]
+    labels_mal, counts_mal = _group_counts(groups.get("malote", {}))
     malote_chart = {
         "type": "bar",
         "title": "Coleta de Malote (Envio Físico)",
@@ -361,8 +296,7 @@ def relatorio_contabil():
         "total": sum(counts_mal),
     }
 
-    labels_rel = list(relatorios_grouped.keys())
-    counts_rel = [len(relatorios_grouped[label]) for label in labels_rel]
+    labels_rel, counts_rel = _group_counts(groups.get("relatorios", {}), relatorio_map)
     relatorios_chart = {
         "type": "bar",
         "title": "Controle de Relatórios (Contábil)",
@@ -383,24 +317,11 @@ def relatorio_contabil():
     )
 
 @relatorios_bp.route("/relatorio_usuarios")
+@read_replica
 def relatorio_usuarios():
     """Visualize user counts by role and status."""
-    users = User.query.with_entities(
-        User.username, User.name, User.email, User.role, User.ativo
-    ).all()
-    grouped = {}
-    labels = []
-    counts = []
-    for username, name, email, role, ativo in users:
-        tipo = "Admin" if role == "admin" else "Usuário"
-        status = "Ativo" if ativo else "Inativo"
-        label = f"{tipo} {status}"
-        grouped.setdefault(label, []).append(
-            {"username": username, "name": name, "email": email}
-        )
-    for label, usuarios in grouped.items():
-        labels.append(label)
-        counts.append(len(usuarios))
+    groups = load_report_groups("usuarios")
+    labels, counts = _group_counts(groups.get("perfil", {}))
     users_chart = {
         "type": "doughnut",
         "title": "Usuários por tipo e status",
@@ -416,6 +337,7 @@ def relatorio_usuarios():
     )
 
 @relatorios_bp.route("/relatorio_cursos")
+@read_replica
 def relatorio_cursos():
     """Show aggregated metrics for the internal course catalog."""
     records = get_courses_overview()
@@ -619,6 +541,8 @@ def relatorio_cursos():
 
 
 @relatorios_bp.route("/relatorio_tarefas")
+@read_replica
+@query_budget(40)
 def relatorio_tarefas():
     """Expose tactical dashboards about the global task workload."""
     today = date.today()
@@ -633,8 +557,11 @@ def relatorio_tarefas():
     )
     open_tasks_query = overview_query.filter(Task.status != TaskStatus.DONE)
 
-    total_tasks = overview_query.count()
-    open_tasks = open_tasks_query.count()
+    # Contadores agregados vem do read-model task_stats (poucas centenas de
+    # linhas) em vez de varias contagens sobre a tabela tasks.
+    task_stats = get_task_overview_stats(today, upcoming_limit, EXCLUDED_TASK_TAGS)
+    total_tasks = task_stats.total
+    open_tasks = task_stats.open
     completed_last_30 = (
         overview_query.filter(
             Task.status == TaskStatus.DONE,
@@ -642,28 +569,12 @@ def relatorio_tarefas():
             Task.completed_at >= now - timedelta(days=30),
         ).count()
     )
-    overdue_tasks = (
-        open_tasks_query.filter(
-            Task.due_date.isnot(None),
-            Task.due_date < today,
-        ).count()
-    )
-    due_soon_tasks = (
-        open_tasks_query.filter(
-            Task.due_date.isnot(None),
-            Task.due_date >= today,
-            Task.due_date <= upcoming_limit,
-        ).count()
-    )
-    no_due_date_tasks = open_tasks_query.filter(Task.due_date.is_(None)).count()
-    unassigned_tasks = open_tasks_query.filter(Task.assigned_to.is_(None)).count()
+    overdue_tasks = task_stats.overdue
+    due_soon_tasks = task_stats.due_soon
+    no_due_date_tasks = task_stats.no_due_date
+    unassigned_tasks = task_stats.unassigned
     on_track_tasks = max(open_tasks - overdue_tasks - due_soon_tasks - no_due_date_tasks, 0)
 
-    status_rows = (
-        overview_query.with_entities(Task.status, db.func.count(Task.id))
-        .group_by(Task.status)
-        .all()
-    )
     status_labels_map = {
         TaskStatus.PENDING: "Pendentes",
         TaskStatus.IN_PROGRESS: "Em andamento",
@@ -673,8 +584,7 @@ def relatorio_tarefas():
     status_values = []
     for status in TaskStatus:
         status_labels.append(status_labels_map[status])
-        count = next((qty for st, qty in status_rows if st == status), 0)
-        status_values.append(count)
+        status_values.append(task_stats.by_status.get(status, 0))
     status_chart = {
         "type": "doughnut",
         "title": "Distribuicao por status",
@@ -684,12 +594,6 @@ def relatorio_tarefas():
         "total": total_tasks,
     }
 
-    priority_rows = (
-        overview_query.with_entities(Task.priority, db.func.count(Task.id))
-        .filter(Task.status != TaskStatus.DONE)
-        .group_by(Task.priority)
-        .all()
-    )
     priority_labels_map = {
         TaskPriority.LOW: "Baixa",
         TaskPriority.MEDIUM: "Media",
@@ -699,8 +603,7 @@ def relatorio_tarefas():
     priority_values = []
     for priority in TaskPriority:
         priority_labels.append(priority_labels_map[priority])
-        count = next((qty for pr, qty in priority_rows if pr == priority), 0)
-        priority_values.append(count)
+        priority_values.append(task_stats.open_by_priority.get(priority, 0))
     priority_chart = {
         "type": "bar",
         "title": "Prioridade das tarefas abertas",
@@ -868,14 +771,7 @@ def relatorio_tarefas():
         else None
     )
 
-    sector_rows = (
-        overview_query.with_entities(Tag.nome, db.func.count(Task.id))
-        .filter(Task.status != TaskStatus.DONE)
-        .group_by(Tag.nome)
-        .order_by(db.func.count(Task.id).desc())
-        .limit(8)
-        .all()
-    )
+    sector_rows = task_stats.open_by_tag.most_common(8)
     sector_labels = []
     sector_values = []
     for nome, quantidade in sector_rows:
@@ -892,15 +788,20 @@ def relatorio_tarefas():
         "total": sum(sector_values),
     }
 
-    user_rows = (
-        overview_query.join(User, User.id == Task.assigned_to)
-        .with_entities(User.id, User.name, User.username, db.func.count(Task.id))
-        .filter(Task.status != TaskStatus.DONE)
-        .group_by(User.id, User.name, User.username)
-        .order_by(db.func.count(Task.id).desc())
-        .limit(8)
-        .all()
-    )
+    top_user_counts = task_stats.open_by_user.most_common()
+    user_lookup = {}
+    if top_user_counts:
+        user_lookup = {
+            row.id: row
+            for row in User.query.with_entities(User.id, User.name, User.username)
+            .filter(User.id.in_([user_id for user_id, _ in top_user_counts]))
+            .all()
+        }
+    user_rows = [
+        (user_id, user_lookup[user_id].name, user_lookup[user_id].username, quantidade)
+        for user_id, quantidade in top_user_counts
+        if user_id in user_lookup
+    ][:8]
     user_labels = []
     user_values = []
     for user_id, name, username, quantidade in user_rows:
@@ -935,37 +836,17 @@ def relatorio_tarefas():
         subject_values.append(quantidade)
 
     open_task_dates = open_tasks_query.with_entities(Task.created_at).all()
-    age_buckets = [
-        ("0-7 dias", 0, 7),
-        ("8-14 dias", 8, 14),
-        ("15-30 dias", 15, 30),
-        ("+30 dias", 31, None),
-    ]
-    bucket_counts = {label: 0 for label, _, _ in age_buckets}
-    total_age_days = 0
-    open_age_samples = 0
-    for (created_at,) in open_task_dates:
-        if not created_at:
-            continue
-        age_days = (today - created_at.date()).days
-        if age_days < 0:
-            continue
-        total_age_days += age_days
-        open_age_samples += 1
-        for label, start, end in age_buckets:
-            if end is None and age_days >= start:
-                bucket_counts[label] += 1
-                break
-            if end is not None and start <= age_days <= end:
-                bucket_counts[label] += 1
-                break
-    avg_open_age_days = (total_age_days / open_age_samples) if open_age_samples else None
+    bucket_counts, avg_open_age_days = compute_age_buckets(
+        pd.Series([created_at for (created_at,) in open_task_dates], dtype="datetime64[ns]"),
+        today,
+    )
+    open_age_samples = sum(bucket_counts.values())
     aging_chart = {
         "type": "bar",
         "title": "Idade das tarefas em aberto",
         "datasetLabel": "Quantidade de tarefas",
-        "labels": [label for label, _, _ in age_buckets],
-        "values": [bucket_counts[label] for label, _, _ in age_buckets],
+        "labels": list(bucket_counts.keys()),
+        "values": list(bucket_counts.values()),
         "xTitle": "Faixa de idade",
         "yTitle": "Quantidade",
         "total": sum(bucket_counts.values()),
@@ -989,89 +870,23 @@ def relatorio_tarefas():
             total_days += delta.total_seconds() / 86400
         avg_completion_days = total_days / len(completed_speed_rows)
 
-    overview_task_rows = overview_query.with_entities(
-        Task.id, Task.created_at, Task.completed_at
-    ).all()
-    task_meta = {
-        task_id: {"created_at": created_at, "completed_at": completed_at}
-        for task_id, created_at, completed_at in overview_task_rows
-    }
-    task_ids = list(task_meta.keys())
-
-    time_to_completion_seconds: list[float] = []
-    for meta in task_meta.values():
-        created_at = meta["created_at"]
-        completed_at = meta["completed_at"]
-        if created_at and completed_at:
-            delta = completed_at - created_at
-            seconds = delta.total_seconds()
-            if seconds >= 0:
-                time_to_completion_seconds.append(seconds)
-
-    pending_to_progress_seconds: list[float] = []
-    progress_to_done_seconds: list[float] = []
-    reopened_last_30 = 0
-    reopened_current_month = 0
+    # Historico carregado em uma unica consulta colunar e processado com
+    # group-bys vetorizados (app.services.task_analytics).
+    overview_task_ids = overview_query.with_entities(Task.id).statement
     month_start = date(today.year, today.month, 1)
     next_month = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
-    if task_ids:
-        history_cutoff = now - timedelta(days=30)
-        history_rows = (
-            TaskStatusHistory.query.with_entities(
-                TaskStatusHistory.task_id,
-                TaskStatusHistory.from_status,
-                TaskStatusHistory.to_status,
-                TaskStatusHistory.changed_at,
-            )
-            .filter(TaskStatusHistory.task_id.in_(task_ids))
-            .order_by(TaskStatusHistory.task_id, TaskStatusHistory.changed_at)
-            .all()
-        )
-        history_map: dict[int, list[tuple[TaskStatus | None, TaskStatus, datetime]]] = defaultdict(list)
-        for task_id, from_status, to_status, changed_at in history_rows:
-            history_map[task_id].append((from_status, to_status, changed_at))
-
-        for task_id, entries in history_map.items():
-            meta = task_meta.get(task_id)
-            if not meta:
-                continue
-            last_pending_time = meta["created_at"]
-            last_in_progress_time = None
-            for from_status, to_status, changed_at in entries:
-                if not changed_at:
-                    continue
-                if (
-                    from_status == TaskStatus.DONE
-                    and to_status in (TaskStatus.PENDING, TaskStatus.IN_PROGRESS)
-                ):
-                    if changed_at >= history_cutoff:
-                        reopened_last_30 += 1
-                    if month_start <= changed_at.date() < next_month:
-                        reopened_current_month += 1
-                if to_status == TaskStatus.PENDING:
-                    last_pending_time = changed_at
-                elif to_status == TaskStatus.IN_PROGRESS:
-                    if last_pending_time:
-                        delta = changed_at - last_pending_time
-                        seconds = delta.total_seconds()
-                        if seconds >= 0:
-                            pending_to_progress_seconds.append(seconds)
-                    last_in_progress_time = changed_at
-                elif to_status == TaskStatus.DONE:
-                    if last_in_progress_time:
-                        delta = changed_at - last_in_progress_time
-                        seconds = delta.total_seconds()
-                        if seconds >= 0:
-                            progress_to_done_seconds.append(seconds)
-
-    def _avg_seconds(values: list[float]) -> float | None:
-        if not values:
-            return None
-        return sum(values) / len(values)
+    duration_stats = compute_task_durations(
+        load_task_frame(overview_task_ids),
+        load_status_history_frame(overview_task_ids),
+        now=now,
+        today=today,
+    )
+    reopened_last_30 = duration_stats.reopened_last_30
+    reopened_current_month = duration_stats.reopened_current_month
 
-    avg_creation_to_completion_seconds = _avg_seconds(time_to_completion_seconds)
-    avg_pending_to_progress_seconds = _avg_seconds(pending_to_progress_seconds)
-    avg_progress_to_done_seconds = _avg_seconds(progress_to_done_seconds)
+    avg_creation_to_completion_seconds = duration_stats.creation_to_completion.average
+    avg_pending_to_progress_seconds = duration_stats.pending_to_progress.average
+    avg_progress_to_done_seconds = duration_stats.progress_to_done.average
 
     def _format_duration(seconds: float | None) -> str | None:
         if seconds is None:
@@ -1101,21 +916,21 @@ def relatorio_tarefas():
             "label": "Abertura -> Conclusao",
             "value": _format_duration(avg_creation_to_completion_seconds),
             "description": _duration_source_label(
-                len(time_to_completion_seconds), "tarefas concluidas"
+                duration_stats.creation_to_completion.count, "tarefas concluidas"
             ),
         },
         {
             "label": "Pendente -> Em andamento",
             "value": _format_duration(avg_pending_to_progress_seconds),
             "description": _duration_source_label(
-                len(pending_to_progress_seconds), "transicoes registradas"
+                duration_stats.pending_to_progress.count, "transicoes registradas"
             ),
         },
         {
             "label": "Em andamento -> Concluida",
             "value": _format_duration(avg_progress_to_done_seconds),
             "description": _duration_source_label(
-                len(progress_to_done_seconds), "transicoes registradas"
+                duration_stats.progress_to_done.count, "transicoes registradas"
             ),
         },
     ]
@@ -1193,7 +1008,7 @@ def relatorio_tarefas():
         },
     ]
 
-    done_tasks = next((qty for st, qty in status_rows if st == TaskStatus.DONE), 0)
+    done_tasks = task_stats.by_status.get(TaskStatus.DONE, 0)
     completion_rate = (done_tasks / total_tasks * 100) if total_tasks else 0
     kpis = [
         {
@@ -1250,6 +1065,7 @@ def relatorio_tarefas():
 
 @relatorios_bp.route("/relatorio_mural_logs")
 @report_access_required("mural_logs")
+@read_replica
 def relatorio_mural_logs():
     """Display audit logs for MURAL access and card click interactions."""
 
@@ -1276,34 +1092,21 @@ def relatorio_mural_logs():
     if event_type and event_type not in valid_events:
         event_type = ""
 
-    logs_query = (
-        AuditLog.query
-        .filter(AuditLog.resource_type == "announcement")
-        .filter(AuditLog.action_type == "view")
-        .filter(AuditLog.action_description.in_(tuple(valid_events)))
-    )
-
-    if start_date:
-        start_dt = datetime.combine(start_date, datetime.min.time())
-        logs_query = logs_query.filter(AuditLog.created_at >= start_dt)
-    if end_date:
-        end_dt = datetime.combine(end_date, datetime.max.time())
-        logs_query = logs_query.filter(AuditLog.created_at <= end_dt)
-    if user_id_filter:
-        logs_query = logs_query.filter(AuditLog.user_id == user_id_filter)
-    if announcement_id_filter:
-        logs_query = logs_query.filter(AuditLog.resource_id == announcement_id_filter)
-    if event_type:
-        logs_query = logs_query.filter(AuditLog.action_description == event_type)
-
-    total_logs = logs_query.count()
-    logs = (
-        logs_query
-        .order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
-        .offset((page - 1) * per_page)
-        .limit(per_page)
-        .all()
+    logs_page = query_audit_logs(
+        AuditLogFilters(
+            start=start_date,
+            end=end_date,
+            user_ids=(user_id_filter,) if user_id_filter else None,
+            resource_types=("announcement",),
+            action_types=("view",),
+            action_descriptions=(event_type,) if event_type else tuple(valid_events),
+            resource_id=announcement_id_filter or None,
+        ),
+        page=page,
+        per_page=per_page,
     )
+    total_logs = logs_page.total
+    logs = logs_page.rows
 
     announcement_ids = {
         log.resource_id for log in logs if isinstance(log.resource_id, int)
@@ -1350,6 +1153,7 @@ def relatorio_mural_logs():
 
 @relatorios_bp.route("/relatorio_client_logs")
 @report_access_required("client_logs")
+@read_replica
 def relatorio_client_logs():
     """Display audit logs for client-related create/update/delete actions."""
 
@@ -1381,35 +1185,22 @@ def relatorio_client_logs():
     if action_type_filter and action_type_filter not in valid_action_types:
         action_type_filter = ""
 
-    logs_query = AuditLog.query.filter(
-        AuditLog.resource_type.in_(tuple(valid_resource_types))
-    )
-
-    if start_date:
-        logs_query = logs_query.filter(
-            AuditLog.created_at >= datetime.combine(start_date, datetime.min.time())
-        )
-    if end_date:
-        logs_query = logs_query.filter(
-            AuditLog.created_at <= datetime.combine(end_date, datetime.max.time())
-        )
-    if user_id_filter:
-        logs_query = logs_query.filter(AuditLog.user_id == user_id_filter)
-    if resource_id_filter:
-        logs_query = logs_query.filter(AuditLog.resource_id == resource_id_filter)
-    if resource_type_filter:
-        logs_query = logs_query.filter(AuditLog.resource_type == resource_type_filter)
-    if action_type_filter:
-        logs_query = logs_query.filter(AuditLog.action_type == action_type_filter)
-
-    total_logs = logs_query.count()
-    logs = (
-        logs_query
-        .order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
-        .offset((page - 1) * per_page)
-        .limit(per_page)
-        .all()
+    logs_page = query_audit_logs(
+        AuditLogFilters(
+            start=start_date,
+            end=end_date,
+            user_ids=(user_id_filter,) if user_id_filter else None,
+            resource_types=(
+                (resource_type_filter,) if resource_type_filter else tuple(valid_resource_types)
+            ),
+            action_types=(action_type_filter,) if action_type_filter else None,
+            resource_id=resource_id_filter or None,
+        ),
+        page=page,
+        per_page=per_page,
     )
+    total_logs = logs_page.total
+    logs = logs_page.rows
 
     active_users = (
         User.query
@@ -1439,6 +1230,7 @@ def relatorio_client_logs():
 
 @relatorios_bp.route("/relatorio_atividade_usuarios")
 @report_access_required("user_activity_logs")
+@read_replica
 def relatorio_atividade_usuarios():
     """Display user activity with latest login and session heartbeat."""
 
@@ -1495,28 +1287,15 @@ def relatorio_atividade_usuarios():
             continue
         latest_session_by_user[sess.user_id] = sess
 
-    login_logs_query = (
-        AuditLog.query.filter(
-            AuditLog.user_id.in_(user_ids),
-            AuditLog.resource_type == "session",
-            AuditLog.action_type == "login",
+    latest_login_by_user = latest_audit_log_by_user(
+        AuditLogFilters(
+            start=start_date,
+            end=end_date,
+            user_ids=user_ids,
+            resource_types=("session",),
+            action_types=("login",),
         )
-        .order_by(AuditLog.created_at.desc(), AuditLog.id.desc())
     )
-    if start_date:
-        login_logs_query = login_logs_query.filter(
-            AuditLog.created_at >= datetime.combine(start_date, datetime.min.time())
-        )
-    if end_date:
-        login_logs_query = login_logs_query.filter(
-            AuditLog.created_at <= datetime.combine(end_date, datetime.max.time())
-        )
-    login_logs = login_logs_query.all()
-    latest_login_by_user: dict[int, AuditLog] = {}
-    for log in login_logs:
-        if not log.user_id or log.user_id in latest_login_by_user:
-            continue
-        latest_login_by_user[log.user_id] = log
 
     now = utc3_now()
     online_threshold = now - timedelta(minutes=5)
@@ -10,6 +10,7 @@ Rotas:
     - POST /reuniao/<id>/status: Atualiza status da reuniao
     - POST /reuniao/<id>/pautas: Registra pautas da reuniao
     - POST /reuniao/<id>/delete: Exclui reuniao
+    - GET /reuniao/serie/<job_id>/status: Progresso da criacao de uma serie
 
 Dependencias:
     - models: Reuniao, ReuniaoStatus, User
@@ -41,6 +42,7 @@ from app import db, limiter
 from app.forms import MeetConfigurationForm, MeetingForm
 from app.models.tables import Reuniao, ReuniaoStatus, default_meet_settings
 from app.services.google_calendar import get_calendar_timezone
+from app.services.meeting_series import get_series_job
 from app.services.meeting_room import (
     MeetingStatusConflictError,
     RESCHEDULE_REQUIRED_STATUSES,
@@ -219,10 +221,13 @@ def sala_reunioes():
                         "meeting_id": operation.meeting_id,
                         "meet_link": operation.meet_link,
                     }
+                if operation and operation.series_job_id:
+                    session["meeting_series_job"] = operation.series_job_id
                 return redirect(url_for("reunioes.sala_reunioes"))
             show_modal = True
     if request.method == "POST":
         show_modal = True
+    meeting_series_job = session.pop("meeting_series_job", None)
     meet_popup_payload = session.pop("meet_popup", None)
     meet_popup_data: dict[str, Any] | None = None
     if meet_popup_payload:
@@ -267,11 +272,24 @@ def sala_reunioes():
         show_modal=show_modal,
         calendar_timezone=calendar_tz.key,
         meet_popup_data=meet_popup_data,
+        meeting_series_job=meeting_series_job,
         meeting_status_options=status_options,
         reschedule_statuses=reschedule_statuses,
         today_date=today_date,
     )
 
+@reunioes_bp.route("/reuniao/serie/<job_id>/status", methods=["GET"])
+@login_required
+def meeting_series_status(job_id: str):
+    """Return the progress of a recurring series being created in background."""
+    job = get_series_job(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Criação da série não encontrada."}), 404
+    if job.user_id != current_user.id and not is_user_admin(current_user):
+        return jsonify({"success": False, "error": "Acesso negado."}), 403
+    return jsonify({"success": True, **job.as_dict()})
+
+
 @reunioes_bp.route("/reuniao/<int:meeting_id>/meet-config", methods=["POST"])
 @login_required
 def configure_meet_call(meeting_id: int):
@@ -19,6 +19,7 @@ Rotas:
     - POST /tasks/<id>/responses/read: Marcar como lido
     - GET /tasks/<id>: Visualizar tarefa
     - POST /tasks/<id>/status: Atualizar status
+    - POST /tasks/bulk: Operacao em massa (mover, reatribuir, concluir)
     - POST /tasks/<id>/delete: Excluir tarefa
 
 Dependencias:
@@ -64,7 +65,6 @@ from app.models.tables import (
     TaskResponse,
     TaskResponseParticipant,
     TaskFollower,
-    TaskStatusHistory,
     TaskNotification,
     NotificationType,
     Tag,
@@ -92,7 +92,7 @@ from app.controllers.routes._base import (
 )
 
 # Utilities
-from app.utils.performance_middleware import track_custom_span
+from app.utils.performance_middleware import query_budget, track_custom_span
 from app.utils.security import sanitize_html
 
 # Optimized queries with cache and eager loading
@@ -100,6 +100,20 @@ from app.services.optimized_queries import (
     get_active_users_with_tags,
     get_all_tags,
 )
+from app.services.notification_counters import mark_notifications_read
+from app.services.task_stats import count_tasks_by_status
+from app.services.task_tree import (
+    delete_task_trees,
+    get_ancestor_ids,
+    get_subtree_ids,
+    get_subtree_progress,
+    is_descendant,
+)
+from app.services.task_bulk import (
+    BulkTaskOperationError,
+    BulkTaskRequest,
+    apply_bulk_task_operation,
+)
 
 # Other imports
 from datetime import datetime, timezone
@@ -322,79 +336,69 @@ def _group_root_tasks_by_status(
     for status in ordered_statuses:
         buckets.setdefault(status, [])
 
+    _prefetch_task_progress(
+        _iter_tasks_with_children(task for bucket in buckets.values() for task in bucket)
+    )
     return buckets
 
 
+def _prefetch_task_progress(tasks: Iterable[Task]) -> None:
+    """Attach ``subtree_progress`` to every rendered card in one closure query."""
+    cards = {task.id: task for task in tasks}
+    progress = get_subtree_progress(list(cards), direct_only=True)
+    for task_id, task in cards.items():
+        task.subtree_progress = progress[task_id]
+
+
 def _collect_task_tree_ids(task_id: int) -> list[int]:
     """
-    Coleta todos IDs da árvore de tasks usando CTE recursivo.
+    Coleta todos IDs da árvore de tasks via ``task_closure``.
 
     Retorna lista de IDs incluindo a task raiz e todas subtasks recursivamente.
-    Performance: 1 query ao invés de N queries recursivas.
+    Performance: 1 query indexada (ancestor_id) em vez de CTE recursivo.
     """
-    from sqlalchemy import text
-
-    query = text("""
-        WITH RECURSIVE task_tree AS (
-            SELECT id FROM tasks WHERE id = :task_id
-            UNION ALL
-            SELECT t.id FROM tasks t
-            INNER JOIN task_tree tt ON t.parent_id = tt.id
-        )
-        SELECT id FROM task_tree
-    """)
+    return get_subtree_ids(task_id)
 
-    result = db.session.execute(query, {"task_id": task_id})
-    return [row[0] for row in result]
 
+def _get_task_breadcrumb(task_id: int) -> list[Task]:
+    """Return the ancestors of ``task_id`` via ``task_closure``, root first."""
+    ancestor_ids = get_ancestor_ids(task_id)
+    if not ancestor_ids:
+        return []
+    ancestors = {task.id: task for task in Task.query.filter(Task.id.in_(ancestor_ids))}
+    return [ancestors[ancestor_id] for ancestor_id in reversed(ancestor_ids) if ancestor_id in ancestors]
 
-def _delete_task_tree_bulk(task_id: int) -> None:
-    """
-    Deleta árvore de tasks eficientemente usando bulk deletes.
 
-    Performance: 6 queries ao invés de potencialmente centenas.
-    Usa CTE recursivo para coletar IDs, depois bulk delete de todos relacionamentos.
+def _resolve_task_reparent(task: Task, parent_id: int | None) -> tuple[Task | None, str | None]:
     """
-    task_ids = _collect_task_tree_ids(task_id)
-
-    if not task_ids:
-        return
+    Valida a troca de tarefa pai antes do flush.
 
-    # Bulk delete de todos relacionamentos
-    # Nota: ordem importa - deletar relacionamentos antes das tasks
-    TaskResponseParticipant.query.filter(
-        TaskResponseParticipant.task_id.in_(task_ids)
-    ).delete(synchronize_session=False)
-
-    TaskResponse.query.filter(
-        TaskResponse.task_id.in_(task_ids)
-    ).delete(synchronize_session=False)
-
-    TaskAttachment.query.filter(
-        TaskAttachment.task_id.in_(task_ids)
-    ).delete(synchronize_session=False)
-
-    TaskHistory.query.filter(
-        TaskHistory.task_id.in_(task_ids)
-    ).delete(synchronize_session=False)
-
-    TaskStatusHistory.query.filter(
-        TaskStatusHistory.task_id.in_(task_ids)
-    ).delete(synchronize_session=False)
-
-    TaskNotification.query.filter(
-        TaskNotification.task_id.in_(task_ids)
-    ).delete(synchronize_session=False)
+    Retorna ``(nova_pai, None)`` ou ``(None, mensagem)``. O ciclo e checado
+    em ``task_closure`` aqui, para a rota responder com flash em vez de o
+    listener do mapper abortar o commit.
+    """
+    if parent_id is None:
+        return None, None
+    parent = Task.query.get(parent_id)
+    if parent is None:
+        return None, "Tarefa pai não encontrada."
+    if parent.id == task.id or is_descendant(parent.id, task.id):
+        return None, "Uma tarefa não pode ser subtarefa dela mesma ou de suas subtarefas."
+    if parent.tag.nome.lower() in EXCLUDED_TASK_TAGS_LOWER:
+        return None, "Tarefa pai não encontrada."
+    if parent.is_private and not _user_can_access_task(parent, current_user):
+        return None, "Você não tem acesso à tarefa pai informada."
+    return parent, None
 
-    TaskFollower.query.filter(
-        TaskFollower.task_id.in_(task_ids)
-    ).delete(synchronize_session=False)
 
-    # Por último, deleta as tasks
-    Task.query.filter(
-        Task.id.in_(task_ids)
-    ).delete(synchronize_session=False)
+def _delete_task_tree_bulk(task_id: int) -> None:
+    """
+    Deleta árvore de tasks eficientemente usando bulk deletes.
 
+    A subárvore vem de ``task_closure``; relacionamentos, read-models e o
+    ``has_children`` do pai são tratados em ``delete_task_trees``.
+    """
+    delete_task_trees([task_id])
     db.session.commit()
 
 
@@ -857,6 +861,7 @@ def _is_safe_referrer(referrer_url: str) -> bool:
 @tasks_bp.route("/tasks/overview")
 @login_required
 @meeting_only_access_check
+@query_budget(40)
 def tasks_overview():
     """Kanban view of all tasks grouped by status."""
 
@@ -1042,6 +1047,7 @@ def tasks_overview():
 
 @tasks_bp.route("/tasks/overview/mine")
 @login_required
+@query_budget(40)
 def tasks_overview_mine():
     """Kanban view of tasks where the current user participates."""
 
@@ -1310,6 +1316,7 @@ def tasks_users(tag_id):
 @tasks_bp.route("/tasks/sector/<int:tag_id>")
 @login_required
 @meeting_only_access_check
+@query_budget(40)
 def tasks_sector(tag_id):
     """Kanban board of tasks for a specific sector/tag."""
     tag = Tag.query.get_or_404(tag_id)
@@ -1353,7 +1360,18 @@ def tasks_sector(tag_id):
         key=lambda x: x.completed_at or datetime.min,
         reverse=True,
     )
-    history_count = max(0, len(done_sorted) - 5)
+    if user_is_admin:
+        # Admin enxerga todas as tarefas publicas do setor e as proprias
+        # privadas: o badge usa o read-model (publicas) mais as privadas do
+        # admin, sem sofrer com o limite de 200 tarefas carregadas.
+        done_total = count_tasks_by_status(
+            tag_id=tag_id,
+            user_id=current_user.id if assigned_to_me else None,
+            private_owner_id=current_user.id,
+        )[TaskStatus.DONE]
+        history_count = max(0, done_total - 5)
+    else:
+        history_count = max(0, len(done_sorted) - 5)
     tasks_by_status[TaskStatus.DONE] = done_sorted[:5]
     return render_template(
         "tasks_board.html",
@@ -1732,6 +1750,7 @@ def tasks_new():
         "tasks_new.html",
         form=form,
         parent_task=parent_task,
+        parent_breadcrumb=_get_task_breadcrumb(parent_task.id) if parent_task else [],
         cancel_url=cancel_url,
         is_editing=False,
         editing_task=None,
@@ -1781,6 +1800,19 @@ def tasks_edit(task_id: int):
     form = TaskForm()
     parent_task = task.parent
 
+    # O campo oculto parent_id so e renderizado para subtarefas; um valor
+    # diferente do atual move a subarvore para outra tarefa pai.
+    if request.method == "POST" and "parent_id" in request.form:
+        try:
+            requested_parent_id = int(request.form.get("parent_id") or 0) or None
+        except (TypeError, ValueError):
+            requested_parent_id = task.parent_id
+        if requested_parent_id != task.parent_id:
+            parent_task, reparent_error = _resolve_task_reparent(task, requested_parent_id)
+            if reparent_error:
+                flash(reparent_error, "danger")
+                return redirect(url_for("tasks.tasks_edit", task_id=task.id, return_url=return_url))
+
     if parent_task:
         form.parent_id.data = parent_task.id
         form.tag_id.choices = [(parent_task.tag_id, parent_task.tag.nome)]
@@ -1865,6 +1897,7 @@ def tasks_edit(task_id: int):
             task.is_private = is_private
             task.tag_id = tag_id
             task.assigned_to = assignee_id
+            task.parent_id = parent_task.id if parent_task else None
 
             uploaded_files = [
                 storage
@@ -2001,6 +2034,7 @@ def tasks_edit(task_id: int):
         "tasks_new.html",
         form=form,
         parent_task=parent_task,
+        parent_breadcrumb=_get_task_breadcrumb(parent_task.id) if parent_task else [],
         cancel_url=cancel_url,
         is_editing=True,
         editing_task=task,
@@ -2413,14 +2447,13 @@ def task_responses_mark_read(task_id: int):
     now = utc3_now()
     participant.last_read_at = now
 
-    (
-        TaskNotification.query.filter(
-            TaskNotification.user_id == current_user.id,
-            TaskNotification.task_id == task.id,
-            TaskNotification.type == NotificationType.TASK_RESPONSE.value,
-            TaskNotification.read_at.is_(None),
-        ).update({"read_at": now}, synchronize_session=False)
+    response_notifications = TaskNotification.query.filter(
+        TaskNotification.user_id == current_user.id,
+        TaskNotification.task_id == task.id,
+        TaskNotification.type == NotificationType.TASK_RESPONSE.value,
+        TaskNotification.read_at.is_(None),
     )
+    mark_notifications_read(response_notifications, now)
 
     db.session.commit()
 
@@ -2434,6 +2467,7 @@ def task_responses_mark_read(task_id: int):
 
 @tasks_bp.route("/tasks/<int:task_id>")
 @login_required
+@query_budget(25)
 def tasks_view(task_id):
     """Display details of a completed task."""
     task = (
@@ -2498,6 +2532,7 @@ def tasks_view(task_id):
     return render_template(
         "tasks_view.html",
         task=task,
+        parent_breadcrumb=_get_task_breadcrumb(task.id) if task.parent_id else [],
         priority_labels=priority_labels,
         priority_order=priority_order,
         cancel_url=cancel_url,
@@ -2551,12 +2586,7 @@ def tasks_status(task_id):
             if task.created_by != current_user.id:
                 abort(403)
     if task.status != new_status:
-        history = TaskStatusHistory(
-            task_id=task.id,
-            from_status=task.status,
-            to_status=new_status,
-            changed_by=current_user.id,
-        )
+        # The status history row is written by the Task after_update listener.
         old_status = task.status
         task.status = new_status
         if new_status == TaskStatus.IN_PROGRESS:
@@ -2617,7 +2647,6 @@ def tasks_status(task_id):
                 db.session.add(notification)
                 status_notification_records.append((user_id, notification))
 
-    db.session.add(history)
     if status_notification_records:
         db.session.flush()
     db.session.commit()
@@ -2684,6 +2713,34 @@ def tasks_status(task_id):
     return jsonify({"success": True, "task": task_data})
 
 
+@tasks_bp.route("/tasks/bulk", methods=["POST"])
+@login_required
+def tasks_bulk():
+    """Apply one operation (move, reassign, close) to many tasks at once."""
+    try:
+        bulk_request = BulkTaskRequest.from_payload(request.get_json(silent=True))
+        result = apply_bulk_task_operation(
+            current_user,
+            bulk_request,
+            serializer=_serialize_task,
+            excluded_tags=EXCLUDED_TASK_TAGS,
+        )
+    except BulkTaskOperationError as exc:
+        return jsonify({"success": False, **exc.as_dict()}), exc.http_status
+    except Exception as exc:
+        current_app.logger.exception("Erro na operacao em massa de tarefas", exc_info=exc)
+        return (
+            jsonify(
+                {
+                    "success": False,
+                    "message": "Não foi possível atualizar as tarefas. Tente novamente.",
+                }
+            ),
+            500,
+        )
+    return jsonify(result.as_dict())
+
+
 @tasks_bp.route("/tasks/<int:task_id>/delete", methods=["POST"])
 @login_required
 def tasks_delete(task_id):
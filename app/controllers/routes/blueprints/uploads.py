@@ -29,7 +29,6 @@ from flask import Blueprint, current_app, jsonify, request, url_for
 from flask_login import login_required
 from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
-from PIL import Image, ImageOps, UnidentifiedImageError
 
 from app.controllers.routes._base import get_file_size_bytes
 from app.controllers.routes._validators import (
@@ -38,6 +37,10 @@ from app.controllers.routes._validators import (
     is_safe_image_upload,
     is_safe_pdf_upload,
 )
+from app.utils.lazy_import import lazy_import
+
+Image = lazy_import("PIL.Image")
+ImageOps = lazy_import("PIL.ImageOps")
 
 
 # =============================================================================
@@ -143,7 +146,7 @@ def _build_preview_url(original_path: str, unique_name: str) -> str | None:
             image.save(preview_abs, **save_options)
 
         return url_for("static", filename=preview_rel, _external=True)
-    except (UnidentifiedImageError, OSError, ValueError) as exc:
+    except (Image.UnidentifiedImageError, OSError, ValueError) as exc:
         current_app.logger.warning("Falha ao gerar preview da imagem %s: %s", unique_name, exc)
         return None
 
@@ -26,6 +26,7 @@ from app import db
 from app.controllers.routes._decorators import admin_required
 from app.forms import EditUserForm, RegistrationForm, TagDeleteForm, TagForm
 from app.models.tables import Tag, Task, User
+from app.services.task_tree import delete_task_trees
 
 
 # =============================================================================
@@ -42,42 +43,6 @@ users_bp = Blueprint('users', __name__)
 PERSONAL_TAG_PREFIX = "[PESSOAL] "
 
 
-# =============================================================================
-# FUNÇÕES AUXILIARES
-# =============================================================================
-
-def _delete_task_recursive(task: Task) -> None:
-    """
-    Deleta uma tarefa e todas as suas subtarefas recursivamente.
-
-    Args:
-        task: Tarefa a ser deletada
-    """
-    children = Task.query.filter_by(parent_id=task.id).all()
-    for child in children:
-        _delete_task_recursive(child)
-
-    # Delete task responses
-    from app.models.tables import TaskResponse, TaskResponseParticipant
-    TaskResponseParticipant.query.filter_by(task_id=task.id).delete()
-    TaskResponse.query.filter_by(task_id=task.id).delete()
-
-    # Delete task follow-ups
-    from app.models.tables import TaskFollowUp
-    TaskFollowUp.query.filter_by(task_id=task.id).delete()
-
-    # Delete task attachments
-    from app.models.tables import TaskAttachment
-    TaskAttachment.query.filter_by(task_id=task.id).delete()
-
-    # Delete task history
-    from app.models.tables import TaskHistory
-    TaskHistory.query.filter_by(task_id=task.id).delete()
-
-    # Delete the task itself
-    db.session.delete(task)
-
-
 # =============================================================================
 # ROTAS
 # =============================================================================
@@ -399,9 +364,13 @@ def list_users():
                     else:
                         try:
                             if tag_to_delete.nome.startswith(PERSONAL_TAG_PREFIX):
-                                personal_tasks = Task.query.filter_by(tag_id=tag_to_delete.id).all()
-                                for task in personal_tasks:
-                                    _delete_task_recursive(task)
+                                personal_task_ids = [
+                                    task_id
+                                    for (task_id,) in db.session.query(Task.id).filter_by(
+                                        tag_id=tag_to_delete.id
+                                    )
+                                ]
+                                delete_task_trees(personal_task_ids)
                                 db.session.flush()
                             db.session.delete(tag_to_delete)
                             db.session.commit()
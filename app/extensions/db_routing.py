@@ -0,0 +1,317 @@
+"""Read-replica routing for heavy read-only views and report services.
+
+With ``REPLICA_DATABASE_URI`` set, the replica is registered as the
+``replica`` bind and ``db.session`` uses :class:`RoutingSession`. Code
+marked with :func:`read_replica` sends its SELECTs to the replica; every
+write (flush, DML, ``text()``, ``FOR UPDATE``) keeps going to the primary.
+
+The replica is skipped, falling back to the primary, when:
+
+* it is not configured or failed its last health check (ping or lag);
+* the session already wrote in the current request;
+* the current user committed a write less than
+  ``REPLICA_READ_YOUR_WRITES_SECONDS`` ago (read-your-writes window).
+
+Usage:
+    from app.extensions.db_routing import read_replica
+
+    @bp.route("/relatorio")
+    @read_replica
+    def relatorio():
+        ...
+
+    with read_replica():
+        rows = heavy_query()
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any
+
+import sqlalchemy as sa
+from flask import current_app, has_request_context
+from flask_login import current_user
+from flask_sqlalchemy.session import Session
+
+from app.extensions.cache import cache
+
+logger = logging.getLogger(__name__)
+
+REPLICA_BIND_KEY = "replica"
+
+# Marca de escrita na sessao; forca o primario ate o fim da requisicao.
+_WROTE_KEY = "db_routing_wrote"
+
+# Engine do replica ativo no contexto atual (None = primario).
+_replica_engine: ContextVar[sa.engine.Engine | None] = ContextVar(
+    "db_routing_replica_engine", default=None
+)
+
+
+def configure_replica_bind(app) -> bool:
+    """Register ``REPLICA_DATABASE_URI`` as the ``replica`` bind.
+
+    Must run before ``SQLAlchemy(app)``. Returns ``True`` when a replica is
+    configured.
+    """
+    replica_uri = (app.config.get("REPLICA_DATABASE_URI") or "").strip()
+    if not replica_uri:
+        return False
+    binds = app.config.setdefault("SQLALCHEMY_BINDS", {})
+    binds.setdefault(REPLICA_BIND_KEY, replica_uri)
+    return True
+
+
+# =============================================================================
+# SAUDE DO REPLICA
+# =============================================================================
+
+class ReplicaHealth:
+    """Cached health of the replica, rechecked at most once per interval."""
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self.healthy = True
+        self.checked_at = 0.0
+        self.lag_seconds: float | None = None
+        self.error: str | None = None
+
+    def mark_unhealthy(self, error: str) -> None:
+        with self._lock:
+            if self.healthy:
+                logger.warning("Replica marcado como indisponivel: %s", error)
+            self.healthy = False
+            self.error = error
+            self.checked_at = time.monotonic()
+
+    def is_healthy(self, engine: sa.engine.Engine) -> bool:
+        interval = float(current_app.config.get("REPLICA_HEALTH_CHECK_INTERVAL", 15))
+        if time.monotonic() - self.checked_at < interval:
+            return self.healthy
+        # Uma thread checa; as demais usam o ultimo resultado.
+        if not self._lock.acquire(blocking=False):
+            return self.healthy
+        try:
+            self._check(engine)
+        finally:
+            self.checked_at = time.monotonic()
+            self._lock.release()
+        return self.healthy
+
+    def _check(self, engine: sa.engine.Engine) -> None:
+        max_lag = float(current_app.config.get("REPLICA_MAX_LAG_SECONDS", 30))
+        try:
+            with engine.connect() as connection:
+                connection.execute(sa.text("SELECT 1"))
+                lag = _replication_lag(connection)
+        except Exception as exc:
+            if self.healthy:
+                logger.warning("Replica indisponivel, usando o primario: %s", exc)
+            self.healthy = False
+            self.error = str(exc)
+            return
+
+        self.lag_seconds = lag
+        if lag is not None and lag > max_lag:
+            if self.healthy:
+                logger.warning("Replica atrasado %.0fs (limite %.0fs), usando o primario", lag, max_lag)
+            self.healthy = False
+            self.error = f"lag {lag:.0f}s"
+            return
+        if not self.healthy:
+            logger.info("Replica disponivel novamente")
+        self.healthy = True
+        self.error = None
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "healthy": self.healthy,
+            "lag_seconds": self.lag_seconds,
+            "error": self.error,
+        }
+
+
+def _replication_lag(connection) -> float | None:
+    """Return MySQL replication lag in seconds, ``None`` when unknown.
+
+    A server that is not a replica (or a SQLite stand-in) reports no lag.
+    Stopped replication (``Seconds_Behind_Source`` NULL) counts as infinite.
+    """
+    if connection.dialect.name != "mysql":
+        return None
+    for statement, column in (
+        ("SHOW REPLICA STATUS", "Seconds_Behind_Source"),
+        ("SHOW SLAVE STATUS", "Seconds_Behind_Master"),
+    ):
+        try:
+            row = connection.execute(sa.text(statement)).mappings().first()
+        except sa.exc.DBAPIError:
+            continue
+        if row is None:
+            return None
+        value = row.get(column)
+        return float("inf") if value is None else float(value)
+    return None
+
+
+replica_health = ReplicaHealth()
+
+
+def get_replica_engine() -> sa.engine.Engine | None:
+    """Return the replica engine when configured and healthy."""
+    db = current_app.extensions["sqlalchemy"]
+    engine = db.engines.get(REPLICA_BIND_KEY)
+    if engine is None or not replica_health.is_healthy(engine):
+        return None
+    return engine
+
+
+# =============================================================================
+# READ-YOUR-WRITES
+# =============================================================================
+
+def _last_write_key(user_id: int) -> str:
+    return f"db_routing:last_write:{user_id}"
+
+
+def _current_user_id() -> int | None:
+    if not has_request_context():
+        return None
+    try:
+        if current_user.is_authenticated:
+            return current_user.id
+    except Exception:
+        return None
+    return None
+
+
+def _within_read_your_writes_window() -> bool:
+    user_id = _current_user_id()
+    if user_id is None:
+        return False
+    window = float(current_app.config.get("REPLICA_READ_YOUR_WRITES_SECONDS", 10))
+    last_write = cache.get(_last_write_key(user_id))
+    return last_write is not None and time.time() - float(last_write) < window
+
+
+def _record_user_write(response):
+    """``after_request``: start the user's read-your-writes window."""
+    db = current_app.extensions["sqlalchemy"]
+    if not db.session.registry.has():
+        return response
+    if db.session.info.pop(_WROTE_KEY, False):
+        user_id = _current_user_id()
+        if user_id is not None:
+            window = float(current_app.config.get("REPLICA_READ_YOUR_WRITES_SECONDS", 10))
+            cache.set(_last_write_key(user_id), time.time(), timeout=int(window) + 1)
+    return response
+
+
+# =============================================================================
+# SESSAO
+# =============================================================================
+
+def _is_read(clause: Any) -> bool:
+    if clause is None:
+        return True
+    if not getattr(clause, "is_select", False):
+        # DML, text() e demais construcoes ficam no primario.
+        return False
+    return getattr(clause, "_for_update_arg", None) is None
+
+
+class RoutingSession(Session):
+    """``db.session`` class that sends marked reads to the replica."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            engine = _replica_engine.get()
+            if (
+                engine is not None
+                and not self._flushing
+                and not self.info.get(_WROTE_KEY)
+                and _is_read(clause)
+                and (mapper is not None or clause is not None)
+            ):
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@sa.event.listens_for(RoutingSession, "after_flush")
+def _mark_session_wrote(session, flush_context) -> None:
+    session.info[_WROTE_KEY] = True
+
+
+@sa.event.listens_for(RoutingSession, "do_orm_execute")
+def _mark_session_dml(orm_execute_state) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[_WROTE_KEY] = True
+
+
+def _on_replica_error(context) -> None:
+    if context.is_disconnect or isinstance(context.sqlalchemy_exception, sa.exc.OperationalError):
+        replica_health.mark_unhealthy(str(context.original_exception))
+
+
+# =============================================================================
+# MARCACAO
+# =============================================================================
+
+class read_replica:
+    """Route the reads of a block or function to the replica.
+
+    Works as a decorator (views, report services) and as a context
+    manager. A decorated call that hits a replica failure is retried once
+    on the primary.
+    """
+
+    def __init__(self, func=None) -> None:
+        self._func = func
+        self._tokens: list = []
+        if func is not None:
+            wraps(func)(self)
+
+    def __enter__(self):
+        engine = None
+        if _replica_engine.get() is None:
+            engine = get_replica_engine()
+            if engine is not None and _within_read_your_writes_window():
+                engine = None
+        self._tokens.append(_replica_engine.set(engine or _replica_engine.get()))
+        return engine
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _replica_engine.reset(self._tokens.pop())
+
+    def __call__(self, *args, **kwargs):
+        with read_replica() as engine:
+            if engine is None:
+                return self._func(*args, **kwargs)
+            try:
+                return self._func(*args, **kwargs)
+            except sa.exc.DBAPIError:
+                # So o listener do engine do replica marca indisponibilidade;
+                # erros do primario seguem adiante.
+                if replica_health.healthy:
+                    raise
+                current_app.extensions["sqlalchemy"].session.rollback()
+        logger.warning("Reexecutando %s no primario apos falha do replica", self._func.__name__)
+        token = _replica_engine.set(None)
+        try:
+            return self._func(*args, **kwargs)
+        finally:
+            _replica_engine.reset(token)
+
+
+def init_db_routing(app) -> None:
+    """Register the request hook and the replica error listener."""
+    app.after_request(_record_user_write)
+    with app.app_context():
+        engine = app.extensions["sqlalchemy"].engines.get(REPLICA_BIND_KEY)
+    if engine is not None:
+        sa.event.listen(engine, "handle_error", _on_replica_error)
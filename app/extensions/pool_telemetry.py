@@ -0,0 +1,281 @@
+"""Connection-pool telemetry: checkout wait, hold time and who holds it.
+
+``/health/db-pool`` only shows how many connections are checked out right
+now. This module records, per worker process, histograms of:
+
+* checkout wait: time spent in ``pool.connect()`` (queueing for a free
+  connection, opening a new one and the pre-ping), plus pool timeouts;
+* hold time: from checkout to checkin, i.e. how long a request or job kept
+  the connection, including any HTTP/SMTP call made with the session open.
+
+Each sample is tagged with its owner: the Flask endpoint inside a request,
+the job name inside :class:`pool_job` (scheduler and background jobs), or
+the thread name otherwise.
+
+Usage:
+    from app.extensions.pool_telemetry import pool_job, pool_telemetry
+
+    with pool_job("sync_encerramento_fiscal"):
+        ...
+
+    pool_telemetry.snapshot(top=10)
+"""
+
+from __future__ import annotations
+
+import bisect
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import wraps
+from typing import Any
+from zoneinfo import ZoneInfo
+
+import sqlalchemy as sa
+from flask import has_request_context, request
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+SAO_PAULO_TZ = ZoneInfo("America/Sao_Paulo")
+
+# Limites superiores dos buckets, em ms; o ultimo bucket e aberto.
+BUCKET_BOUNDS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Donos distintos guardados; o excedente vai para ``OTHER_OWNER``.
+MAX_OWNERS = 500
+OTHER_OWNER = "other"
+
+_RECORD_KEY = "pool_telemetry"
+
+_job_name: ContextVar[str | None] = ContextVar("pool_telemetry_job", default=None)
+
+
+def current_owner() -> str:
+    """Label for the code currently taking a connection."""
+    job = _job_name.get()
+    if job:
+        return f"job:{job}"
+    if has_request_context():
+        return f"endpoint:{request.endpoint or request.path}"
+    return f"thread:{threading.current_thread().name}"
+
+
+class pool_job:
+    """Attribute the connections taken in a block or function to a job.
+
+    Works as a decorator and as a context manager; the name shows up as
+    ``job:<name>`` in the telemetry.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._tokens: list = []
+
+    def __enter__(self) -> str:
+        self._tokens.append(_job_name.set(self.name))
+        return self.name
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        _job_name.reset(self._tokens.pop())
+
+    def __call__(self, func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with pool_job(self.name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+
+# =============================================================================
+# HISTOGRAMAS
+# =============================================================================
+
+@dataclass
+class _Histogram:
+    counts: list[int] = field(default_factory=lambda: [0] * (len(BUCKET_BOUNDS_MS) + 1))
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def add(self, value_ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKET_BOUNDS_MS, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        if value_ms > self.max_ms:
+            self.max_ms = value_ms
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the percentile (``max`` for the last)."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                if index < len(BUCKET_BOUNDS_MS):
+                    return float(min(BUCKET_BOUNDS_MS[index], self.max_ms))
+                return self.max_ms
+        return self.max_ms
+
+    def as_dict(self, buckets: bool = False) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 1),
+            "avg_ms": round(self.total_ms / self.count, 2) if self.count else 0.0,
+            "max_ms": round(self.max_ms, 1),
+            "p50_ms": round(self.percentile(0.50), 1),
+            "p95_ms": round(self.percentile(0.95), 1),
+            "p99_ms": round(self.percentile(0.99), 1),
+        }
+        if buckets:
+            labels = [f"<={bound}" for bound in BUCKET_BOUNDS_MS] + [f">{BUCKET_BOUNDS_MS[-1]}"]
+            data["buckets"] = dict(zip(labels, self.counts))
+        return data
+
+
+@dataclass
+class _OwnerStats:
+    wait: _Histogram = field(default_factory=_Histogram)
+    hold: _Histogram = field(default_factory=_Histogram)
+    timeouts: int = 0
+
+
+class PoolTelemetry:
+    """In-process aggregation of pool samples; safe across request threads."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.hold_warning_ms = 0.0
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._since = datetime.now(SAO_PAULO_TZ)
+            self._wait = _Histogram()
+            self._hold = _Histogram()
+            self._timeouts = 0
+            self._owners: dict[str, _OwnerStats] = {}
+            self._active: dict[int, tuple[str, float]] = {}
+
+    def _owner_stats(self, owner: str) -> _OwnerStats:
+        stats = self._owners.get(owner)
+        if stats is None:
+            if len(self._owners) >= MAX_OWNERS:
+                owner = OTHER_OWNER
+            stats = self._owners.setdefault(owner, _OwnerStats())
+        return stats
+
+    def record_wait(self, owner: str, seconds: float, timed_out: bool = False) -> None:
+        value_ms = seconds * 1000
+        with self._lock:
+            stats = self._owner_stats(owner)
+            self._wait.add(value_ms)
+            stats.wait.add(value_ms)
+            if timed_out:
+                self._timeouts += 1
+                stats.timeouts += 1
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        owner = current_owner()
+        started = time.perf_counter()
+        connection_record.info[_RECORD_KEY] = (owner, started)
+        with self._lock:
+            self._active[id(connection_record)] = (owner, started)
+
+    def on_checkin(self, dbapi_connection, connection_record) -> None:
+        if connection_record is None:
+            return
+        checkout = connection_record.info.pop(_RECORD_KEY, None)
+        with self._lock:
+            self._active.pop(id(connection_record), None)
+        if checkout is None:
+            return
+        owner, started = checkout
+        value_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self._hold.add(value_ms)
+            self._owner_stats(owner).hold.add(value_ms)
+        if self.hold_warning_ms and value_ms >= self.hold_warning_ms:
+            logger.warning(
+                "Conexao do pool retida por %.0f ms (%s)",
+                value_ms,
+                owner,
+                extra={"pool_hold": {"owner": owner, "hold_ms": round(value_ms, 1)}},
+            )
+
+    def snapshot(self, top: int = 10) -> dict[str, Any]:
+        """Global histograms, the ``top`` owners by total hold time and live holders."""
+        now = time.perf_counter()
+        with self._lock:
+            holders = sorted(
+                self._owners.items(), key=lambda item: item[1].hold.total_ms, reverse=True
+            )[:top]
+            active = sorted(self._active.values(), key=lambda item: item[1])[:top]
+            return {
+                "since": self._since.isoformat(),
+                "checkout_wait": self._wait.as_dict(buckets=True),
+                "hold": self._hold.as_dict(buckets=True),
+                "timeouts": self._timeouts,
+                "top_holders": [
+                    {
+                        "owner": owner,
+                        "hold": stats.hold.as_dict(),
+                        "checkout_wait": stats.wait.as_dict(),
+                        "timeouts": stats.timeouts,
+                    }
+                    for owner, stats in holders
+                ],
+                "active": [
+                    {"owner": owner, "held_ms": round((now - started) * 1000, 1)}
+                    for owner, started in active
+                ],
+            }
+
+
+pool_telemetry = PoolTelemetry()
+
+
+# =============================================================================
+# POOL E LISTENERS
+# =============================================================================
+
+class InstrumentedQueuePool(QueuePool):
+    """``QueuePool`` that times ``connect()`` for the checkout wait histogram."""
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except sa.exc.TimeoutError:
+            pool_telemetry.record_wait(current_owner(), time.perf_counter() - started, timed_out=True)
+            raise
+        pool_telemetry.record_wait(current_owner(), time.perf_counter() - started)
+        return connection
+
+
+def configure_pool_class(app) -> None:
+    """Use :class:`InstrumentedQueuePool` for every engine unless disabled.
+
+    Must run before ``SQLAlchemy(app)``. In-memory SQLite keeps its
+    ``StaticPool`` (no wait times); hold times are recorded either way.
+    """
+    if app.config.get("POOL_TELEMETRY", True):
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"].setdefault("poolclass", InstrumentedQueuePool)
+
+
+def init_pool_telemetry(app) -> None:
+    """Register checkout/checkin listeners on every engine (primary and binds)."""
+    if not app.config.get("POOL_TELEMETRY", True):
+        return
+    pool_telemetry.hold_warning_ms = float(app.config.get("POOL_HOLD_WARNING_MS", 0) or 0)
+    with app.app_context():
+        engines = list(app.extensions["sqlalchemy"].engines.values())
+    for engine in engines:
+        sa.event.listen(engine, "checkout", pool_telemetry.on_checkout)
+        sa.event.listen(engine, "checkin", pool_telemetry.on_checkin)
@@ -6,6 +6,8 @@ import os
 from concurrent.futures import ThreadPoolExecutor, Future
 from typing import Callable, Any
 
+from app.extensions.pool_telemetry import pool_job
+
 _logger = logging.getLogger(__name__)
 
 _max_workers = int(os.getenv("TASK_QUEUE_MAX_WORKERS", "4") or 4)
@@ -19,12 +21,13 @@ def submit_io_task(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Futur
     thread. Errors are logged asynchronously to avoid crashing the caller.
     """
 
-    future = _executor.submit(func, *args, **kwargs)
+    name = getattr(func, '__name__', repr(func))
+    future = _executor.submit(pool_job(name)(func), *args, **kwargs)
 
     def _log_outcome(fut: Future) -> None:
         exc = fut.exception()
         if exc:
-            _logger.error("Background task %s failed: %s", getattr(func, '__name__', func), exc, exc_info=exc)
+            _logger.error("Background task %s failed: %s", name, exc, exc_info=exc)
 
     future.add_done_callback(_log_outcome)
     return future
@@ -9,8 +9,10 @@ from enum import Enum
 from zoneinfo import ZoneInfo
 
 from flask_login import UserMixin
-from sqlalchemy import event, inspect, select
+from sqlalchemy import event, inspect, literal, select, true
 from sqlalchemy.dialects import mysql
+from sqlalchemy.orm import Session as OrmSession, object_session, scoped_session
+from sqlalchemy.orm.attributes import set_committed_value
 from sqlalchemy.ext.mutable import MutableDict, MutableList
 from sqlalchemy.types import TypeDecorator, String, Time
 from werkzeug.security import generate_password_hash, check_password_hash
@@ -242,6 +244,12 @@ class User(db.Model, UserMixin):
     role = db.Column(db.String(20), default='user')
     is_master = db.Column(db.Boolean, default=False)
     last_seen = db.Column(db.DateTime, default=sao_paulo_now_naive)
+    updated_at = db.Column(
+        db.DateTime,
+        default=sao_paulo_now_naive,
+        onupdate=sao_paulo_now_naive,
+        index=True,
+    )
     tags = db.relationship('Tag', secondary=user_tags, backref=db.backref('users', lazy=True))
     google_id = db.Column(db.String(255), unique=True)
     google_refresh_token = db.Column(db.String(255))
@@ -669,16 +677,17 @@ class AuditLog(db.Model):
 
     __tablename__ = "audit_logs"
     __table_args__ = (
-        db.Index('idx_audit_user_id', 'user_id'),
+        db.Index('idx_audit_user_created', 'user_id', 'created_at'),
         db.Index('idx_audit_action_type', 'action_type'),
         db.Index('idx_audit_resource', 'resource_type', 'resource_id'),
+        db.Index('idx_audit_resource_action_created', 'resource_type', 'action_type', 'created_at'),
         db.Index('idx_audit_created_at', 'created_at'),
     )
 
     id = db.Column(db.Integer, primary_key=True)
 
-    # Usuario que executou a acao
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    # Usuario que executou a acao (sem FK: tabela particionada no MySQL)
+    user_id = db.Column(db.Integer, nullable=False)
     username = db.Column(db.String(80), nullable=False)  # Denormalizado para historico
 
     # Contexto da acao
@@ -703,12 +712,55 @@ class AuditLog(db.Model):
     created_at = db.Column(db.DateTime, default=sao_paulo_now_naive, nullable=False)
 
     # Relacionamentos
-    user = db.relationship("User", backref=db.backref("audit_logs", lazy="dynamic"))
+    user = db.relationship(
+        "User",
+        primaryjoin="foreign(AuditLog.user_id) == User.id",
+        backref=db.backref("audit_logs", lazy="dynamic"),
+    )
+
+    # No MySQL a tabela e particionada por mes e a chave primaria e
+    # (id, created_at). No SQLite (sem particoes, e sem autoincremento em
+    # chave composta) a tabela segue com a chave em ``id``; o mapper usa a
+    # chave composta nos dois casos.
+    __mapper_args__ = {"primary_key": [id, created_at]}
 
     def __repr__(self) -> str:
         return f"<AuditLog {self.id}: {self.username} {self.action_type} {self.resource_type}>"
 
 
+class AuditLogArchive(db.Model):
+    """Cold storage for audit months compacted out of ``audit_logs``.
+
+    Same columns and ids as ``AuditLog``; no foreign key so archived rows
+    outlive deleted users. See ``app.services.audit_logs``.
+    """
+
+    __tablename__ = "audit_logs_archive"
+    __table_args__ = (
+        db.Index('idx_audit_archive_user_created', 'user_id', 'created_at'),
+        db.Index('idx_audit_archive_resource_action_created', 'resource_type', 'action_type', 'created_at'),
+        db.Index('idx_audit_archive_created_at', 'created_at'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    username = db.Column(db.String(80), nullable=False)
+    action_type = db.Column(db.String(50), nullable=False)
+    resource_type = db.Column(db.String(50), nullable=False)
+    resource_id = db.Column(db.Integer, nullable=True)
+    action_description = db.Column(db.String(255), nullable=False)
+    old_values = db.Column(db.JSON, nullable=True)
+    new_values = db.Column(db.JSON, nullable=True)
+    ip_address = db.Column(db.String(45), nullable=True)
+    user_agent = db.Column(db.Text, nullable=True)
+    request_id = db.Column(db.String(50), nullable=True)
+    endpoint = db.Column(db.String(255), nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<AuditLogArchive {self.id}: {self.username} {self.action_type} {self.resource_type}>"
+
+
 class Consultoria(db.Model):
     """Stores consulting company credentials.
 
@@ -1093,6 +1145,19 @@ class Empresa(db.Model):
     codigo_empresa = db.Column(db.String(100), nullable=False)
     contatos = db.Column(JsonString(255))
     ativo = db.Column(db.Boolean, default=True)
+    updated_at = db.Column(
+        db.DateTime,
+        default=sao_paulo_now_naive,
+        onupdate=sao_paulo_now_naive,
+        index=True,
+    )
+
+    __table_args__ = (
+        db.Index('idx_empresas_ativo_tipo', 'ativo', 'tipo_empresa'),
+        db.Index('idx_empresas_ativo_tributacao', 'ativo', 'tributacao'),
+        db.Index('idx_empresas_tributacao_ativo', 'tributacao', 'ativo'),
+        db.Index('idx_empresas_codigo_ativo', 'codigo_empresa', 'ativo'),
+    )
 
     def __repr__(self) -> str:
         return f"<Empresa {self.nome_empresa}>"
@@ -1129,6 +1194,7 @@ class Departamento(db.Model):
         db.DateTime,
         default=sao_paulo_now_naive,
         onupdate=sao_paulo_now_naive,
+        index=True,
     )
     empresa = db.relationship('Empresa', backref=db.backref('departamentos', lazy=True))
 
@@ -1136,6 +1202,86 @@ class Departamento(db.Model):
         return f"<Departamento {self.tipo} - Empresa {self.empresa_id}>"
 
 
+class ReportRollupGroup(db.Model):
+    """Daily aggregate of one value of a report dimension.
+
+    ``members`` lists ``[entity_id, detail]`` pairs: the ids let the live
+    overlay move a changed entity between groups, and ``detail`` is only
+    filled for dimensions whose entities the report lists on screen.
+    """
+
+    __tablename__ = "report_rollup_groups"
+
+    id = db.Column(db.Integer, primary_key=True)
+    report_key = db.Column(db.String(40), nullable=False)
+    dimension = db.Column(db.String(40), nullable=False)
+    # Valor bruto da dimensao ("" quando ausente); o rotulo exibido e da view
+    label = db.Column(db.String(255), nullable=False)
+    # Ordem de primeira aparicao, preserva a ordem das barras dos graficos
+    position = db.Column(db.Integer, nullable=False, default=0)
+    entity_count = db.Column(db.Integer, nullable=False, default=0)
+    members = db.Column(db.JSON, nullable=False)
+    snapshot_date = db.Column(db.Date, nullable=False)
+    refreshed_at = db.Column(db.DateTime, default=sao_paulo_now_naive, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint(
+            "report_key", "dimension", "label", name="uq_report_rollup_groups_label"
+        ),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<ReportRollupGroup {self.report_key}.{self.dimension}="
+            f"{self.label!r} count={self.entity_count}>"
+        )
+
+
+class ReportRollupWatermark(db.Model):
+    """``updated_at`` high-water mark reached by the last rollup refresh."""
+
+    __tablename__ = "report_rollup_watermarks"
+
+    report_key = db.Column(db.String(40), primary_key=True)
+    watermark = db.Column(db.DateTime, nullable=True)
+    row_count = db.Column(db.Integer, nullable=False, default=0)
+    last_full_refresh_at = db.Column(db.DateTime, nullable=True)
+    refreshed_at = db.Column(db.DateTime, default=sao_paulo_now_naive, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<ReportRollupWatermark {self.report_key} {self.watermark}>"
+
+
+class SchemaFingerprint(db.Model):
+    """Migration head and model-column hash the database was last synced to.
+
+    Startup compares it with the code in one query and skips every DDL
+    check when both match (see ``app.services.schema_fingerprint``).
+    """
+
+    __tablename__ = "schema_fingerprint"
+
+    id = db.Column(db.Integer, primary_key=True)
+    migration_head = db.Column(db.String(255), nullable=False)
+    columns_hash = db.Column(db.String(64), nullable=False)
+    synced_at = db.Column(db.DateTime, default=sao_paulo_now_naive, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<SchemaFingerprint {self.migration_head} {self.columns_hash[:8]}>"
+
+
+# Deletes are not visible through updated_at, so take the entity out of the
+# rollup groups together with the source row.
+@event.listens_for(Empresa, "after_delete")
+@event.listens_for(Departamento, "after_delete")
+@event.listens_for(User, "after_delete")
+def _report_rollup_after_delete(_mapper, connection, target):
+    """Remove the deleted entity from the report rollups."""
+    from app.services.report_rollups import discard_report_rollup_entities
+
+    discard_report_rollup_entities(connection, [target])
+
+
 class ClienteReuniao(db.Model):
     """Client-specific meeting log linked to a company."""
 
@@ -1271,6 +1417,11 @@ class Reuniao(db.Model):
     meet_host = db.relationship('User', foreign_keys=[meet_host_id])
     course = db.relationship('Course', backref=db.backref('meetings', lazy=True))
 
+    __table_args__ = (
+        # Avanço de status pelo scheduler: agendadas já iniciadas + em andamento
+        db.Index('idx_reunioes_status_inicio', 'status', 'inicio'),
+    )
+
 
 class ReuniaoParticipante(db.Model):
     """Participant linked to a meeting."""
@@ -1485,11 +1636,19 @@ class Task(db.Model):
 
     @property
     def progress(self) -> int:
-        """Return completion percentage based on direct subtasks."""
-        if not self.children:
+        """Return completion percentage based on direct subtasks.
+
+        Boards prefetch ``subtree_progress`` for every card with one
+        ``task_closure`` query; otherwise the loaded children are counted.
+        """
+        prefetched = getattr(self, "subtree_progress", None)
+        if prefetched is not None:
+            total, completed = prefetched.total, prefetched.done
+        else:
+            total = len(self.children)
+            completed = len([c for c in self.children if c.status == TaskStatus.DONE])
+        if not total:
             return 100 if self.status == TaskStatus.DONE else 0
-        total = len(self.children)
-        completed = len([c for c in self.children if c.status == TaskStatus.DONE])
         return int((completed / total) * 100)
 
     def __repr__(self) -> str:
@@ -1545,29 +1704,147 @@ class Task(db.Model):
         )
         return _to_sao_paulo(latest)
 
-    def update_parent_has_children(self):
-        """Update has_children flag on parent task."""
-        if self.parent_id:
-            parent = db.session.get(Task, self.parent_id)
-            if parent:
-                has_children = bool(
-                    db.session.query(Task.id)
-                    .filter(Task.parent_id == parent.id)
-                    .first()
+
+class TaskClosure(db.Model):
+    """Transitive closure of the subtask tree.
+
+    Every task has a ``depth = 0`` row pointing to itself plus one row per
+    ancestor, so subtree, ancestor and "is descendant" lookups are single
+    indexed queries. Rows are maintained by the Task mapper events below;
+    bulk deletes go through ``app.services.task_tree.delete_task_trees``.
+    """
+
+    __tablename__ = "task_closure"
+
+    ancestor_id = db.Column(
+        db.Integer, db.ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True
+    )
+    descendant_id = db.Column(
+        db.Integer, db.ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True
+    )
+    depth = db.Column(db.Integer, nullable=False)
+
+    __table_args__ = (
+        db.Index("idx_task_closure_ancestor_depth", "ancestor_id", "depth"),
+        db.Index("idx_task_closure_descendant_depth", "descendant_id", "depth"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<TaskClosure {self.ancestor_id}->{self.descendant_id} depth={self.depth}>"
+
+
+def _refresh_has_children(connection, target: Task, parent_id: int | None) -> None:
+    """Recompute ``has_children`` of ``parent_id`` from its depth-1 closure rows."""
+    if parent_id is None:
+        return
+    closure = TaskClosure.__table__
+    tasks = Task.__table__
+    has_children = connection.execute(
+        select(closure.c.descendant_id)
+        .where(closure.c.ancestor_id == parent_id, closure.c.depth == 1)
+        .limit(1)
+    ).first() is not None
+    connection.execute(
+        tasks.update()
+        .where(tasks.c.id == parent_id)
+        .values(has_children=has_children, updated_at=tasks.c.updated_at)
+    )
+
+    session = object_session(target)
+    if session is not None:
+        key = inspect(Task).identity_key_from_primary_key((parent_id,))
+        parent = session.identity_map.get(key)
+        if parent is not None:
+            set_committed_value(parent, "has_children", has_children)
+
+
+@event.listens_for(Task, "after_insert")
+def _task_closure_after_insert(_mapper, connection, target):
+    """Link a new task to itself and to every ancestor of its parent."""
+    closure = TaskClosure.__table__
+    connection.execute(
+        closure.insert().values(ancestor_id=target.id, descendant_id=target.id, depth=0)
+    )
+    if target.parent_id is None:
+        return
+    connection.execute(
+        closure.insert().from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            select(closure.c.ancestor_id, literal(target.id), closure.c.depth + 1).where(
+                closure.c.descendant_id == target.parent_id
+            ),
+        )
+    )
+    _refresh_has_children(connection, target, target.parent_id)
+
+
+@event.listens_for(Task, "before_update")
+def _task_closure_before_update(_mapper, connection, target):
+    """Move the whole subtree when a task changes parent."""
+    history = inspect(target).attrs.parent_id.history
+    if not history.has_changes():
+        return
+    closure = TaskClosure.__table__
+    new_parent_id = target.parent_id
+    old_parent_id = connection.execute(
+        select(closure.c.ancestor_id).where(
+            closure.c.descendant_id == target.id, closure.c.depth == 1
+        )
+    ).scalar_one_or_none()
+    if old_parent_id == new_parent_id:
+        return
+
+    subtree_ids = connection.execute(
+        select(closure.c.descendant_id).where(closure.c.ancestor_id == target.id)
+    ).scalars().all()
+    if new_parent_id is not None and new_parent_id in subtree_ids:
+        raise ValueError("Uma tarefa nao pode ser subtarefa dela mesma ou de suas subtarefas.")
+
+    # MySQL nao aceita subconsulta na propria tabela em DELETE: ids em memoria.
+    old_ancestor_ids = connection.execute(
+        select(closure.c.ancestor_id).where(
+            closure.c.descendant_id == target.id, closure.c.depth > 0
+        )
+    ).scalars().all()
+    if old_ancestor_ids:
+        connection.execute(
+            closure.delete().where(
+                closure.c.descendant_id.in_(subtree_ids),
+                closure.c.ancestor_id.in_(old_ancestor_ids),
+            )
+        )
+    if new_parent_id is not None:
+        above = closure.alias("above")
+        below = closure.alias("below")
+        connection.execute(
+            closure.insert().from_select(
+                ["ancestor_id", "descendant_id", "depth"],
+                select(
+                    above.c.ancestor_id,
+                    below.c.descendant_id,
+                    above.c.depth + below.c.depth + 1,
                 )
-                parent.has_children = has_children
-                db.session.add(parent)
-                
-@event.listens_for(Task, 'after_insert')
-@event.listens_for(Task, 'after_update')
-def task_after_insert_or_update(_mapper, _connection, target):
-    """Update parent has_children after task insert or update."""
-    target.update_parent_has_children()
+                .select_from(above.join(below, true()))
+                .where(
+                    above.c.descendant_id == new_parent_id,
+                    below.c.ancestor_id == target.id,
+                ),
+            )
+        )
+    _refresh_has_children(connection, target, old_parent_id)
+    _refresh_has_children(connection, target, new_parent_id)
 
-@event.listens_for(Task, 'after_delete')
-def task_after_delete(_mapper, _connection, target):
-    """Update parent has_children after task deletion."""
-    target.update_parent_has_children()
+
+@event.listens_for(Task, "after_delete")
+def _task_closure_after_delete(_mapper, connection, target):
+    """Drop the closure rows of a deleted task and refresh its parent."""
+    closure = TaskClosure.__table__
+    connection.execute(
+        closure.delete().where(
+            (closure.c.descendant_id == target.id) | (closure.c.ancestor_id == target.id)
+        )
+    )
+    _refresh_has_children(connection, target, target.parent_id)
 
 
 class TaskResponse(db.Model):
@@ -1742,6 +2019,53 @@ class TaskHistory(db.Model):
             return f'{field_display} atualizado'
 
 
+# Sentinels used by the task_stats read-model so every dimension is part of
+# the unique key (NULLs would defeat the upsert on MySQL).
+TASK_STATS_NO_USER = 0
+TASK_STATS_NO_DUE_DATE = date(1900, 1, 1)
+
+
+class TaskStat(db.Model):
+    """Pre-aggregated task counters (tag x assignee x status x due day).
+
+    Only root, non-private tasks are counted, matching the scope of the
+    kanban boards and ``relatorio_tarefas``. Rows are maintained by the Task
+    mapper events below and periodically reconciled by the scheduler.
+    """
+
+    __tablename__ = "task_stats"
+
+    id = db.Column(db.Integer, primary_key=True)
+    tag_id = db.Column(
+        db.Integer, db.ForeignKey("tags.id", ondelete="CASCADE"), nullable=False
+    )
+    user_id = db.Column(
+        db.Integer, nullable=False, default=TASK_STATS_NO_USER, server_default=db.text("0")
+    )
+    status = db.Column(db.Enum(TaskStatus), nullable=False)
+    priority = db.Column(db.Enum(TaskPriority), nullable=False)
+    due_day = db.Column(db.Date, nullable=False, default=TASK_STATS_NO_DUE_DATE)
+    task_count = db.Column(db.Integer, nullable=False, default=0, server_default=db.text("0"))
+    updated_at = db.Column(
+        db.DateTime, default=sao_paulo_now_naive, onupdate=sao_paulo_now_naive, nullable=False
+    )
+
+    __table_args__ = (
+        db.UniqueConstraint(
+            "tag_id", "user_id", "status", "priority", "due_day",
+            name="uq_task_stats_bucket",
+        ),
+        db.Index("idx_task_stats_status_due_day", "status", "due_day"),
+        db.Index("idx_task_stats_user_status", "user_id", "status"),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<TaskStat tag={self.tag_id} user={self.user_id} "
+            f"{self.status} due={self.due_day} count={self.task_count}>"
+        )
+
+
 class TaskNotification(db.Model):
     """Notification emitted for tasks or announcements."""
 
@@ -1786,6 +2110,64 @@ class TaskNotification(db.Model):
         )
 
 
+class UserNotificationCounter(db.Model):
+    """Denormalized unread notification count, one row per user."""
+
+    __tablename__ = "user_notification_counters"
+
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    unread_count = db.Column(db.Integer, nullable=False, default=0, server_default=db.text("0"))
+    updated_at = db.Column(
+        db.DateTime, default=sao_paulo_now_naive, onupdate=sao_paulo_now_naive, nullable=False
+    )
+
+    def __repr__(self) -> str:
+        return f"<UserNotificationCounter user={self.user_id} unread={self.unread_count}>"
+
+
+def apply_unread_notification_delta(connection, user_id: int | None, delta: int) -> None:
+    """Adjust the unread counter of ``user_id`` inside the caller's transaction."""
+    if not user_id or not delta:
+        return
+    _upsert_counter(
+        connection,
+        UserNotificationCounter.__table__,
+        {"user_id": user_id},
+        "unread_count",
+        delta,
+    )
+
+
+@event.listens_for(TaskNotification, "after_insert")
+def _notification_counter_after_insert(_mapper, connection, target):
+    """Count new unread notifications."""
+    if target.read_at is None:
+        apply_unread_notification_delta(connection, target.user_id, 1)
+
+
+@event.listens_for(TaskNotification, "after_update")
+def _notification_counter_after_update(_mapper, connection, target):
+    """Track read/unread transitions done through the ORM."""
+    history = inspect(target).attrs.read_at.history
+    if not history.has_changes():
+        return
+    was_unread = not history.deleted or history.deleted[0] is None
+    is_unread = target.read_at is None
+    if was_unread and not is_unread:
+        apply_unread_notification_delta(connection, target.user_id, -1)
+    elif is_unread and not was_unread:
+        apply_unread_notification_delta(connection, target.user_id, 1)
+
+
+@event.listens_for(TaskNotification, "after_delete")
+def _notification_counter_after_delete(_mapper, connection, target):
+    """Discount unread notifications deleted through the ORM."""
+    if target.read_at is None:
+        apply_unread_notification_delta(connection, target.user_id, -1)
+
+
 class PushSubscription(db.Model):
     """Web Push subscription for sending notifications outside the browser."""
 
@@ -1880,6 +2262,7 @@ def _create_task_assignment_notification(connection, task: Task, assignee_id: in
             created_at=sao_paulo_now_naive(),
         )
     )
+    apply_unread_notification_delta(connection, assignee_id, 1)
 
     # Store notification info for push after commit
     if not hasattr(task, "_pending_push_notifications"):
@@ -1993,6 +2376,7 @@ def _notify_creator_on_completion(connection, task: Task, completer_id: int) ->
             created_at=sao_paulo_now_naive(),
         )
     )
+    apply_unread_notification_delta(connection, task.created_by, 1)
 
     # Broadcast notification to realtime clients to wake up SSE streams
     from app.services.realtime import get_broadcaster
@@ -2183,6 +2567,11 @@ class Inventario(db.Model):
     empresa = db.relationship('Empresa', backref=db.backref('inventario', uselist=False, lazy=True))
     encerramento_balanco_usuario = db.relationship('User', foreign_keys=[encerramento_balanco_usuario_id])
 
+    __table_args__ = (
+        db.Index('idx_inventario_status_empresa', 'status', 'empresa_id'),
+        db.Index('idx_inventario_encerramento', 'encerramento_fiscal'),
+    )
+
     def __repr__(self) -> str:
         return f"<Inventario empresa_id={self.empresa_id}>"
 
@@ -2207,11 +2596,155 @@ class Inventario(db.Model):
         return _format_brl(self.valor_enviado_sped)
 
 
-def _record_task_change(connection, task: Task, field_name: str, old_value, new_value, changed_by: int | None):
-    """Record a single field change in the task history."""
-    from flask import has_request_context, g
+class InventarioFile(db.Model):
+    """Anexo do inventario (uma linha por arquivo, conteudo em disco).
+
+    Substitui as colunas JSON ``Inventario.cfop_files``,
+    ``cfop_consolidado_files`` e ``cliente_files``; durante a transicao a
+    leitura combina as duas fontes (ver ``app.services.inventario_files``).
+    """
+    __tablename__ = 'tbl_inventario_files'
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    empresa_id = db.Column(
+        db.Integer, db.ForeignKey('tbl_empresas.id', ondelete='CASCADE'), nullable=False
+    )
+    category = db.Column(db.String(32), nullable=False)  # cfop | cfop-consolidado | cliente
+    name = db.Column(db.String(255), nullable=False)
+    mime_type = db.Column(db.String(120), nullable=True)
+    size = db.Column(db.BigInteger, nullable=True)
+    sha256 = db.Column(db.String(64), nullable=True)
+    path = db.Column(db.String(512), nullable=False)  # relativo a static/
+    uploaded_by = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'), nullable=True)
+    created_at = db.Column(db.DateTime, default=sao_paulo_now_naive, nullable=False)
+
+    __table_args__ = (
+        db.Index('idx_inventario_files_empresa_category', 'empresa_id', 'category', 'created_at'),
+        db.Index('idx_inventario_files_sha256', 'sha256'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<InventarioFile empresa_id={self.empresa_id} category={self.category} name={self.name}>"
+
+
+class AcessoriasSyncCursor(db.Model):
+    """Per-empresa high-water mark of the Acessorias delivery sync.
+
+    ``last_dh`` is sent as ``DtLastDH`` on the next run, so only deliveries
+    changed since then are fetched. Keyed by period: changing the period
+    starts from a full fetch again.
+    """
+
+    __tablename__ = "acessorias_sync_cursors"
+
+    empresa_id = db.Column(
+        db.Integer, db.ForeignKey("tbl_empresas.id", ondelete="CASCADE"), primary_key=True
+    )
+    period_key = db.Column(db.String(32), primary_key=True)
+    last_dh = db.Column(db.DateTime, nullable=True)
+    last_fetch_count = db.Column(db.Integer, nullable=False, default=0)
+    synced_at = db.Column(db.DateTime, default=sao_paulo_now_naive, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<AcessoriasSyncCursor {self.empresa_id}:{self.period_key} {self.last_dh}>"
+
+
+class AcessoriasSyncRun(db.Model):
+    """Checkpoint of one sync run; a run without ``finished_at`` is resumed."""
+
+    __tablename__ = "acessorias_sync_runs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    period_key = db.Column(db.String(32), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="running")
+    started_at = db.Column(db.DateTime, default=sao_paulo_now_naive, nullable=False)
+    heartbeat_at = db.Column(db.DateTime, default=sao_paulo_now_naive, nullable=False)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    processed = db.Column(db.Integer, nullable=False, default=0)
+    stats = db.Column(db.JSON, nullable=True)
+
+    __table_args__ = (
+        db.Index("idx_acessorias_sync_runs_period", "period_key", "finished_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<AcessoriasSyncRun {self.id} {self.period_key} {self.status}>"
+
+
+class CalendarEventMirror(db.Model):
+    """Local copy of one Google Calendar event instance.
+
+    Kept current by ``app.services.calendar_mirror`` through Google's
+    incremental sync; ``payload`` is the event resource exactly as the API
+    returned it. ``start_utc``/``end_utc`` are naive UTC, for range queries.
+    """
+
+    __tablename__ = "calendar_event_mirror"
+
+    calendar_id = db.Column(db.String(255), primary_key=True)
+    event_id = db.Column(db.String(255), primary_key=True)
+    status = db.Column(db.String(20), nullable=True)
+    summary = db.Column(db.String(500), nullable=True)
+    start_utc = db.Column(db.DateTime, nullable=False)
+    end_utc = db.Column(db.DateTime, nullable=False)
+    all_day = db.Column(db.Boolean, nullable=False, default=False)
+    etag = db.Column(db.String(100), nullable=True)
+    updated = db.Column(db.String(40), nullable=True)
+    payload = db.Column(db.JSON, nullable=False)
+    synced_at = db.Column(db.DateTime, default=sao_paulo_now_naive, nullable=False)
+
+    __table_args__ = (
+        db.Index("idx_calendar_event_mirror_range", "calendar_id", "start_utc", "end_utc"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<CalendarEventMirror {self.event_id} {self.start_utc}>"
+
+
+class CalendarSyncState(db.Model):
+    """Sync token and bookkeeping of the calendar mirror, one row per calendar.
+
+    ``synced_through`` is when the last successful sync started: every change
+    made before it is in the mirror. ``lease_until`` keeps two workers from
+    syncing at once; ``changed_at`` moves only when rows were written.
+    """
+
+    __tablename__ = "calendar_sync_state"
+
+    calendar_id = db.Column(db.String(255), primary_key=True)
+    sync_token = db.Column(db.String(512), nullable=True)
+    synced_through = db.Column(db.DateTime, nullable=True)
+    last_full_sync_at = db.Column(db.DateTime, nullable=True)
+    changed_at = db.Column(db.DateTime, nullable=True)
+    lease_until = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    last_error_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self) -> str:
+        return f"<CalendarSyncState {self.calendar_id} {self.synced_through}>"
+
+
+# =============================================================================
+# TASK HISTORY BUFFER
+# =============================================================================
+#
+# The Task listeners below do not write history rows one statement at a time.
+# They append them to a buffer in ``Session.info`` kept per transaction
+# (the root one or a SAVEPOINT from ``begin_nested``), and
+# ``_flush_task_history_buffer`` emits one multi-row INSERT per table from
+# the root ``before_commit``. A SAVEPOINT that commits hands its rows to the
+# enclosing transaction; a transaction that ends without committing takes
+# its rows (and those handed to it) along. ``TASK_HISTORY_BUFFERED = False``
+# restores immediate writes.
+
+_TASK_HISTORY_BUFFER_KEY = "task_history_buffer"
+_TASK_HISTORY_INSERT_CHUNK = 500
+
+
+def _task_history_actor(changed_by: int | None = None) -> int | None:
+    """Resolve the user id responsible for the change from the request."""
+    from flask import has_request_context
 
-    # Get current user ID from Flask context if not provided
     if changed_by is None and has_request_context():
         try:
             from flask_login import current_user
@@ -2219,6 +2752,38 @@ def _record_task_change(connection, task: Task, field_name: str, old_value, new_
                 changed_by = current_user.id
         except Exception:
             pass
+    return changed_by
+
+
+def _task_history_buffering_enabled() -> bool:
+    from flask import current_app, has_app_context
+
+    if not has_app_context():
+        return True
+    return bool(current_app.config.get("TASK_HISTORY_BUFFERED", True))
+
+
+def _task_history_buffer(session) -> dict:
+    """Return the ``{table: rows}`` buffer of the innermost transaction."""
+    if isinstance(session, scoped_session):
+        session = session()
+    transaction = session.get_nested_transaction() or session.get_transaction()
+    buffers = session.info.setdefault(_TASK_HISTORY_BUFFER_KEY, {})
+    return buffers.setdefault(transaction, {})
+
+
+def _queue_history_row(connection, target, table, row: dict) -> None:
+    """Buffer ``row`` for ``table`` in the target's session, or write it now."""
+    session = object_session(target)
+    if session is None or not _task_history_buffering_enabled():
+        connection.execute(table.insert().values(**row))
+        return
+    _task_history_buffer(session).setdefault(table, []).append(row)
+
+
+def _record_task_change(connection, task: Task, field_name: str, old_value, new_value, changed_by: int | None):
+    """Record a single field change in the task history."""
+    changed_by = _task_history_actor(changed_by)
 
     old_val_str = _format_value_for_history(old_value)
     new_val_str = _format_value_for_history(new_value)
@@ -2227,59 +2792,65 @@ def _record_task_change(connection, task: Task, field_name: str, old_value, new_
     if old_val_str == new_val_str:
         return
 
-    connection.execute(
-        TaskHistory.__table__.insert().values(
-            task_id=task.id,
-            changed_at=sao_paulo_now_naive(),
-            changed_by=changed_by,
-            field_name=field_name,
-            old_value=old_val_str,
-            new_value=new_val_str,
-            change_type='updated'
-        )
+    _queue_history_row(
+        connection,
+        task,
+        TaskHistory.__table__,
+        {
+            "task_id": task.id,
+            "changed_at": sao_paulo_now_naive(),
+            "changed_by": changed_by,
+            "field_name": field_name,
+            "old_value": old_val_str,
+            "new_value": new_val_str,
+            "change_type": 'updated',
+        },
+    )
+
+
+def _record_task_status_change(connection, task: Task, from_status, to_status, changed_by: int | None):
+    """Record a status transition in ``task_status_history``."""
+    if to_status is None or from_status == to_status:
+        return
+    _queue_history_row(
+        connection,
+        task,
+        TaskStatusHistory.__table__,
+        {
+            "task_id": task.id,
+            "from_status": from_status,
+            "to_status": to_status,
+            "changed_at": sao_paulo_now_naive(),
+            "changed_by": changed_by,
+        },
     )
 
 
 @event.listens_for(Task, "after_insert")
 def _record_task_creation(_mapper, _connection, target):
     """Record task creation in history."""
-    from flask import has_request_context
-    from flask_login import current_user
-
-    changed_by = None
-    if has_request_context():
-        try:
-            if hasattr(current_user, 'id'):
-                changed_by = current_user.id
-        except Exception:
-            pass
+    changed_by = _task_history_actor()
 
-    _connection.execute(
-        TaskHistory.__table__.insert().values(
-            task_id=target.id,
-            changed_at=sao_paulo_now_naive(),
-            changed_by=changed_by or target.created_by,
-            field_name='task',
-            old_value=None,
-            new_value=target.title,
-            change_type='created'
-        )
+    _queue_history_row(
+        _connection,
+        target,
+        TaskHistory.__table__,
+        {
+            "task_id": target.id,
+            "changed_at": sao_paulo_now_naive(),
+            "changed_by": changed_by or target.created_by,
+            "field_name": 'task',
+            "old_value": None,
+            "new_value": target.title,
+            "change_type": 'created',
+        },
     )
 
 
 @event.listens_for(Task, "after_update")
 def _record_task_updates(_mapper, _connection, target):
-    """Record all field changes in task history."""
-    from flask import has_request_context
-    from flask_login import current_user
-
-    changed_by = None
-    if has_request_context():
-        try:
-            if hasattr(current_user, 'id'):
-                changed_by = current_user.id
-        except Exception:
-            pass
+    """Record all field changes (and status transitions) in task history."""
+    changed_by = _task_history_actor()
 
     state = inspect(target)
 
@@ -2305,6 +2876,285 @@ def _record_task_updates(_mapper, _connection, target):
 
         _record_task_change(_connection, target, field_name, old_value, new_value, changed_by)
 
+        if field_name == 'status':
+            _record_task_status_change(_connection, target, old_value, new_value, changed_by)
+
+
+def record_bulk_task_changes(session, changes, changed_by: int | None = None) -> None:
+    """Record history for tasks changed by a set-based ``UPDATE``.
+
+    ``Query.update`` does not fire the mapper events above, so bulk
+    operations pass their ``(task_id, field_name, old_value, new_value)``
+    changes here. The rows join the session buffer like any other change.
+    """
+    changed_by = _task_history_actor(changed_by)
+    now = sao_paulo_now_naive()
+    rows: dict = {TaskHistory.__table__: [], TaskStatusHistory.__table__: []}
+    for task_id, field_name, old_value, new_value in changes:
+        old_val_str = _format_value_for_history(old_value)
+        new_val_str = _format_value_for_history(new_value)
+        if old_val_str == new_val_str:
+            continue
+        rows[TaskHistory.__table__].append(
+            {
+                "task_id": task_id,
+                "changed_at": now,
+                "changed_by": changed_by,
+                "field_name": field_name,
+                "old_value": old_val_str,
+                "new_value": new_val_str,
+                "change_type": 'updated',
+            }
+        )
+        if field_name == 'status' and new_value is not None:
+            rows[TaskStatusHistory.__table__].append(
+                {
+                    "task_id": task_id,
+                    "from_status": old_value,
+                    "to_status": new_value,
+                    "changed_at": now,
+                    "changed_by": changed_by,
+                }
+            )
+
+    if not _task_history_buffering_enabled():
+        connection = session.connection()
+        for table, table_rows in rows.items():
+            if table_rows:
+                _insert_buffered_rows(connection, table, table_rows)
+        return
+    buffer = _task_history_buffer(session)
+    for table, table_rows in rows.items():
+        if table_rows:
+            buffer.setdefault(table, []).extend(table_rows)
+
+
+def _insert_buffered_rows(connection, table, rows: list[dict]) -> None:
+    # Multi-row VALUES requires the same keys in every row.
+    for start in range(0, len(rows), _TASK_HISTORY_INSERT_CHUNK):
+        connection.execute(table.insert().values(rows[start:start + _TASK_HISTORY_INSERT_CHUNK]))
+
+
+@event.listens_for(OrmSession, "before_commit")
+def _flush_task_history_buffer(session):
+    """Write the buffered history rows, one multi-row INSERT per table."""
+    if session.get_nested_transaction() is not None:
+        # SAVEPOINT commit: its rows move to the parent in after_commit.
+        return
+    if _TASK_HISTORY_BUFFER_KEY not in session.info and not (
+        session.new or session.dirty or session.deleted
+    ):
+        return
+    # The final flush of the commit runs after before_commit; flush now so
+    # its history rows land in this batch.
+    session.flush()
+    buffers = session.info.pop(_TASK_HISTORY_BUFFER_KEY, None)
+    if not buffers:
+        return
+    connection = session.connection()
+    for table in (TaskHistory.__table__, TaskStatusHistory.__table__):
+        rows = [row for buffer in buffers.values() for row in buffer.get(table, ())]
+        if rows:
+            _insert_buffered_rows(connection, table, rows)
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _promote_task_history_buffer(session):
+    """Hand the rows of a committed SAVEPOINT to the enclosing transaction."""
+    transaction = session.get_nested_transaction()
+    buffers = session.info.get(_TASK_HISTORY_BUFFER_KEY)
+    if transaction is None or not buffers:
+        return
+    rows = buffers.pop(transaction, None)
+    if not rows:
+        return
+    parent = transaction.parent
+    while not parent.nested and parent.parent is not None:
+        parent = parent.parent
+    target = buffers.setdefault(parent, {})
+    for table, table_rows in rows.items():
+        target.setdefault(table, []).extend(table_rows)
+
+
+@event.listens_for(OrmSession, "after_transaction_end")
+def _discard_task_history_buffer(session, transaction):
+    """Drop rows buffered by a transaction that ended without committing.
+
+    Committed SAVEPOINTs were already promoted and the root commit wrote its
+    rows in before_commit, so whatever is left here was rolled back.
+    """
+    if transaction.parent is None:
+        session.info.pop(_TASK_HISTORY_BUFFER_KEY, None)
+        return
+    buffers = session.info.get(_TASK_HISTORY_BUFFER_KEY)
+    if buffers:
+        buffers.pop(transaction, None)
+
+
+# =============================================================================
+# TASK STATS READ-MODEL
+# =============================================================================
+
+def task_stats_bucket(tag_id, assigned_to, status, priority, due_date, parent_id, is_private):
+    """Return the task_stats key for a task, or ``None`` when it is out of scope."""
+    if parent_id is not None or is_private or tag_id is None or status is None:
+        return None
+    return (
+        tag_id,
+        assigned_to or TASK_STATS_NO_USER,
+        status,
+        priority or TaskPriority.MEDIUM,
+        due_date or TASK_STATS_NO_DUE_DATE,
+    )
+
+
+def _task_stats_current_bucket(task: Task):
+    return task_stats_bucket(
+        task.tag_id,
+        task.assigned_to,
+        task.status,
+        task.priority,
+        task.due_date,
+        task.parent_id,
+        task.is_private,
+    )
+
+
+_TASK_STATS_FIELDS = (
+    "tag_id", "assigned_to", "status", "priority", "due_date", "parent_id", "is_private"
+)
+
+
+def _task_stats_previous_bucket(connection, task: Task):
+    """Return the bucket the task belonged to before the pending flush."""
+    state = inspect(task)
+    previous = {}
+    needs_reload = False
+    for attr_name in _TASK_STATS_FIELDS:
+        history = state.attrs[attr_name].history
+        if not history.has_changes():
+            previous[attr_name] = getattr(task, attr_name)
+        elif history.deleted:
+            previous[attr_name] = history.deleted[0]
+        else:
+            # Atributo expirado antes da alteracao: o valor antigo so existe no banco
+            needs_reload = True
+
+    if needs_reload:
+        columns = [getattr(Task, attr_name) for attr_name in _TASK_STATS_FIELDS]
+        row = connection.execute(select(*columns).where(Task.id == task.id)).first()
+        if row is None:
+            return None
+        previous = dict(zip(_TASK_STATS_FIELDS, row))
+
+    return task_stats_bucket(*(previous[attr_name] for attr_name in _TASK_STATS_FIELDS))
+
+
+def _upsert_counter(connection, table, key_values: dict, counter_column: str, delta: int) -> None:
+    """Add ``delta`` to ``counter_column`` of the row identified by ``key_values``.
+
+    Uses the native upsert of MySQL/SQLite so concurrent writers never race
+    on the first insert; other dialects fall back to UPDATE-then-INSERT.
+    """
+    now = sao_paulo_now_naive()
+    counter = table.c[counter_column]
+    values = {**key_values, counter_column: delta, "updated_at": now}
+    dialect = connection.dialect.name
+
+    if dialect == "mysql":
+        stmt = mysql.insert(table).values(**values)
+        stmt = stmt.on_duplicate_key_update({counter_column: counter + delta, "updated_at": now})
+        connection.execute(stmt)
+        return
+
+    if dialect == "sqlite":
+        from sqlalchemy.dialects import sqlite
+
+        stmt = sqlite.insert(table).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key_values),
+            set_={counter_column: counter + delta, "updated_at": now},
+        )
+        connection.execute(stmt)
+        return
+
+    result = connection.execute(
+        table.update()
+        .where(*(table.c[name] == value for name, value in key_values.items()))
+        .values({counter_column: counter + delta, "updated_at": now})
+    )
+    if not result.rowcount:
+        connection.execute(table.insert().values(**values))
+
+
+def apply_task_stats_delta(connection, bucket, delta: int) -> None:
+    """Add ``delta`` to the counter of ``bucket`` using a single upsert."""
+    if bucket is None or not delta:
+        return
+
+    tag_id, user_id, status, priority, due_day = bucket
+    _upsert_counter(
+        connection,
+        TaskStat.__table__,
+        {
+            "tag_id": tag_id,
+            "user_id": user_id,
+            "status": status,
+            "priority": priority,
+            "due_day": due_day,
+        },
+        "task_count",
+        delta,
+    )
+
+
+def _safe_task_stats_delta(connection, bucket, delta: int) -> None:
+    # O read-model nunca deve impedir a gravacao da tarefa; divergencias sao
+    # corrigidas pela reconciliacao periodica (app.services.task_stats).
+    try:
+        apply_task_stats_delta(connection, bucket, delta)
+    except Exception as exc:
+        import logging
+        logging.getLogger(__name__).warning(
+            "Falha ao atualizar task_stats (bucket=%s, delta=%s): %s", bucket, delta, exc
+        )
+
+
+@event.listens_for(Task, "after_insert")
+def _task_stats_after_insert(_mapper, connection, target):
+    """Count a newly created task in the task_stats read-model."""
+    _safe_task_stats_delta(connection, _task_stats_current_bucket(target), 1)
+
+
+@event.listens_for(Task, "before_update")
+def _task_stats_before_update(_mapper, connection, target):
+    """Remember the task_stats bucket before the UPDATE is emitted."""
+    state = inspect(target)
+    if not any(state.attrs[name].history.has_changes() for name in _TASK_STATS_FIELDS):
+        target._task_stats_previous = None
+        return
+    target._task_stats_previous = (_task_stats_previous_bucket(connection, target),)
+
+
+@event.listens_for(Task, "after_update")
+def _task_stats_after_update(_mapper, connection, target):
+    """Move the task between task_stats buckets when a dimension changes."""
+    previous = target.__dict__.pop("_task_stats_previous", None)
+    if previous is None:
+        return
+    old_bucket = previous[0]
+    new_bucket = _task_stats_current_bucket(target)
+    if old_bucket == new_bucket:
+        return
+    _safe_task_stats_delta(connection, old_bucket, -1)
+    _safe_task_stats_delta(connection, new_bucket, 1)
+
+
+@event.listens_for(Task, "before_delete")
+def _task_stats_before_delete(_mapper, connection, target):
+    """Discount a deleted task from the task_stats read-model."""
+    _safe_task_stats_delta(connection, _task_stats_previous_bucket(connection, target), -1)
+
 
 # ============================================
 # INVENTARIO TABLE COLUMN CONFIGURATION
@@ -40,8 +40,15 @@ def init_scheduler(app):
 
     # Importar dentro da função para evitar imports circulares
     from app.controllers.routes.blueprints.empresas import send_daily_tadeu_notification
+    from app.extensions.pool_telemetry import pool_job
+    from app.services.audit_logs import maintain_audit_storage
+    from app.services.calendar_mirror import sync_calendar_mirror
     from app.services.inventario_sync import sync_encerramento_fiscal
+    from app.services.meeting_room import advance_meeting_statuses
+    from app.services.report_rollups import refresh_report_rollups
+    from app.services.task_stats import reconcile_task_stats
 
+    @pool_job("daily_tadeu_notification")
     def job_wrapper():
         """Wrapper que executa a função dentro do contexto da aplicação Flask"""
         with app.app_context():
@@ -52,6 +59,7 @@ def init_scheduler(app):
                 except Exception as e:
                     logger.error(f"Erro ao executar notificação diária para Tadeu: {e}", exc_info=True)
 
+    @pool_job("inventario_test_cristiano")
     def test_cristiano_wrapper():
         """Wrapper para envio de teste do inventario apenas para Cristiano."""
         with app.app_context():
@@ -62,6 +70,7 @@ def init_scheduler(app):
                 except Exception as e:
                     logger.error(f"Erro ao executar teste de inventario para Cristiano: {e}", exc_info=True)
 
+    @pool_job("sync_encerramento_fiscal")
     def sync_encerramento_wrapper():
         """Wrapper para sincronização automática de encerramento fiscal."""
         with app.app_context():
@@ -74,6 +83,66 @@ def init_scheduler(app):
             except Exception as e:
                 logger.error(f"Erro no sync automático de encerramento fiscal: {e}", exc_info=True)
 
+    @pool_job("reconcile_task_stats")
+    def reconcile_task_stats_wrapper():
+        """Wrapper para reconciliação do read-model task_stats."""
+        with app.app_context():
+            try:
+                result = reconcile_task_stats()
+                logger.info(
+                    "Reconciliação de task_stats concluída",
+                    extra=result.as_dict()
+                )
+            except Exception as e:
+                logger.error(f"Erro na reconciliação de task_stats: {e}", exc_info=True)
+
+    @pool_job("refresh_report_rollups")
+    def refresh_report_rollups_wrapper():
+        """Wrapper para atualização dos rollups de relatórios."""
+        with app.app_context():
+            # Incremental toda noite; reconstrução completa aos domingos para
+            # descartar entidades que saíram do filtro de algum relatório
+            full = datetime.now(ZoneInfo("America/Sao_Paulo")).weekday() == 6
+            try:
+                results = refresh_report_rollups(full=full)
+                logger.info(
+                    "Rollups de relatórios atualizados",
+                    extra={"rollups": [result.as_dict() for result in results]}
+                )
+            except Exception as e:
+                logger.error(f"Erro ao atualizar rollups de relatórios: {e}", exc_info=True)
+
+    @pool_job("maintain_audit_storage")
+    def maintain_audit_storage_wrapper():
+        """Wrapper para partições e arquivamento do log de auditoria."""
+        with app.app_context():
+            try:
+                result = maintain_audit_storage()
+                logger.info("Manutenção do log de auditoria concluída", extra=result)
+            except Exception as e:
+                logger.error(f"Erro na manutenção do log de auditoria: {e}", exc_info=True)
+
+    @pool_job("calendar_mirror_sync")
+    def calendar_mirror_sync_wrapper():
+        """Wrapper para o sync incremental do espelho da agenda da sala."""
+        with app.app_context():
+            try:
+                result = sync_calendar_mirror()
+                logger.info("Espelho da agenda sincronizado", extra=result.as_dict())
+            except Exception as e:
+                logger.error(f"Erro no sync do espelho da agenda: {e}", exc_info=True)
+
+    @pool_job("advance_meeting_statuses")
+    def advance_meeting_statuses_wrapper():
+        """Wrapper para o avanço de status das reuniões da sala."""
+        with app.app_context():
+            try:
+                result = advance_meeting_statuses()
+                if result.advanced:
+                    logger.info("Status de reuniões avançados", extra=result.as_dict())
+            except Exception as e:
+                logger.error(f"Erro ao avançar status das reuniões: {e}", exc_info=True)
+
     # Agendar sincronização de encerramento fiscal às 6h (horário de Brasília)
     scheduler.add_job(
         func=sync_encerramento_wrapper,
@@ -94,6 +163,68 @@ def init_scheduler(app):
         coalesce=True,
     )
 
+    # Reconciliar task_stats a cada 30 minutos (e logo após o boot, para
+    # popular a tabela em bases recém-migradas)
+    scheduler.add_job(
+        func=reconcile_task_stats_wrapper,
+        trigger=CronTrigger(minute='*/30', timezone='America/Sao_Paulo'),
+        id='reconcile_task_stats',
+        name='Reconciliação do read-model task_stats',
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+        next_run_time=datetime.now(ZoneInfo("America/Sao_Paulo")) + timedelta(seconds=30),
+    )
+
+    # Manter o espelho da agenda da sala em dia mesmo sem acessos (e logo
+    # após o boot, para popular a tabela em bases recém-migradas)
+    mirror_minutes = max(int(app.config.get('CALENDAR_MIRROR_SYNC_MINUTES', 5)), 1)
+    scheduler.add_job(
+        func=calendar_mirror_sync_wrapper,
+        trigger=CronTrigger(minute=f'*/{mirror_minutes}', timezone='America/Sao_Paulo'),
+        id='calendar_mirror_sync',
+        name='Sync incremental do espelho da agenda',
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+        next_run_time=datetime.now(ZoneInfo("America/Sao_Paulo")) + timedelta(seconds=20),
+    )
+
+    # Avançar status das reuniões (agendada -> em andamento -> realizada) a
+    # cada minuto; as leituras do calendário apenas projetam o status
+    scheduler.add_job(
+        func=advance_meeting_statuses_wrapper,
+        trigger=CronTrigger(minute='*', timezone='America/Sao_Paulo'),
+        id='advance_meeting_statuses',
+        name='Avanço de status das reuniões',
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+        next_run_time=datetime.now(ZoneInfo("America/Sao_Paulo")) + timedelta(seconds=10),
+    )
+
+    # Atualizar rollups dos relatórios às 2h (fora do horário de uso)
+    scheduler.add_job(
+        func=refresh_report_rollups_wrapper,
+        trigger=CronTrigger(hour=2, minute=0, timezone='America/Sao_Paulo'),
+        id='refresh_report_rollups',
+        name='Atualização dos rollups de relatórios',
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+
+    # Partições do próximo mês e arquivamento de meses antigos às 3h30
+    scheduler.add_job(
+        func=maintain_audit_storage_wrapper,
+        trigger=CronTrigger(hour=3, minute=30, timezone='America/Sao_Paulo'),
+        id='maintain_audit_storage',
+        name='Manutenção do log de auditoria',
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True,
+    )
+
     if os.getenv("INVENTARIO_TEST_CRISTIANO_AT_14") == "1":
         tz = ZoneInfo("America/Sao_Paulo")
         now = datetime.now(tz)
@@ -8,6 +8,7 @@ from __future__ import annotations
 import logging
 import os
 import re
+import time
 import urllib.parse
 from dataclasses import dataclass
 from datetime import date, datetime
@@ -17,6 +18,9 @@ import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+from app.services.http_cache import HttpCacheStats, SQLiteHttpCache
+from app.utils.rate_limit import TokenBucket
+
 DEFAULT_BASE_URL = os.getenv("ACESSORIAS_BASE", "https://api.acessorias.com")
 DEFAULT_TOKEN = (
     os.getenv("ACESSORIAS_DELIVERIES_TOKEN")
@@ -24,6 +28,10 @@ DEFAULT_TOKEN = (
     or os.getenv("ACESSORIAS_API_TOKEN")
 )
 
+# Tentativas por pagina quando a API responde 429 (limite de requisicoes).
+MAX_RATE_LIMIT_RETRIES = 3
+MAX_RETRY_AFTER_SECONDS = 60.0
+
 
 class DeliveriesAuthError(RuntimeError):
     """Token ausente ou invalido para acessar a API."""
@@ -73,6 +81,19 @@ class EntregaMatch:
     referencia: date | None
 
 
+@dataclass
+class DeliveriesFetch:
+    """Entregas de uma consulta e a idade do dado mais antigo servido do cache.
+
+    ``cache_age`` e zero quando todas as paginas vieram da API (ou foram
+    revalidadas); senao, o instante da consulta menos ``cache_age`` e ate
+    onde os dados estao garantidamente atualizados.
+    """
+
+    entregas: list[dict]
+    cache_age: float = 0.0
+
+
 class AcessoriasDeliveriesClient:
     """Client fino para a rota ``/deliveries``."""
 
@@ -82,17 +103,26 @@ class AcessoriasDeliveriesClient:
         base_url: str | None = None,
         timeout: int = 30,
         logger: logging.Logger | None = None,
+        rate_limiter: TokenBucket | None = None,
+        cache: SQLiteHttpCache | None = None,
     ) -> None:
         self.base_url = (base_url or DEFAULT_BASE_URL).rstrip("/")
         self.token = token or DEFAULT_TOKEN
         self.timeout = timeout
         self.logger = logger
+        # Compartilhado entre as threads que usam este client.
+        self.rate_limiter = rate_limiter
+        # Cache em disco das respostas; ``cache_stats`` conta so este client.
+        self.cache = cache
+        self.cache_stats = HttpCacheStats()
         self.session = requests.Session()
         # Configurar retry automático e pool de conexões
+        # 429 fica com ``_get``: a espera passa pelo rate limiter compartilhado.
         retry = Retry(
             total=3,
             backoff_factor=0.5,
-            status_forcelist=[500, 502, 503, 504]
+            status_forcelist=[500, 502, 503, 504],
+            respect_retry_after_header=False,
         )
         adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20)
         adapter.max_retries = retry
@@ -107,6 +137,57 @@ class AcessoriasDeliveriesClient:
             )
         return {"Authorization": f"Bearer {self.token}", "Accept": "application/json"}
 
+    @staticmethod
+    def _retry_after(resp: requests.Response) -> float:
+        try:
+            seconds = float(resp.headers.get("Retry-After", ""))
+        except ValueError:
+            seconds = 1.0
+        return min(max(seconds, 0.5), MAX_RETRY_AFTER_SECONDS)
+
+    def _get(self, url: str, params: dict[str, Any]) -> requests.Response:
+        """GET one page through the response cache, when configured."""
+        if self.cache is None:
+            return self._send(url, params=params, headers=self._headers())
+        return self.cache.get(
+            self.session,
+            url,
+            params=dict(params),
+            headers=self._headers(),
+            stats=self.cache_stats,
+            send=self._send,
+        )
+
+    def _send(self, url: str, *, params: dict[str, Any], headers: dict[str, str]) -> requests.Response:
+        """One network GET, honouring the shared rate limit and ``429 Retry-After``."""
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            try:
+                resp = self.session.get(
+                    url,
+                    headers=headers,
+                    params=params,
+                    timeout=self.timeout,
+                    proxies={"http": None, "https": None},
+                )
+            except requests.RequestException as exc:
+                raise DeliveriesClientError(f"Erro de rede ao consultar entregas: {exc}") from exc
+            if resp.status_code != 429 or attempt == MAX_RATE_LIMIT_RETRIES:
+                return resp
+            wait = self._retry_after(resp)
+            if self.logger:
+                self.logger.warning(
+                    "Limite de requisicoes da Acessorias atingido; aguardando",
+                    extra={"url": url, "retry_after": wait, "attempt": attempt + 1},
+                )
+            if self.rate_limiter:
+                # Segura todas as threads, nao so a que recebeu o 429.
+                self.rate_limiter.pause(wait)
+            else:
+                time.sleep(wait)
+        return resp
+
     def fetch_deliveries(
         self,
         identificador: str,
@@ -116,11 +197,31 @@ class AcessoriasDeliveriesClient:
         last_dh: str | None = None,
         include_config: bool = False,
     ) -> list[dict]:
+        """Busca entregas paginadas para um identificador (CNPJ/CPF)."""
+        return self.fetch_deliveries_snapshot(
+            identificador,
+            start_date,
+            end_date,
+            last_dh=last_dh,
+            include_config=include_config,
+        ).entregas
+
+    def fetch_deliveries_snapshot(
+        self,
+        identificador: str,
+        start_date: date,
+        end_date: date,
+        *,
+        last_dh: str | None = None,
+        include_config: bool = False,
+    ) -> DeliveriesFetch:
         """
         Busca entregas paginadas para um identificador (CNPJ/CPF).
 
         A API limita 50 registros por pagina; a paginacao continua ate receber
         uma lista vazia.
+        Com ``last_dh`` (``YYYY-MM-DD HH:MM:SS``) a API devolve apenas as
+        entregas alteradas depois desse instante.
         """
         ident = _digits_only(identificador)
         if not ident:
@@ -138,6 +239,7 @@ class AcessoriasDeliveriesClient:
             params["config"] = 1
 
         all_entregas: list[dict] = []
+        cache_age = 0.0
         page = 1
 
         while True:
@@ -147,16 +249,8 @@ class AcessoriasDeliveriesClient:
                     f"Buscando pagina {page} de entregas",
                     extra={"identificador": ident, "page": page, "url": url}
                 )
-            try:
-                resp = self.session.get(
-                    url,
-                    headers=self._headers(),
-                    params=params,
-                    timeout=self.timeout,
-                    proxies={"http": None, "https": None},
-                )
-            except requests.RequestException as exc:
-                raise DeliveriesClientError(f"Erro de rede ao consultar entregas: {exc}") from exc
+            resp = self._get(url, params)
+            cache_age = max(cache_age, getattr(resp, "cache_age", 0.0))
 
             if resp.status_code == 401:
                 if self.logger:
@@ -200,7 +294,7 @@ class AcessoriasDeliveriesClient:
                 "Entregas recebidas da Acessorias",
                 extra={"identificador": ident, "total_entregas": len(all_entregas)},
             )
-        return all_entregas
+        return DeliveriesFetch(all_entregas, cache_age)
 
     # -- Business helpers ---------------------------------------------
     def _has_valid_comment(self, entrega: dict) -> bool:
@@ -0,0 +1,424 @@
+"""
+Armazenamento particionado e consulta indexada do log de auditoria.
+
+``audit_logs`` cresce sem limite. Este modulo organiza o armazenamento em
+duas camadas:
+
+- quente: ``audit_logs``. No MySQL a tabela e particionada por mes
+  (``PARTITION BY RANGE (TO_DAYS(created_at))``, particoes ``pYYYYMM`` e
+  ``pmax``); ``ensure_audit_partitions`` cria as particoes dos proximos meses.
+- fria: ``audit_logs_archive``. ``compact_audit_logs`` move os meses mais
+  antigos que ``AUDIT_HOT_MONTHS`` em lotes pequenos (uma transacao curta por
+  lote), sem bloquear as insercoes do mes corrente; no MySQL a particao
+  esvaziada e removida em seguida. No SQLite o arquivo e o unico mecanismo.
+
+As consultas usam intervalos semiabertos em ``created_at`` (o MySQL poda as
+particoes fora do periodo) e so leem o arquivo quando o periodo alcanca os
+meses arquivados. Os indices ``(user_id, created_at)`` e
+``(resource_type, action_type, created_at)`` cobrem os filtros dos relatorios.
+
+Uso:
+    from app.services.audit_logs import AuditLogFilters, query_audit_logs
+
+    page = query_audit_logs(
+        AuditLogFilters(resource_types=("announcement",), start=start_date),
+        page=1,
+        per_page=50,
+    )
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Any, Sequence
+
+import sqlalchemy as sa
+from flask import current_app
+
+from app import db
+from app.extensions.db_routing import read_replica
+from app.models.tables import AuditLog, AuditLogArchive, User, sao_paulo_now_naive
+
+logger = logging.getLogger(__name__)
+
+AUDIT_TABLE = AuditLog.__table__
+ARCHIVE_TABLE = AuditLogArchive.__table__
+AUDIT_COLUMNS = tuple(column.name for column in ARCHIVE_TABLE.columns)
+
+DEFAULT_HOT_MONTHS = 12
+PARTITION_MONTHS_AHEAD = 2
+COMPACT_BATCH_SIZE = 1000
+MAXVALUE_PARTITION = "pmax"
+
+
+@dataclass(frozen=True)
+class AuditLogFilters:
+    """Filters accepted by the audit report queries (all optional)."""
+
+    start: date | None = None
+    end: date | None = None
+    user_ids: Sequence[int] | None = None
+    resource_types: Sequence[str] | None = None
+    action_types: Sequence[str] | None = None
+    action_descriptions: Sequence[str] | None = None
+    resource_id: int | None = None
+    resource_ids: Sequence[int] | None = None
+
+
+@dataclass
+class AuditLogRow:
+    """Audit entry read from either storage tier."""
+
+    id: int
+    user_id: int
+    username: str
+    action_type: str
+    resource_type: str
+    resource_id: int | None
+    action_description: str
+    old_values: Any
+    new_values: Any
+    ip_address: str | None
+    user_agent: str | None
+    request_id: str | None
+    endpoint: str | None
+    created_at: datetime
+    user: User | None = None
+
+
+@dataclass
+class AuditLogPage:
+    rows: list[AuditLogRow]
+    total: int
+
+
+@dataclass
+class AuditCompactionResult:
+    cutoff: date
+    moved: int = 0
+    dropped_partitions: list[str] = field(default_factory=list)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "cutoff": self.cutoff.isoformat(),
+            "moved": self.moved,
+            "dropped_partitions": self.dropped_partitions,
+        }
+
+
+def _month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _add_months(value: date, months: int) -> date:
+    index = value.year * 12 + (value.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _is_mysql() -> bool:
+    return db.engine.dialect.name == "mysql"
+
+
+# =============================================================================
+# CONSULTA
+# =============================================================================
+
+def _filtered_select(table: sa.Table, filters: AuditLogFilters, columns) -> sa.Select:
+    c = table.c
+    stmt = sa.select(*columns)
+    if filters.start:
+        stmt = stmt.where(c.created_at >= datetime.combine(filters.start, datetime.min.time()))
+    if filters.end:
+        # Limite superior exclusivo: mesmo resultado de "<= 23:59:59.999999" e
+        # comparavel com os limites das particoes.
+        stmt = stmt.where(
+            c.created_at < datetime.combine(filters.end + timedelta(days=1), datetime.min.time())
+        )
+    if filters.user_ids is not None:
+        stmt = stmt.where(c.user_id.in_(list(filters.user_ids)))
+    if filters.resource_types is not None:
+        stmt = stmt.where(c.resource_type.in_(list(filters.resource_types)))
+    if filters.action_types is not None:
+        stmt = stmt.where(c.action_type.in_(list(filters.action_types)))
+    if filters.action_descriptions is not None:
+        stmt = stmt.where(c.action_description.in_(list(filters.action_descriptions)))
+    if filters.resource_id is not None:
+        stmt = stmt.where(c.resource_id == filters.resource_id)
+    if filters.resource_ids is not None:
+        stmt = stmt.where(c.resource_id.in_(list(filters.resource_ids)))
+    return stmt
+
+
+def _archive_reaches(filters: AuditLogFilters) -> bool:
+    """Return True when the period overlaps months already archived."""
+    if filters.end and filters.start and filters.end < filters.start:
+        return False
+    newest_archived = db.session.execute(
+        sa.select(sa.func.max(ARCHIVE_TABLE.c.created_at))
+    ).scalar()
+    if newest_archived is None:
+        return False
+    if filters.start is None:
+        return True
+    return datetime.combine(filters.start, datetime.min.time()) <= newest_archived
+
+
+def _source(filters: AuditLogFilters, columns_for) -> sa.Subquery:
+    hot = _filtered_select(AUDIT_TABLE, filters, columns_for(AUDIT_TABLE))
+    if not _archive_reaches(filters):
+        return hot.subquery("audit_source")
+    cold = _filtered_select(ARCHIVE_TABLE, filters, columns_for(ARCHIVE_TABLE))
+    return sa.union_all(hot, cold).subquery("audit_source")
+
+
+def _attach_users(rows: list[AuditLogRow]) -> list[AuditLogRow]:
+    user_ids = {row.user_id for row in rows if row.user_id}
+    if not user_ids:
+        return rows
+    users = {user.id: user for user in User.query.filter(User.id.in_(user_ids))}
+    for row in rows:
+        row.user = users.get(row.user_id)
+    return rows
+
+
+@read_replica
+def query_audit_logs(filters: AuditLogFilters, *, page: int = 1, per_page: int = 50) -> AuditLogPage:
+    """Return one page (newest first) of audit entries plus the total count."""
+    source = _source(
+        filters, lambda table: [table.c[name] for name in AUDIT_COLUMNS]
+    )
+    total = db.session.execute(sa.select(sa.func.count()).select_from(source)).scalar() or 0
+    result = db.session.execute(
+        sa.select(source)
+        .order_by(source.c.created_at.desc(), source.c.id.desc())
+        .offset((max(page, 1) - 1) * per_page)
+        .limit(per_page)
+    )
+    rows = [AuditLogRow(**row._asdict()) for row in result]
+    return AuditLogPage(rows=_attach_users(rows), total=int(total))
+
+
+@read_replica
+def latest_audit_log_by_user(filters: AuditLogFilters) -> dict[int, AuditLogRow]:
+    """Return the most recent matching entry per user.
+
+    Resolved with ``MAX(created_at) GROUP BY user_id`` over the
+    ``(user_id, created_at)`` index instead of loading every entry.
+    """
+    source = _source(
+        filters, lambda table: [table.c[name] for name in AUDIT_COLUMNS]
+    )
+    newest = (
+        sa.select(source.c.user_id, sa.func.max(source.c.created_at).label("created_at"))
+        .group_by(source.c.user_id)
+        .subquery("newest")
+    )
+    result = db.session.execute(
+        sa.select(source)
+        .join(
+            newest,
+            sa.and_(
+                newest.c.user_id == source.c.user_id,
+                newest.c.created_at == source.c.created_at,
+            ),
+        )
+        .order_by(source.c.id.desc())
+    )
+    latest: dict[int, AuditLogRow] = {}
+    for row in result:
+        latest.setdefault(row.user_id, AuditLogRow(**row._asdict()))
+    _attach_users(list(latest.values()))
+    return latest
+
+
+@read_replica
+def first_audit_log_by_resource_user(
+    filters: AuditLogFilters,
+) -> dict[tuple[int, int], AuditLogRow]:
+    """Return the first matching entry per ``(resource_id, user_id)``.
+
+    Reads both tiers, so compacted months still count. Ordered newest first.
+    """
+    source = _source(
+        filters, lambda table: [table.c[name] for name in AUDIT_COLUMNS]
+    )
+    # Os ids sao preservados no arquivo: MIN(id) e o primeiro registro.
+    first_ids = (
+        sa.select(sa.func.min(source.c.id).label("id"))
+        .group_by(source.c.resource_id, source.c.user_id)
+        .subquery("first_ids")
+    )
+    result = db.session.execute(
+        sa.select(source)
+        .join(first_ids, first_ids.c.id == source.c.id)
+        .order_by(source.c.created_at.desc(), source.c.id.desc())
+    )
+    first: dict[tuple[int, int], AuditLogRow] = {}
+    for row in result:
+        first[(row.resource_id, row.user_id)] = AuditLogRow(**row._asdict())
+    _attach_users(list(first.values()))
+    return first
+
+
+def audit_log_exists(filters: AuditLogFilters) -> bool:
+    """Return True when any entry matches, looking at the archive only if needed.
+
+    Reads the primary database: meant for write-path checks.
+    """
+    hot = _filtered_select(AUDIT_TABLE, filters, [AUDIT_TABLE.c.id]).limit(1)
+    if db.session.execute(hot).first() is not None:
+        return True
+    if not _archive_reaches(filters):
+        return False
+    cold = _filtered_select(ARCHIVE_TABLE, filters, [ARCHIVE_TABLE.c.id]).limit(1)
+    return db.session.execute(cold).first() is not None
+
+
+# =============================================================================
+# PARTICOES (MYSQL)
+# =============================================================================
+
+def _partition_name(month: date) -> str:
+    return f"p{month:%Y%m}"
+
+
+def _partition_clause(month: date) -> str:
+    upper = _add_months(month, 1)
+    return (
+        f"PARTITION {_partition_name(month)} "
+        f"VALUES LESS THAN (TO_DAYS('{upper.isoformat()}'))"
+    )
+
+
+def list_audit_partitions() -> list[str]:
+    """Return ``audit_logs`` partition names in order (empty when not partitioned)."""
+    if not _is_mysql():
+        return []
+    rows = db.session.execute(
+        sa.text(
+            "SELECT PARTITION_NAME FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'audit_logs' "
+            "AND PARTITION_NAME IS NOT NULL ORDER BY PARTITION_ORDINAL_POSITION"
+        )
+    ).scalars()
+    return list(rows)
+
+
+def ensure_audit_partitions(
+    *, months_ahead: int = PARTITION_MONTHS_AHEAD, today: date | None = None
+) -> list[str]:
+    """Split ``pmax`` so the current and next ``months_ahead`` months exist.
+
+    ``pmax`` is kept empty, so the reorganize is a metadata-only change.
+    """
+    partitions = list_audit_partitions()
+    if MAXVALUE_PARTITION not in partitions:
+        return []
+
+    current = _month_start(today or sao_paulo_now_naive().date())
+    existing = set(partitions)
+    missing = [
+        month
+        for month in (_add_months(current, offset) for offset in range(months_ahead + 1))
+        if _partition_name(month) not in existing
+    ]
+    # Meses anteriores ao ultimo existente ja caem em particoes existentes.
+    monthly = sorted(name for name in partitions if name != MAXVALUE_PARTITION)
+    if monthly:
+        missing = [month for month in missing if _partition_name(month) > monthly[-1]]
+    if not missing:
+        return []
+
+    clauses = ", ".join(_partition_clause(month) for month in missing)
+    db.session.execute(
+        sa.text(
+            f"ALTER TABLE audit_logs REORGANIZE PARTITION {MAXVALUE_PARTITION} INTO "
+            f"({clauses}, PARTITION {MAXVALUE_PARTITION} VALUES LESS THAN MAXVALUE)"
+        )
+    )
+    db.session.commit()
+    created = [_partition_name(month) for month in missing]
+    logger.info("Particoes de auditoria criadas: %s", ", ".join(created))
+    return created
+
+
+def _drop_empty_partitions(cutoff: date) -> list[str]:
+    cutoff_name = _partition_name(cutoff)
+    dropped: list[str] = []
+    for name in list_audit_partitions():
+        if name == MAXVALUE_PARTITION or name >= cutoff_name:
+            continue
+        has_rows = db.session.execute(
+            sa.text(f"SELECT 1 FROM audit_logs PARTITION ({name}) LIMIT 1")
+        ).first()
+        if has_rows:
+            continue
+        db.session.execute(sa.text(f"ALTER TABLE audit_logs DROP PARTITION {name}"))
+        dropped.append(name)
+    db.session.commit()
+    return dropped
+
+
+# =============================================================================
+# ARQUIVAMENTO
+# =============================================================================
+
+def compact_audit_logs(
+    *,
+    keep_months: int | None = None,
+    batch_size: int = COMPACT_BATCH_SIZE,
+    today: date | None = None,
+) -> AuditCompactionResult:
+    """Move months older than ``keep_months`` into ``audit_logs_archive``.
+
+    Each batch copies and deletes the same ids in one short transaction, so a
+    row is never visible in both tiers and inserts into the current month
+    never wait on the compaction.
+    """
+    if keep_months is None:
+        keep_months = int(current_app.config.get("AUDIT_HOT_MONTHS", DEFAULT_HOT_MONTHS))
+    current = _month_start(today or sao_paulo_now_naive().date())
+    cutoff = _add_months(current, -max(keep_months, 1))
+    cutoff_dt = datetime.combine(cutoff, datetime.min.time())
+    result = AuditCompactionResult(cutoff=cutoff)
+
+    columns = [AUDIT_TABLE.c[name] for name in AUDIT_COLUMNS]
+    last_id = 0
+    while True:
+        with db.engine.begin() as connection:
+            ids = connection.execute(
+                sa.select(AUDIT_TABLE.c.id)
+                .where(AUDIT_TABLE.c.created_at < cutoff_dt, AUDIT_TABLE.c.id > last_id)
+                .order_by(AUDIT_TABLE.c.id)
+                .limit(batch_size)
+            ).scalars().all()
+            if not ids:
+                break
+            connection.execute(
+                ARCHIVE_TABLE.insert().from_select(
+                    list(AUDIT_COLUMNS),
+                    sa.select(*columns).where(AUDIT_TABLE.c.id.in_(ids)),
+                )
+            )
+            connection.execute(AUDIT_TABLE.delete().where(AUDIT_TABLE.c.id.in_(ids)))
+        result.moved += len(ids)
+        last_id = ids[-1]
+
+    if _is_mysql():
+        result.dropped_partitions = _drop_empty_partitions(cutoff)
+    if result.moved:
+        logger.info(
+            "Auditoria compactada ate %s: %s registros arquivados",
+            cutoff.isoformat(),
+            result.moved,
+        )
+    return result
+
+
+def maintain_audit_storage() -> dict[str, Any]:
+    """Nightly maintenance: create upcoming partitions and archive old months."""
+    created = ensure_audit_partitions()
+    compaction = compact_audit_logs()
+    return {"created_partitions": created, **compaction.as_dict()}
@@ -0,0 +1,212 @@
+"""Bounded in-process queue that writes audit rows in batches.
+
+``log_user_action`` used to add and commit its ``AuditLog`` row inside the
+request, adding a second commit to every audited action. Entries are now
+queued and a single background thread bulk-inserts them (and emits the
+user-actions file log) in batches.
+
+When the queue is full the entry is written synchronously on the caller's
+thread instead of being dropped, and pending entries are flushed at exit.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+from flask import Flask, current_app
+
+_DEFAULT_QUEUE_SIZE = 5000
+_DEFAULT_BATCH_SIZE = 200
+_DEFAULT_FLUSH_INTERVAL = 1.0
+_SHUTDOWN_TIMEOUT = 10.0
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class AuditEntry:
+    """One audited action: the ``audit_logs`` row and its file log record."""
+
+    row: dict[str, Any]
+    record: logging.LogRecord | None = None
+
+
+def write_audit_entries(app: Flask, entries: list[AuditEntry]) -> None:
+    """Insert ``entries`` in one statement and emit their file logs.
+
+    Uses its own connection so the caller's session is never committed.
+    """
+    from app import db
+    from app.models.tables import AuditLog
+
+    with app.app_context():
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(AuditLog.__table__.insert(), [entry.row for entry in entries])
+        except Exception as exc:
+            if len(entries) == 1:
+                logger.error("Failed to save audit log to database: %s", exc)
+            else:
+                # Um registro invalido nao deve descartar o lote inteiro.
+                for entry in entries:
+                    write_audit_entries(app, [entry])
+                return
+
+    user_actions_logger = logging.getLogger("user_actions")
+    for entry in entries:
+        if entry.record is not None:
+            user_actions_logger.handle(entry.record)
+
+
+class AuditWriter:
+    """Drain ``AuditEntry`` objects into ``audit_logs`` from a daemon thread."""
+
+    def __init__(
+        self,
+        app: Flask,
+        *,
+        max_queue_size: int = _DEFAULT_QUEUE_SIZE,
+        batch_size: int = _DEFAULT_BATCH_SIZE,
+        flush_interval: float = _DEFAULT_FLUSH_INTERVAL,
+    ) -> None:
+        self.app = app
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.05, flush_interval)
+        self._queue: queue.Queue[AuditEntry] = queue.Queue(maxsize=max(1, max_queue_size))
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.sync_writes = 0
+
+    # ------------------------------------------------------------------
+    # Producer side
+    # ------------------------------------------------------------------
+
+    def submit(self, entry: AuditEntry) -> bool:
+        """Queue ``entry``; write it synchronously when the queue is saturated.
+
+        Returns ``True`` when the entry was queued.
+        """
+        if self._stop.is_set():
+            self.write([entry])
+            return False
+        self._ensure_thread()
+        try:
+            self._queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            self.sync_writes += 1
+            logger.warning(
+                "Fila de auditoria cheia (%s itens); gravando de forma sincrona",
+                self._queue.maxsize,
+            )
+            self.write([entry])
+            return False
+
+    def _ensure_thread(self) -> None:
+        # Started lazily so forked workers (gunicorn --preload) get their own thread.
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="audit-writer", daemon=True
+            )
+            self._thread.start()
+
+    # ------------------------------------------------------------------
+    # Consumer side
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._next_batch(timeout=self.flush_interval)
+            if not batch:
+                continue
+            try:
+                self.write(batch)
+            except Exception:
+                logger.exception("Falha ao gravar lote de auditoria (%s itens)", len(batch))
+
+    def _next_batch(self, timeout: float | None) -> list[AuditEntry]:
+        try:
+            first = self._queue.get(timeout=timeout) if timeout else self._queue.get_nowait()
+        except queue.Empty:
+            return []
+        batch = [first]
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def write(self, entries: list[AuditEntry]) -> None:
+        write_audit_entries(self.app, entries)
+
+    def flush(self) -> None:
+        """Write every queued entry on the calling thread."""
+        while True:
+            batch = self._next_batch(timeout=None)
+            if not batch:
+                return
+            self.write(batch)
+
+    def shutdown(self) -> None:
+        """Stop the background thread and flush what is still queued."""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive():
+            thread.join(timeout=_SHUTDOWN_TIMEOUT)
+        try:
+            self.flush()
+        except Exception:
+            # Suppress shutdown errors during interpreter finalization
+            pass
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+
+_writer: AuditWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def get_audit_writer() -> AuditWriter | None:
+    """Return the process-wide writer, or ``None`` when async writes are disabled."""
+    global _writer
+    if _writer is not None:
+        return _writer
+
+    app = current_app._get_current_object()
+    if not app.config.get("AUDIT_ASYNC_WRITES", True) or app.testing:
+        return None
+
+    with _writer_lock:
+        if _writer is None:
+            _writer = AuditWriter(
+                app,
+                max_queue_size=int(app.config.get("AUDIT_QUEUE_MAXSIZE", _DEFAULT_QUEUE_SIZE)),
+                batch_size=int(app.config.get("AUDIT_BATCH_SIZE", _DEFAULT_BATCH_SIZE)),
+                flush_interval=float(
+                    app.config.get("AUDIT_FLUSH_INTERVAL", _DEFAULT_FLUSH_INTERVAL)
+                ),
+            )
+            atexit.register(_writer.shutdown)
+    return _writer
+
+
+def submit_audit_entry(entry: AuditEntry) -> None:
+    """Queue an audit entry, writing it immediately when async writes are off."""
+    writer = get_audit_writer()
+    if writer is None:
+        write_audit_entries(current_app._get_current_object(), [entry])
+        return
+    writer.submit(entry)
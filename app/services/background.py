@@ -8,6 +8,8 @@ from typing import Any, Callable
 
 from flask import current_app
 
+from app.extensions.pool_telemetry import pool_job
+
 _DEFAULT_MAX_WORKERS = 4
 _executor: ThreadPoolExecutor | None = None
 
@@ -42,19 +44,20 @@ def submit_background_job(func: Callable[..., Any], /, *args: Any, **kwargs: Any
     it falls back to running the job synchronously and returns ``False``.
     """
     app = current_app._get_current_object()
+    name = getattr(func, "__name__", repr(func))
 
     def _runner() -> None:
-        with app.app_context():
+        with app.app_context(), pool_job(name):
             try:
                 func(*args, **kwargs)
             except Exception:
-                app.logger.exception("Background job %s failed", getattr(func, "__name__", repr(func)))
+                app.logger.exception("Background job %s failed", name)
 
     try:
         _get_executor().submit(_runner)
         return True
     except Exception:
-        app.logger.exception("Failed to submit background job %s; running synchronously", getattr(func, "__name__", repr(func)))
+        app.logger.exception("Failed to submit background job %s; running synchronously", name)
         _runner()
         return False
 
@@ -0,0 +1,378 @@
+"""
+Espelho local da agenda da sala de reuniao (``calendar_event_mirror``).
+
+A sala de reuniao le os eventos desta tabela em vez de paginar a agenda
+inteira no Google a cada expiracao de cache:
+
+* O primeiro sync (ou um sync forcado) lista todos os eventos e guarda o
+  ``nextSyncToken``; eventos que nao vieram na listagem sao removidos.
+* Os seguintes pedem ao Google so o que mudou desde o token. Eventos
+  cancelados/excluidos chegam com ``status == "cancelled"`` e saem da tabela.
+* Um ``410 Gone`` (token expirado) descarta o token e refaz o sync completo.
+* Eventos que terminaram ha mais de ``MEETING_CALENDAR_PAST_DAYS`` sao podados.
+* Um lease em ``calendar_sync_state`` impede dois workers de sincronizar ao
+  mesmo tempo; se o Google cair, a tabela continua servindo a ultima versao.
+
+Uso:
+    from app.services.calendar_mirror import list_mirrored_events, sync_calendar_mirror
+
+    result = sync_calendar_mirror()                 # incremental
+    result = sync_calendar_mirror(force_full=True)  # ignora o token
+    events = list_mirrored_events(now, now + timedelta(days=30))
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from datetime import time as dt_time
+from typing import Any
+
+from dateutil.parser import isoparse
+from flask import current_app
+from sqlalchemy import or_, update
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.extensions.cache import cache
+from app.models.tables import CalendarEventMirror, CalendarSyncState, sao_paulo_now_naive
+from app.services import google_calendar
+from app.services.google_calendar import SyncTokenExpired, get_calendar_timezone, iter_event_changes
+
+logger = logging.getLogger(__name__)
+
+# Marcado por ``mark_mirror_dirty`` apos alteracoes locais na agenda; o
+# proximo leitor sincroniza antes de ler. Fica no cache compartilhado para
+# valer em todos os workers.
+DIRTY_CACHE_KEY = "calendar_mirror:dirty_at"
+DIRTY_CACHE_TIMEOUT = 3600
+SWEEP_CHUNK = 500
+
+
+def mirror_calendar_id() -> str:
+    """Key of the mirrored calendar (the meeting room account)."""
+    return google_calendar.MEETING_ROOM_EMAIL or "default"
+
+
+# =============================================================================
+# RESULTADO
+# =============================================================================
+
+@dataclass
+class MirrorSyncResult:
+    """Summary of one ``sync_calendar_mirror`` call."""
+
+    mode: str = "incremental"
+    token_expired: bool = False
+    skipped_locked: bool = False
+    pages: int = 0
+    received: int = 0
+    upserted: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    ignored: int = 0
+    swept: int = 0
+    pruned: int = 0
+    elapsed_ms: float = 0.0
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.upserted or self.deleted or self.swept or self.pruned)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "token_expired": self.token_expired,
+            "skipped_locked": self.skipped_locked,
+            "pages": self.pages,
+            "received": self.received,
+            "upserted": self.upserted,
+            "unchanged": self.unchanged,
+            "deleted": self.deleted,
+            "ignored": self.ignored,
+            "swept": self.swept,
+            "pruned": self.pruned,
+            "elapsed_ms": round(self.elapsed_ms, 1),
+        }
+
+
+# =============================================================================
+# CONVERSAO DE EVENTOS
+# =============================================================================
+
+def _to_utc_naive(value: datetime) -> datetime:
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def _event_bounds(event: dict) -> tuple[datetime, datetime, bool] | None:
+    """Return ``(start_utc, end_utc, all_day)`` of a Google event resource."""
+    start = event.get("start") or {}
+    end = event.get("end") or {}
+    if start.get("dateTime"):
+        begin = isoparse(start["dateTime"])
+        finish = isoparse(end.get("dateTime") or start["dateTime"])
+        if begin.tzinfo is None:
+            begin = begin.replace(tzinfo=get_calendar_timezone())
+        if finish.tzinfo is None:
+            finish = finish.replace(tzinfo=get_calendar_timezone())
+        return _to_utc_naive(begin), _to_utc_naive(finish), False
+    if start.get("date"):
+        tz = get_calendar_timezone()
+        first_day = date.fromisoformat(start["date"])
+        last_day = date.fromisoformat(end["date"]) if end.get("date") else first_day + timedelta(days=1)
+        return (
+            _to_utc_naive(datetime.combine(first_day, dt_time.min, tz)),
+            _to_utc_naive(datetime.combine(last_day, dt_time.min, tz)),
+            True,
+        )
+    return None
+
+
+def _retention_cutoff() -> datetime:
+    past_days = max(int(current_app.config.get("MEETING_CALENDAR_PAST_DAYS", 60)), 0)
+    return datetime.now(timezone.utc).replace(tzinfo=None) - timedelta(days=past_days)
+
+
+def _apply_page(
+    calendar_id: str,
+    items: list[dict],
+    stamp: datetime,
+    cutoff: datetime,
+    result: MirrorSyncResult,
+    kept: set[str],
+) -> None:
+    """Upsert/delete one page of changes; ids left in the mirror go to ``kept``."""
+    ids = {item["id"] for item in items if item.get("id")}
+    existing = {
+        row.event_id: row
+        for row in CalendarEventMirror.query.filter(
+            CalendarEventMirror.calendar_id == calendar_id,
+            CalendarEventMirror.event_id.in_(ids),
+        )
+    } if ids else {}
+
+    for item in items:
+        event_id = item.get("id")
+        if not event_id:
+            result.ignored += 1
+            continue
+        row = existing.get(event_id)
+        bounds = None if item.get("status") == "cancelled" else _event_bounds(item)
+        if bounds is None or bounds[1] < cutoff:
+            if row is not None:
+                db.session.delete(row)
+                existing.pop(event_id)
+                result.deleted += 1
+            else:
+                result.ignored += 1
+            continue
+
+        if row is None:
+            row = CalendarEventMirror(calendar_id=calendar_id, event_id=event_id)
+            db.session.add(row)
+            existing[event_id] = row
+        elif item.get("etag") and row.etag == item.get("etag"):
+            row.synced_at = stamp
+            kept.add(event_id)
+            result.unchanged += 1
+            continue
+
+        row.start_utc, row.end_utc, row.all_day = bounds
+        row.status = item.get("status")
+        row.summary = (item.get("summary") or "")[:500] or None
+        row.etag = item.get("etag")
+        row.updated = item.get("updated")
+        row.payload = item
+        row.synced_at = stamp
+        kept.add(event_id)
+        result.upserted += 1
+
+
+# =============================================================================
+# SYNC
+# =============================================================================
+
+def _claim_lease(calendar_id: str, now: datetime) -> bool:
+    """Take the sync lease of the calendar; ``False`` if another worker holds it."""
+    if db.session.get(CalendarSyncState, calendar_id) is None:
+        db.session.add(CalendarSyncState(calendar_id=calendar_id))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+    lease = timedelta(seconds=int(current_app.config.get("CALENDAR_MIRROR_LEASE_SECONDS", 120)))
+    claimed = db.session.execute(
+        update(CalendarSyncState)
+        .where(CalendarSyncState.calendar_id == calendar_id)
+        .where(or_(CalendarSyncState.lease_until.is_(None), CalendarSyncState.lease_until < now))
+        .values(lease_until=now + lease)
+    ).rowcount == 1
+    db.session.commit()
+    return claimed
+
+
+def _pull(
+    calendar_id: str,
+    sync_token: str | None,
+    stamp: datetime,
+    result: MirrorSyncResult,
+    kept: set[str],
+) -> str | None:
+    """Apply every page of changes since ``sync_token``; return the next token."""
+    cutoff = _retention_cutoff()
+    next_token = None
+    for items, token in iter_event_changes(sync_token):
+        result.pages += 1
+        result.received += len(items)
+        _apply_page(calendar_id, items, stamp, cutoff, result, kept)
+        db.session.commit()
+        next_token = token or next_token
+    return next_token
+
+
+def _sweep(calendar_id: str, kept: set[str]) -> int:
+    """Delete mirrored events missing from a full listing (deleted in Google)."""
+    stored = {
+        event_id
+        for (event_id,) in db.session.query(CalendarEventMirror.event_id).filter(
+            CalendarEventMirror.calendar_id == calendar_id
+        )
+    }
+    gone = sorted(stored - kept)
+    for offset in range(0, len(gone), SWEEP_CHUNK):
+        CalendarEventMirror.query.filter(
+            CalendarEventMirror.calendar_id == calendar_id,
+            CalendarEventMirror.event_id.in_(gone[offset:offset + SWEEP_CHUNK]),
+        ).delete(synchronize_session=False)
+    return len(gone)
+
+
+def sync_calendar_mirror(*, force_full: bool = False) -> MirrorSyncResult:
+    """Bring ``calendar_event_mirror`` up to date with Google Calendar.
+
+    Incremental when a sync token is stored, full otherwise (or when
+    ``force_full``/the token expired). Errors from Google are recorded in
+    ``calendar_sync_state`` and re-raised; the table keeps its contents.
+    """
+    calendar_id = mirror_calendar_id()
+    started = time.perf_counter()
+    # Sem fracao: o DATETIME do MySQL a descartaria e ``synced_through``
+    # passaria a parecer anterior a marcacoes de sujo ja cobertas.
+    stamp = sao_paulo_now_naive().replace(microsecond=0)
+    result = MirrorSyncResult()
+
+    if not _claim_lease(calendar_id, stamp):
+        result.skipped_locked = True
+        return result
+
+    try:
+        state = db.session.get(CalendarSyncState, calendar_id)
+        token = None if force_full else state.sync_token
+        result.mode = "incremental" if token else "full"
+        kept: set[str] = set()
+        try:
+            next_token = _pull(calendar_id, token, stamp, result, kept)
+        except SyncTokenExpired:
+            db.session.rollback()
+            logger.info("Token de sync da agenda expirou; refazendo o sync completo")
+            result.mode = "full"
+            result.token_expired = True
+            kept.clear()
+            next_token = _pull(calendar_id, None, stamp, result, kept)
+
+        if result.mode == "full":
+            result.swept = _sweep(calendar_id, kept)
+        result.pruned = CalendarEventMirror.query.filter(
+            CalendarEventMirror.calendar_id == calendar_id,
+            CalendarEventMirror.end_utc < _retention_cutoff(),
+        ).delete(synchronize_session=False)
+
+        state = db.session.get(CalendarSyncState, calendar_id)
+        state.sync_token = next_token
+        state.synced_through = stamp
+        if result.mode == "full":
+            state.last_full_sync_at = stamp
+        if result.changed or state.changed_at is None:
+            state.changed_at = sao_paulo_now_naive()
+        state.last_error = None
+        state.lease_until = None
+        db.session.commit()
+    except Exception as exc:
+        db.session.rollback()
+        state = db.session.get(CalendarSyncState, calendar_id)
+        if state is not None:
+            state.last_error = str(exc)[:1000]
+            state.last_error_at = sao_paulo_now_naive()
+            state.lease_until = None
+            db.session.commit()
+        raise
+    finally:
+        result.elapsed_ms = (time.perf_counter() - started) * 1000
+
+    logger.info("Espelho da agenda sincronizado: %s", result.as_dict())
+    return result
+
+
+# =============================================================================
+# LEITURA
+# =============================================================================
+
+def get_sync_state() -> CalendarSyncState | None:
+    """Current sync state, reloaded (another thread or worker may have synced)."""
+    return db.session.get(CalendarSyncState, mirror_calendar_id(), populate_existing=True)
+
+
+def mark_mirror_dirty() -> None:
+    """Make the next reader sync before reading (after a local calendar write)."""
+    try:
+        cache.set(DIRTY_CACHE_KEY, sao_paulo_now_naive(), timeout=DIRTY_CACHE_TIMEOUT)
+    except Exception:
+        logger.warning("Nao foi possivel marcar o espelho da agenda como sujo", exc_info=True)
+
+
+def mirror_sync_reason(state: CalendarSyncState | None) -> str | None:
+    """Why the mirror should be synced before (or while) serving a read.
+
+    ``"never"``/``"dirty"`` call for a sync before reading, ``"stale"`` for a
+    background refresh; ``None`` means the table can be served as is
+    (including right after a failed sync, for ``CALENDAR_MIRROR_RETRY_SECONDS``).
+    """
+    now = sao_paulo_now_naive()
+    config = current_app.config
+    synced_through = state.synced_through if state is not None else None
+    if state is not None and state.last_error_at is not None and (
+        synced_through is None or state.last_error_at > synced_through
+    ):
+        retry = timedelta(seconds=int(config.get("CALENDAR_MIRROR_RETRY_SECONDS", 30)))
+        if now - state.last_error_at < retry:
+            return None
+    if synced_through is None:
+        return "never"
+    try:
+        dirty_at = cache.get(DIRTY_CACHE_KEY)
+    except Exception:
+        dirty_at = None
+    if dirty_at is not None and dirty_at >= synced_through:
+        return "dirty"
+    max_age = timedelta(seconds=int(config.get("CALENDAR_MIRROR_MAX_AGE_SECONDS", 60)))
+    if now - synced_through > max_age:
+        return "stale"
+    return None
+
+
+def list_mirrored_events(time_min: datetime, time_max: datetime | None = None) -> list[dict]:
+    """Mirrored events ending after ``time_min`` (and starting before ``time_max``).
+
+    Returns the Google event resources ordered by start, like
+    ``events().list(orderBy="startTime")``.
+    """
+    query = CalendarEventMirror.query.filter(
+        CalendarEventMirror.calendar_id == mirror_calendar_id(),
+        CalendarEventMirror.end_utc > _to_utc_naive(time_min),
+    )
+    if time_max is not None:
+        query = query.filter(CalendarEventMirror.start_utc < _to_utc_naive(time_max))
+    rows = query.order_by(CalendarEventMirror.start_utc, CalendarEventMirror.event_id).all()
+    return [row.payload for row in rows]
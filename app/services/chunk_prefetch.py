@@ -0,0 +1,300 @@
+"""
+Pre-renderizacao em segundo plano dos lotes de listagens progressivas.
+
+A listagem completa do inventario guarda os ids sob um token e o front-end
+pede ``/api/inventario/chunk`` conforme a rolagem; cada pedido fazia as
+consultas e o render na hora. O ``ChunkPrefetcher`` renderiza os proximos
+lotes no executor de segundo plano e grava o resultado no mesmo cache que a
+rota consulta, de modo que a rolagem encontra o lote pronto.
+
+* Profundidade adaptativa: parte de ``CHUNK_PREFETCH_DEPTH`` lotes e cresce
+  com a velocidade de rolagem (lotes pedidos por segundo vezes
+  ``CHUNK_PREFETCH_LOOKAHEAD_SECONDS``), ate ``CHUNK_PREFETCH_MAX_DEPTH``.
+* Cancelamento: quando o token expira (ou some do cache) os lotes
+  pendentes sao descartados.
+* Orcamento de CPU: todo o prefetch do processo divide uma janela movel de
+  CPU (``CHUNK_PREFETCH_CPU_BUDGET`` = fracao de um nucleo); estourado o
+  orcamento, os lotes ficam para o render sob demanda da propria rota.
+
+Uso:
+    from app.services.chunk_prefetch import ChunkPrefetcher
+
+    prefetcher = ChunkPrefetcher("inventario", cache_key=lambda t, o, l: f"chunk:{t}:{o}:{l}")
+    prefetcher.advance(token, loaded=100, limit=100, total=300, render=render_chunk)
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from flask import current_app
+
+from app.extensions.cache import cache
+from app.services.background import submit_background_job
+
+logger = logging.getLogger(__name__)
+
+# Pedidos considerados no calculo da velocidade de rolagem.
+_RATE_SAMPLES = 5
+
+RenderChunk = Callable[[int, int], "dict[str, Any] | None"]
+
+
+# =============================================================================
+# ORCAMENTO DE CPU
+# =============================================================================
+
+class CpuBudget:
+    """Rolling-window CPU-time budget shared by every prefetch worker of the process.
+
+    ``fraction`` is the share of one core the prefetch may use, measured with
+    ``time.thread_time`` around each render.
+    """
+
+    def __init__(self, window_seconds: float = 10.0) -> None:
+        self.window_seconds = window_seconds
+        self._lock = threading.Lock()
+        self._samples: deque[tuple[float, float]] = deque()
+
+    def _prune(self, now: float) -> None:
+        while self._samples and now - self._samples[0][0] > self.window_seconds:
+            self._samples.popleft()
+
+    def used(self) -> float:
+        with self._lock:
+            self._prune(time.monotonic())
+            return sum(seconds for _, seconds in self._samples)
+
+    def available(self, fraction: float) -> bool:
+        return self.used() < fraction * self.window_seconds
+
+    def charge(self, cpu_seconds: float) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._prune(now)
+            self._samples.append((now, cpu_seconds))
+
+
+cpu_budget = CpuBudget()
+
+
+# =============================================================================
+# PREFETCH POR TOKEN
+# =============================================================================
+
+@dataclass
+class _TokenState:
+    token: str
+    limit: int
+    total: int
+    render: RenderChunk
+    expires_at: float
+    requests: deque = field(default_factory=lambda: deque(maxlen=_RATE_SAMPLES))
+    pending: list[int] = field(default_factory=list)
+    scheduled: set[int] = field(default_factory=set)
+    prefetched: set[int] = field(default_factory=set)
+    worker_active: bool = False
+    cancelled: bool = False
+
+    @property
+    def expired(self) -> bool:
+        return time.time() >= self.expires_at
+
+    def chunks_per_second(self) -> float:
+        if len(self.requests) < 2:
+            return 0.0
+        span = self.requests[-1] - self.requests[0]
+        return (len(self.requests) - 1) / span if span > 0 else float(_RATE_SAMPLES)
+
+
+@dataclass
+class PrefetchStats:
+    scheduled: int = 0
+    rendered: int = 0
+    hits: int = 0
+    skipped_budget: int = 0
+    cancelled: int = 0
+    cpu_seconds: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "scheduled": self.scheduled,
+            "rendered": self.rendered,
+            "hits": self.hits,
+            "skipped_budget": self.skipped_budget,
+            "cancelled": self.cancelled,
+            "cpu_seconds": round(self.cpu_seconds, 3),
+        }
+
+
+class ChunkPrefetcher:
+    """Render the chunks after the one just served, ahead of the client."""
+
+    def __init__(self, name: str, cache_key: Callable[[str, int, int], str]) -> None:
+        self.name = name
+        self.cache_key = cache_key
+        self.stats = PrefetchStats()
+        self._lock = threading.Lock()
+        self._states: dict[str, _TokenState] = {}
+
+    # -------------------------------------------------------------------------
+    # Configuracao
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _config(key: str, default: float) -> float:
+        return float(current_app.config.get(key, default))
+
+    def depth_for(self, state: _TokenState) -> int:
+        """Chunks to keep ready: base depth, grown with the scroll speed."""
+        base = int(self._config("CHUNK_PREFETCH_DEPTH", 2))
+        maximum = max(base, int(self._config("CHUNK_PREFETCH_MAX_DEPTH", 6)))
+        lookahead = self._config("CHUNK_PREFETCH_LOOKAHEAD_SECONDS", 10)
+        wanted = math.ceil(state.chunks_per_second() * lookahead)
+        return max(base, min(maximum, wanted))
+
+    # -------------------------------------------------------------------------
+    # API
+    # -------------------------------------------------------------------------
+
+    def advance(
+        self,
+        token: str,
+        *,
+        loaded: int,
+        limit: int,
+        total: int,
+        render: RenderChunk,
+        expires_at: float | None = None,
+    ) -> None:
+        """Record that the client has ``loaded`` rows and queue the next chunks.
+
+        Called when the token is created and on every chunk request. The
+        state is per process and created on demand, so a chunk request that
+        lands on another worker simply starts prefetching there.
+        """
+        if not current_app.config.get("CHUNK_PREFETCH_ENABLED", True):
+            return
+        if expires_at is not None and expires_at <= time.time():
+            return
+        self._sweep()
+        with self._lock:
+            state = self._states.get(token)
+            if state is None:
+                state = _TokenState(
+                    token=token,
+                    limit=limit,
+                    total=total,
+                    render=render,
+                    expires_at=expires_at or time.time() + 300,
+                )
+                self._states[token] = state
+            state.requests.append(time.monotonic())
+            if loaded - limit in state.prefetched:
+                self.stats.hits += 1
+
+            depth = self.depth_for(state)
+            for index in range(depth):
+                offset = loaded + index * state.limit
+                if offset >= state.total:
+                    break
+                if offset in state.scheduled:
+                    continue
+                state.scheduled.add(offset)
+                state.pending.append(offset)
+                self.stats.scheduled += 1
+            start_worker = bool(state.pending) and not state.worker_active
+            if start_worker:
+                state.worker_active = True
+
+        if start_worker:
+            submit_background_job(self._run, state)
+
+    def cancel(self, token: str) -> None:
+        with self._lock:
+            state = self._states.pop(token, None)
+            if state is not None:
+                self._cancel_state(state)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            active = len(self._states)
+        return {
+            "name": self.name,
+            "active_tokens": active,
+            "cpu_used_seconds": round(cpu_budget.used(), 3),
+            **self.stats.as_dict(),
+        }
+
+    # -------------------------------------------------------------------------
+    # Internos
+    # -------------------------------------------------------------------------
+
+    def _cancel_state(self, state: _TokenState) -> None:
+        state.cancelled = True
+        self.stats.cancelled += len(state.pending)
+        state.pending.clear()
+
+    def _sweep(self) -> None:
+        """Drop the state of expired tokens; their queued chunks are cancelled."""
+        with self._lock:
+            for token in [token for token, state in self._states.items() if state.expired]:
+                self._cancel_state(self._states.pop(token))
+
+    def _next_offset(self, state: _TokenState) -> int | None:
+        with self._lock:
+            if state.cancelled or not state.pending:
+                state.worker_active = False
+                return None
+            return state.pending.pop(0)
+
+    def _run(self, state: _TokenState) -> None:
+        """Render the pending chunks of one token, one at a time."""
+        budget = self._config("CHUNK_PREFETCH_CPU_BUDGET", 0.25)
+        timeout = int(self._config("CHUNK_PREFETCH_CACHE_SECONDS", 120))
+        while True:
+            offset = self._next_offset(state)
+            if offset is None:
+                return
+            if state.expired:
+                self.cancel(state.token)
+                continue
+            if not cpu_budget.available(budget):
+                # Sem orcamento: a propria rota renderiza sob demanda.
+                with self._lock:
+                    skipped = 1 + len(state.pending)
+                    state.scheduled.difference_update([offset, *state.pending])
+                    state.pending.clear()
+                    self.stats.skipped_budget += skipped
+                continue
+
+            key = self.cache_key(state.token, offset, state.limit)
+            if cache.get(key) is not None:
+                continue
+            started = time.thread_time()
+            try:
+                result = state.render(offset, state.limit)
+            except Exception:
+                logger.exception("Prefetch %s: falha ao renderizar lote %s", self.name, offset)
+                with self._lock:
+                    state.scheduled.discard(offset)
+                continue
+            finally:
+                spent = time.thread_time() - started
+                cpu_budget.charge(spent)
+                self.stats.cpu_seconds += spent
+            if result is None:
+                # Token sumiu do cache: nada mais a renderizar.
+                self.cancel(state.token)
+                continue
+            cache.set(key, result, timeout=timeout)
+            with self._lock:
+                state.prefetched.add(offset)
+                self.stats.rendered += 1
+            logger.debug("Prefetch %s: lote %s do token %s pronto", self.name, offset, state.token)
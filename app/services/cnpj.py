@@ -2,10 +2,11 @@
 
 import os
 import re
-import requests
 from datetime import datetime
 
-ACESSORIAS_BASE = "https://api.acessorias.com"
+from app.services.cnpj_lookup import BRASILAPI, FOUND, RECEITAWS, get_cnpj_lookup, pooled_session
+
+ACESSORIAS_BASE = os.getenv("ACESSORIAS_BASE", "https://api.acessorias.com")
 ACESSORIAS_TOKEN = os.getenv("ACESSORIAS_TOKEN")
 
 
@@ -15,7 +16,7 @@ def get_acessorias_company(documento: str) -> dict | bool | None:
         return None
     url = f"{ACESSORIAS_BASE}/companies/{documento}"
     headers = {"Authorization": f"Bearer {ACESSORIAS_TOKEN}", "Accept": "application/json"}
-    r = requests.get(url, headers=headers, timeout=20, proxies={"http": None, "https": None})
+    r = pooled_session("acessorias").get(url, headers=headers, timeout=20, proxies={"http": None, "https": None})
     if r.status_code == 200:
         try:
             return r.json()
@@ -131,7 +132,9 @@ def upsert_acessorias_company(payload: dict) -> dict | None:
         "Authorization": f"Bearer {ACESSORIAS_TOKEN}",
         "Accept": "application/json",
     }
-    r = requests.post(url, headers=headers, json=payload, timeout=30, proxies={"http": None, "https": None})
+    r = pooled_session("acessorias").post(
+        url, headers=headers, json=payload, timeout=30, proxies={"http": None, "https": None}
+    )
     try:
         data = r.json()
     except Exception:
@@ -140,27 +143,15 @@ def upsert_acessorias_company(payload: dict) -> dict | None:
 
 
 def get_brasilapi_cnpj(cnpj: str) -> dict | None:
-    """Retrieve CNPJ details from BrasilAPI."""
-    url = f"https://brasilapi.com.br/api/cnpj/v1/{cnpj}"
-    r = requests.get(url, timeout=20, proxies={"http": None, "https": None})
-    if r.status_code == 200:
-        return r.json()
-    return None
+    """Retrieve CNPJ details from BrasilAPI (uncached, single provider)."""
+    outcome, data = BRASILAPI.fetch(cnpj, timeout=20)
+    return data if outcome == FOUND else None
 
 
 def get_receitaws_cnpj(cnpj: str) -> dict | None:
-    """Retrieve CNPJ details from the ReceitaWS service."""
-    url = f"https://www.receitaws.com.br/v1/cnpj/{cnpj}"
-    r = requests.get(url, timeout=20, proxies={"http": None, "https": None})
-    if r.status_code == 200:
-        try:
-            data = r.json()
-            if data.get("status") == "ERROR":
-                return None
-            return data
-        except Exception:
-            return None
-    return None
+    """Retrieve CNPJ details from the ReceitaWS service (uncached, single provider)."""
+    outcome, data = RECEITAWS.fetch(cnpj, timeout=20)
+    return data if outcome == FOUND else None
 
 
 def mapear_para_form(d: dict) -> dict:
@@ -285,15 +276,21 @@ def consultar_cnpj(cnpj_input: str) -> dict | None:
         return payload or None
 
     # CNPJ: consulta APIs externas + complemento de dados via Acessorias.
+    # A Acessorias so depende do documento, entao roda junto com os provedores.
     cnpj = documento
-    dados = get_brasilapi_cnpj(cnpj)
-    if not dados:
-        dados = get_receitaws_cnpj(cnpj)
-    if not dados:
+    lookup = get_cnpj_lookup()
+    acessorias = lookup.executor.submit(get_acessorias_company, cnpj) if ACESSORIAS_TOKEN else None
+    result = lookup.lookup(cnpj)
+    if not result.found:
+        if acessorias is not None:
+            acessorias.cancel()
+        if result.unavailable:
+            raise ValueError("Servico de consulta indisponivel")
         return None
 
+    dados = result.data
     payload = mapear_para_form(dados)
-    base = get_acessorias_company(cnpj)
+    base = acessorias.result() if acessorias is not None else None
     if base is False and ACESSORIAS_TOKEN:
         base = upsert_acessorias_company(mapear_para_acessorias(dados))
         if not base:
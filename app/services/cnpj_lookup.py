@@ -0,0 +1,493 @@
+"""
+Consulta de CNPJ em provedores publicos com cache, conexoes reaproveitadas e hedging.
+
+``consultar_cnpj`` chamava BrasilAPI e depois ReceitaWS em sequencia, com um
+``requests.get`` avulso (nova conexao TCP/TLS a cada chamada) e sem cache. Este
+servico:
+
+* Guarda o resultado em SQLite no disco (``CNPJ_CACHE_PATH``): respostas
+  encontradas valem ``CNPJ_CACHE_TTL_SECONDS``; CNPJ que todos os provedores
+  consultados desconhecem vale ``CNPJ_NEGATIVE_CACHE_TTL_SECONDS``.
+* Usa uma ``requests.Session`` com pool keep-alive por provedor.
+* Dispara o provedor mais rapido e, se ele nao responder dentro do atraso de
+  hedge (o dobro da latencia mediana dele, limitado por
+  ``CNPJ_HEDGE_DELAY_MS``), dispara o proximo em paralelo; vale a primeira
+  resposta boa. Erro ou "nao encontrado" dispara o proximo na hora.
+* Mantem a saude de cada provedor (mediana das ultimas chamadas e falhas
+  seguidas). Provedor lento (mediana acima de ``CNPJ_SLOW_PROVIDER_MS``) ou
+  em quarentena sai da ordem e recebe apenas sondagens em segundo plano ate
+  se recuperar.
+
+Uso:
+    from app.services.cnpj_lookup import get_cnpj_lookup
+
+    result = get_cnpj_lookup().lookup("12345678000190")
+    if result.found:
+        dados = result.data
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from flask import current_app
+
+from app.utils.lazy_import import lazy_import
+
+requests = lazy_import("requests")
+
+logger = logging.getLogger(__name__)
+
+FOUND = "found"
+NOT_FOUND = "not_found"
+
+BRASILAPI_URL = os.getenv("CNPJ_BRASILAPI_URL", "https://brasilapi.com.br/api/cnpj/v1/{cnpj}")
+RECEITAWS_URL = os.getenv("CNPJ_RECEITAWS_URL", "https://www.receitaws.com.br/v1/cnpj/{cnpj}")
+
+# Saude dos provedores
+HEALTH_WINDOW = 20
+FAILURES_BEFORE_COOLDOWN = 3
+COOLDOWN_SECONDS = 60.0
+PROBE_INTERVAL_SECONDS = 30.0
+
+
+class ProviderError(RuntimeError):
+    """Resposta inesperada de um provedor (erro HTTP, limite, JSON invalido)."""
+
+
+# =============================================================================
+# SESSOES
+# =============================================================================
+
+_sessions: dict[str, Any] = {}
+_sessions_lock = threading.Lock()
+
+
+def pooled_session(name: str) -> "requests.Session":
+    """Keep-alive session shared by every caller of the same provider."""
+    with _sessions_lock:
+        session = _sessions.get(name)
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _sessions[name] = session
+        return session
+
+
+# =============================================================================
+# PROVEDORES
+# =============================================================================
+
+def _parse_brasilapi(resp: "requests.Response") -> tuple[str, dict | None]:
+    if resp.status_code == 200:
+        try:
+            return FOUND, resp.json()
+        except ValueError as exc:
+            raise ProviderError("BrasilAPI: resposta nao e JSON") from exc
+    if resp.status_code in (400, 404):
+        return NOT_FOUND, None
+    raise ProviderError(f"BrasilAPI: status {resp.status_code}")
+
+
+def _parse_receitaws(resp: "requests.Response") -> tuple[str, dict | None]:
+    if resp.status_code != 200:
+        raise ProviderError(f"ReceitaWS: status {resp.status_code}")
+    try:
+        data = resp.json()
+    except ValueError as exc:
+        raise ProviderError("ReceitaWS: resposta nao e JSON") from exc
+    if data.get("status") == "ERROR":
+        return NOT_FOUND, None
+    return FOUND, data
+
+
+@dataclass
+class Provider:
+    name: str
+    url_template: str
+    parse: Callable[["requests.Response"], tuple[str, dict | None]]
+
+    def fetch(self, cnpj: str, timeout: float) -> tuple[str, dict | None]:
+        """One request to the provider; raises ``ProviderError`` on failure."""
+        try:
+            resp = pooled_session(self.name).get(
+                self.url_template.format(cnpj=cnpj),
+                timeout=timeout,
+                proxies={"http": None, "https": None},
+            )
+        except requests.RequestException as exc:
+            raise ProviderError(f"{self.name}: {exc}") from exc
+        return self.parse(resp)
+
+
+BRASILAPI = Provider("brasilapi", BRASILAPI_URL, _parse_brasilapi)
+RECEITAWS = Provider("receitaws", RECEITAWS_URL, _parse_receitaws)
+DEFAULT_PROVIDERS = (BRASILAPI, RECEITAWS)
+
+
+class ProviderHealth:
+    """Recent latencies and consecutive failures of one provider.
+
+    The median (not the mean) ranks providers: with hedging, a provider that
+    is usually fast but has a slow tail should still go first.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.samples: deque[float] = deque(maxlen=HEALTH_WINDOW)
+        self.calls = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.cooldown_until = 0.0
+        self.last_attempt = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms: float, ok: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            self.last_attempt = time.monotonic()
+            self.samples.append(latency_ms)
+            if ok:
+                self.consecutive_failures = 0
+                self.cooldown_until = 0.0
+                return
+            self.failures += 1
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= FAILURES_BEFORE_COOLDOWN:
+                self.cooldown_until = self.last_attempt + COOLDOWN_SECONDS
+
+    def typical_ms(self) -> float | None:
+        with self._lock:
+            return statistics.median(self.samples) if self.samples else None
+
+    def expected_ms(self, default: float) -> float:
+        typical = self.typical_ms()
+        return typical if typical is not None else default
+
+    def unhealthy(self, slow_ms: float, now: float) -> bool:
+        if now < self.cooldown_until:
+            return True
+        typical = self.typical_ms()
+        return typical is not None and typical > slow_ms
+
+    def probe_due(self, now: float) -> bool:
+        with self._lock:
+            if now - self.last_attempt < PROBE_INTERVAL_SECONDS:
+                return False
+            # Reserva a sondagem; a chamada atualiza de novo ao terminar.
+            self.last_attempt = now
+            return True
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "p50_ms": round(self.typical_ms() or 0.0, 1),
+            "calls": self.calls,
+            "failures": self.failures,
+            "consecutive_failures": self.consecutive_failures,
+            "cooling_down": time.monotonic() < self.cooldown_until,
+        }
+
+
+# =============================================================================
+# CACHE PERSISTENTE
+# =============================================================================
+
+_CACHE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cnpj_results (
+    documento TEXT PRIMARY KEY,
+    found INTEGER NOT NULL,
+    provider TEXT,
+    data TEXT,
+    stored_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+)
+"""
+
+
+@dataclass
+class CachedLookup:
+    found: bool
+    provider: str | None
+    data: dict | None
+
+
+class CnpjResultCache:
+    """Positive and negative lookup results on disk; one connection per thread."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        conn.execute(_CACHE_SCHEMA)
+        conn.execute("DELETE FROM cnpj_results WHERE expires_at < ?", (time.time(),))
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, documento: str) -> CachedLookup | None:
+        try:
+            row = self._conn().execute(
+                "SELECT found, provider, data FROM cnpj_results WHERE documento = ? AND expires_at > ?",
+                (documento, time.time()),
+            ).fetchone()
+        except sqlite3.Error:
+            logger.warning("Cache de CNPJ indisponivel", exc_info=True)
+            return None
+        if row is None:
+            return None
+        return CachedLookup(bool(row[0]), row[1], json.loads(row[2]) if row[2] else None)
+
+    def put(self, documento: str, *, found: bool, provider: str | None, data: dict | None, ttl: int) -> None:
+        if ttl <= 0:
+            return
+        now = time.time()
+        try:
+            conn = self._conn()
+            conn.execute(
+                "INSERT OR REPLACE INTO cnpj_results (documento, found, provider, data, stored_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (documento, int(found), provider, json.dumps(data) if data is not None else None, now, now + ttl),
+            )
+            conn.commit()
+        except sqlite3.Error:
+            logger.warning("Falha ao gravar cache de CNPJ", exc_info=True)
+
+    def delete(self, documento: str) -> None:
+        conn = self._conn()
+        conn.execute("DELETE FROM cnpj_results WHERE documento = ?", (documento,))
+        conn.commit()
+
+
+# =============================================================================
+# SERVICO
+# =============================================================================
+
+@dataclass
+class LookupResult:
+    documento: str
+    found: bool
+    data: dict | None = None
+    provider: str | None = None
+    source: str = "network"
+    elapsed_ms: float = 0.0
+    attempts: list[str] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+    @property
+    def unavailable(self) -> bool:
+        """No provider answered at all (errors or timeouts only)."""
+        return not self.found and self.source == "network" and len(self.errors) == len(self.attempts)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "documento": self.documento,
+            "found": self.found,
+            "provider": self.provider,
+            "source": self.source,
+            "elapsed_ms": round(self.elapsed_ms, 1),
+            "attempts": self.attempts,
+            "errors": self.errors,
+        }
+
+
+class CnpjLookupService:
+    """Hedged lookup over ``providers`` with a persistent result cache."""
+
+    def __init__(
+        self,
+        providers: tuple[Provider, ...] | list[Provider] = DEFAULT_PROVIDERS,
+        *,
+        cache: CnpjResultCache | None = None,
+        positive_ttl: int = 7 * 24 * 3600,
+        negative_ttl: int = 24 * 3600,
+        hedge_delay_ms: float = 800.0,
+        timeout: float = 10.0,
+        slow_ms: float = 4000.0,
+        max_workers: int = 8,
+    ) -> None:
+        self.providers = list(providers)
+        self.cache = cache
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.hedge_delay_ms = hedge_delay_ms
+        self.timeout = timeout
+        self.slow_ms = slow_ms
+        self.health = {p.name: ProviderHealth(p.name) for p in self.providers}
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cnpj-lookup")
+        self.stats: dict[str, int] = {"lookups": 0, "cache_hits": 0, "hedged": 0, "probes": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key: str, amount: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] = self.stats.get(key, 0) + amount
+
+    # -------------------------------------------------------------------------
+    # Provedores
+    # -------------------------------------------------------------------------
+
+    def _call(self, provider: Provider, cnpj: str) -> tuple[str, dict | None]:
+        started = time.perf_counter()
+        ok = False
+        try:
+            outcome = provider.fetch(cnpj, self.timeout)
+            ok = True
+            return outcome
+        finally:
+            self.health[provider.name].record((time.perf_counter() - started) * 1000, ok)
+
+    def _probe(self, provider: Provider, cnpj: str) -> None:
+        try:
+            self._call(provider, cnpj)
+        except ProviderError:
+            pass
+
+    def ranked_providers(self) -> list[Provider]:
+        """Healthy providers, fastest first; unhealthy ones only get background probes."""
+        now = time.monotonic()
+        ranked = sorted(
+            self.providers,
+            key=lambda p: self.health[p.name].expected_ms(self.hedge_delay_ms),
+        )
+        healthy = [p for p in ranked if not self.health[p.name].unhealthy(self.slow_ms, now)]
+        if not healthy:
+            return ranked
+        return healthy
+
+    def _hedge_delay(self, provider: Provider) -> float:
+        expected = self.health[provider.name].expected_ms(self.hedge_delay_ms)
+        return max(50.0, min(expected * 2, self.hedge_delay_ms)) / 1000
+
+    # -------------------------------------------------------------------------
+    # API
+    # -------------------------------------------------------------------------
+
+    def lookup(self, documento: str, *, use_cache: bool = True) -> LookupResult:
+        """Return the provider data for ``documento`` (cache first, then hedged calls)."""
+        started = time.perf_counter()
+        self._count("lookups")
+        if use_cache and self.cache is not None:
+            cached = self.cache.get(documento)
+            if cached is not None:
+                self._count("cache_hits")
+                return LookupResult(
+                    documento=documento,
+                    found=cached.found,
+                    data=cached.data,
+                    provider=cached.provider,
+                    source="cache",
+                    elapsed_ms=(time.perf_counter() - started) * 1000,
+                )
+
+        result = LookupResult(documento=documento, found=False)
+        queue = self.ranked_providers()
+        for provider in self.providers:
+            if provider not in queue and self.health[provider.name].probe_due(time.monotonic()):
+                self._count("probes")
+                self.executor.submit(self._probe, provider, documento)
+
+        pending: dict[Future, Provider] = {}
+        not_found: list[str] = []
+        deadline = time.monotonic() + self.timeout
+        next_hedge = deadline
+
+        def launch() -> None:
+            nonlocal next_hedge
+            provider = queue.pop(0)
+            pending[self.executor.submit(self._call, provider, documento)] = provider
+            result.attempts.append(provider.name)
+            next_hedge = time.monotonic() + self._hedge_delay(provider)
+
+        launch()
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                result.errors.extend(f"{p.name}: timeout" for p in pending.values())
+                break
+            wait_until = min(deadline, next_hedge) if queue else deadline
+            done, _ = wait(pending, timeout=max(0.0, wait_until - now), return_when=FIRST_COMPLETED)
+            if not done:
+                if queue and time.monotonic() >= next_hedge:
+                    self._count("hedged")
+                    launch()
+                continue
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    outcome, data = future.result()
+                except ProviderError as exc:
+                    result.errors.append(str(exc))
+                    continue
+                if outcome == FOUND and data:
+                    result.found = True
+                    result.data = data
+                    result.provider = provider.name
+                    break
+                not_found.append(provider.name)
+            if result.found:
+                break
+            if queue and not pending:
+                launch()
+
+        result.elapsed_ms = (time.perf_counter() - started) * 1000
+        if self.cache is not None:
+            if result.found:
+                self.cache.put(
+                    documento, found=True, provider=result.provider, data=result.data, ttl=self.positive_ttl
+                )
+            elif not_found and len(not_found) == len(result.attempts):
+                # Todos os consultados desconhecem o CNPJ: cache negativo.
+                self.cache.put(documento, found=False, provider=None, data=None, ttl=self.negative_ttl)
+        if result.found and result.provider:
+            self._count(f"won_{result.provider}")
+        return result
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return {
+            **stats,
+            "providers": {name: health.snapshot() for name, health in self.health.items()},
+        }
+
+
+_service: CnpjLookupService | None = None
+_service_lock = threading.Lock()
+
+
+def get_cnpj_lookup() -> CnpjLookupService:
+    """Process-wide service configured from the app config on first use."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            config = current_app.config
+            path = config.get("CNPJ_CACHE_PATH")
+            _service = CnpjLookupService(
+                cache=CnpjResultCache(path) if path else None,
+                positive_ttl=int(config.get("CNPJ_CACHE_TTL_SECONDS", 7 * 24 * 3600)),
+                negative_ttl=int(config.get("CNPJ_NEGATIVE_CACHE_TTL_SECONDS", 24 * 3600)),
+                hedge_delay_ms=float(config.get("CNPJ_HEDGE_DELAY_MS", 800)),
+                timeout=float(config.get("CNPJ_LOOKUP_TIMEOUT_SECONDS", 10)),
+                slow_ms=float(config.get("CNPJ_SLOW_PROVIDER_MS", 4000)),
+            )
+        return _service
@@ -7,9 +7,12 @@ dedicated room e-mail and performs all calendar operations.
 
 from __future__ import annotations
 
+import base64
+import hashlib
 import os
 import re
-from collections.abc import Sequence
+import time
+from collections.abc import Iterator, Sequence
 from datetime import datetime
 from uuid import uuid4
 from functools import lru_cache
@@ -17,11 +20,18 @@ from zoneinfo import ZoneInfo
 
 from urllib.parse import urlparse
 
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
 import socket
 
+from app.utils.lazy_import import lazy_import
+
+# The Google client stack costs ~0.3s to import; every model import pulls this
+# module in, so it is only loaded when a service is actually built.
+service_account = lazy_import("google.oauth2.service_account")
+discovery = lazy_import("googleapiclient.discovery")
+errors = lazy_import("googleapiclient.errors")
+googleapiclient_http = lazy_import("googleapiclient.http")
+google_auth_credentials = lazy_import("google.auth.credentials")
+
 _MEET_CODE_PATTERN = re.compile(r"[a-z0-9]{3,}(?:-[a-z0-9]{3,}){2}|[a-z0-9]{10,}")
 
 # Scopes required to manage calendar events.
@@ -39,6 +49,13 @@ MEET_SCOPES: tuple[str, ...] = (
 # Environment driven configuration for the meeting room.
 SERVICE_ACCOUNT_FILE = os.getenv("GOOGLE_SERVICE_ACCOUNT_FILE")
 MEETING_ROOM_EMAIL = os.getenv("GOOGLE_MEETING_ROOM_EMAIL")
+# Alternate API base (root + "calendar/v3/"), e.g. scripts/fake_google_calendar_server.py.
+CALENDAR_API_ENDPOINT = os.getenv("GOOGLE_CALENDAR_API_ENDPOINT")
+
+# The Calendar API accepts at most 50 requests per batch.
+BATCH_MAX_REQUESTS = 50
+# Batch items failing with these statuses are retried in a later batch.
+BATCH_RETRY_STATUSES = frozenset({403, 429, 500, 502, 503})
 
 
 def _build_delegated_credentials(scopes: Sequence[str]):
@@ -61,10 +78,33 @@ def _build_service():
 
     Cached to avoid recreating the service on every request.
     """
-    delegated = _build_delegated_credentials(CALENDAR_SCOPES)
     # Set socket timeout to prevent hanging requests (reduced to 3s for faster failover)
     socket.setdefaulttimeout(3)
-    return build("calendar", "v3", credentials=delegated)
+    if CALENDAR_API_ENDPOINT:
+        credentials = (
+            _build_delegated_credentials(CALENDAR_SCOPES)
+            if SERVICE_ACCOUNT_FILE
+            else google_auth_credentials.AnonymousCredentials()
+        )
+        return discovery.build(
+            "calendar",
+            "v3",
+            credentials=credentials,
+            client_options={"api_endpoint": CALENDAR_API_ENDPOINT},
+        )
+    delegated = _build_delegated_credentials(CALENDAR_SCOPES)
+    return discovery.build("calendar", "v3", credentials=delegated)
+
+
+def _new_batch(service, callback=None):
+    """Batch request for the Calendar API (honouring ``CALENDAR_API_ENDPOINT``)."""
+    if CALENDAR_API_ENDPOINT:
+        root = urlparse(CALENDAR_API_ENDPOINT)
+        return googleapiclient_http.BatchHttpRequest(
+            callback=callback,
+            batch_uri=f"{root.scheme}://{root.netloc}/batch/calendar/v3",
+        )
+    return service.new_batch_http_request(callback=callback)
 
 
 @lru_cache(maxsize=2)
@@ -75,7 +115,7 @@ def _build_meet_service():
     """
     delegated = _build_delegated_credentials(MEET_SCOPES)
     socket.setdefaulttimeout(3)
-    return build("meet", "v2", credentials=delegated)
+    return discovery.build("meet", "v2", credentials=delegated)
 
 
 @lru_cache(maxsize=1)
@@ -156,12 +196,98 @@ def list_upcoming_events(
         return []
 
 
+class SyncTokenExpired(RuntimeError):
+    """Google answered ``410 Gone``: the stored sync token must be discarded."""
+
+
+def iter_event_changes(
+    sync_token: str | None = None,
+    *,
+    page_size: int = 250,
+) -> Iterator[tuple[list[dict], str | None]]:
+    """Yield ``(items, next_sync_token)`` pages of the meeting room calendar.
+
+    Without ``sync_token`` every event instance is listed (a full sync);
+    with it, only the events changed since the token was issued, including
+    cancelled ones (``status == "cancelled"``). ``next_sync_token`` is only
+    set on the last page. Unlike :func:`list_upcoming_events` errors are
+    raised; an expired token raises :class:`SyncTokenExpired`.
+    """
+    service = _build_service()
+    params: dict[str, object] = {
+        "calendarId": MEETING_ROOM_EMAIL,
+        "singleEvents": True,
+        "maxResults": page_size,
+    }
+    if sync_token:
+        params["syncToken"] = sync_token
+        params["showDeleted"] = True
+
+    page_token: str | None = None
+    while True:
+        if page_token:
+            params["pageToken"] = page_token
+        try:
+            response = service.events().list(**params).execute()
+        except errors.HttpError as exc:
+            if getattr(getattr(exc, "resp", None), "status", None) == 410:
+                raise SyncTokenExpired("Calendar sync token expired") from exc
+            raise
+        page_token = response.get("nextPageToken")
+        yield response.get("items", []), (None if page_token else response.get("nextSyncToken"))
+        if not page_token:
+            return
+
+
 def _send_updates_flag(notify_attendees: bool | None) -> str:
     """Translate a boolean into the Google Calendar ``sendUpdates`` flag."""
 
     return "all" if notify_attendees else "none"
 
 
+def slot_event_id(seed: str, start: datetime) -> str:
+    """Deterministic event id (base32hex, as the Calendar API requires) for one slot."""
+    digest = hashlib.sha1(f"{seed}:{start.isoformat()}".encode()).digest()
+    return base64.b32hexencode(digest).decode().rstrip("=").lower()
+
+
+def _event_body(
+    summary: str,
+    start: datetime,
+    end: datetime,
+    description: str = "",
+    attendees: list[str] | None = None,
+    *,
+    with_meet: bool = False,
+    event_id: str | None = None,
+) -> dict:
+    """Event resource for ``events().insert``.
+
+    With ``event_id`` the insert is idempotent: sending it again answers
+    ``409`` instead of creating a second event.
+    """
+    tz_name = get_calendar_timezone().key
+    event = {
+        "summary": summary,
+        "start": {"dateTime": start.isoformat(), "timeZone": tz_name},
+        "end": {"dateTime": end.isoformat(), "timeZone": tz_name},
+    }
+    if event_id:
+        event["id"] = event_id
+    if with_meet:
+        event["conferenceData"] = {
+            "createRequest": {
+                "requestId": event_id or uuid4().hex,
+                "conferenceSolutionKey": {"type": "hangoutsMeet"},
+            }
+        }
+    if description:
+        event["description"] = description
+    if attendees:
+        event["attendees"] = [{"email": email} for email in attendees]
+    return event
+
+
 def create_meet_event(
     summary: str,
     start: datetime,
@@ -173,22 +299,7 @@ def create_meet_event(
     """Create a calendar event with a Google Meet link."""
     try:
         service = _build_service()
-        tz_name = get_calendar_timezone().key
-        event = {
-            "summary": summary,
-            "start": {"dateTime": start.isoformat(), "timeZone": tz_name},
-            "end": {"dateTime": end.isoformat(), "timeZone": tz_name},
-            "conferenceData": {
-                "createRequest": {
-                    "requestId": uuid4().hex,
-                    "conferenceSolutionKey": {"type": "hangoutsMeet"},
-                }
-            },
-        }
-        if description:
-            event["description"] = description
-        if attendees:
-            event["attendees"] = [{"email": email} for email in attendees]
+        event = _event_body(summary, start, end, description, attendees, with_meet=True)
         created_event = (
             service.events()
             .insert(
@@ -203,7 +314,7 @@ def create_meet_event(
     except (socket.timeout, socket.error) as e:
         print(f"Google Calendar API timeout on create_meet_event: {e}")
         raise RuntimeError("Timeout ao criar evento no Google Calendar. Tente novamente.")
-    except HttpError as e:
+    except errors.HttpError as e:
         print(f"Google Calendar API error on create_meet_event: {e}")
         raise RuntimeError(f"Erro ao criar evento no Google Calendar: {e}")
     except Exception as e:
@@ -222,16 +333,7 @@ def create_event(
     """Create a calendar event without a Google Meet link."""
     try:
         service = _build_service()
-        tz_name = get_calendar_timezone().key
-        event = {
-            "summary": summary,
-            "start": {"dateTime": start.isoformat(), "timeZone": tz_name},
-            "end": {"dateTime": end.isoformat(), "timeZone": tz_name},
-        }
-        if description:
-            event["description"] = description
-        if attendees:
-            event["attendees"] = [{"email": email} for email in attendees]
+        event = _event_body(summary, start, end, description, attendees)
         created_event = (
             service.events()
             .insert(
@@ -245,7 +347,7 @@ def create_event(
     except (socket.timeout, socket.error) as e:
         print(f"Google Calendar API timeout on create_event: {e}")
         raise RuntimeError("Timeout ao criar evento no Google Calendar. Tente novamente.")
-    except HttpError as e:
+    except errors.HttpError as e:
         print(f"Google Calendar API error on create_event: {e}")
         raise RuntimeError(f"Erro ao criar evento no Google Calendar: {e}")
     except Exception as e:
@@ -253,6 +355,110 @@ def create_event(
         raise
 
 
+def create_events_batch(
+    slots: Sequence[tuple[datetime, datetime]],
+    summary: str,
+    description: str = "",
+    attendees: list[str] | None = None,
+    *,
+    with_meet: bool = False,
+    notify_attendees: bool | None = None,
+    max_attempts: int = 3,
+    id_seed: str | None = None,
+) -> list[dict | Exception]:
+    """Create one event per ``(start, end)`` slot through batch requests.
+
+    Up to ``BATCH_MAX_REQUESTS`` inserts share one HTTP round trip. Items
+    rejected with a rate-limit or server error (``BATCH_RETRY_STATUSES``) are
+    sent again in a later batch, with backoff. The result is aligned with
+    ``slots``: the created event, or the exception of an item that failed
+    for good.
+
+    Every slot carries an event id (``slot_event_id`` of ``id_seed``, or a
+    random seed), so re-sending a batch Google already committed answers
+    ``409`` and the existing event is fetched instead of duplicated.
+    """
+    seed = id_seed or uuid4().hex
+    event_ids = [slot_event_id(seed, start) for start, _end in slots]
+    service = _build_service()
+    insert_kwargs: dict[str, object] = {
+        "calendarId": MEETING_ROOM_EMAIL,
+        "sendUpdates": _send_updates_flag(notify_attendees),
+    }
+    if with_meet:
+        insert_kwargs["conferenceDataVersion"] = 1
+
+    results: list[dict | Exception | None] = [None] * len(slots)
+    pending = list(range(len(slots)))
+    for attempt in range(max_attempts):
+        retry: list[int] = []
+        duplicates: list[int] = []
+        last_attempt = attempt == max_attempts - 1
+
+        def on_response(request_id, response, exception):
+            index = int(request_id)
+            if exception is None:
+                results[index] = response
+                return
+            status = getattr(getattr(exception, "resp", None), "status", None)
+            results[index] = exception
+            if status == 409:
+                # Already created by an earlier round trip whose answer was lost.
+                duplicates.append(index)
+            elif not last_attempt and status in BATCH_RETRY_STATUSES:
+                retry.append(index)
+
+        def on_existing(request_id, response, exception):
+            index = int(request_id)
+            if exception is None and response.get("status") != "cancelled":
+                results[index] = response
+                return
+            status = getattr(getattr(exception, "resp", None), "status", None)
+            if exception is not None:
+                results[index] = exception
+            if not last_attempt and status in BATCH_RETRY_STATUSES:
+                retry.append(index)
+
+        def execute(batch, indexes, action):
+            try:
+                batch.execute()
+            except Exception as exc:
+                # The whole round trip failed (timeout, 5xx on the batch itself).
+                print(f"Google Calendar batch {action} failed: {exc}")
+                for index in indexes:
+                    if results[index] is None or isinstance(results[index], Exception):
+                        results[index] = exc
+                        if not last_attempt:
+                            retry.append(index)
+
+        for offset in range(0, len(pending), BATCH_MAX_REQUESTS):
+            chunk = pending[offset:offset + BATCH_MAX_REQUESTS]
+            batch = _new_batch(service, callback=on_response)
+            for index in chunk:
+                start, end = slots[index]
+                body = _event_body(
+                    summary, start, end, description, attendees,
+                    with_meet=with_meet, event_id=event_ids[index],
+                )
+                batch.add(service.events().insert(body=body, **insert_kwargs), request_id=str(index))
+            execute(batch, chunk, "insert")
+
+        for offset in range(0, len(duplicates), BATCH_MAX_REQUESTS):
+            chunk = duplicates[offset:offset + BATCH_MAX_REQUESTS]
+            batch = _new_batch(service, callback=on_existing)
+            for index in chunk:
+                batch.add(
+                    service.events().get(calendarId=MEETING_ROOM_EMAIL, eventId=event_ids[index]),
+                    request_id=str(index),
+                )
+            execute(batch, chunk, "get")
+        if not retry:
+            break
+        pending = sorted(set(retry))
+        time.sleep(2 ** attempt)
+    return results
+
+
 def update_event(
     event_id: str,
     summary: str,
@@ -282,7 +488,7 @@ def update_event(
                 eventId=event_id
             ).execute()
             print(f"Successfully got event: ID={event_id}")
-        except HttpError as e:
+        except errors.HttpError as e:
             if e.resp.status == 404:
                 print(f"Event not found in Calendar: ID={event_id}")
                 raise RuntimeError(f"Evento não encontrado no Google Calendar (ID: {event_id})")
@@ -338,14 +544,14 @@ def update_event(
             )
             print(f"Successfully updated event: ID={event_id}")
             return updated_event
-        except HttpError as e:
+        except errors.HttpError as e:
             error_reason = e._get_reason() if hasattr(e, '_get_reason') else str(e)
             print(f"Failed to update event in Calendar: ID={event_id}, error={error_reason}")
             raise RuntimeError(f"Falha ao atualizar evento no Google Calendar: {error_reason}")
     except (socket.timeout, socket.error) as e:
         print(f"Google Calendar API timeout on update_event: {e}")
         raise RuntimeError("Timeout ao atualizar evento no Google Calendar. Tente novamente.")
-    except HttpError as e:
+    except errors.HttpError as e:
         print(f"Google Calendar API error on update_event: {e}")
         raise RuntimeError(f"Erro ao atualizar evento no Google Calendar: {e}")
     except Exception as e:
@@ -358,11 +564,27 @@ def delete_event(event_id: str):
     service = _build_service()
     try:
         service.events().delete(calendarId=MEETING_ROOM_EMAIL, eventId=event_id).execute()
-    except HttpError:
+    except errors.HttpError:
         # Ignore errors when the event has already been removed.
         pass
 
 
+def delete_events_batch(event_ids: Sequence[str]) -> None:
+    """Delete many meeting room events, ``BATCH_MAX_REQUESTS`` per round trip.
+
+    Best effort, like ``delete_event``: per-item errors are ignored.
+    """
+    service = _build_service()
+    for offset in range(0, len(event_ids), BATCH_MAX_REQUESTS):
+        batch = _new_batch(service, callback=lambda request_id, response, exception: None)
+        for event_id in event_ids[offset:offset + BATCH_MAX_REQUESTS]:
+            batch.add(service.events().delete(calendarId=MEETING_ROOM_EMAIL, eventId=event_id))
+        try:
+            batch.execute()
+        except Exception as exc:
+            print(f"Google Calendar batch delete failed: {exc}")
+
+
 def _extract_meeting_code(meet_link: str | None) -> str | None:
     """Return the meeting code embedded in a Google Meet URL."""
 
@@ -456,7 +678,7 @@ def update_meet_space_preferences(
         )
         print(f"Successfully applied Meet settings to {space_name}")
         return response
-    except HttpError as e:
+    except errors.HttpError as e:
         error_details = {
             "status_code": e.resp.status if hasattr(e, 'resp') else None,
             "reason": e.error_details if hasattr(e, 'error_details') else str(e),
@@ -0,0 +1,328 @@
+"""
+Cache persistente (SQLite) de respostas HTTP para clients de APIs externas.
+
+As respostas ficam em disco, chaveadas por metodo, URL, parametros e um hash
+do token, e sobrevivem entre execucoes e entre processos:
+
+* Com ``ETag`` ou ``Last-Modified`` a entrada e revalidada a cada uso
+  (``If-None-Match`` / ``If-Modified-Since``); um ``304`` devolve o corpo
+  guardado sem transferi-lo de novo. ``Cache-Control: max-age`` dispensa a
+  revalidacao durante o prazo.
+* Sem validadores, a entrada vale pelo TTL configurado para o endpoint
+  (primeiro segmento do caminho, ex.: ``deliveries``) e depois e buscada de
+  novo.
+* ``Cache-Control: no-store`` nunca e gravado.
+
+Uso:
+    from app.services.http_cache import HttpCacheStats, get_http_cache
+
+    cache = get_http_cache("/srv/app/instance/http_cache.sqlite3", ttls={"deliveries": 900})
+    stats = HttpCacheStats()
+    resp = cache.get(session, url, params=params, headers=headers, stats=stats)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+from urllib.parse import urlparse
+
+from app.utils.lazy_import import lazy_import
+
+requests = lazy_import("requests")
+
+logger = logging.getLogger(__name__)
+
+# Entradas sem uso ha mais que isso sao removidas ao abrir o cache.
+PRUNE_AFTER_SECONDS = 7 * 24 * 3600
+# Cabecalhos da resposta guardados junto com o corpo.
+_KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control", "Date")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS http_responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    stored_at REAL NOT NULL,
+    fresh_until REAL NOT NULL,
+    used_at REAL NOT NULL
+)
+"""
+
+
+# =============================================================================
+# ESTATISTICAS
+# =============================================================================
+
+@dataclass
+class HttpCacheStats:
+    """Counters of one consumer (e.g. one sync run); thread-safe."""
+
+    hits: int = 0
+    revalidated: int = 0
+    misses: int = 0
+    stored: int = 0
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.revalidated + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of requests answered without downloading the body again."""
+        return (self.hits + self.revalidated) / self.lookups if self.lookups else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "misses": self.misses,
+            "stored": self.stored,
+            "hit_rate": round(self.hit_rate, 3),
+        }
+
+
+# =============================================================================
+# CACHE
+# =============================================================================
+
+@dataclass
+class _Entry:
+    status: int
+    headers: dict[str, str]
+    body: bytes
+    etag: str | None
+    last_modified: str | None
+    stored_at: float
+    fresh_until: float
+
+    def to_response(self, url: str, *, cache_age: float = 0.0) -> requests.Response:
+        resp = requests.Response()
+        resp.cache_age = cache_age
+        resp.status_code = self.status
+        resp.headers = requests.structures.CaseInsensitiveDict(self.headers)
+        resp._content = self.body
+        resp.url = url
+        resp.encoding = "utf-8"
+        return resp
+
+
+def _max_age(cache_control: str) -> int | None:
+    match = re.search(r"max-age=(\d+)", cache_control or "")
+    return int(match.group(1)) if match else None
+
+
+class SQLiteHttpCache:
+    """On-disk response cache; one SQLite connection per thread."""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        ttls: dict[str, int] | None = None,
+        default_ttl: int = 0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = path
+        self.ttls = dict(ttls or {})
+        self.default_ttl = default_ttl
+        self._clock = clock
+        self._local = threading.local()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        conn.execute(_SCHEMA)
+        conn.execute(
+            "DELETE FROM http_responses WHERE used_at < ?",
+            (self._clock() - PRUNE_AFTER_SECONDS,),
+        )
+        conn.commit()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # -------------------------------------------------------------------------
+    # Chave e TTL
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def key_for(method: str, url: str, params: dict[str, Any] | None, headers: dict[str, str]) -> str:
+        """Method + URL + sorted params + token hash (responses are per account)."""
+        parts = {
+            "method": method.upper(),
+            "url": url,
+            "params": sorted((str(k), str(v)) for k, v in (params or {}).items()),
+            "auth": hashlib.sha256(headers.get("Authorization", "").encode()).hexdigest(),
+        }
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode()).hexdigest()
+
+    def ttl_for(self, url: str) -> int:
+        segments = [s for s in urlparse(url).path.split("/") if s]
+        endpoint = segments[0] if segments else ""
+        return int(self.ttls.get(endpoint, self.default_ttl))
+
+    # -------------------------------------------------------------------------
+    # Leitura e escrita
+    # -------------------------------------------------------------------------
+
+    def _load(self, key: str) -> _Entry | None:
+        row = self._conn().execute(
+            "SELECT status, headers, body, etag, last_modified, stored_at, fresh_until "
+            "FROM http_responses WHERE key = ?",
+            (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        return _Entry(row[0], json.loads(row[1]), row[2], row[3], row[4], row[5], row[6])
+
+    def _store(self, key: str, url: str, resp: requests.Response) -> bool:
+        cache_control = resp.headers.get("Cache-Control", "")
+        if "no-store" in cache_control:
+            return False
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        max_age = _max_age(cache_control)
+        if max_age is not None:
+            ttl = max_age
+        elif etag or last_modified:
+            ttl = 0  # revalida sempre
+        else:
+            ttl = self.ttl_for(url)
+            if ttl <= 0:
+                return False
+        now = self._clock()
+        headers = {name: resp.headers[name] for name in _KEPT_HEADERS if name in resp.headers}
+        conn = self._conn()
+        conn.execute(
+            "INSERT OR REPLACE INTO http_responses "
+            "(key, url, status, headers, body, etag, last_modified, stored_at, fresh_until, used_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (key, url, resp.status_code, json.dumps(headers), resp.content, etag,
+             last_modified, now, now + ttl, now),
+        )
+        conn.commit()
+        return True
+
+    def _touch(self, key: str, resp: requests.Response) -> None:
+        """Extend an entry after a 304 (its ``max-age`` may have been renewed)."""
+        now = self._clock()
+        max_age = _max_age(resp.headers.get("Cache-Control", "")) or 0
+        conn = self._conn()
+        conn.execute(
+            "UPDATE http_responses SET fresh_until = ?, used_at = ? WHERE key = ?",
+            (now + max_age, now, key),
+        )
+        conn.commit()
+
+    def get(
+        self,
+        session: requests.Session,
+        url: str,
+        *,
+        params: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        stats: HttpCacheStats | None = None,
+        send: Callable[..., requests.Response] | None = None,
+        **kwargs: Any,
+    ) -> requests.Response:
+        """GET through the cache.
+
+        ``send`` replaces ``session.get`` for the network round trip, so the
+        caller can keep its own rate limiting and retry handling around it.
+        Only ``200`` responses are cached; anything else is returned as is.
+        A response served from a fresh entry without asking the server
+        carries ``cache_age`` (seconds since it was stored); network and
+        revalidated responses carry ``0``.
+        """
+        headers = dict(headers or {})
+        key = self.key_for("GET", url, params, headers)
+        try:
+            entry = self._load(key)
+        except sqlite3.Error:
+            logger.warning("Cache HTTP indisponivel; consultando a API direto", exc_info=True)
+            entry = None
+
+        if entry is not None and entry.fresh_until > self._clock():
+            if stats:
+                stats.record("hits")
+            return entry.to_response(url, cache_age=max(self._clock() - entry.stored_at, 0.0))
+
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+
+        send = send or session.get
+        resp = send(url, params=params, headers=headers, **kwargs)
+
+        if resp.status_code == 304 and entry is not None:
+            if stats:
+                stats.record("revalidated")
+            try:
+                self._touch(key, resp)
+            except sqlite3.Error:
+                logger.warning("Falha ao atualizar cache HTTP", exc_info=True)
+            return entry.to_response(url)
+
+        if stats:
+            stats.record("misses")
+        if resp.status_code == 200:
+            try:
+                if self._store(key, url, resp) and stats:
+                    stats.record("stored")
+            except sqlite3.Error:
+                logger.warning("Falha ao gravar cache HTTP", exc_info=True)
+        return resp
+
+
+_caches: dict[str, SQLiteHttpCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_http_cache(path: str, *, ttls: dict[str, int] | None = None, default_ttl: int = 0) -> SQLiteHttpCache:
+    """Process-wide cache instance per file; TTLs are updated on every call."""
+    with _caches_lock:
+        cache = _caches.get(path)
+        if cache is None:
+            cache = _caches[path] = SQLiteHttpCache(path, ttls=ttls, default_ttl=default_ttl)
+        else:
+            cache.ttls = dict(ttls or {})
+            cache.default_ttl = default_ttl
+        return cache
+
+
+def parse_ttls(value: str | None) -> dict[str, int]:
+    """Parse ``"deliveries=900,companies=3600"`` into ``{"deliveries": 900, ...}``."""
+    ttls: dict[str, int] = {}
+    for item in (value or "").split(","):
+        name, _, seconds = item.partition("=")
+        if name.strip() and seconds.strip().isdigit():
+            ttls[name.strip()] = int(seconds.strip())
+    return ttls
@@ -0,0 +1,706 @@
+"""
+Armazenamento dos anexos do inventario e migracao dos anexos legados.
+
+Os anexos ficam em disco (``static/uploads/inventario/<empresa>/<tipo>``) e
+cada um tem uma linha em ``tbl_inventario_files`` (``InventarioFile``):
+incluir, remover ou mover um anexo e uma escrita de uma linha, e as
+contagens saem de um ``GROUP BY``.
+
+Antes disso os metadados ficavam nas colunas JSON do ``Inventario``, e as
+entradas mais antigas ainda trazem o arquivo inteiro em base64
+(``file_data``). Durante a transicao a leitura e dupla: a lista de um tipo
+e formada pelas entradas JSON restantes seguidas das linhas da tabela
+(``INVENTARIO_FILES_JSON_FALLBACK`` desliga a parte JSON). O backfill move
+as entradas para a tabela, uma linha do inventario por transacao, de modo
+que pode ser interrompido e retomado a qualquer momento.
+
+Uso:
+    from app.services.inventario_files import (
+        add_inventario_file,
+        backfill_inventario_files,
+        list_inventario_files,
+    )
+
+    files = list_inventario_files(empresa_id, "cfop")
+    result = backfill_inventario_files(batch_size=20)
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import hashlib
+import json
+import logging
+import os
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from mimetypes import guess_type
+from typing import Any, Callable
+
+import sqlalchemy as sa
+from flask import current_app
+from werkzeug.utils import secure_filename
+
+from sqlalchemy.orm.attributes import flag_modified
+
+from app import db
+from app.constants import INVENTARIO_UPLOAD_SUBDIR
+from app.models.tables import Inventario, InventarioFile, sao_paulo_now_naive
+
+logger = logging.getLogger(__name__)
+
+# Tipo de anexo (rota / subdiretorio em disco) -> coluna JSON do Inventario.
+INVENTARIO_FILE_COLUMNS = {
+    "cfop": "cfop_files",
+    "cfop-consolidado": "cfop_consolidado_files",
+    "cliente": "cliente_files",
+}
+INVENTARIO_FILE_CATEGORIES = tuple(INVENTARIO_FILE_COLUMNS)
+
+# Multiplo de 4: cada pedaco de base64 decodifica sozinho.
+_DECODE_CHUNK_CHARS = 4 * 256 * 1024
+
+_COPY_CHUNK_BYTES = 1024 * 1024
+
+_LEGACY_MARKER = '%"file_data"%'
+# Qualquer lista JSON com ao menos um objeto ainda precisa de backfill.
+_JSON_ENTRY_MARKER = "%{%"
+
+
+class LegacyFileError(ValueError):
+    """A legacy entry whose ``file_data`` cannot be decoded."""
+
+
+@dataclass
+class InventarioFileMigrationResult:
+    rows_scanned: int = 0
+    rows_migrated: int = 0
+    files_migrated: int = 0
+    bytes_written: int = 0
+    remaining_rows: int = 0
+    last_id: int = 0
+    errors: list[dict[str, Any]] = field(default_factory=list)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "rows_scanned": self.rows_scanned,
+            "rows_migrated": self.rows_migrated,
+            "files_migrated": self.files_migrated,
+            "bytes_written": self.bytes_written,
+            "remaining_rows": self.remaining_rows,
+            "last_id": self.last_id,
+            "errors": self.errors,
+        }
+
+
+# =============================================================================
+# LAYOUT EM DISCO
+# =============================================================================
+
+def inventario_upload_dir(empresa_id: int, file_type: str) -> tuple[str, str]:
+    """Return ``(relative_dir, absolute_dir)`` for an attachment type, creating it."""
+    relative_dir = os.path.join(INVENTARIO_UPLOAD_SUBDIR, str(empresa_id), file_type).replace("\\", "/")
+    absolute_dir = os.path.join(current_app.root_path, "static", relative_dir)
+    os.makedirs(absolute_dir, exist_ok=True)
+    return relative_dir, absolute_dir
+
+
+def inventario_file_absolute_path(relative_path: str) -> str:
+    return os.path.join(current_app.root_path, "static", relative_path)
+
+
+def is_legacy_entry(entry: Any) -> bool:
+    return isinstance(entry, dict) and bool(entry.get("file_data")) and entry.get("storage") != "disk"
+
+
+def _write_base64_blob(encoded: str, absolute_dir: str, extension: str) -> tuple[str, int]:
+    """Decode ``encoded`` to disk in chunks; return ``(file_name, size)``.
+
+    The file is named after the SHA-256 of its content, so re-running an
+    interrupted migration overwrites the same file instead of leaving copies.
+    """
+    if encoded.startswith("data:") and "," in encoded:
+        encoded = encoded.split(",", 1)[1]
+    encoded = "".join(encoded.split())
+
+    digest = hashlib.sha256()
+    size = 0
+    temp_path = os.path.join(absolute_dir, f".{uuid.uuid4().hex}.part")
+    try:
+        with open(temp_path, "wb") as handle:
+            for start in range(0, len(encoded), _DECODE_CHUNK_CHARS):
+                try:
+                    chunk = base64.b64decode(encoded[start:start + _DECODE_CHUNK_CHARS])
+                except (binascii.Error, ValueError) as exc:
+                    raise LegacyFileError(f"base64 invalido: {exc}") from exc
+                digest.update(chunk)
+                size += len(chunk)
+                handle.write(chunk)
+        file_name = f"legacy-{digest.hexdigest()[:32]}{extension}"
+        os.replace(temp_path, os.path.join(absolute_dir, file_name))
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return file_name, size
+
+
+def _migrate_entry(entry: dict, empresa_id: int, file_type: str) -> tuple[dict, int]:
+    """Write one legacy entry to disk and return its metadata-only version."""
+    original_name = entry.get("filename") or "arquivo"
+    extension = os.path.splitext(secure_filename(original_name))[1].lower()
+    relative_dir, absolute_dir = inventario_upload_dir(empresa_id, file_type)
+    file_name, size = _write_base64_blob(entry["file_data"], absolute_dir, extension)
+
+    migrated = {key: value for key, value in entry.items() if key != "file_data"}
+    migrated.update(
+        {
+            "filename": original_name,
+            "path": f"{relative_dir}/{file_name}",
+            "mime_type": entry.get("mime_type") or guess_type(original_name)[0] or "application/octet-stream",
+            "storage": "disk",
+            "size": size,
+            "migrated_at": datetime.now().isoformat(),
+        }
+    )
+    return migrated, size
+
+
+# =============================================================================
+# MIGRACAO
+# =============================================================================
+
+def _legacy_filter():
+    table = Inventario.__table__
+    return sa.or_(
+        *[
+            sa.cast(table.c[column], sa.Text).like(_LEGACY_MARKER)
+            for column in INVENTARIO_FILE_COLUMNS.values()
+        ]
+    )
+
+
+def count_legacy_inventario_rows() -> int:
+    """Rows that still carry inline base64 attachments (no blob is transferred)."""
+    table = Inventario.__table__
+    return db.session.execute(
+        sa.select(sa.func.count()).select_from(table).where(_legacy_filter())
+    ).scalar_one()
+
+
+def migrate_inventario_row(inventario_id: int) -> tuple[int, int, list[str]]:
+    """Move the legacy attachments of one row to disk and commit.
+
+    The row is locked (``FOR UPDATE``) while its JSON is rewritten, so an
+    upload appending to the same list waits instead of being overwritten.
+    ``updated_at`` is preserved. An undecodable entry is left in place and
+    reported in ``failures``. Returns ``(files, bytes, failures)``.
+    """
+    table = Inventario.__table__
+    columns = list(INVENTARIO_FILE_COLUMNS.values())
+    files = written = 0
+    failures: list[str] = []
+    try:
+        row = db.session.execute(
+            sa.select(table.c.empresa_id, *[table.c[column] for column in columns])
+            .where(table.c.id == inventario_id)
+            .with_for_update()
+        ).first()
+        if row is None:
+            db.session.rollback()
+            return 0, 0, []
+
+        values: dict[str, Any] = {}
+        for file_type, column in INVENTARIO_FILE_COLUMNS.items():
+            entries = getattr(row, column)
+            if not isinstance(entries, list) or not any(is_legacy_entry(entry) for entry in entries):
+                continue
+            rewritten = []
+            for index, entry in enumerate(entries):
+                if is_legacy_entry(entry):
+                    try:
+                        entry, size = _migrate_entry(entry, row.empresa_id, file_type)
+                    except LegacyFileError as exc:
+                        # Mantem a entrada como esta; as demais seguem migradas.
+                        failures.append(f"{file_type}[{index}]: {exc}")
+                    else:
+                        files += 1
+                        written += size
+                rewritten.append(entry)
+            values[column] = rewritten
+
+        if values:
+            db.session.execute(
+                table.update()
+                .where(table.c.id == inventario_id)
+                .values(**values, updated_at=table.c.updated_at)
+            )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    # Instancias ja carregadas nesta sessao ainda apontam para o JSON antigo.
+    for instance in list(db.session.identity_map.values()):
+        if isinstance(instance, Inventario) and instance.id == inventario_id:
+            db.session.expire(instance)
+    return files, written, failures
+
+
+def _run_in_batches(
+    where,
+    handle_row: Callable[[int], tuple[int, int, list[str]]],
+    batch_size: int,
+    limit: int | None,
+    after_id: int,
+    progress: Callable[[InventarioFileMigrationResult], None] | None,
+) -> InventarioFileMigrationResult:
+    """Select ids matching ``where`` ``batch_size`` at a time and handle each row."""
+    result = InventarioFileMigrationResult(last_id=after_id)
+    table = Inventario.__table__
+
+    while limit is None or result.rows_scanned < limit:
+        size = batch_size if limit is None else min(batch_size, limit - result.rows_scanned)
+        ids = db.session.execute(
+            sa.select(table.c.id)
+            .where(where, table.c.id > result.last_id)
+            .order_by(table.c.id)
+            .limit(size)
+        ).scalars().all()
+        db.session.rollback()
+        if not ids:
+            break
+
+        for inventario_id in ids:
+            result.rows_scanned += 1
+            result.last_id = inventario_id
+            try:
+                files, written, failures = handle_row(inventario_id)
+            except (OSError, sa.exc.SQLAlchemyError) as exc:
+                failures, files, written = [str(exc)], 0, 0
+            for failure in failures:
+                logger.warning("Falha ao migrar anexo do inventario %s: %s", inventario_id, failure)
+                result.errors.append({"inventario_id": inventario_id, "error": failure})
+            if files:
+                result.rows_migrated += 1
+                result.files_migrated += files
+                result.bytes_written += written
+
+        if progress is not None:
+            progress(result)
+
+    return result
+
+
+def migrate_legacy_inventario_files(
+    batch_size: int = 20,
+    limit: int | None = None,
+    after_id: int = 0,
+    progress: Callable[[InventarioFileMigrationResult], None] | None = None,
+) -> InventarioFileMigrationResult:
+    """Migrate every row with legacy attachments, ``batch_size`` ids at a time.
+
+    Only ids are selected to find the rows, so no blob is transferred until
+    the row is migrated. Each row commits on its own: stopping midway keeps
+    everything already done, and the next run picks up what is left (pass
+    ``after_id`` to skip rows that failed). ``progress`` is called after
+    each batch.
+    """
+    result = _run_in_batches(
+        _legacy_filter(), migrate_inventario_row, batch_size, limit, after_id, progress
+    )
+    result.remaining_rows = count_legacy_inventario_rows()
+    db.session.rollback()
+    logger.info("Migracao de anexos legados do inventario concluida", extra=result.as_dict())
+    return result
+
+
+# =============================================================================
+# LEITURA DUPLA (JSON LEGADO + TABELA)
+# =============================================================================
+
+def json_fallback_enabled() -> bool:
+    return bool(current_app.config.get("INVENTARIO_FILES_JSON_FALLBACK", True))
+
+
+def coerce_file_entries(value: Any) -> list:
+    """Normalize a JSON column value (list, single dict or JSON text) to a list."""
+    if not value:
+        return []
+    if isinstance(value, list):
+        return value
+    if isinstance(value, dict):
+        return [value]
+    if isinstance(value, str):
+        try:
+            parsed = json.loads(value)
+        except (TypeError, ValueError):
+            return []
+        return parsed if isinstance(parsed, list) else []
+    return []
+
+
+def is_valid_json_entry(entry: Any) -> bool:
+    """An entry with a name and either inline data or a path on disk."""
+    if not isinstance(entry, dict):
+        return False
+    filename = str(entry.get("filename") or "").strip()
+    file_data = str(entry.get("file_data") or "").strip()
+    path = str(entry.get("path") or "").strip()
+    return bool(filename and (file_data or path))
+
+
+def _serialize_json_entry(entry: dict, json_index: int) -> dict:
+    item = {key: value for key, value in entry.items() if key != "file_data"}
+    item.update(
+        {
+            "source": "json",
+            "json_index": json_index,
+            "legacy": is_legacy_entry(entry),
+            "filename": entry.get("filename") or "arquivo",
+            "mime_type": entry.get("mime_type") or "application/octet-stream",
+            "storage": entry.get("storage", "database"),
+        }
+    )
+    return item
+
+
+def _serialize_row(row: InventarioFile) -> dict:
+    return {
+        "source": "table",
+        "id": row.id,
+        "legacy": False,
+        "filename": row.name,
+        "path": row.path,
+        "mime_type": row.mime_type or "application/octet-stream",
+        "size": row.size,
+        "sha256": row.sha256,
+        "uploaded_at": row.created_at.isoformat() if row.created_at else None,
+        "storage": "disk",
+    }
+
+
+def list_inventario_files_by_empresa_ids(
+    empresa_ids: list[int],
+    categories: tuple[str, ...] = INVENTARIO_FILE_CATEGORIES,
+) -> dict[int, dict[str, list[dict]]]:
+    """Attachments per empresa and category, in display order.
+
+    Legacy JSON entries come first (they are older than any table row),
+    followed by the table rows by ``created_at``. The position in each list
+    is the ``file_index`` used by the routes. Two queries regardless of the
+    number of empresas; only the JSON columns of ``categories`` are read.
+    """
+    result: dict[int, dict[str, list[dict]]] = {
+        empresa_id: {category: [] for category in categories} for empresa_id in empresa_ids
+    }
+    if not empresa_ids or not categories:
+        return result
+
+    if json_fallback_enabled():
+        table = Inventario.__table__
+        columns = [INVENTARIO_FILE_COLUMNS[category] for category in categories]
+        rows = db.session.execute(
+            sa.select(table.c.empresa_id, *[table.c[column] for column in columns])
+            .where(table.c.empresa_id.in_(empresa_ids))
+        ).all()
+        for row in rows:
+            for category, column in zip(categories, columns):
+                result[row.empresa_id][category].extend(
+                    _serialize_json_entry(entry, index)
+                    for index, entry in enumerate(coerce_file_entries(getattr(row, column)))
+                    if isinstance(entry, dict)
+                )
+
+    records = (
+        InventarioFile.query.filter(
+            InventarioFile.empresa_id.in_(empresa_ids),
+            InventarioFile.category.in_(categories),
+        )
+        .order_by(InventarioFile.created_at, InventarioFile.id)
+        .all()
+    )
+    for record in records:
+        result[record.empresa_id][record.category].append(_serialize_row(record))
+    return result
+
+
+def list_inventario_files(empresa_id: int, category: str) -> list[dict]:
+    return list_inventario_files_by_empresa_ids([empresa_id], (category,))[empresa_id][category]
+
+
+def inventario_has_files(inventario: Inventario, category: str) -> bool:
+    """Whether the empresa has at least one valid attachment of ``category``."""
+    has_rows = db.session.query(
+        sa.exists().where(
+            InventarioFile.empresa_id == inventario.empresa_id,
+            InventarioFile.category == category,
+        )
+    ).scalar()
+    if has_rows:
+        return True
+    if not json_fallback_enabled():
+        return False
+    entries = coerce_file_entries(getattr(inventario, INVENTARIO_FILE_COLUMNS[category]))
+    return any(is_valid_json_entry(entry) for entry in entries)
+
+
+def count_inventario_files_by_empresa_ids(empresa_ids: list[int]) -> dict[int, dict[str, int]]:
+    """``{empresa_id: {category: count}}`` from one ``GROUP BY`` on the table."""
+    counts: dict[int, dict[str, int]] = {}
+    if not empresa_ids:
+        return counts
+    rows = (
+        db.session.query(
+            InventarioFile.empresa_id,
+            InventarioFile.category,
+            sa.func.count(InventarioFile.id),
+        )
+        .filter(InventarioFile.empresa_id.in_(empresa_ids))
+        .group_by(InventarioFile.empresa_id, InventarioFile.category)
+        .all()
+    )
+    for empresa_id, category, total in rows:
+        counts.setdefault(int(empresa_id), {})[category] = int(total)
+    return counts
+
+
+# =============================================================================
+# ESCRITA (UMA LINHA POR OPERACAO)
+# =============================================================================
+
+def add_inventario_file(
+    empresa_id: int,
+    category: str,
+    uploaded_file,
+    uploaded_by: int | None = None,
+) -> InventarioFile:
+    """Stream an upload to disk, hashing it on the way, and add its row.
+
+    The caller commits; the row is already in the session, so queries made
+    before the commit (status rules, counts) see it.
+    """
+    original_name = secure_filename(uploaded_file.filename or "arquivo.pdf")
+    extension = os.path.splitext(original_name)[1].lower()
+    relative_dir, absolute_dir = inventario_upload_dir(empresa_id, category)
+    unique_name = f"{uuid.uuid4().hex}{extension}"
+
+    digest = hashlib.sha256()
+    size = 0
+    with open(os.path.join(absolute_dir, unique_name), "wb") as handle:
+        while True:
+            chunk = uploaded_file.stream.read(_COPY_CHUNK_BYTES)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+            handle.write(chunk)
+
+    record = InventarioFile(
+        empresa_id=empresa_id,
+        category=category,
+        name=original_name,
+        mime_type=uploaded_file.mimetype or guess_type(original_name)[0] or "application/octet-stream",
+        size=size,
+        sha256=digest.hexdigest(),
+        path=f"{relative_dir}/{unique_name}",
+        uploaded_by=uploaded_by,
+        created_at=sao_paulo_now_naive(),
+    )
+    db.session.add(record)
+    return record
+
+
+def delete_inventario_file(inventario: Inventario, category: str, file_index: int) -> bool:
+    """Remove the attachment at ``file_index``; ``False`` if there is none.
+
+    A table row is removed with a single ``DELETE``; a legacy JSON entry is
+    dropped from its list on ``inventario``. The caller commits.
+    """
+    entries = list_inventario_files(inventario.empresa_id, category)
+    if file_index < 0 or file_index >= len(entries):
+        return False
+    entry = entries[file_index]
+    if entry["source"] == "table":
+        table = InventarioFile.__table__
+        db.session.execute(table.delete().where(table.c.id == entry["id"]))
+        return True
+
+    column = INVENTARIO_FILE_COLUMNS[category]
+    remaining = list(coerce_file_entries(getattr(inventario, column)))
+    del remaining[entry["json_index"]]
+    setattr(inventario, column, remaining)
+    flag_modified(inventario, column)
+    return True
+
+
+def move_inventario_files(inventario: Inventario, source: str, target: str) -> int:
+    """Move every attachment of ``source`` to ``target``; returns how many.
+
+    Table rows move with a single ``UPDATE`` of ``category``; legacy JSON
+    entries are appended to the target JSON list. The caller commits.
+    """
+    table = InventarioFile.__table__
+    moved = db.session.execute(
+        table.update()
+        .where(table.c.empresa_id == inventario.empresa_id, table.c.category == source)
+        .values(category=target)
+    ).rowcount or 0
+
+    if json_fallback_enabled():
+        source_column = INVENTARIO_FILE_COLUMNS[source]
+        target_column = INVENTARIO_FILE_COLUMNS[target]
+        source_entries = coerce_file_entries(getattr(inventario, source_column))
+        if source_entries:
+            setattr(
+                inventario,
+                target_column,
+                coerce_file_entries(getattr(inventario, target_column)) + source_entries,
+            )
+            setattr(inventario, source_column, [])
+            flag_modified(inventario, target_column)
+            flag_modified(inventario, source_column)
+            moved += len(source_entries)
+    return moved
+
+
+# =============================================================================
+# BACKFILL JSON -> TABELA
+# =============================================================================
+
+def _json_filter():
+    table = Inventario.__table__
+    return sa.or_(
+        *[
+            sa.cast(table.c[column], sa.Text).like(_JSON_ENTRY_MARKER)
+            for column in INVENTARIO_FILE_COLUMNS.values()
+        ]
+    )
+
+
+def count_json_inventario_rows() -> int:
+    """Rows whose JSON columns still hold attachment entries."""
+    table = Inventario.__table__
+    return db.session.execute(
+        sa.select(sa.func.count()).select_from(table).where(_json_filter())
+    ).scalar_one()
+
+
+def _hash_file(absolute_path: str) -> tuple[str, int]:
+    digest = hashlib.sha256()
+    size = 0
+    with open(absolute_path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(_COPY_CHUNK_BYTES), b""):
+            digest.update(chunk)
+            size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def _parse_uploaded_at(value: Any) -> datetime | None:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    return parsed.replace(tzinfo=None)
+
+
+def _row_values_from_entry(empresa_id: int, category: str, entry: dict) -> dict:
+    name = str(entry.get("filename") or "arquivo")[:255]
+    sha256 = None
+    size = entry.get("size")
+    absolute_path = inventario_file_absolute_path(entry["path"])
+    if os.path.exists(absolute_path):
+        sha256, size = _hash_file(absolute_path)
+    return {
+        "empresa_id": empresa_id,
+        "category": category,
+        "name": name,
+        "mime_type": entry.get("mime_type") or guess_type(name)[0] or "application/octet-stream",
+        "size": size,
+        "sha256": sha256,
+        "path": entry["path"],
+        "uploaded_by": None,
+        "created_at": _parse_uploaded_at(entry.get("uploaded_at")) or sao_paulo_now_naive(),
+    }
+
+
+def backfill_inventario_row(inventario_id: int) -> tuple[int, int, list[str]]:
+    """Move the JSON entries of one ``Inventario`` row into the table and commit.
+
+    Base64 entries are first written to disk by :func:`migrate_inventario_row`.
+    The JSON is then rewritten under ``FOR UPDATE`` keeping only what could
+    not be moved (undecodable or path-less entries), so the file index the
+    users see is unchanged. ``updated_at`` is preserved. Returns
+    ``(files, bytes, failures)``.
+    """
+    _, _, failures = migrate_inventario_row(inventario_id)
+    table = Inventario.__table__
+    columns = list(INVENTARIO_FILE_COLUMNS.values())
+    records: list[dict] = []
+    try:
+        row = db.session.execute(
+            sa.select(table.c.empresa_id, *[table.c[column] for column in columns])
+            .where(table.c.id == inventario_id)
+            .with_for_update()
+        ).first()
+        if row is None:
+            db.session.rollback()
+            return 0, 0, failures
+
+        values: dict[str, Any] = {}
+        for category, column in INVENTARIO_FILE_COLUMNS.items():
+            entries = coerce_file_entries(getattr(row, column))
+            if not any(isinstance(entry, dict) for entry in entries):
+                continue
+            kept = []
+            for index, entry in enumerate(entries):
+                if isinstance(entry, dict) and entry.get("path") and not is_legacy_entry(entry):
+                    records.append(_row_values_from_entry(row.empresa_id, category, entry))
+                    continue
+                if not is_legacy_entry(entry):
+                    # Entradas legadas com falha ja foram reportadas pela migracao.
+                    failures.append(f"{category}[{index}]: entrada sem caminho")
+                kept.append(entry)
+            values[column] = kept or sa.null()
+
+        if records:
+            db.session.execute(InventarioFile.__table__.insert(), records)
+        if values:
+            db.session.execute(
+                table.update()
+                .where(table.c.id == inventario_id)
+                .values(**values, updated_at=table.c.updated_at)
+            )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    for instance in list(db.session.identity_map.values()):
+        if isinstance(instance, Inventario) and instance.id == inventario_id:
+            db.session.expire(instance)
+    return len(records), sum(record["size"] or 0 for record in records), failures
+
+
+def backfill_inventario_files(
+    batch_size: int = 20,
+    limit: int | None = None,
+    after_id: int = 0,
+    progress: Callable[[InventarioFileMigrationResult], None] | None = None,
+) -> InventarioFileMigrationResult:
+    """Backfill every row with JSON entries; same batching as the migration.
+
+    ``bytes_written`` is the size of the files moved to the table. Once
+    ``remaining_rows`` is zero, ``INVENTARIO_FILES_JSON_FALLBACK`` can be
+    turned off.
+    """
+    result = _run_in_batches(
+        _json_filter(), backfill_inventario_row, batch_size, limit, after_id, progress
+    )
+    result.remaining_rows = count_json_inventario_rows()
+    db.session.rollback()
+    logger.info("Backfill de anexos do inventario concluido", extra=result.as_dict())
+    return result
@@ -1,25 +1,53 @@
-"""Rotinas de sincronizacao do inventario com dados externos."""
+"""Rotinas de sincronizacao do inventario com dados externos.
+
+O sync de ``encerramento_fiscal`` e incremental e retomavel:
+
+* Cada empresa guarda em ``acessorias_sync_cursors`` o instante da ultima
+  consulta bem-sucedida do periodo; a proxima pede a API so o que mudou
+  depois dele (``DtLastDH``, com uma pequena sobreposicao).
+* Cada execucao abre uma linha em ``acessorias_sync_runs``. Os cursores sao
+  gravados em lotes junto com as marcacoes; se o processo cair, a proxima
+  execucao retoma a run aberta e pula as empresas ja consultadas nela.
+* As threads dividem um unico ``TokenBucket`` (``ACESSORIAS_RATE_PER_SECOND``
+  e ``ACESSORIAS_RATE_BURST``), entao o limite vale para o sync inteiro.
+* As respostas passam pelo cache HTTP em disco (``app.services.http_cache``);
+  o resumo do sync traz a taxa de acerto.
+
+Uso:
+    from app.services.inventario_sync import sync_encerramento_fiscal
+
+    result = sync_encerramento_fiscal()           # incremental
+    result = sync_encerramento_fiscal(full=True)  # ignora os cursores
+"""
 
 from __future__ import annotations
 
 import logging
 import re
-import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
-from datetime import date, datetime
-from typing import Any, Iterable
+from datetime import date, datetime, timedelta
+from typing import Any
 
+from flask import current_app
 from sqlalchemy.orm import joinedload
 
 from app import db
-from app.models.tables import Empresa, Inventario
+from app.models.tables import (
+    AcessoriasSyncCursor,
+    AcessoriasSyncRun,
+    Empresa,
+    Inventario,
+    sao_paulo_now_naive,
+)
 from app.services.acessorias_deliveries import (
     AcessoriasDeliveriesClient,
     DeliveriesAuthError,
     DeliveriesClientError,
     EntregaMatch,
 )
+from app.services.http_cache import SQLiteHttpCache, get_http_cache, parse_ttls
+from app.utils.rate_limit import TokenBucket
 
 DEFAULT_PERIOD_START = date(2025, 12, 1)
 DEFAULT_PERIOD_END = date(2025, 12, 31)
@@ -28,6 +56,11 @@ DEFAULT_PERIOD_END = date(2025, 12, 31)
 MAX_WORKERS = 10
 BATCH_COMMIT_SIZE = 50
 
+# Recuo aplicado ao cursor: cobre relogios dessincronizados e entregas
+# gravadas na Acessorias enquanto a consulta anterior estava em andamento.
+WATERMARK_OVERLAP = timedelta(minutes=10)
+LAST_DH_FORMAT = "%Y-%m-%d %H:%M:%S"
+
 
 @dataclass
 class SyncResult:
@@ -36,6 +69,13 @@ class SyncResult:
     set_true: int = 0
     set_false: int = 0
     skipped_no_cnpj: int = 0
+    incremental: int = 0
+    skipped_checkpoint: int = 0
+    run_id: int | None = None
+    resumed: bool = False
+    already_running: bool = False
+    rate_limit_wait_seconds: float = 0.0
+    http_cache: dict[str, Any] = field(default_factory=dict)
     errors: list[dict[str, Any]] = field(default_factory=list)
 
     def as_dict(self) -> dict[str, Any]:
@@ -45,17 +85,36 @@ class SyncResult:
             "set_true": self.set_true,
             "set_false": self.set_false,
             "skipped_no_cnpj": self.skipped_no_cnpj,
+            "incremental": self.incremental,
+            "skipped_checkpoint": self.skipped_checkpoint,
+            "run_id": self.run_id,
+            "resumed": self.resumed,
+            "already_running": self.already_running,
+            "rate_limit_wait_seconds": round(self.rate_limit_wait_seconds, 3),
+            "http_cache": self.http_cache,
             "errors": self.errors or [],
         }
 
 
+@dataclass
+class _EmpresaJob:
+    """Dados de uma empresa copiados da sessao para uso nas threads."""
+    inventario_id: int
+    empresa_id: int
+    razao_social: str
+    cnpj: str
+    last_dh: str | None = None
+
+
 @dataclass
 class EmpresaProcessResult:
     """Resultado do processamento de uma empresa individual."""
     inventario_id: int
+    empresa_id: int
     should_update: bool = False
-    skipped_no_cnpj: bool = False
-    skipped_already_true: bool = False
+    incremental: bool = False
+    fetched_at: datetime | None = None
+    total_entregas: int = 0
     error: dict[str, Any] | None = None
     match_info: dict[str, Any] | None = None
 
@@ -64,62 +123,56 @@ def _clean_cnpj(cnpj: str | None) -> str:
     return re.sub(r"\D", "", cnpj or "")
 
 
+def _period_key(start_date: date, end_date: date) -> str:
+    return f"{start_date.isoformat()}:{end_date.isoformat()}"
+
+
+def _last_dh_param(watermark: datetime) -> str:
+    """``DtLastDH`` for a cursor: overlap applied, floored to the hour.
+
+    Flooring keeps the URL identical across runs within the same hour, so a
+    repeated run is answered by the HTTP cache.
+    """
+    since = (watermark - WATERMARK_OVERLAP).replace(minute=0, second=0, microsecond=0)
+    return since.strftime(LAST_DH_FORMAT)
+
+
 def _process_single_empresa(
-    inventario: Inventario,
+    job: _EmpresaJob,
     client: AcessoriasDeliveriesClient,
     start_date: date,
     end_date: date,
-    last_dh: str | None,
     log: logging.Logger,
 ) -> EmpresaProcessResult:
     """
     Processa uma única empresa de forma isolada (thread-safe para a parte de API).
     Retorna o resultado sem modificar o banco.
     """
-    result = EmpresaProcessResult(inventario_id=inventario.id)
-    
-    empresa = inventario.empresa
-    if not empresa:
-        return result
-
-    cnpj = _clean_cnpj(getattr(empresa, "cnpj", None))
-    if len(cnpj) != 14:
-        log.warning(
-            "Empresa pulada: CNPJ invalido",
-            extra={
-                "empresa_id": empresa.id,
-                "razao_social": getattr(empresa, "razao_social", "N/A"),
-                "cnpj_raw": getattr(empresa, "cnpj", None),
-                "cnpj_limpo": cnpj,
-            }
-        )
-        result.skipped_no_cnpj = True
-        return result
-
-    if inventario.encerramento_fiscal is True:
-        log.debug(
-            "Empresa ja marcada como encerrada; pulando reprocessamento",
-            extra={"empresa_id": empresa.id, "cnpj": cnpj},
-        )
-        result.skipped_already_true = True
-        return result
+    result = EmpresaProcessResult(
+        inventario_id=job.inventario_id,
+        empresa_id=job.empresa_id,
+        incremental=job.last_dh is not None,
+    )
 
     log.info(
         "Buscando entregas para empresa",
         extra={
-            "empresa_id": empresa.id,
-            "cnpj": cnpj,
+            "empresa_id": job.empresa_id,
+            "cnpj": job.cnpj,
             "start_date": start_date.isoformat(),
             "end_date": end_date.isoformat(),
+            "last_dh": job.last_dh,
         }
     )
 
+    # Marcado antes da consulta: o que mudar durante ela entra na proxima.
+    fetched_at = sao_paulo_now_naive()
     try:
-        entregas = client.fetch_deliveries(
-            cnpj,
+        fetch = client.fetch_deliveries_snapshot(
+            job.cnpj,
             start_date,
             end_date,
-            last_dh=last_dh,
+            last_dh=job.last_dh,
             include_config=False,
         )
     except DeliveriesAuthError:
@@ -127,9 +180,9 @@ def _process_single_empresa(
         raise
     except DeliveriesClientError as exc:
         result.error = {
-            "empresa_id": empresa.id,
-            "razao_social": getattr(empresa, "razao_social", "N/A"),
-            "cnpj": cnpj,
+            "empresa_id": job.empresa_id,
+            "razao_social": job.razao_social,
+            "cnpj": job.cnpj,
             "error": str(exc),
             "error_type": type(exc).__name__,
             "timestamp": datetime.now().isoformat(),
@@ -137,13 +190,19 @@ def _process_single_empresa(
         log.error(
             "Erro ao buscar entregas para empresa",
             extra={
-                "empresa_id": empresa.id,
-                "cnpj": cnpj,
+                "empresa_id": job.empresa_id,
+                "cnpj": job.cnpj,
                 "error": str(exc),
             }
         )
         return result
 
+    entregas = fetch.entregas
+    # Pagina servida do cache pelo TTL: o cursor so avanca ate quando ela
+    # foi gravada, senao as alteracoes desse intervalo nunca seriam relidas.
+    result.fetched_at = fetched_at - timedelta(seconds=fetch.cache_age)
+    result.total_entregas = len(entregas)
+
     match: EntregaMatch | None = client.find_encerramento_fiscal(
         entregas,
         start_date=start_date,
@@ -154,8 +213,8 @@ def _process_single_empresa(
         log.info(
             "Encerramento Fiscal encontrado",
             extra={
-                "empresa_id": empresa.id,
-                "cnpj": cnpj,
+                "empresa_id": job.empresa_id,
+                "cnpj": job.cnpj,
                 "entrega_nome": match.raw.get("Nome"),
                 "entrega_status": match.raw.get("Status"),
                 "referencia": match.referencia.isoformat() if match.referencia else None,
@@ -170,8 +229,8 @@ def _process_single_empresa(
         log.debug(
             "Nenhuma entrega de Fechamento Fiscal encontrada",
             extra={
-                "empresa_id": empresa.id,
-                "cnpj": cnpj,
+                "empresa_id": job.empresa_id,
+                "cnpj": job.cnpj,
                 "total_entregas": len(entregas),
             }
         )
@@ -179,6 +238,87 @@ def _process_single_empresa(
     return result
 
 
+# =============================================================================
+# CHECKPOINT
+# =============================================================================
+
+def _open_run(period_key: str) -> tuple[AcessoriasSyncRun | None, bool]:
+    """Resume the unfinished run of the period or start a new one.
+
+    Returns ``(None, False)`` when another process is still working on the
+    period (heartbeat newer than ``ACESSORIAS_SYNC_STALE_SECONDS``).
+    """
+    now = sao_paulo_now_naive()
+    stale_after = timedelta(
+        seconds=int(current_app.config.get("ACESSORIAS_SYNC_STALE_SECONDS", 1800))
+    )
+    run = (
+        AcessoriasSyncRun.query.filter_by(period_key=period_key, finished_at=None)
+        .order_by(AcessoriasSyncRun.started_at.desc())
+        .first()
+    )
+    if run is None:
+        run = AcessoriasSyncRun(
+            period_key=period_key,
+            status="running",
+            started_at=now,
+            heartbeat_at=now,
+            processed=0,
+        )
+        db.session.add(run)
+        db.session.commit()
+        return run, False
+
+    if run.status == "running" and now - run.heartbeat_at < stale_after:
+        return None, False
+
+    run.status = "running"
+    run.heartbeat_at = now
+    db.session.commit()
+    return run, True
+
+
+def _save_cursor(
+    cursors: dict[int, AcessoriasSyncCursor],
+    period_key: str,
+    proc_result: EmpresaProcessResult,
+) -> None:
+    cursor = cursors.get(proc_result.empresa_id)
+    if cursor is None:
+        cursor = AcessoriasSyncCursor(empresa_id=proc_result.empresa_id, period_key=period_key)
+        db.session.add(cursor)
+        cursors[proc_result.empresa_id] = cursor
+    # Apenas atribuicoes: cursores expirados pelo commit nao sao recarregados.
+    cursor.last_dh = proc_result.fetched_at
+    cursor.last_fetch_count = proc_result.total_entregas
+    cursor.synced_at = sao_paulo_now_naive()
+
+
+def _checkpoint(run: AcessoriasSyncRun, processed: int, *, status: str = "running") -> None:
+    """Commit the pending cursors and marks together with the run heartbeat."""
+    run.processed = (run.processed or 0) + processed
+    run.status = status
+    run.heartbeat_at = sao_paulo_now_naive()
+    db.session.commit()
+
+
+def _build_http_cache() -> SQLiteHttpCache | None:
+    config = current_app.config
+    if not config.get("ACESSORIAS_HTTP_CACHE_ENABLED", True):
+        return None
+    path = config.get("ACESSORIAS_HTTP_CACHE_PATH")
+    if not path:
+        return None
+    return get_http_cache(path, ttls=parse_ttls(config.get("ACESSORIAS_HTTP_CACHE_TTLS")))
+
+
+def _build_rate_limiter() -> TokenBucket:
+    return TokenBucket(
+        rate=float(current_app.config.get("ACESSORIAS_RATE_PER_SECOND", 5)),
+        capacity=float(current_app.config.get("ACESSORIAS_RATE_BURST", 5)),
+    )
+
+
 def sync_encerramento_fiscal(
     *,
     start_date: date = DEFAULT_PERIOD_START,
@@ -186,19 +326,42 @@ def sync_encerramento_fiscal(
     last_dh: str | None = None,
     logger: logging.Logger | None = None,
     max_workers: int = MAX_WORKERS,
+    full: bool = False,
+    client: AcessoriasDeliveriesClient | None = None,
 ) -> SyncResult:
     """
     Atualiza ``encerramento_fiscal`` para empresas ativas no inventario.
 
     Criterio: existencia de entrega "Fechamento Fiscal" entregue no periodo informado.
     Apenas atualiza de False/None para True (nao desmarca quem ja esta como True).
-    
-    Utiliza processamento paralelo para chamadas à API externa (5-10x mais rápido).
+
+    Cada empresa consulta apenas as entregas alteradas desde o seu cursor;
+    ``full=True`` ignora os cursores e ``last_dh`` fixa o mesmo ``DtLastDH``
+    para todas. Os cursores e as marcacoes sao confirmados a cada
+    ``BATCH_COMMIT_SIZE`` empresas, e uma run interrompida e retomada.
     """
     log = logger or logging.getLogger(__name__)
     result = SyncResult()
+    period_key = _period_key(start_date, end_date)
 
-    client = AcessoriasDeliveriesClient(logger=log)
+    run, resumed = _open_run(period_key)
+    if run is None:
+        log.warning(
+            "Sync de encerramento fiscal ja em andamento; execucao ignorada",
+            extra={"period_key": period_key},
+        )
+        result.already_running = True
+        return result
+    result.run_id = run.id
+    result.resumed = resumed
+    run_started_at = run.started_at
+
+    if client is None:
+        client = AcessoriasDeliveriesClient(
+            logger=log,
+            rate_limiter=_build_rate_limiter(),
+            cache=_build_http_cache(),
+        )
 
     inventarios: list[Inventario] = (
         Inventario.query.join(Empresa)
@@ -206,93 +369,124 @@ def sync_encerramento_fiscal(
         .options(joinedload(Inventario.empresa))
         .all()
     )
-
-    # Mapeamento de inventario_id -> inventario para atualização posterior
     inventario_map: dict[int, Inventario] = {inv.id: inv for inv in inventarios}
-    
+    cursors: dict[int, AcessoriasSyncCursor] = {
+        cursor.empresa_id: cursor
+        for cursor in AcessoriasSyncCursor.query.filter_by(period_key=period_key)
+    }
+
+    # Copia o necessario para as threads; nenhuma delas toca a sessao.
+    jobs: list[_EmpresaJob] = []
+    for inventario in inventarios:
+        empresa = inventario.empresa
+        if not empresa:
+            continue
+
+        cnpj = _clean_cnpj(getattr(empresa, "cnpj", None))
+        if len(cnpj) != 14:
+            log.warning(
+                "Empresa pulada: CNPJ invalido",
+                extra={
+                    "empresa_id": empresa.id,
+                    "razao_social": getattr(empresa, "razao_social", "N/A"),
+                    "cnpj_raw": getattr(empresa, "cnpj", None),
+                    "cnpj_limpo": cnpj,
+                }
+            )
+            result.skipped_no_cnpj += 1
+            continue
+
+        if inventario.encerramento_fiscal is True:
+            continue
+
+        cursor = cursors.get(empresa.id)
+        if cursor is not None and cursor.synced_at and cursor.synced_at >= run_started_at:
+            # Ja consultada por esta run antes da interrupcao.
+            result.skipped_checkpoint += 1
+            continue
+
+        job_last_dh = last_dh
+        if job_last_dh is None and not full and cursor is not None and cursor.last_dh:
+            job_last_dh = _last_dh_param(cursor.last_dh)
+
+        jobs.append(
+            _EmpresaJob(
+                inventario_id=inventario.id,
+                empresa_id=empresa.id,
+                razao_social=getattr(empresa, "razao_social", None) or "N/A",
+                cnpj=cnpj,
+                last_dh=job_last_dh,
+            )
+        )
+
     log.info(
         "Iniciando sync paralelo de encerramento fiscal",
         extra={
             "total_empresas": len(inventarios),
+            "a_consultar": len(jobs),
             "max_workers": max_workers,
             "start_date": start_date.isoformat(),
             "end_date": end_date.isoformat(),
+            "run_id": run.id,
+            "resumed": resumed,
         }
     )
 
-    # Lista para coletar resultados que precisam de update
-    pending_updates: list[int] = []  # inventario_ids
     auth_error: DeliveriesAuthError | None = None
-    lock = threading.Lock()
-
-    def process_with_error_handling(inv: Inventario) -> EmpresaProcessResult | None:
-        nonlocal auth_error
-        try:
-            return _process_single_empresa(
-                inv, client, start_date, end_date, last_dh, log
-            )
-        except DeliveriesAuthError as e:
-            with lock:
-                auth_error = e
-            return None
-
-    # Processar em paralelo
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {
-            executor.submit(process_with_error_handling, inv): inv 
-            for inv in inventarios
-        }
-        
+    pending = 0
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = [
+            executor.submit(_process_single_empresa, job, client, start_date, end_date, log)
+            for job in jobs
+        ]
         for future in as_completed(futures):
-            # Verificar se houve erro de autenticação
-            if auth_error:
+            try:
+                proc_result = future.result()
+            except DeliveriesAuthError as exc:
+                auth_error = exc
                 break
-                
-            proc_result = future.result()
-            if proc_result is None:
-                continue
-                
-            if proc_result.skipped_no_cnpj:
-                result.skipped_no_cnpj += 1
-                continue
-                
-            if proc_result.skipped_already_true:
-                continue
-                
+
             if proc_result.error:
                 result.errors.append(proc_result.error)
                 continue
-            
-            # Contabilizar como verificado
+
             result.checked += 1
-            
+            if proc_result.incremental:
+                result.incremental += 1
+
             if proc_result.should_update:
-                pending_updates.append(proc_result.inventario_id)
+                inventario = inventario_map.get(proc_result.inventario_id)
+                if inventario is not None:
+                    inventario.encerramento_fiscal = True
+                    result.updated += 1
+                    result.set_true += 1
+
+            _save_cursor(cursors, period_key, proc_result)
+            pending += 1
+            if pending >= BATCH_COMMIT_SIZE:
+                _checkpoint(run, pending)
+                log.debug(f"Checkpoint intermediário: {pending} empresas")
+                pending = 0
+    finally:
+        # Apos erro de token, descarta o que ainda nao comecou.
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    if client.rate_limiter is not None:
+        result.rate_limit_wait_seconds = client.rate_limiter.waited_seconds
+    if client.cache is not None:
+        result.http_cache = client.cache_stats.as_dict()
 
-    # Se houve erro de autenticação, propagar
     if auth_error:
+        # Guarda o progresso; a proxima execucao retoma esta run.
+        _checkpoint(run, pending, status="interrupted")
         raise auth_error
 
-    # Aplicar updates no banco de dados (thread principal, sequencial)
-    # Com commits em batches para segurança
-    batch_count = 0
-    for inv_id in pending_updates:
-        inventario = inventario_map.get(inv_id)
-        if inventario and inventario.encerramento_fiscal is not True:
-            inventario.encerramento_fiscal = True
-            result.updated += 1
-            result.set_true += 1
-            batch_count += 1
-            
-            # Commit em batches
-            if batch_count >= BATCH_COMMIT_SIZE:
-                db.session.commit()
-                log.debug(f"Commit intermediário: {batch_count} registros")
-                batch_count = 0
-
-    # Commit final dos registros restantes
-    if batch_count > 0:
-        db.session.commit()
+    run.processed = (run.processed or 0) + pending
+    run.status = "done"
+    run.heartbeat_at = run.finished_at = sao_paulo_now_naive()
+    run.stats = result.as_dict()
+    db.session.commit()
 
     log.info(
         "Sincronizacao de encerramento fiscal concluida",
@@ -302,6 +496,9 @@ def sync_encerramento_fiscal(
             "set_true": result.set_true,
             "set_false": result.set_false,
             "skipped_no_cnpj": result.skipped_no_cnpj,
+            "incremental": result.incremental,
+            "skipped_checkpoint": result.skipped_checkpoint,
+            "http_cache_hit_rate": result.http_cache.get("hit_rate"),
             "errors": len(result.errors or []),
             "start_date": start_date.isoformat(),
             "end_date": end_date.isoformat(),
@@ -1,10 +1,13 @@
 """Helpers for meeting room scheduling logic."""
 
+import math
 import time
 import threading
-from dataclasses import dataclass
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
 from datetime import date, datetime, timedelta
-from typing import Any, Sequence
+from itertools import accumulate
+from typing import Any, Iterable, Sequence
 from flask import flash, current_app
 from markupsafe import Markup
 from dateutil.parser import isoparse
@@ -23,7 +26,6 @@ from app.services.meeting_recurrence import (
     generate_recurrence_group_id,
 )
 from app.services.google_calendar import (
-    list_upcoming_events,
     create_meet_event,
     create_event,
     update_event,
@@ -32,11 +34,23 @@ from app.services.google_calendar import (
     update_meet_space_preferences,
 )
 from app.services.calendar_cache import calendar_cache
+from app.services.calendar_mirror import (
+    get_sync_state,
+    list_mirrored_events,
+    mark_mirror_dirty,
+    mirror_sync_reason,
+    sync_calendar_mirror,
+)
 from app.services.background import submit_background_job
-from google.auth.exceptions import RefreshError
-from googleapiclient.errors import HttpError
+from app.services.meeting_schedule import ScheduleIndex
+from app.services.meeting_series import SeriesSpec, start_series_job
+from app.utils.lazy_import import lazy_import
+from sqlalchemy import and_, or_, select
 from sqlalchemy.orm import selectinload
 
+google_auth_exceptions = lazy_import("google.auth.exceptions")
+googleapiclient_errors = lazy_import("googleapiclient.errors")
+
 # Lazy-load calendar timezone to avoid API call at module import
 _CALENDAR_TZ = None
 
@@ -62,11 +76,16 @@ _user_cache_ttl = timedelta(minutes=5)  # Mesmo TTL do cache de eventos
 
 MIN_GAP = timedelta(minutes=2)
 
-# Request coalescing para prevenir múltiplas chamadas simultâneas à API do Google Calendar
-# Usa Event ao invés de Lock para permitir que múltiplas threads esperem pelo mesmo fetch
-_fetch_event: threading.Event | None = None
-_fetch_event_lock = threading.Lock()
+# Um sync do espelho por vez neste processo; as demais threads esperam por ele
+_mirror_sync_lock = threading.Lock()
 _fetch_timeout = 5.0  # segundos (reduzido de 10s para falhar mais rápido)
+_mirror_refresh_pending = False
+_mirror_refresh_lock = threading.Lock()
+
+# Eventos lidos do espelho: (changed_at, instante da leitura, eventos)
+_mirror_events_memo: tuple[datetime | None, float, list[dict]] | None = None
+_mirror_changed_at_seen: datetime | None = None
+_mirror_memo_ttl = 60.0
 
 # Combined cache version control for proper invalidation
 _combined_cache_version: int = 0
@@ -130,6 +149,19 @@ class MeetingOperationResult:
 
     meeting_id: int
     meet_link: str | None
+    series_job_id: str | None = None
+
+
+@dataclass(slots=True)
+class StatusProgressResult:
+    """Outcome of one :func:`advance_meeting_statuses` run."""
+
+    checked: int = 0
+    advanced: int = 0
+    changes: list[dict[str, Any]] = field(default_factory=list)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"checked": self.checked, "advanced": self.advanced}
 
 
 def get_status_label(status: ReuniaoStatus) -> str:
@@ -240,9 +272,9 @@ def _apply_meet_preferences(meeting: Reuniao) -> tuple[bool | None, str | None]:
             )
             message = str(exc)
             unauthorized = False
-            if isinstance(exc, RefreshError) and "unauthorized_client" in message:
+            if isinstance(exc, google_auth_exceptions.RefreshError) and "unauthorized_client" in message:
                 unauthorized = True
-            elif isinstance(exc, HttpError) and getattr(exc, "resp", None) and getattr(exc.resp, "status", None) in (401, 403):
+            elif isinstance(exc, googleapiclient_errors.HttpError) and getattr(exc, "resp", None) and getattr(exc.resp, "status", None) in (401, 403):
                 unauthorized = True
 
             if unauthorized:
@@ -345,183 +377,214 @@ def populate_participants_choices(form):
     ]
 
 
-def fetch_raw_events():
-    """Fetch upcoming events from Google Calendar with caching and request coalescing.
-
-    Uses a 3-tier protection strategy:
-    1. Primary cache (5 minutes) - frequently accessed
-    2. Stale cache (15 minutes) - fallback during API failures
-    3. Request coalescing - multiple concurrent requests wait for single fetch
-
-    Thread safety (request coalescing pattern):
-    - First thread: Creates event, fetches from API, sets event to signal completion
-    - Concurrent threads: Wait on existing event (up to 5s), then read from cache
-    - Timeout: 5 seconds to fail fast
-    """
-    global _fetch_event
-
-    # Fast path: Try primary cache first (no lock needed)
-    cached_events = calendar_cache.get("raw_calendar_events")
-    if cached_events is not None:
-        return cached_events
-
-    # Cache miss - check if another thread is already fetching
-    with _fetch_event_lock:
-        if _fetch_event is not None:
-            # Another thread is fetching - wait for it
-            event_to_wait = _fetch_event
-        else:
-            # We're the first - create event and fetch
-            _fetch_event = threading.Event()
-            event_to_wait = None
-
-    # If another thread is fetching, wait for it to complete
-    if event_to_wait is not None:
-        wait_success = event_to_wait.wait(timeout=_fetch_timeout)
-
-        if not wait_success:
-            # Timeout waiting - try stale cache
-            current_app.logger.warning(
-                "Timeout waiting for calendar fetch after %.1fs - using stale cache",
-                _fetch_timeout
-            )
-            stale_events = calendar_cache.get("raw_calendar_events_stale")
-            if stale_events is not None:
-                return stale_events
-            # No stale cache - raise timeout
-            raise TimeoutError(
-                f"Timeout waiting for calendar fetch (>{_fetch_timeout}s) and no stale cache available"
-            )
+def _bump_combined_cache_version() -> None:
+    # Since SimpleCache doesn't support pattern matching, we increment a version counter
+    # All cached entries will check this version and invalidate themselves if stale
+    global _combined_cache_version
+    with _combined_cache_version_lock:
+        _combined_cache_version += 1
+        current_app.logger.debug(f"Invalidated combined cache, new version: {_combined_cache_version}")
 
-        # Fetch completed by other thread - check cache
-        cached_events = calendar_cache.get("raw_calendar_events")
-        if cached_events is not None:
-            return cached_events
 
-        # Cache somehow missing - fall through to fetch ourselves
+def _sync_mirror_now(reason: str) -> None:
+    """Sync the mirror before reading it; one thread per process does the call."""
+    if not _mirror_sync_lock.acquire(timeout=_fetch_timeout):
         current_app.logger.warning(
-            "Cache missing after fetch event signaled - fetching again"
+            "Timeout waiting for calendar mirror sync after %.1fs - serving the mirror",
+            _fetch_timeout,
         )
-
-    # We're responsible for fetching - do it now
+        return
     try:
-        current_app.logger.debug("Fetching calendar events from Google API")
-        fetch_start = time.perf_counter()
-
-        # Get stale cache as fallback
-        stale_events = calendar_cache.get("raw_calendar_events_stale")
-        calendar_tz = CALENDAR_TZ
-        now = datetime.now(calendar_tz)
-        # Reduzimos o horizonte padrÇœo para diminuir payload e latÇõncia do Google API
-        future_window_days = max(
-            int(current_app.config.get("MEETING_CALENDAR_FUTURE_DAYS", 365)),
-            0,
+        # Another thread may have synced while we waited for the lock.
+        if mirror_sync_reason(get_sync_state()) not in ("never", "dirty"):
+            return
+        sync_calendar_mirror()
+    except Exception as e:
+        current_app.logger.warning(
+            "Google Calendar sync failed (%s); serving the local mirror: %s", reason, e
         )
-        time_max = now + timedelta(days=future_window_days)
+    finally:
+        _mirror_sync_lock.release()
 
-        try:
-            # Fetch from Google Calendar API
-            events = list_upcoming_events(max_results=None, time_max=time_max)
-            fetch_duration = (time.perf_counter() - fetch_start) * 1000
 
-            # Update both primary and stale caches
-            calendar_cache.set("raw_calendar_events", events, ttl=300)  # 5 minutes
-            calendar_cache.set("raw_calendar_events_stale", events, ttl=900)  # 15 minutes
+def _refresh_mirror_job() -> None:
+    global _mirror_refresh_pending
+    try:
+        sync_calendar_mirror()
+    finally:
+        with _mirror_refresh_lock:
+            _mirror_refresh_pending = False
 
-            current_app.logger.info(
-                "Successfully fetched %d calendar events from Google API in %.2fms",
-                len(events),
-                fetch_duration
-            )
 
-            return events
+def _refresh_mirror_in_background() -> None:
+    global _mirror_refresh_pending
+    with _mirror_refresh_lock:
+        if _mirror_refresh_pending:
+            return
+        _mirror_refresh_pending = True
+    submit_background_job(_refresh_mirror_job)
 
-        except Exception as e:
-            fetch_duration = (time.perf_counter() - fetch_start) * 1000
 
-            # If API call fails but we have stale data, use it
-            if stale_events is not None:
-                current_app.logger.warning(
-                    "Google Calendar API failed after %.2fms, using stale cache: %s",
-                    fetch_duration,
-                    str(e)
-                )
-                # Refresh primary cache with stale data to avoid repeated API calls
-                calendar_cache.set("raw_calendar_events", stale_events, ttl=60)
-                return stale_events
-
-            # No cache available, re-raise the exception
-            current_app.logger.error(
-                "Google Calendar API failed after %.2fms and no stale cache available: %s",
-                fetch_duration,
-                str(e)
-            )
-            raise
+def fetch_raw_events():
+    """Return upcoming meeting room events from the local calendar mirror.
 
-    finally:
-        # Signal waiting threads and clear event
-        with _fetch_event_lock:
-            if _fetch_event is not None:
-                _fetch_event.set()
-                _fetch_event = None
+    ``calendar_event_mirror`` is kept current with Google's incremental sync
+    (``app.services.calendar_mirror``), so a read costs at most one small
+    delta request:
+    1. Never synced, or flagged dirty by a local write - sync now, then read
+    2. Older than ``CALENDAR_MIRROR_MAX_AGE_SECONDS`` - read now, refresh in background
+    3. Google unavailable - the mirror is served as is
+
+    The rows are memoized per process until the mirror changes (or for
+    ``_mirror_memo_ttl`` seconds, so finished events drop off).
+    """
+    global _mirror_events_memo, _mirror_changed_at_seen
+
+    state = get_sync_state()
+    reason = mirror_sync_reason(state)
+    if reason in ("never", "dirty"):
+        _sync_mirror_now(reason)
+        state = get_sync_state()
+    elif reason == "stale":
+        _refresh_mirror_in_background()
+
+    changed_at = state.changed_at if state is not None else None
+    if changed_at != _mirror_changed_at_seen:
+        # Mirror written by another worker or a background sync.
+        _mirror_changed_at_seen = changed_at
+        _mirror_events_memo = None
+        _bump_combined_cache_version()
+
+    memo = _mirror_events_memo
+    if memo is not None and memo[0] == changed_at and time.monotonic() - memo[1] < _mirror_memo_ttl:
+        return memo[2]
+
+    read_start = time.perf_counter()
+    calendar_tz = CALENDAR_TZ
+    now = datetime.now(calendar_tz)
+    # Reduzimos o horizonte padrão para diminuir payload
+    future_window_days = max(
+        int(current_app.config.get("MEETING_CALENDAR_FUTURE_DAYS", 365)),
+        0,
+    )
+    events = list_mirrored_events(now, now + timedelta(days=future_window_days))
+    _mirror_events_memo = (changed_at, time.monotonic(), events)
+    current_app.logger.debug(
+        "Loaded %d calendar events from the local mirror in %.2fms",
+        len(events),
+        (time.perf_counter() - read_start) * 1000,
+    )
+    return events
 
 
 def invalidate_calendar_cache(force_refresh: bool = False):
-    """Soft invalidate the calendar cache, optionally forcing a refresh.
+    """Mark the calendar mirror dirty after a local write to Google Calendar.
 
-    When ``force_refresh`` is False we keep the existing data for 30s so in-flight
-    requests can still iterate while a fresh fetch runs. When True we drop both the
-    primary and stale caches to ensure no deleted event can be snapped back from memory.
+    The next :func:`fetch_raw_events` runs an incremental sync before reading,
+    so created, edited and deleted events show up right away.
+    ``force_refresh`` is kept for callers; the sync already removes deleted
+    events, so both modes behave the same.
     """
-    cached_events = calendar_cache.get("raw_calendar_events")
-    if cached_events is not None:
-        if force_refresh:
-            calendar_cache.delete("raw_calendar_events")
-        else:
-            # Shorten TTL to 30 seconds instead of deleting the entry entirely.
-            calendar_cache.set("raw_calendar_events", cached_events, ttl=30)
-    if force_refresh:
-        calendar_cache.delete("raw_calendar_events_stale")
+    global _mirror_events_memo
+    mark_mirror_dirty()
+    _mirror_events_memo = None
 
     # Invalidate combined_events cache for all users
-    # Since SimpleCache doesn't support pattern matching, we increment a version counter
-    # All cached entries will check this version and invalidate themselves if stale
-    global _combined_cache_version
-    with _combined_cache_version_lock:
-        _combined_cache_version += 1
-        current_app.logger.debug(f"Invalidated combined cache, new version: {_combined_cache_version}")
+    _bump_combined_cache_version()
 
 
-def try_get_cached_combined_events(current_user_id: int, is_admin: bool):
-    """Return cached combined events tuple (events, version, key) or (None, version, key)."""
-    cache_key = f"combined_events:{current_user_id}:{is_admin}"
-    cached_data = calendar_cache.get(cache_key)
-    with _combined_cache_version_lock:
-        current_version = _combined_cache_version
+# Flags de eventos que existem so no Google: ninguem os altera pelo sistema
+_EXTERNAL_EVENT_FLAGS = {
+    "can_edit": False,
+    "can_delete": False,
+    "can_update_status": False,
+    "can_configure": False,
+    "can_edit_pautas": False,
+}
 
-    if cached_data is None:
-        return None, current_version, cache_key
+COMBINED_CACHE_KEY = "combined_events:base"
 
-    cached_version = cached_data.get("version") if isinstance(cached_data, dict) else None
-    cached_events = cached_data.get("events") if isinstance(cached_data, dict) else cached_data
 
-    if cached_version == current_version and cached_events is not None:
-        return cached_events, current_version, cache_key
+class CalendarProjection:
+    """Calendar events shared by every user, sorted by start.
 
-    return None, current_version, cache_key
+    Only the permission flags depend on the requester: :meth:`for_user`
+    overlays them on the events that touch the requested range, located by
+    bisection. Events that came only from Google carry fixed flags and are
+    returned as is, without a copy.
+    """
 
+    def __init__(
+        self,
+        entries: list[tuple[dict[str, Any], tuple[int, ReuniaoStatus, bool] | None]],
+    ) -> None:
+        # ``entries``: (evento, (criador_id, status, tem_meet) ou None para eventos do Google)
+        entries.sort(key=lambda entry: entry[0]["start"])
+        self._events = [event for event, _ in entries]
+        self._owners = [owner for _, owner in entries]
+        # Comparacao por data (YYYY-MM-DD), como o FullCalendar pede a janela
+        self._start_days = [event["start"][:10] for event in self._events]
+        self._end_days = [(event.get("end") or event["start"])[:10] for event in self._events]
+        # Maior termino ate cada posicao: nao decresce, entao tambem aceita bisect
+        self._reach_days = list(accumulate(self._end_days, max))
+
+    def __len__(self) -> int:
+        return len(self._events)
+
+    def _positions(self, range_start: str | None, range_end: str | None) -> Iterable[int]:
+        if not range_start or not range_end:
+            return range(len(self._events))
+        start_day, end_day = range_start[:10], range_end[:10]
+        # Antes de ``low`` tudo termina antes da janela; de ``high`` em diante tudo comeca depois
+        low = bisect_left(self._reach_days, start_day)
+        high = bisect_right(self._start_days, end_day)
+        return (i for i in range(low, high) if self._end_days[i] >= start_day)
+
+    def for_user(
+        self,
+        current_user_id: int,
+        is_admin: bool,
+        range_start: str | None = None,
+        range_end: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Events touching ``[range_start, range_end]`` with the user's flags."""
+        events: list[dict[str, Any]] = []
+        for position in self._positions(range_start, range_end):
+            event = self._events[position]
+            owner = self._owners[position]
+            if owner is None:
+                events.append(event)
+            else:
+                events.append({**event, **_meeting_permissions(*owner, current_user_id, is_admin)})
+        return events
 
-def _next_available(
-    start: datetime, dur: timedelta, intervals: list[tuple[datetime, datetime]]
+
+def get_cached_calendar_projection() -> tuple[CalendarProjection | None, int]:
+    """Return the shared projection for the current cache version, if built."""
+    cached_data = calendar_cache.get(COMBINED_CACHE_KEY)
+    with _combined_cache_version_lock:
+        current_version = _combined_cache_version
+    if isinstance(cached_data, dict) and cached_data.get("version") == current_version:
+        return cached_data["projection"], current_version
+    return None, current_version
+
+
+def try_get_cached_combined_events(
+    current_user_id: int,
+    is_admin: bool,
+    range_start: str | None = None,
+    range_end: str | None = None,
 ):
-    intervals = sorted(intervals, key=lambda x: x[0])
-    while True:
-        for s, e in intervals:
-            if start < e + MIN_GAP and start + dur > s - MIN_GAP:
-                start = e + MIN_GAP
-                break
-        else:
-            return start
+    """Return cached combined events tuple (events, version, key) or (None, version, key)."""
+    projection, current_version = get_cached_calendar_projection()
+    if projection is None:
+        return None, current_version, COMBINED_CACHE_KEY
+    events = projection.for_user(current_user_id, is_admin, range_start, range_end)
+    return events, current_version, COMBINED_CACHE_KEY
+
+
+def _next_available(start: datetime, dur: timedelta, index: ScheduleIndex) -> datetime:
+    return index.next_free(start, dur)
 
 
 def _collect_intervals(
@@ -542,6 +605,10 @@ def _collect_intervals(
         existing_end = isoparse(
             e["end"].get("dateTime") or e["end"].get("date")
         ).astimezone(CALENDAR_TZ)
+        if window_start is not None and existing_end < window_start - MIN_GAP:
+            continue
+        if window_end is not None and existing_start > window_end + MIN_GAP:
+            continue
         intervals.append((existing_start, existing_end))
 
     query = Reuniao.query.with_entities(
@@ -564,8 +631,35 @@ def _collect_intervals(
     return intervals
 
 
+def _build_schedule_index(
+    raw_events,
+    window_start: datetime,
+    window_end: datetime,
+    *,
+    exclude_meeting_id: int | None = None,
+    exclude_event_id: str | None = None,
+) -> ScheduleIndex:
+    """Index of busy intervals in the window; widens itself (and re-queries) on demand."""
+
+    def load(lo: datetime, hi: datetime) -> list[tuple[datetime, datetime]]:
+        return _collect_intervals(
+            raw_events,
+            exclude_meeting_id=exclude_meeting_id,
+            exclude_event_id=exclude_event_id,
+            window_start=lo,
+            window_end=hi,
+        )
+
+    return ScheduleIndex(
+        load(window_start, window_end),
+        gap=MIN_GAP,
+        window=(window_start, window_end),
+        loader=load,
+    )
+
+
 def _calculate_adjusted_start(
-    start_dt: datetime, duration: timedelta, intervals: list[tuple[datetime, datetime]], now
+    start_dt: datetime, duration: timedelta, index: ScheduleIndex, now
 ) -> tuple[datetime, list[str]]:
     proposed_start = max(start_dt, now + MIN_GAP)
     messages: list[str] = []
@@ -573,38 +667,95 @@ def _calculate_adjusted_start(
         messages.append(
             "Reuniões devem ser agendadas com pelo menos 2 minutos de antecedência."
         )
-    adjusted_start = _next_available(proposed_start, duration, intervals)
+    adjusted_start = _next_available(proposed_start, duration, index)
     if adjusted_start != proposed_start:
         messages.append("Horário conflita com outra reunião.")
     return adjusted_start, messages
 
 
-def _auto_progress_status(
-    meeting: Reuniao, start_dt: datetime, end_dt: datetime, now: datetime
-) -> bool:
-    """Update the meeting status according to the current time.
+def _progressed_status(
+    status: ReuniaoStatus, start_dt: datetime, end_dt: datetime, now: datetime
+) -> ReuniaoStatus:
+    """Return the status a meeting should have at ``now``.
 
-    Returns ``True`` if the status changed.
+    Only scheduled and in-progress meetings move with the clock; postponed,
+    cancelled and finished meetings keep their status.
     """
 
-    status = meeting.status
-    new_status = status
-    if status in {ReuniaoStatus.ADIADA, ReuniaoStatus.CANCELADA, ReuniaoStatus.REALIZADA}:
-        return False
     if status == ReuniaoStatus.AGENDADA:
         if now >= end_dt:
-            new_status = ReuniaoStatus.REALIZADA
-        elif start_dt <= now < end_dt:
-            new_status = ReuniaoStatus.EM_ANDAMENTO
+            return ReuniaoStatus.REALIZADA
+        if start_dt <= now:
+            return ReuniaoStatus.EM_ANDAMENTO
     elif status == ReuniaoStatus.EM_ANDAMENTO:
         if now >= end_dt:
-            new_status = ReuniaoStatus.REALIZADA
-        elif now < start_dt:
-            new_status = ReuniaoStatus.AGENDADA
-    if new_status != status:
-        meeting.status = new_status
-        return True
-    return False
+            return ReuniaoStatus.REALIZADA
+        if now < start_dt:
+            return ReuniaoStatus.AGENDADA
+    return status
+
+
+def advance_meeting_statuses(now: datetime | None = None) -> StatusProgressResult:
+    """Persist clock-driven status changes (scheduled -> in progress -> finished).
+
+    Runs from the scheduler every minute so the calendar read paths never
+    write. Only meetings that can move are loaded: scheduled ones that have
+    already started plus the few in progress, both served by
+    ``idx_reunioes_status_inicio``. Each UPDATE is guarded by the old status,
+    so a manual change made meanwhile wins. When something changes the
+    combined calendar cache is invalidated and connected clients are told to
+    refresh.
+    """
+
+    if now is None:
+        now = datetime.now(CALENDAR_TZ)
+    result = StatusProgressResult()
+    rows = db.session.execute(
+        select(Reuniao.id, Reuniao.status, Reuniao.inicio, Reuniao.fim).where(
+            or_(
+                and_(Reuniao.status == ReuniaoStatus.AGENDADA, Reuniao.inicio <= now),
+                Reuniao.status == ReuniaoStatus.EM_ANDAMENTO,
+            )
+        )
+    ).all()
+    result.checked = len(rows)
+
+    transitions: dict[tuple[ReuniaoStatus, ReuniaoStatus], list[int]] = {}
+    for meeting_id, status, inicio, fim in rows:
+        new_status = _progressed_status(
+            status, inicio.astimezone(CALENDAR_TZ), fim.astimezone(CALENDAR_TZ), now
+        )
+        if new_status != status:
+            transitions.setdefault((status, new_status), []).append(meeting_id)
+    if not transitions:
+        return result
+
+    try:
+        for (old_status, new_status), meeting_ids in transitions.items():
+            changed = db.session.execute(
+                db.update(Reuniao)
+                .where(Reuniao.id.in_(meeting_ids), Reuniao.status == old_status)
+                .values(status=new_status)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            result.advanced += changed
+            result.changes.extend(
+                {"id": meeting_id, "old_status": old_status.value, "new_status": new_status.value}
+                for meeting_id in meeting_ids
+            )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+
+    _bump_combined_cache_version()
+    try:
+        from app.services.realtime import broadcast_meetings_status_changed
+
+        broadcast_meetings_status_changed(result.changes)
+    except Exception as e:
+        current_app.logger.warning(f"Failed to broadcast meeting status changes: {e}")
+    return result
 
 
 def _meeting_participant_metadata(meeting: Reuniao):
@@ -679,50 +830,54 @@ def _meeting_participant_metadata(meeting: Reuniao):
     }
 
 
-def serialize_meeting_event(
-    meeting: Reuniao,
-    now: datetime,
+def _meeting_permissions(
+    creator_id: int,
+    status: ReuniaoStatus,
+    has_meet_link: bool,
     current_user_id: int,
     is_admin: bool,
-    *,
-    auto_progress: bool = True,
-):
-    """Serialize a meeting instance to the structure used by the calendar."""
+) -> dict[str, bool]:
+    """Return the per-user flags of a meeting event; the rest is shared."""
+
+    is_creator = creator_id == current_user_id
+    # Admins podem editar qualquer reunião; criadores só podem editar AGENDADAS ou ADIADAS
+    can_edit = is_admin or (is_creator and status in EDITABLE_STATUSES)
+    return {
+        "can_edit": can_edit,
+        # Admins podem excluir qualquer reunião; criadores só podem excluir se podem editar
+        "can_delete": is_admin or can_edit,
+        "can_configure": has_meet_link and (is_admin or is_creator) and status in CONFIGURABLE_STATUSES,
+        "can_update_status": is_admin or is_creator,
+        "can_edit_pautas": status == ReuniaoStatus.REALIZADA and (is_admin or is_creator),
+    }
+
+
+def _serialize_meeting_base(
+    meeting: Reuniao, now: datetime, auto_progress: bool
+) -> tuple[dict[str, Any], ReuniaoStatus]:
+    """Serialize the user-independent part of a meeting event.
+
+    Returns the event and the status shown, projected to ``now`` when
+    ``auto_progress`` is set.
+    """
 
     start_dt = meeting.inicio.astimezone(CALENDAR_TZ)
     end_dt = meeting.fim.astimezone(CALENDAR_TZ)
+    # A projecao nao grava nada: quem persiste a mudanca e advance_meeting_statuses
     if auto_progress:
-        status_changed = _auto_progress_status(meeting, start_dt, end_dt, now)
+        status = _progressed_status(meeting.status, start_dt, end_dt, now)
     else:
-        status_changed = False
-    status = meeting.status
-    label = get_status_label(status)
-    color = get_status_color(status)
+        status = meeting.status
     participant_meta = _meeting_participant_metadata(meeting)
-    normalized_settings = _normalize_meet_settings(meeting.meet_settings)
-    can_update_status = is_admin or meeting.criador_id == current_user_id
-    # Admins podem editar qualquer reunião; criadores só podem editar AGENDADAS ou ADIADAS
-    can_edit = is_admin or (meeting.criador_id == current_user_id and status in EDITABLE_STATUSES)
-    can_configure = (
-        bool(meeting.meet_link)
-        and (is_admin or meeting.criador_id == current_user_id)
-        and status in CONFIGURABLE_STATUSES
-    )
-    # Admins podem excluir qualquer reunião; criadores só podem excluir se podem editar
-    can_delete = is_admin or can_edit
-    can_edit_pautas = (
-        status == ReuniaoStatus.REALIZADA
-        and (is_admin or meeting.criador_id == current_user_id)
-    )
     event_data = {
         "id": meeting.id,
         "title": meeting.assunto,
         "start": start_dt.isoformat(),
         "end": end_dt.isoformat(),
-        "color": color,
+        "color": get_status_color(status),
         "description": meeting.descricao,
         "pautas": meeting.pautas or "",
-        "status": label,
+        "status": get_status_label(status),
         "status_code": status.value,
         "creator": participant_meta["creator_name"] or participant_meta["creator_username"],
         "creator_username": participant_meta["creator_username"],
@@ -730,13 +885,8 @@ def serialize_meeting_event(
         "participant_ids": participant_meta["ids"],
         "participant_details": participant_meta["details"],
         "meeting_id": meeting.id,
-        "can_edit": can_edit,
-        "can_delete": can_delete,
-        "can_configure": can_configure,
-        "can_update_status": can_update_status,
-        "can_edit_pautas": can_edit_pautas,
         "course_id": meeting.course_id,
-        "meet_settings": normalized_settings,
+        "meet_settings": _normalize_meet_settings(meeting.meet_settings),
         "host_candidates": participant_meta["host_candidates"],
         "meet_host_id": meeting.meet_host_id,
     }
@@ -744,7 +894,31 @@ def serialize_meeting_event(
         event_data["meet_link"] = meeting.meet_link
     if participant_meta["host_display"]:
         event_data["meet_host_name"] = participant_meta["host_display"]
-    return event_data, status_changed
+    return event_data, status
+
+
+def serialize_meeting_event(
+    meeting: Reuniao,
+    now: datetime,
+    current_user_id: int,
+    is_admin: bool,
+    *,
+    auto_progress: bool = True,
+):
+    """Serialize a meeting instance to the structure used by the calendar.
+
+    With ``auto_progress`` the status shown is projected to ``now`` without
+    touching the row; ``status_changed`` tells whether it differs from the
+    stored one.
+    """
+
+    event_data, status = _serialize_meeting_base(meeting, now, auto_progress)
+    event_data.update(
+        _meeting_permissions(
+            meeting.criador_id, status, bool(meeting.meet_link), current_user_id, is_admin
+        )
+    )
+    return event_data, status != meeting.status
 
 
 def create_meeting_and_event(form, raw_events, now, user_id: int):
@@ -759,14 +933,12 @@ def create_meeting_and_event(form, raw_events, now, user_id: int):
     )
     duration = end_dt - start_dt
     search_padding = max(duration, timedelta(hours=1))
-    intervals = _collect_intervals(
-        raw_events,
-        window_start=start_dt - search_padding,
-        window_end=end_dt + search_padding,
+    index = _build_schedule_index(
+        raw_events, start_dt - search_padding, end_dt + search_padding
     )
 
     adjusted_start, messages = _calculate_adjusted_start(
-        start_dt, duration, intervals, now
+        start_dt, duration, index, now
     )
     if adjusted_start != start_dt:
         adjusted_end = adjusted_start + duration
@@ -885,11 +1057,24 @@ def create_meeting_and_event(form, raw_events, now, user_id: int):
     if meeting.meet_link:
         meetings_to_sync.append((meeting.id, "create_meeting"))
 
-    additional_meet_link = None
+    series_job = None
 
     if recurrence_dates:
-        recurrence_count = 0
         recurrence_conflicts = []
+        free_occurrences: list[tuple[datetime, datetime]] = []
+
+        # One index for the whole series (a single bounded query) instead of
+        # one query and one scan of every event per occurrence.
+        series_padding = max(duration, timedelta(hours=1))
+        series_index = _build_schedule_index(
+            raw_events,
+            datetime.combine(min(recurrence_dates), form.start_time.data, tzinfo=CALENDAR_TZ)
+            - series_padding,
+            datetime.combine(max(recurrence_dates), form.end_time.data, tzinfo=CALENDAR_TZ)
+            + series_padding,
+            exclude_meeting_id=meeting.id,
+            exclude_event_id=meeting.google_event_id,
+        )
 
         for recurrence_date in recurrence_dates:
             start_dt_recurrent = datetime.combine(
@@ -901,19 +1086,11 @@ def create_meeting_and_event(form, raw_events, now, user_id: int):
 
             # Validate conflicts for each recurrent meeting
             duration = end_dt_recurrent - start_dt_recurrent
-            padding = max(duration, timedelta(hours=1))
-            recurrent_intervals = _collect_intervals(
-                raw_events,
-                exclude_meeting_id=meeting.id,
-                exclude_event_id=meeting.google_event_id,
-                window_start=start_dt_recurrent - padding,
-                window_end=end_dt_recurrent + padding,
-            )
             adjusted_start_recurrent, conflict_messages = _calculate_adjusted_start(
-                start_dt_recurrent, duration, recurrent_intervals, now
+                start_dt_recurrent, duration, series_index, now
             )
 
-            # If there's a conflict, record it but continue creating
+            # If there's a conflict, record it but continue with the others
             if adjusted_start_recurrent != start_dt_recurrent:
                 recurrence_conflicts.append({
                     'date': recurrence_date.strftime('%d/%m/%Y'),
@@ -924,67 +1101,31 @@ def create_meeting_and_event(form, raw_events, now, user_id: int):
                 # Skip creating this conflicting occurrence
                 continue
 
-            if form.create_meet.data:
-                event_recurrent = create_meet_event(
-                    form.subject.data,
-                    start_dt_recurrent,
-                    end_dt_recurrent,
-                    description,
-                    participant_emails,
-                    notify_attendees=should_notify,
-                )
-                meet_link_recurrent = event_recurrent.get("hangoutLink")
-            else:
-                event_recurrent = create_event(
-                    form.subject.data,
-                    start_dt_recurrent,
-                    end_dt_recurrent,
-                    description,
-                    participant_emails,
+            free_occurrences.append((start_dt_recurrent, end_dt_recurrent))
+
+        # The Google events are created in batches by a background job; the
+        # page polls its progress (see app.services.meeting_series).
+        if free_occurrences:
+            series_job = start_series_job(
+                SeriesSpec(
+                    subject=form.subject.data,
+                    description=form.description.data,
+                    calendar_description=description,
+                    occurrences=free_occurrences,
+                    participant_ids=[u.id for u in selected_users],
+                    participant_emails=participant_emails,
+                    create_meet=bool(form.create_meet.data),
                     notify_attendees=should_notify,
+                    user_id=user_id,
+                    course_id=course_id_value,
+                    group_id=group_id,
+                    recorrencia_tipo=recorrencia_tipo_value,
+                    recorrencia_fim=recorrencia_fim_value,
+                    recorrencia_dias_semana=recorrencia_dias_semana_value,
+                    meet_settings=_normalize_meet_settings(),
                 )
-                meet_link_recurrent = None
-
-            recurrent_meeting = Reuniao(
-                inicio=start_dt_recurrent,
-                fim=end_dt_recurrent,
-                assunto=form.subject.data,
-                descricao=form.description.data,
-                status=ReuniaoStatus.AGENDADA,
-                meet_link=meet_link_recurrent,
-                google_event_id=event_recurrent["id"],
-                criador_id=user_id,
-                course_id=course_id_value,
-                recorrencia_tipo=recorrencia_tipo_value,
-                recorrencia_fim=recorrencia_fim_value,
-                recorrencia_grupo_id=group_id,
-                recorrencia_dias_semana=recorrencia_dias_semana_value,
             )
-            recurrent_meeting.meet_host_id = user_id
-            recurrent_meeting.meet_settings = _normalize_meet_settings()
-            db.session.add(recurrent_meeting)
-            db.session.flush()
-
-            for user in selected_users:
-                db.session.add(
-                    ReuniaoParticipante(
-                        reuniao_id=recurrent_meeting.id,
-                        id_usuario=user.id,
-                        username_usuario=user.username,
-                    )
-                )
-
-            if meet_link_recurrent:
-                meetings_to_sync.append((recurrent_meeting.id, "create_meeting_recurrence"))
 
-            if not meet_link and meet_link_recurrent and not additional_meet_link:
-                additional_meet_link = meet_link_recurrent
-
-            recurrence_count += 1
-
-        db.session.commit()
-
-        total_meetings = recurrence_count + 1
         total_requested = len(recurrence_dates) + 1
 
         # Show warnings about conflicts if any
@@ -1008,16 +1149,22 @@ def create_meeting_and_event(form, raw_events, now, user_id: int):
                 "warning",
             )
 
+        pending_message = (
+            f" As outras {len(free_occurrences)} reunioes da serie estao sendo criadas em segundo plano."
+            if free_occurrences
+            else ""
+        )
         if meet_link:
             flash(
                 Markup(
-                    f'Serie de {total_meetings} reunioes recorrentes criada com sucesso! '
+                    f'Primeira reuniao da serie criada com sucesso! '
                     f'<a href="{meet_link}" target="_blank">Link do Meet da primeira reuniao</a>'
+                    f'{pending_message}'
                 ),
                 "success",
             )
         else:
-            flash(f"Serie de {total_meetings} reunioes recorrentes criada com sucesso!", "success")
+            flash(f"Primeira reuniao da serie criada com sucesso!{pending_message}", "success")
     else:
         if meet_link:
             flash(
@@ -1041,7 +1188,9 @@ def create_meeting_and_event(form, raw_events, now, user_id: int):
     #         "info",
     #     )
 
-    return True, MeetingOperationResult(meeting.id, meet_link or additional_meet_link)
+    return True, MeetingOperationResult(
+        meeting.id, meet_link, series_job.job_id if series_job else None
+    )
 def update_meeting(form, raw_events, now, meeting: Reuniao):
     """Update existing meeting adjusting for conflicts and syncing with Google Calendar.
 
@@ -1057,28 +1206,15 @@ def update_meeting(form, raw_events, now, meeting: Reuniao):
         form.date.data, form.end_time.data, tzinfo=CALENDAR_TZ
     )
     duration = end_dt - start_dt
-    intervals: list[tuple[datetime, datetime]] = []
-    for e in raw_events:
-        if meeting.google_event_id and e.get("id") == meeting.google_event_id:
-            continue
-        existing_start = isoparse(
-            e["start"].get("dateTime") or e["start"].get("date")
-        ).astimezone(CALENDAR_TZ)
-        existing_end = isoparse(
-            e["end"].get("dateTime") or e["end"].get("date")
-        ).astimezone(CALENDAR_TZ)
-        intervals.append((existing_start, existing_end))
-    for r in Reuniao.query.filter(Reuniao.id != meeting.id).all():
-        existing_start = r.inicio.astimezone(CALENDAR_TZ)
-        existing_end = r.fim.astimezone(CALENDAR_TZ)
-        intervals.append((existing_start, existing_end))
-    proposed_start = max(start_dt, now + MIN_GAP)
-    messages: list[str] = []
-    if proposed_start != start_dt:
-        messages.append("Reuniões devem ser agendadas com pelo menos 2 minutos de antecedência.")
-    adjusted_start = _next_available(proposed_start, duration, intervals)
-    if adjusted_start != proposed_start:
-        messages.append("Horário conflita com outra reunião.")
+    search_padding = max(duration, timedelta(hours=1))
+    index = _build_schedule_index(
+        raw_events,
+        start_dt - search_padding,
+        end_dt + search_padding,
+        exclude_meeting_id=meeting.id,
+        exclude_event_id=meeting.google_event_id,
+    )
+    adjusted_start, messages = _calculate_adjusted_start(start_dt, duration, index, now)
     if adjusted_start != start_dt:
         adjusted_end = adjusted_start + duration
         form.date.data = adjusted_start.date()
@@ -1309,15 +1445,15 @@ def change_meeting_status(
         duration = new_end - new_start
         raw_events = raw_events or fetch_raw_events()
         padding = max(duration, timedelta(hours=1))
-        intervals = _collect_intervals(
+        index = _build_schedule_index(
             raw_events,
+            new_start - padding,
+            new_end + padding,
             exclude_meeting_id=meeting.id,
             exclude_event_id=meeting.google_event_id,
-            window_start=new_start - padding,
-            window_end=new_end + padding,
         )
         adjusted_start, messages = _calculate_adjusted_start(
-            new_start, duration, intervals, now
+            new_start, duration, index, now
         )
         if adjusted_start != new_start:
             raise MeetingStatusConflictError(messages)
@@ -1382,7 +1518,7 @@ def change_meeting_status(
         elif new_status == ReuniaoStatus.CANCELADA:
             meeting.meet_link = None
             db.session.commit()
-    except (HttpError, RefreshError) as e:
+    except (googleapiclient_errors.HttpError, google_auth_exceptions.RefreshError) as e:
         google_sync_failed = True
         current_app.logger.warning(
             f"Google Calendar sync failed for meeting {meeting.id}: {e}. "
@@ -1432,22 +1568,28 @@ def delete_meeting(meeting: Reuniao) -> bool:
     return True
 
 
-def combine_events(raw_events, now, current_user_id: int, is_admin: bool):
-    """Combine Google and local events updating their status.
+def build_calendar_projection(raw_events, now) -> CalendarProjection:
+    """Combine Google and local events into the projection shared by all users.
 
-    ``is_admin`` indicates if the requester has admin privileges, allowing
-    them to delete meetings regardless of status.
+    This is a pure read: statuses are projected to ``now`` for display and
+    persisted by the scheduler (:func:`advance_meeting_statuses`). The result
+    is cached per cache version until the next start or end in it, so a
+    projected status never outlives its transition.
     """
-    cached_events, current_version, cache_key = try_get_cached_combined_events(
-        current_user_id, is_admin
-    )
-    if cached_events is not None:
-        return cached_events
+    projection, current_version = get_cached_calendar_projection()
+    if projection is not None:
+        return projection
 
-    events: list[dict] = []
+    entries: list[tuple[dict[str, Any], tuple[int, ReuniaoStatus, bool] | None]] = []
     seen_keys: set[tuple[str, str, str]] = set()
+    # Proximo inicio/fim depois de agora: ate la nenhum status exibido muda
+    next_transition: datetime | None = None
 
-    updated = False
+    def track_transition(start_dt: datetime, end_dt: datetime) -> None:
+        nonlocal next_transition
+        for moment in (start_dt, end_dt):
+            if moment > now and (next_transition is None or moment < next_transition):
+                next_transition = moment
 
     # Intervalo configurável para reduzir dados processados mantendo histórico relevante
     past_window_days = max(int(current_app.config.get("MEETING_CALENDAR_PAST_DAYS", 60)), 0)
@@ -1473,39 +1615,14 @@ def combine_events(raw_events, now, current_user_id: int, is_admin: bool):
     # edit permissions) is preserved. Google events are added later only
     # if they don't match an existing local meeting.
 
-    # Coletar mudanças de status sem fazer commit aqui para evitar bloqueios
-    status_updates = []
     for r in meetings:
-        event_data, status_changed = serialize_meeting_event(
-            r, now, current_user_id, is_admin
-        )
-        if status_changed:
-            status_updates.append((r.id, r.status))
+        event_data, status = _serialize_meeting_base(r, now, auto_progress=True)
+        if r.status in (ReuniaoStatus.AGENDADA, ReuniaoStatus.EM_ANDAMENTO):
+            track_transition(r.inicio.astimezone(CALENDAR_TZ), r.fim.astimezone(CALENDAR_TZ))
         key = (event_data["title"], event_data["start"], event_data["end"])
-        events.append(event_data)
+        entries.append((event_data, (r.criador_id, status, bool(r.meet_link))))
         seen_keys.add(key)
 
-    # Commit apenas se houver mudanças de status, usando UPDATE individual para evitar
-    # race conditions. Isso permite que múltiplas requisições atualizem diferentes reuniões
-    # sem conflitos, e ignora atualizações que já foram feitas por outra thread.
-    if status_updates:
-        try:
-            # Usar bulk update para melhor performance, mas sem expiration check
-            # para evitar locks desnecessários
-            for meeting_id, new_status in status_updates:
-                # Update direto no BD sem carregar objeto ORM completo
-                # Isso evita OptimisticLockException
-                db.session.execute(
-                    db.update(Reuniao)
-                    .where(Reuniao.id == meeting_id)
-                    .values(status=new_status)
-                )
-            db.session.commit()
-            current_app.logger.debug(f"Auto-updated status for {len(status_updates)} meetings")
-        except Exception as e:
-            current_app.logger.warning(f"Failed to commit status updates: {e}")
-            db.session.rollback()
-
     # Cache user emails para evitar múltiplas queries
     all_emails = set()
     for e in raw_events:
@@ -1531,6 +1648,7 @@ def combine_events(raw_events, now, current_user_id: int, is_admin: bool):
         key = (e.get("summary", "Sem título"), start_dt.isoformat(), end_dt.isoformat())
         if key in seen_keys:
             continue
+        track_transition(start_dt, end_dt)
         if now < start_dt:
             color = "#ffc107"
             status_label = "Agendada"
@@ -1560,7 +1678,7 @@ def combine_events(raw_events, now, current_user_id: int, is_admin: bool):
             creator_name = creator_email
         else:
             creator_name = ""
-        events.append(
+        entries.append((
             {
                 "id": e.get("id"),
                 "title": e.get("summary", "Sem título"),
@@ -1574,22 +1692,42 @@ def combine_events(raw_events, now, current_user_id: int, is_admin: bool):
                 "status_code": None,
                 "participants": attendees,
                 "creator": creator_name,
-                "can_edit": False,
-                "can_delete": False,
-                "can_update_status": False,
-                "can_configure": False,
-                "can_edit_pautas": False,
-            }
-        )
+                **_EXTERNAL_EVENT_FLAGS,
+            },
+            None,
+        ))
         seen_keys.add(key)
 
-    # Cachear resultado processado por 90 segundos com versão
-    # TTL curto para balance entre performance e freshness
-    # Include version to allow proper invalidation across all users
+    # Cachear resultado processado por até 90 segundos com versão, sem passar
+    # do próximo início/fim (quando algum status exibido muda)
+    # Uma única cópia para todos os usuários; a versão invalida após escritas
+    ttl = 90
+    if next_transition is not None:
+        ttl = max(1, min(ttl, math.ceil((next_transition - now).total_seconds())))
+    projection = CalendarProjection(entries)
     cached_data_with_version = {
         "version": current_version,
-        "events": events
+        "projection": projection,
     }
-    calendar_cache.set(cache_key, cached_data_with_version, ttl=90)
+    calendar_cache.set(COMBINED_CACHE_KEY, cached_data_with_version, ttl=ttl)
 
-    return events
+    return projection
+
+
+def combine_events(
+    raw_events,
+    now,
+    current_user_id: int,
+    is_admin: bool,
+    range_start: str | None = None,
+    range_end: str | None = None,
+):
+    """Combine Google and local events for the calendar.
+
+    ``is_admin`` indicates if the requester has admin privileges, allowing
+    them to delete meetings regardless of status. ``range_start`` and
+    ``range_end`` (ISO dates, as sent by FullCalendar) limit the result to
+    the events touching that window; without them every event is returned.
+    """
+    projection = build_calendar_projection(raw_events, now)
+    return projection.for_user(current_user_id, is_admin, range_start, range_end)
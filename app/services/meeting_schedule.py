@@ -0,0 +1,137 @@
+"""
+Indice de horarios ocupados da sala de reuniao.
+
+Substitui as varreduras lineares da checagem de conflitos: os intervalos
+ocupados (ja acrescidos da folga minima entre reunioes) sao ordenados e
+fundidos em blocos disjuntos, e uma arvore de segmentos guarda o maior vao
+livre depois de cada bloco. Com isso:
+
+* ``overlaps(inicio, fim)`` e uma busca binaria;
+* ``next_free(inicio, duracao)`` acha o primeiro vao que comporta a duracao
+  descendo a arvore, em vez de pular de reuniao em reuniao.
+
+O indice cobre uma janela de tempo. Com um ``loader`` ele se estende sozinho
+quando a consulta passa do fim da janela (ex.: uma sequencia de reunioes
+emendadas empurra o horario livre para o dia seguinte).
+
+Uso:
+    from app.services.meeting_schedule import ScheduleIndex
+
+    index = ScheduleIndex(intervals, gap=timedelta(minutes=2), window=(inicio, fim), loader=load)
+    index.overlaps(inicio, fim)
+    index.next_free(inicio, timedelta(hours=1))
+"""
+
+from __future__ import annotations
+
+import math
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from typing import Callable, Iterable
+
+Interval = tuple[datetime, datetime]
+
+
+class ScheduleIndex:
+    """Busy intervals of one room in a time window, with O(log n) queries.
+
+    Two intervals conflict when they overlap once each busy interval is
+    widened by ``gap`` on both sides, the same rule as the original linear
+    check. Durations are assumed positive.
+    """
+
+    def __init__(
+        self,
+        intervals: Iterable[Interval] = (),
+        *,
+        gap: timedelta = timedelta(0),
+        window: tuple[datetime, datetime] | None = None,
+        loader: Callable[[datetime, datetime], Iterable[Interval]] | None = None,
+    ) -> None:
+        self.gap = gap
+        self.window_start, self.window_end = window if window is not None else (None, None)
+        self._loader = loader
+        self._intervals = list(intervals)
+        self._build()
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    # -------------------------------------------------------------------------
+    # Construcao
+    # -------------------------------------------------------------------------
+
+    def _build(self) -> None:
+        starts: list[datetime] = []
+        ends: list[datetime] = []
+        for start, end in sorted((s - self.gap, e + self.gap) for s, e in self._intervals):
+            if ends and start <= ends[-1]:
+                if end > ends[-1]:
+                    ends[-1] = end
+                continue
+            starts.append(start)
+            ends.append(end)
+        self._starts = starts
+        self._ends = ends
+
+        # Vao livre depois de cada bloco; o ultimo e ilimitado.
+        gaps = [(starts[i + 1] - ends[i]).total_seconds() for i in range(len(starts) - 1)]
+        gaps.append(math.inf)
+        size = 1
+        while size < len(gaps):
+            size *= 2
+        tree = [-math.inf] * (2 * size)
+        tree[size:size + len(gaps)] = gaps
+        for node in range(size - 1, 0, -1):
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+        self._size = size
+        self._tree = tree
+
+    def extend(self, until: datetime) -> None:
+        """Load busy intervals up to ``until`` (at least doubling the window)."""
+        if self._loader is None or self.window_end is None or until <= self.window_end:
+            return
+        span = self.window_end - self.window_start if self.window_start is not None else timedelta(0)
+        new_end = max(until, self.window_end + span)
+        self._intervals.extend(self._loader(self.window_end, new_end))
+        self.window_end = new_end
+        self._build()
+
+    # -------------------------------------------------------------------------
+    # Consultas
+    # -------------------------------------------------------------------------
+
+    def _block_at(self, start: datetime, end: datetime) -> int | None:
+        """Index of the merged block overlapping ``[start, end)``, if any."""
+        candidate = bisect_left(self._starts, end) - 1
+        if candidate >= 0 and self._ends[candidate] > start:
+            return candidate
+        return None
+
+    def _first_gap(self, node: int, left: int, right: int, lo: int, need: float) -> int | None:
+        """First block ``>= lo`` followed by a free gap of at least ``need`` seconds."""
+        if right <= lo or self._tree[node] < need:
+            return None
+        if right - left == 1:
+            return left
+        mid = (left + right) // 2
+        found = self._first_gap(2 * node, left, mid, lo, need)
+        if found is None:
+            found = self._first_gap(2 * node + 1, mid, right, lo, need)
+        return found
+
+    def overlaps(self, start: datetime, end: datetime) -> bool:
+        """Whether ``[start, end)`` conflicts with a busy interval."""
+        self.extend(end)
+        return self._block_at(start, end) is not None
+
+    def next_free(self, start: datetime, duration: timedelta) -> datetime:
+        """Earliest start ``>= start`` where ``duration`` fits without conflicts."""
+        while True:
+            block = self._block_at(start, start + duration)
+            if block is not None:
+                block = self._first_gap(1, 0, self._size, block, duration.total_seconds())
+                start = self._ends[block]
+            if self._loader is None or self.window_end is None or start + duration <= self.window_end:
+                return start
+            self.extend(start + duration)
@@ -0,0 +1,226 @@
+"""
+Criacao em segundo plano das ocorrencias de uma serie de reunioes.
+
+``create_meeting_and_event`` grava a primeira reuniao na hora, checa as
+demais ocorrencias contra conflitos e entrega as livres a um job em segundo
+plano. O job cria os eventos no Google em lotes de ate 50 por requisicao
+(``create_events_batch``) e grava as linhas de ``Reuniao`` a cada lote, em
+vez de uma chamada serial por data dentro da requisicao do usuario.
+
+O progresso fica no cache compartilhado (todos os workers enxergam) e a tela
+consulta ``/reuniao/serie/<job_id>/status`` ate o job terminar.
+
+Uso:
+    from app.services.meeting_series import SeriesSpec, get_series_job, start_series_job
+
+    job = start_series_job(spec)
+    get_series_job(job.job_id).as_dict()  # {"status": "running", "created": 50, ...}
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from typing import Any
+from uuid import uuid4
+
+from app import db
+from app.extensions.cache import cache
+from app.models.tables import (
+    Reuniao,
+    ReuniaoParticipante,
+    ReuniaoRecorrenciaTipo,
+    ReuniaoStatus,
+    User,
+    sao_paulo_now_naive,
+)
+from app.services.background import submit_background_job
+from app.services.calendar_mirror import mark_mirror_dirty
+from app.services.google_calendar import (
+    BATCH_MAX_REQUESTS,
+    create_events_batch,
+    delete_events_batch,
+)
+
+logger = logging.getLogger(__name__)
+
+JOB_CACHE_PREFIX = "meeting_series_job:"
+JOB_TTL_SECONDS = 6 * 3600
+# Datas com falha guardadas no job (a tela mostra so as primeiras).
+MAX_REPORTED_FAILURES = 20
+
+
+# =============================================================================
+# ESTADO DO JOB
+# =============================================================================
+
+@dataclass
+class SeriesSpec:
+    """Everything the job needs to create the remaining occurrences."""
+
+    subject: str
+    description: str | None
+    calendar_description: str
+    occurrences: list[tuple[datetime, datetime]]
+    participant_ids: list[int]
+    participant_emails: list[str]
+    create_meet: bool
+    notify_attendees: bool
+    user_id: int
+    course_id: int | None
+    group_id: str
+    recorrencia_tipo: ReuniaoRecorrenciaTipo
+    recorrencia_fim: date | None
+    recorrencia_dias_semana: str | None
+    meet_settings: dict[str, bool]
+
+
+@dataclass
+class SeriesJob:
+    """Progress of one series creation, as stored in the cache."""
+
+    job_id: str
+    group_id: str
+    user_id: int
+    total: int
+    status: str = "queued"
+    created: int = 0
+    failed: int = 0
+    batches: int = 0
+    failed_dates: list[str] = field(default_factory=list)
+    meet_link: str | None = None
+    error: str | None = None
+    started_at: str | None = None
+    finished_at: str | None = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed")
+
+    def as_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["finished"] = self.finished
+        return data
+
+
+def _save(job: SeriesJob) -> None:
+    cache.set(JOB_CACHE_PREFIX + job.job_id, asdict(job), timeout=JOB_TTL_SECONDS)
+
+
+def get_series_job(job_id: str) -> SeriesJob | None:
+    data = cache.get(JOB_CACHE_PREFIX + job_id)
+    return SeriesJob(**data) if data else None
+
+
+def start_series_job(spec: SeriesSpec) -> SeriesJob:
+    """Register the job and queue it on the background executor."""
+    job = SeriesJob(
+        job_id=uuid4().hex,
+        group_id=spec.group_id,
+        user_id=spec.user_id,
+        total=len(spec.occurrences),
+    )
+    _save(job)
+    submit_background_job(run_series_job, job.job_id, spec)
+    return job
+
+
+# =============================================================================
+# EXECUCAO
+# =============================================================================
+
+def _create_chunk(
+    spec: SeriesSpec,
+    chunk: list[tuple[datetime, datetime]],
+    users: list[User],
+    job: SeriesJob,
+) -> None:
+    results = create_events_batch(
+        chunk,
+        spec.subject,
+        spec.calendar_description,
+        spec.participant_emails,
+        with_meet=spec.create_meet,
+        notify_attendees=spec.notify_attendees,
+        # Ids derivados da serie: reenvios do mesmo horario nao duplicam eventos.
+        id_seed=spec.group_id,
+    )
+    meetings: list[Reuniao] = []
+    for (start, end), outcome in zip(chunk, results):
+        if not isinstance(outcome, dict):
+            job.failed += 1
+            if len(job.failed_dates) < MAX_REPORTED_FAILURES:
+                job.failed_dates.append(start.strftime("%d/%m/%Y"))
+            logger.warning("Ocorrencia %s da serie %s nao criada: %s", start, spec.group_id, outcome)
+            continue
+        meet_link = outcome.get("hangoutLink")
+        meeting = Reuniao(
+            inicio=start,
+            fim=end,
+            assunto=spec.subject,
+            descricao=spec.description,
+            status=ReuniaoStatus.AGENDADA,
+            meet_link=meet_link,
+            google_event_id=outcome["id"],
+            criador_id=spec.user_id,
+            course_id=spec.course_id,
+            recorrencia_tipo=spec.recorrencia_tipo,
+            recorrencia_fim=spec.recorrencia_fim,
+            recorrencia_grupo_id=spec.group_id,
+            recorrencia_dias_semana=spec.recorrencia_dias_semana,
+        )
+        meeting.meet_host_id = spec.user_id
+        meeting.meet_settings = dict(spec.meet_settings)
+        meetings.append(meeting)
+        if meet_link and not job.meet_link:
+            job.meet_link = meet_link
+
+    try:
+        db.session.add_all(meetings)
+        db.session.flush()
+        db.session.add_all(
+            ReuniaoParticipante(
+                reuniao_id=meeting.id,
+                id_usuario=user.id,
+                username_usuario=user.username,
+            )
+            for meeting in meetings
+            for user in users
+        )
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        # O Google ja aceitou os eventos: sem as reunioes locais ficariam orfaos.
+        delete_events_batch([meeting.google_event_id for meeting in meetings])
+        raise
+    job.created += len(meetings)
+    job.batches += 1
+
+
+def run_series_job(job_id: str, spec: SeriesSpec) -> SeriesJob:
+    """Create the occurrences batch by batch, saving progress after each one."""
+    job = get_series_job(job_id) or SeriesJob(
+        job_id=job_id, group_id=spec.group_id, user_id=spec.user_id, total=len(spec.occurrences)
+    )
+    job.status = "running"
+    job.started_at = sao_paulo_now_naive().isoformat()
+    _save(job)
+
+    try:
+        users = User.query.filter(User.id.in_(spec.participant_ids)).all() if spec.participant_ids else []
+        for offset in range(0, len(spec.occurrences), BATCH_MAX_REQUESTS):
+            _create_chunk(spec, spec.occurrences[offset:offset + BATCH_MAX_REQUESTS], users, job)
+            _save(job)
+        job.status = "done"
+    except Exception as exc:
+        db.session.rollback()
+        logger.exception("Falha ao criar a serie de reunioes %s", spec.group_id)
+        job.status = "failed"
+        job.error = str(exc)
+    finally:
+        job.finished_at = sao_paulo_now_naive().isoformat()
+        _save(job)
+        if job.created:
+            mark_mirror_dirty()
+    return job
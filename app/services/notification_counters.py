@@ -0,0 +1,171 @@
+"""
+Contadores denormalizados de notificacoes nao lidas.
+
+``user_notification_counters`` guarda uma linha por usuario, mantida na
+mesma transacao das gravacoes em ``task_notifications``:
+
+- insercoes/atualizacoes/remocoes via ORM: eventos do mapper em
+  ``app.models.tables``;
+- operacoes em massa (``Query.update``/``Query.delete``) nao disparam
+  eventos e devem ser executadas pelos helpers deste modulo, que descontam
+  do contador exatamente as linhas que o UPDATE/DELETE alterou (rowcount
+  por usuario), sem ler a contagem antes: chamadas concorrentes nao
+  descontam a mesma notificacao duas vezes.
+
+O badge passa a ser uma leitura por chave primaria.
+
+Uso:
+    from app.services.notification_counters import get_unread_count
+
+    unread = get_unread_count(current_user.id)
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from typing import Iterable
+
+import sqlalchemy as sa
+
+from app import db
+from app.models.tables import (
+    TaskNotification,
+    User,
+    UserNotificationCounter,
+    apply_unread_notification_delta,
+    sao_paulo_now_naive,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def get_unread_count(user_id: int) -> int:
+    """Return the unread badge for ``user_id`` (primary-key lookup).
+
+    The migration seeds a row per user and the first notification upserts
+    it; a user still without a row falls back to a plain COUNT. The getter
+    never writes, so it does not commit the caller's session nor race
+    concurrent first reads on the primary key.
+    """
+    unread = db.session.execute(
+        sa.select(UserNotificationCounter.unread_count).where(
+            UserNotificationCounter.user_id == user_id
+        )
+    ).scalar_one_or_none()
+    if unread is not None:
+        return int(unread)
+
+    unread = db.session.execute(
+        sa.select(sa.func.count(TaskNotification.id)).where(
+            TaskNotification.user_id == user_id,
+            TaskNotification.read_at.is_(None),
+        )
+    ).scalar()
+    return int(unread or 0)
+
+
+def add_unread_notifications(user_ids: Iterable[int]) -> None:
+    """Count notifications inserted in bulk (one entry per notification)."""
+    connection = db.session.connection()
+    for user_id, quantity in Counter(user_ids).items():
+        apply_unread_notification_delta(connection, user_id, quantity)
+
+
+def _unread_user_ids(query) -> list[int]:
+    return [
+        user_id
+        for (user_id,) in query.filter(TaskNotification.read_at.is_(None))
+        .with_entities(TaskNotification.user_id)
+        .distinct()
+        .order_by(None)
+    ]
+
+
+def mark_notifications_read(query, read_at) -> int:
+    """Mark the unread rows matched by ``query`` as read and discount them.
+
+    Runs one UPDATE per user guarded by ``read_at IS NULL`` and discounts
+    its rowcount, so rows another transaction already marked are not
+    discounted again. Does not commit. Returns the number of rows updated.
+    """
+    connection = db.session.connection()
+    updated = 0
+    for user_id in _unread_user_ids(query):
+        changed = query.filter(
+            TaskNotification.user_id == user_id,
+            TaskNotification.read_at.is_(None),
+        ).update({TaskNotification.read_at: read_at}, synchronize_session=False)
+        apply_unread_notification_delta(connection, user_id, -changed)
+        updated += changed
+    return updated
+
+
+def delete_notifications(query) -> int:
+    """Delete the rows matched by ``query``, discounting the unread ones.
+
+    Unread rows are deleted per user and discounted by rowcount; the read
+    rows left are removed in a single statement. Does not commit. Returns
+    the number of rows deleted.
+    """
+    connection = db.session.connection()
+    deleted = 0
+    for user_id in _unread_user_ids(query):
+        changed = query.filter(
+            TaskNotification.user_id == user_id,
+            TaskNotification.read_at.is_(None),
+        ).delete(synchronize_session=False)
+        apply_unread_notification_delta(connection, user_id, -changed)
+        deleted += changed
+    return deleted + query.delete(synchronize_session=False)
+
+
+def repair_notification_counters(user_ids: Iterable[int] | None = None) -> dict[int, int]:
+    """Recompute counters from ``task_notifications`` and commit.
+
+    Args:
+        user_ids: restrict the repair to these users (default: every user)
+
+    Returns:
+        Mapping ``user_id -> unread`` for the repaired users.
+    """
+    selected = list(user_ids) if user_ids is not None else None
+
+    counts_query = (
+        db.session.query(TaskNotification.user_id, sa.func.count(TaskNotification.id))
+        .filter(TaskNotification.read_at.is_(None))
+        .group_by(TaskNotification.user_id)
+    )
+    if selected is not None:
+        counts_query = counts_query.filter(TaskNotification.user_id.in_(selected))
+    unread_by_user = {user_id: int(quantity) for user_id, quantity in counts_query.all()}
+
+    if selected is None:
+        selected = [user_id for (user_id,) in db.session.query(User.id).all()]
+
+    existing = {
+        row.user_id: row
+        for row in UserNotificationCounter.query.filter(
+            UserNotificationCounter.user_id.in_(selected)
+        )
+    } if selected else {}
+
+    now = sao_paulo_now_naive()
+    result: dict[int, int] = {}
+    for user_id in selected:
+        unread = unread_by_user.get(user_id, 0)
+        row = existing.get(user_id)
+        if row is None:
+            db.session.add(
+                UserNotificationCounter(user_id=user_id, unread_count=unread, updated_at=now)
+            )
+        elif row.unread_count != unread:
+            logger.info(
+                "Contador de notificacoes corrigido",
+                extra={"user_id": user_id, "from": row.unread_count, "to": unread},
+            )
+            row.unread_count = unread
+        result[user_id] = unread
+
+    db.session.commit()
+    return result
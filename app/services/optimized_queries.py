@@ -31,6 +31,10 @@ from app.models.tables import (
     Task,
     User,
 )
+from app.services.inventario_files import (
+    count_inventario_files_by_empresa_ids,
+    json_fallback_enabled,
+)
 
 
 # =============================================================================
@@ -265,6 +269,10 @@ def get_inventario_file_counts_by_empresa_ids(empresa_ids: List[int]) -> dict[in
     """
     Retorna metadados de anexos do inventário sem carregar payload base64.
 
+    As contagens vêm de um GROUP BY em ``tbl_inventario_files``. Enquanto
+    ``INVENTARIO_FILES_JSON_FALLBACK`` estiver ligado, somam-se as entradas
+    ainda não migradas das colunas JSON (``json_length``).
+
     Return:
         {
             empresa_id: {
@@ -278,6 +286,32 @@ def get_inventario_file_counts_by_empresa_ids(empresa_ids: List[int]) -> dict[in
     if not empresa_ids:
         return {}
 
+    counts: dict[int, dict[str, int | bool]] = {}
+
+    def bucket(empresa_id) -> dict[str, int | bool]:
+        return counts.setdefault(
+            int(empresa_id),
+            {"cfop": 0, "cfop_consolidado": 0, "cliente": 0, "cliente_legacy": False},
+        )
+
+    for empresa_id, by_category in count_inventario_files_by_empresa_ids(empresa_ids).items():
+        entry = bucket(empresa_id)
+        for category, total in by_category.items():
+            key = category.replace("-", "_")
+            if key in entry:
+                entry[key] += total
+
+    if not json_fallback_enabled():
+        rows = (
+            db.session.query(Inventario.empresa_id)
+            .filter(Inventario.empresa_id.in_(empresa_ids))
+            .filter(Inventario.cliente_pdf_path.isnot(None), Inventario.cliente_pdf_path != "")
+            .all()
+        )
+        for row in rows:
+            bucket(row.empresa_id)["cliente_legacy"] = True
+        return counts
+
     try:
         rows = (
             db.session.query(
@@ -292,15 +326,10 @@ def get_inventario_file_counts_by_empresa_ids(empresa_ids: List[int]) -> dict[in
             .filter(Inventario.empresa_id.in_(empresa_ids))
             .all()
         )
-        return {
-            int(row.empresa_id): {
-                "cfop": int(row.cfop or 0),
-                "cfop_consolidado": int(row.cfop_consolidado or 0),
-                "cliente": int(row.cliente or 0),
-                "cliente_legacy": bool(row.cliente_pdf_path),
-            }
+        legacy = [
+            (row.empresa_id, int(row.cfop or 0), int(row.cfop_consolidado or 0), int(row.cliente or 0), row.cliente_pdf_path)
             for row in rows
-        }
+        ]
     except SQLAlchemyError:
         # Fallback para bancos sem json_length: calcula no Python.
         # AVISO: Isso pode ser lento se as colunas JSON contiverem dados Base64 pesados.
@@ -308,25 +337,34 @@ def get_inventario_file_counts_by_empresa_ids(empresa_ids: List[int]) -> dict[in
         inventarios = (
             Inventario.query.options(
                 load_only(
-                    "empresa_id",
-                    "cfop_files",
-                    "cfop_consolidado_files",
-                    "cliente_files",
-                    "cliente_pdf_path",
+                    Inventario.empresa_id,
+                    Inventario.cfop_files,
+                    Inventario.cfop_consolidado_files,
+                    Inventario.cliente_files,
+                    Inventario.cliente_pdf_path,
                 )
             )
             .filter(Inventario.empresa_id.in_(empresa_ids))
             .all()
         )
-        return {
-            int(inv.empresa_id): {
-                "cfop": len(inv.cfop_files or []) if isinstance(inv.cfop_files, list) else 0,
-                "cfop_consolidado": len(inv.cfop_consolidado_files or []) if isinstance(inv.cfop_consolidado_files, list) else 0,
-                "cliente": len(inv.cliente_files or []) if isinstance(inv.cliente_files, list) else 0,
-                "cliente_legacy": bool(inv.cliente_pdf_path),
-            }
+        legacy = [
+            (
+                inv.empresa_id,
+                len(inv.cfop_files) if isinstance(inv.cfop_files, list) else 0,
+                len(inv.cfop_consolidado_files) if isinstance(inv.cfop_consolidado_files, list) else 0,
+                len(inv.cliente_files) if isinstance(inv.cliente_files, list) else 0,
+                inv.cliente_pdf_path,
+            )
             for inv in inventarios
-        }
+        ]
+
+    for empresa_id, cfop, cfop_consolidado, cliente, cliente_pdf_path in legacy:
+        entry = bucket(empresa_id)
+        entry["cfop"] += cfop
+        entry["cfop_consolidado"] += cfop_consolidado
+        entry["cliente"] += cliente
+        entry["cliente_legacy"] = bool(cliente_pdf_path)
+    return counts
 
 
 # =============================================================================
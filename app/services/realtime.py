@@ -301,6 +301,28 @@ def broadcast_task_updated(
     )
 
 
+def broadcast_tasks_bulk_updated(
+    operation: str,
+    items: List[Dict[str, Any]],
+    user_id: Optional[int] = None,
+    exclude_user: Optional[int] = None,
+) -> None:
+    """Broadcast one aggregated event for a bulk task operation.
+
+    Each item carries ``id``, ``old_status``, ``new_status`` and ``task``.
+    """
+
+    if not items:
+        return
+    _broadcaster.broadcast(
+        event_type="tasks:bulk_updated",
+        data={"operation": operation, "items": items},
+        user_id=user_id,
+        scope="tasks",
+        exclude_user=exclude_user,
+    )
+
+
 def broadcast_task_response_created(
     task_id: int,
     response_data: Dict[str, Any],
@@ -330,3 +352,16 @@ def broadcast_task_response_created(
         )
 
 
+def broadcast_meetings_status_changed(items: List[Dict[str, Any]]) -> None:
+    """Broadcast that meeting room statuses moved with the clock.
+
+    Each item carries ``id``, ``old_status`` and ``new_status``.
+    """
+
+    if not items:
+        return
+    _broadcaster.broadcast(
+        event_type="meetings:status_changed",
+        data={"items": items},
+        scope="calendar",
+    )
@@ -0,0 +1,529 @@
+"""
+Rollups diarios dos relatorios administrativos.
+
+Os relatorios de empresas, fiscal, contabil e usuarios agregavam tabelas
+transacionais a cada acesso. Este modulo guarda, por relatorio, um agregado
+por valor de cada dimensao exibida (``report_rollup_groups``): a contagem e
+os ids das entidades do grupo (e, so onde a tela lista entidades, os campos
+exibidos). O scheduler atualiza os agregados a partir de marcas d'agua de
+``updated_at`` (``report_rollup_watermarks``).
+
+As views leem os grupos (dezenas de linhas) e sobrepoem ao vivo apenas as
+entidades alteradas depois da ultima atualizacao (na pratica, o dia
+corrente): cada tabela de origem e consultada com um unico predicado
+``updated_at >= marca`` indexado, e so as entidades encontradas sao relidas.
+
+Uso:
+    from app.services.report_rollups import load_report_groups
+
+    groups = load_report_groups("empresas")
+    groups["tributacao"]["Simples Nacional"].count
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Iterable
+
+import sqlalchemy as sa
+
+from app import db
+from app.extensions.db_routing import read_replica
+from app.models.tables import (
+    Departamento,
+    Empresa,
+    ReportRollupGroup,
+    ReportRollupWatermark,
+    User,
+    sao_paulo_now_naive,
+)
+
+logger = logging.getLogger(__name__)
+
+# Entidades alteradas relidas por consulta (clausula IN).
+OVERLAY_BATCH_SIZE = 500
+
+# Envio de documentos que usa malote (mesma regra das views).
+MALOTE_ENVIOS = ("Fisico", "Digital e Físico")
+
+
+@dataclass
+class ReportGroup:
+    """Entities of one dimension value; ``members`` holds ``[id, detail]`` pairs."""
+
+    label: str
+    members: list[list] = field(default_factory=list)
+    position: int = 0
+
+    @property
+    def count(self) -> int:
+        return len(self.members)
+
+    @property
+    def details(self) -> list[dict]:
+        return [detail for _entity_id, detail in self.members if detail is not None]
+
+
+# dimensao -> rotulo bruto -> grupo, na ordem de primeira aparicao
+ReportGroups = dict[str, dict[str, ReportGroup]]
+
+
+@dataclass(frozen=True)
+class RollupSource:
+    """Describe how a report is aggregated.
+
+    ``build_query`` returns a query whose first column is the entity id.
+    ``id_column`` filters it by id for the overlay. ``changed_id_queries``
+    returns one query per source table, each selecting entity ids with a
+    single indexed ``updated_at`` predicate. ``groupings`` maps a row to
+    ``(dimension, label, detail)`` tuples. ``entity_row`` builds the same
+    row from a loaded ``model`` instance, or ``None`` when the instance is
+    outside the report.
+    """
+
+    key: str
+    build_query: Callable[[], Any]
+    id_column: Callable[[], Any]
+    changed_id_queries: Callable[[datetime], list]
+    groupings: Callable[[tuple], Iterable[tuple[str, str, dict | None]]]
+    model: type
+    entity_row: Callable[[Any], tuple | None]
+
+
+@dataclass
+class RollupRefreshResult:
+    report_key: str
+    full: bool = False
+    entities: int = 0
+    groups: int = 0
+    watermark: datetime | None = None
+    errors: list[str] = field(default_factory=list)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "report_key": self.report_key,
+            "full": self.full,
+            "entities": self.entities,
+            "groups": self.groups,
+            "watermark": self.watermark.isoformat() if self.watermark else None,
+            "errors": self.errors,
+        }
+
+
+# =============================================================================
+# FONTES
+# =============================================================================
+
+def _json_list(value) -> list:
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return []
+    return list(value or [])
+
+
+def _empresas_query():
+    return Empresa.query.with_entities(
+        Empresa.id,
+        Empresa.nome_empresa,
+        Empresa.cnpj,
+        Empresa.codigo_empresa,
+        Empresa.tributacao,
+        Empresa.sistema_utilizado,
+    )
+
+
+def _empresa_row(empresa):
+    return (
+        empresa.id,
+        empresa.nome_empresa,
+        empresa.cnpj,
+        empresa.codigo_empresa,
+        empresa.tributacao,
+        empresa.sistema_utilizado,
+    )
+
+
+def _empresas_groupings(row):
+    _eid, nome, cnpj, codigo, tributacao, sistema = row
+    # A tela lista as empresas por regime; as demais dimensoes so contam
+    yield "tributacao", tributacao or "", {"nome": nome, "cnpj": cnpj, "codigo": codigo}
+    yield "sistema", (sistema or "").strip(), None
+
+
+def _departamento_query(tipo: str, *columns):
+    return (
+        Departamento.query.filter_by(tipo=tipo)
+        .join(Empresa)
+        .with_entities(Departamento.id, *columns)
+    )
+
+
+def _fiscal_query():
+    return _departamento_query(
+        "Departamento Fiscal",
+        Departamento.formas_importacao,
+        Departamento.forma_movimento,
+        Departamento.malote_coleta,
+    )
+
+
+def _fiscal_row(departamento):
+    if departamento.tipo != "Departamento Fiscal":
+        return None
+    return (
+        departamento.id,
+        departamento.formas_importacao,
+        departamento.forma_movimento,
+        departamento.malote_coleta,
+    )
+
+
+def _fiscal_groupings(row):
+    _departamento_id, formas, envio, malote = row
+    for forma in _json_list(formas):
+        yield "importacao", str(forma), None
+    yield "envio", envio or "", None
+    if envio in MALOTE_ENVIOS:
+        yield "malote", malote or "", None
+
+
+def _contabil_query():
+    return _departamento_query(
+        "Departamento Contábil",
+        Departamento.metodo_importacao,
+        Departamento.forma_movimento,
+        Departamento.malote_coleta,
+        Departamento.controle_relatorios,
+    )
+
+
+def _contabil_row(departamento):
+    if departamento.tipo != "Departamento Contábil":
+        return None
+    return (
+        departamento.id,
+        departamento.metodo_importacao,
+        departamento.forma_movimento,
+        departamento.malote_coleta,
+        departamento.controle_relatorios,
+    )
+
+
+def _contabil_groupings(row):
+    _departamento_id, metodos, envio, malote, relatorios = row
+    for metodo in _json_list(metodos):
+        yield "importacao", str(metodo), None
+    yield "envio", envio or "", None
+    if envio in MALOTE_ENVIOS:
+        yield "malote", malote or "", None
+    for relatorio in _json_list(relatorios):
+        yield "relatorios", str(relatorio), None
+
+
+def _departamentos_changed(since: datetime) -> list:
+    # Departamento alterado, ou da empresa alterada (nome/codigo aparecem no join).
+    return [
+        db.session.query(Departamento.id).filter(Departamento.updated_at >= since),
+        db.session.query(Departamento.id)
+        .join(Empresa, Empresa.id == Departamento.empresa_id)
+        .filter(Empresa.updated_at >= since),
+    ]
+
+
+def _usuarios_query():
+    return User.query.with_entities(User.id, User.role, User.ativo)
+
+
+def _usuarios_groupings(row):
+    _user_id, role, ativo = row
+    tipo = "Admin" if role == "admin" else "Usuário"
+    status = "Ativo" if ativo else "Inativo"
+    yield "perfil", f"{tipo} {status}", None
+
+
+ROLLUP_SOURCES: dict[str, RollupSource] = {
+    "empresas": RollupSource(
+        "empresas",
+        _empresas_query,
+        lambda: Empresa.id,
+        lambda since: [db.session.query(Empresa.id).filter(Empresa.updated_at >= since)],
+        _empresas_groupings,
+        Empresa,
+        _empresa_row,
+    ),
+    "fiscal": RollupSource(
+        "fiscal",
+        _fiscal_query,
+        lambda: Departamento.id,
+        _departamentos_changed,
+        _fiscal_groupings,
+        Departamento,
+        _fiscal_row,
+    ),
+    "contabil": RollupSource(
+        "contabil",
+        _contabil_query,
+        lambda: Departamento.id,
+        _departamentos_changed,
+        _contabil_groupings,
+        Departamento,
+        _contabil_row,
+    ),
+    "usuarios": RollupSource(
+        "usuarios",
+        _usuarios_query,
+        lambda: User.id,
+        lambda since: [db.session.query(User.id).filter(User.updated_at >= since)],
+        _usuarios_groupings,
+        User,
+        lambda user: (user.id, user.role, user.ativo),
+    ),
+}
+
+
+# =============================================================================
+# AGREGACAO
+# =============================================================================
+
+def _add_rows(groups: ReportGroups, source: RollupSource, rows: Iterable[tuple]) -> int:
+    total = 0
+    for row in rows:
+        total += 1
+        for dimension, label, detail in source.groupings(tuple(row)):
+            labels = groups.setdefault(dimension, {})
+            group = labels.get(label)
+            if group is None:
+                group = labels[label] = ReportGroup(label=label, position=len(labels))
+            group.members.append([row[0], detail])
+    return total
+
+
+def _changed_ids(source: RollupSource, since: datetime) -> set[int]:
+    changed: set[int] = set()
+    for query in source.changed_id_queries(since):
+        changed.update(entity_id for (entity_id,) in query.all())
+    return changed
+
+
+def _overlay(groups: ReportGroups, source: RollupSource, since: datetime) -> int:
+    """Replace the contribution of entities changed since ``since`` with live rows.
+
+    Idempotent: each changed entity leaves every group and is re-added from
+    its current row, or stays out when it left the report filter.
+    """
+    changed = _changed_ids(source, since)
+    if not changed:
+        return 0
+    for labels in groups.values():
+        for label in list(labels):
+            group = labels[label]
+            group.members = [member for member in group.members if member[0] not in changed]
+            if not group.members:
+                del labels[label]
+
+    ids = sorted(changed)
+    for start in range(0, len(ids), OVERLAY_BATCH_SIZE):
+        batch = ids[start:start + OVERLAY_BATCH_SIZE]
+        _add_rows(groups, source, source.build_query().filter(source.id_column().in_(batch)))
+    return len(changed)
+
+
+def _load_stored_groups(report_key: str) -> ReportGroups:
+    groups: ReportGroups = {}
+    rows = (
+        db.session.query(
+            ReportRollupGroup.dimension,
+            ReportRollupGroup.label,
+            ReportRollupGroup.position,
+            ReportRollupGroup.members,
+        )
+        .filter(ReportRollupGroup.report_key == report_key)
+        .order_by(ReportRollupGroup.dimension, ReportRollupGroup.position)
+    )
+    for dimension, label, position, members in rows:
+        groups.setdefault(dimension, {})[label] = ReportGroup(
+            label=label, members=list(members or []), position=position
+        )
+    return groups
+
+
+# =============================================================================
+# LEITURA
+# =============================================================================
+
+@read_replica
+def load_report_groups(report_key: str) -> ReportGroups:
+    """Return the report aggregates: stored groups plus today's live deltas.
+
+    Falls back to aggregating the live query while the rollup has never been
+    built.
+    """
+    source = ROLLUP_SOURCES[report_key]
+    mark = db.session.get(ReportRollupWatermark, report_key)
+    if mark is None or mark.watermark is None:
+        groups: ReportGroups = {}
+        _add_rows(groups, source, source.build_query())
+        return groups
+
+    groups = _load_stored_groups(report_key)
+    _overlay(groups, source, mark.watermark)
+    return groups
+
+
+# =============================================================================
+# ATUALIZACAO
+# =============================================================================
+
+def _store_groups(report_key: str, groups: ReportGroups, refreshed_at: datetime) -> int:
+    existing = {
+        (row.dimension, row.label): row
+        for row in ReportRollupGroup.query.filter(ReportRollupGroup.report_key == report_key)
+    }
+    stored = 0
+    for dimension, labels in groups.items():
+        for position, group in enumerate(labels.values()):
+            row = existing.pop((dimension, group.label), None)
+            if row is None:
+                row = ReportRollupGroup(report_key=report_key, dimension=dimension, label=group.label)
+                db.session.add(row)
+            row.position = position
+            row.members = group.members
+            row.entity_count = group.count
+            row.snapshot_date = refreshed_at.date()
+            row.refreshed_at = refreshed_at
+            stored += 1
+    for row in existing.values():
+        db.session.delete(row)
+    return stored
+
+
+def refresh_report_rollup(report_key: str, *, full: bool = False) -> RollupRefreshResult:
+    """Refresh one rollup; incremental unless ``full`` or never built."""
+    source = ROLLUP_SOURCES[report_key]
+    # A marca e capturada antes da leitura: alteracoes concorrentes ficam
+    # com updated_at posterior e sao sobrepostas ao vivo ate a proxima rodada.
+    started_at = sao_paulo_now_naive()
+    mark = db.session.get(ReportRollupWatermark, report_key)
+    if mark is None:
+        mark = ReportRollupWatermark(report_key=report_key)
+        db.session.add(mark)
+    full = full or mark.watermark is None
+    result = RollupRefreshResult(report_key=report_key, full=full)
+
+    if full:
+        groups: ReportGroups = {}
+        result.entities = _add_rows(groups, source, source.build_query())
+    else:
+        groups = _load_stored_groups(report_key)
+        result.entities = _overlay(groups, source, mark.watermark)
+
+    result.groups = _store_groups(report_key, groups, started_at)
+    mark.watermark = started_at
+    mark.refreshed_at = started_at
+    if full:
+        mark.last_full_refresh_at = started_at
+    mark.row_count = result.groups
+    db.session.commit()
+
+    result.watermark = started_at
+    return result
+
+
+# =============================================================================
+# REMOCAO
+# =============================================================================
+
+def _changed_since_refresh(entity, watermark: datetime) -> bool:
+    updated_at = getattr(entity, "updated_at", None)
+    return updated_at is None or updated_at >= watermark or sa.inspect(entity).modified
+
+
+def discard_report_rollup_entities(connection, entities: Iterable[Any]) -> int:
+    """Remove deleted entities from the stored groups; does not commit.
+
+    ``Query.delete`` skips the mapper events, so bulk delete paths call this
+    with the loaded entities before deleting them; ORM deletes go through
+    the ``after_delete`` listener. Only the reports of each model and the
+    groups its current row maps to are rewritten. An entity changed after
+    the watermark may still sit under an older label, so its report is
+    scanned whole. Returns the number of groups rewritten.
+    """
+    targets: dict[str, tuple[set[int], set[tuple[str, str]], list]] = {}
+    for entity in entities:
+        for source in ROLLUP_SOURCES.values():
+            if isinstance(entity, source.model):
+                ids, _labels, pending = targets.setdefault(source.key, (set(), set(), []))
+                ids.add(entity.id)
+                pending.append(entity)
+    if not targets:
+        return 0
+
+    marks_table = ReportRollupWatermark.__table__
+    watermarks = dict(
+        connection.execute(
+            sa.select(marks_table.c.report_key, marks_table.c.watermark).where(
+                marks_table.c.report_key.in_(list(targets))
+            )
+        ).all()
+    )
+
+    table = ReportRollupGroup.__table__
+    rewritten = 0
+    for report_key, (ids, labels, pending) in targets.items():
+        watermark = watermarks.get(report_key)
+        if watermark is None:
+            continue
+        source = ROLLUP_SOURCES[report_key]
+        scan_all = False
+        for entity in pending:
+            if _changed_since_refresh(entity, watermark):
+                scan_all = True
+                break
+            row = source.entity_row(entity)
+            if row is not None:
+                labels.update((dimension, label) for dimension, label, _detail in source.groupings(row))
+        if not scan_all and not labels:
+            continue
+
+        query = sa.select(table.c.id, table.c.dimension, table.c.label, table.c.members).where(
+            table.c.report_key == report_key
+        )
+        if not scan_all:
+            query = query.where(
+                table.c.dimension.in_({dimension for dimension, _label in labels}),
+                table.c.label.in_({label for _dimension, label in labels}),
+            )
+        for group_id, dimension, label, members in connection.execute(query).all():
+            if not scan_all and (dimension, label) not in labels:
+                continue
+            kept = [member for member in members or [] if member[0] not in ids]
+            if len(kept) == len(members or []):
+                continue
+            if kept:
+                connection.execute(
+                    table.update()
+                    .where(table.c.id == group_id)
+                    .values(members=kept, entity_count=len(kept))
+                )
+            else:
+                connection.execute(table.delete().where(table.c.id == group_id))
+            rewritten += 1
+    return rewritten
+
+
+def refresh_report_rollups(*, full: bool = False) -> list[RollupRefreshResult]:
+    """Refresh every registered rollup, isolating failures per report."""
+    results: list[RollupRefreshResult] = []
+    for report_key in ROLLUP_SOURCES:
+        try:
+            results.append(refresh_report_rollup(report_key, full=full))
+        except Exception as exc:
+            db.session.rollback()
+            logger.error("Falha ao atualizar rollup %s: %s", report_key, exc, exc_info=True)
+            results.append(RollupRefreshResult(report_key=report_key, errors=[str(exc)]))
+    return results
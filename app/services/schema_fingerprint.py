@@ -0,0 +1,231 @@
+"""
+Impressao digital do schema: decide na inicializacao se ha DDL a fazer.
+
+``schema_fingerprint`` guarda o head das migracoes e um hash das colunas dos
+modelos com que o banco foi sincronizado. Na importacao do app uma consulta
+compara esses valores com o codigo; se batem, nenhuma DDL roda. Se nao batem,
+o app apenas avisa: migracoes e tabelas novas sao aplicadas pelo comando
+explicito ``python scripts/sync_schema.py``. A excecao e um banco vazio
+(SQLite local de desenvolvimento), criado direto dos modelos.
+
+Uso:
+    from app.services.schema_fingerprint import sync_schema
+
+    result = sync_schema()
+"""
+
+from __future__ import annotations
+
+import ast
+import hashlib
+import logging
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+
+import sqlalchemy as sa
+from flask import current_app
+
+from app import db
+from app.models.tables import SchemaFingerprint, sao_paulo_now_naive
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "migrations",
+)
+
+# Heads do historico antes das migracoes que saem deste modulo. Bancos sem
+# ``alembic_version`` foram mantidos pela inicializacao ate este ponto.
+LEGACY_BASE_REVISIONS = ("ab12cd34ef56", "add_task_history_clean")
+
+SYNC_COMMAND = "python scripts/sync_schema.py"
+
+_REVISION_LINE = re.compile(
+    r"^(revision|down_revision)\s*(?::[^=]+)?=\s*(.+?)\s*(?:#.*)?$", re.MULTILINE
+)
+
+
+@dataclass(frozen=True)
+class SchemaState:
+    migration_head: str
+    columns_hash: str
+
+    def as_dict(self) -> dict[str, str]:
+        return {"migration_head": self.migration_head, "columns_hash": self.columns_hash}
+
+
+@dataclass
+class SchemaSyncResult:
+    mode: str
+    state: SchemaState
+    created_tables: list[str]
+
+    def as_dict(self) -> dict[str, object]:
+        return {"mode": self.mode, "created_tables": self.created_tables, **self.state.as_dict()}
+
+
+# =============================================================================
+# IMPRESSAO DIGITAL ESPERADA
+# =============================================================================
+
+@lru_cache(maxsize=1)
+def migration_head() -> str:
+    """Return the migration head(s) of the code, comma separated.
+
+    Reads the ``revision``/``down_revision`` lines instead of loading every
+    script through Alembic, which costs about half a second on startup.
+    """
+    versions_dir = os.path.join(MIGRATIONS_DIR, "versions")
+    revisions: set[str] = set()
+    parents: set[str] = set()
+    for name in os.listdir(versions_dir):
+        if not name.endswith(".py"):
+            continue
+        with open(os.path.join(versions_dir, name), encoding="utf-8") as handle:
+            source = handle.read()
+        for key, raw_value in _REVISION_LINE.findall(source):
+            value = ast.literal_eval(raw_value)
+            if key == "revision":
+                revisions.add(value)
+            elif isinstance(value, str):
+                parents.add(value)
+            elif value:
+                parents.update(value)
+    return ",".join(sorted(revisions - parents))
+
+
+def columns_hash() -> str:
+    """Hash tables, columns (type, length, nullability) and indexes of the models."""
+    digest = hashlib.sha256()
+    for table_name, table in sorted(db.metadata.tables.items()):
+        digest.update(f"T:{table_name}\n".encode())
+        for column in sorted(table.columns, key=lambda item: item.name):
+            column_type = type(column.type).__name__
+            length = getattr(column.type, "length", None)
+            digest.update(f"C:{column.name}:{column_type}:{length}:{column.nullable}\n".encode())
+        for index in sorted(table.indexes, key=lambda item: item.name or ""):
+            digest.update(f"I:{index.name}\n".encode())
+    return digest.hexdigest()
+
+
+def expected_state() -> SchemaState:
+    return SchemaState(migration_head=migration_head(), columns_hash=columns_hash())
+
+
+def stored_state(connection) -> SchemaState | None:
+    """Read the stored fingerprint; ``None`` when missing or unreadable."""
+    fingerprint = SchemaFingerprint.__table__
+    try:
+        row = connection.execute(
+            sa.select(fingerprint.c.migration_head, fingerprint.c.columns_hash).where(
+                fingerprint.c.id == 1
+            )
+        ).first()
+    except sa.exc.DBAPIError:
+        return None
+    if row is None:
+        return None
+    return SchemaState(migration_head=row[0], columns_hash=row[1])
+
+
+def _write_state(connection, state: SchemaState) -> None:
+    fingerprint = SchemaFingerprint.__table__
+    connection.execute(fingerprint.delete())
+    connection.execute(
+        fingerprint.insert().values(
+            id=1,
+            migration_head=state.migration_head,
+            columns_hash=state.columns_hash,
+            synced_at=sao_paulo_now_naive(),
+        )
+    )
+
+
+# =============================================================================
+# SINCRONIZACAO
+# =============================================================================
+
+def _stamp(connection, revision) -> None:
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    MigrationContext.configure(connection).stamp(ScriptDirectory(MIGRATIONS_DIR), revision)
+
+
+def _current_revisions(connection) -> tuple[str, ...]:
+    from alembic.runtime.migration import MigrationContext
+
+    return tuple(MigrationContext.configure(connection).get_current_heads())
+
+
+def _bootstrap_empty_database() -> SchemaSyncResult:
+    """Create an empty database straight from the models and stamp the head."""
+    state = expected_state()
+    db.create_all()
+    with db.engine.begin() as connection:
+        _stamp(connection, "heads")
+        _write_state(connection, state)
+    return SchemaSyncResult(mode="bootstrap", state=state, created_tables=sorted(db.metadata.tables))
+
+
+def sync_schema() -> SchemaSyncResult:
+    """Bring the database up to the code and record the fingerprint.
+
+    - empty database: ``create_all`` + stamp head;
+    - managed by Alembic: ``upgrade heads``, then ``create_all`` for the
+      model tables no migration creates;
+    - legacy (tables but no ``alembic_version``): stamped at
+      ``LEGACY_BASE_REVISIONS`` first, then treated as managed.
+    """
+    from flask_migrate import upgrade
+
+    inspector = sa.inspect(db.engine)
+    existing = set(inspector.get_table_names())
+    if not existing - {"alembic_version"}:
+        return _bootstrap_empty_database()
+
+    mode = "upgrade"
+    with db.engine.begin() as connection:
+        if not _current_revisions(connection):
+            _stamp(connection, LEGACY_BASE_REVISIONS)
+            mode = "legacy"
+
+    upgrade(directory=MIGRATIONS_DIR, revision="heads")
+    db.create_all()
+
+    created = sorted(set(sa.inspect(db.engine).get_table_names()) - existing)
+    state = expected_state()
+    with db.engine.begin() as connection:
+        _write_state(connection, state)
+    return SchemaSyncResult(mode=mode, state=state, created_tables=created)
+
+
+def ensure_schema_on_startup() -> bool:
+    """Compare the fingerprint in one query; return ``True`` when current.
+
+    An empty database is bootstrapped from the models; any other mismatch
+    only logs, without running DDL.
+    """
+    if not current_app.config.get("SCHEMA_STARTUP_CHECK", True):
+        return True
+    expected = expected_state()
+    with db.engine.connect() as connection:
+        stored = stored_state(connection)
+    if stored == expected:
+        return True
+
+    if stored is None and not (set(sa.inspect(db.engine).get_table_names()) - {"alembic_version"}):
+        result = _bootstrap_empty_database()
+        logger.info("Banco vazio criado a partir dos modelos: %s", result.state.as_dict())
+        return True
+
+    logger.warning(
+        "Schema do banco difere do codigo (banco: %s, codigo: %s); execute '%s'.",
+        stored.as_dict() if stored else None,
+        expected.as_dict(),
+        SYNC_COMMAND,
+    )
+    return False
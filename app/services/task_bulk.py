@@ -0,0 +1,569 @@
+"""
+Operacoes em massa sobre tarefas (mover status, reatribuir, concluir).
+
+Uma lista de IDs recebe uma unica operacao em uma unica transacao:
+
+- permissoes e existencia de todas as tarefas sao verificadas em uma consulta;
+- qualquer tarefa recusada cancela a operacao inteira (nada e gravado);
+- as alteracoes sao ``UPDATE`` por conjunto (um por grupo de efeitos);
+- historico, ``task_stats`` e contadores de notificacao sao mantidos aqui,
+  ja que ``Query.update`` nao dispara os eventos do mapper de ``Task``;
+- as notificacoes sao gravadas em lote e o tempo real recebe um evento
+  agregado (``tasks:bulk_updated``).
+
+Uso:
+    from app.services.task_bulk import BulkTaskRequest, apply_bulk_task_operation
+
+    bulk_request = BulkTaskRequest.from_payload(request.get_json())
+    result = apply_bulk_task_operation(current_user, bulk_request)
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable
+
+import sqlalchemy as sa
+from sqlalchemy.orm import joinedload
+
+from app import db
+from app.constants import PERSONAL_TAG_PREFIX
+from app.models.tables import (
+    NotificationType,
+    Tag,
+    Task,
+    TaskFollower,
+    TaskNotification,
+    TaskStatus,
+    User,
+    record_bulk_task_changes,
+    sao_paulo_now_naive,
+    user_tags,
+)
+from app.services.notification_counters import add_unread_notifications
+from app.services.task_stats import apply_task_stats_changes, snapshot_task_stats
+
+logger = logging.getLogger(__name__)
+
+BULK_TASK_OPERATIONS = ("move", "reassign", "close")
+BULK_TASK_MAX_IDS = 500
+
+# Mesmas transicoes permitidas a nao-admins em ``tasks_status``.
+_NON_ADMIN_TRANSITIONS = {
+    TaskStatus.PENDING: {TaskStatus.IN_PROGRESS},
+    TaskStatus.IN_PROGRESS: {TaskStatus.DONE, TaskStatus.PENDING},
+    TaskStatus.DONE: {TaskStatus.IN_PROGRESS},
+}
+
+
+class BulkTaskOperationError(Exception):
+    """Raised when a bulk request is invalid or any task is refused."""
+
+    HTTP_STATUS = {
+        "invalid_request": 400,
+        "invalid_operation": 400,
+        "invalid_status": 400,
+        "invalid_assignee": 400,
+        "too_many_tasks": 400,
+        "not_found": 404,
+        "forbidden": 403,
+        "invalid_transition": 403,
+    }
+
+    def __init__(self, code: str, message: str, task_ids: Iterable[int] = ()):
+        self.code = code
+        self.message = message
+        self.task_ids = sorted(set(task_ids))
+        super().__init__(message)
+
+    @property
+    def http_status(self) -> int:
+        return self.HTTP_STATUS.get(self.code, 400)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {"error": self.code, "message": self.message, "task_ids": self.task_ids}
+
+
+@dataclass
+class BulkTaskRequest:
+    """Validated bulk payload: task ids plus one operation."""
+
+    task_ids: list[int]
+    operation: str
+    status: TaskStatus | None = None
+    assignee_id: int | None = None
+
+    @classmethod
+    def from_payload(cls, payload: dict | None) -> "BulkTaskRequest":
+        payload = payload or {}
+        raw_ids = payload.get("task_ids")
+        if not isinstance(raw_ids, list) or not raw_ids:
+            raise BulkTaskOperationError("invalid_request", "Informe as tarefas (task_ids).")
+        try:
+            task_ids = list(dict.fromkeys(int(value) for value in raw_ids))
+        except (TypeError, ValueError):
+            raise BulkTaskOperationError("invalid_request", "IDs de tarefa invalidos.")
+        if len(task_ids) > BULK_TASK_MAX_IDS:
+            raise BulkTaskOperationError(
+                "too_many_tasks", f"Limite de {BULK_TASK_MAX_IDS} tarefas por operacao."
+            )
+
+        operation = (payload.get("operation") or "").strip().lower()
+        if operation not in BULK_TASK_OPERATIONS:
+            raise BulkTaskOperationError("invalid_operation", "Operacao invalida.")
+
+        status = None
+        assignee_id = None
+        if operation == "move":
+            try:
+                status = TaskStatus(payload.get("status"))
+            except ValueError:
+                raise BulkTaskOperationError("invalid_status", "Status invalido.")
+        elif operation == "close":
+            status = TaskStatus.DONE
+        else:
+            try:
+                assignee_id = int(payload.get("assignee_id"))
+            except (TypeError, ValueError):
+                assignee_id = 0
+            if assignee_id <= 0:
+                raise BulkTaskOperationError("invalid_assignee", "Selecione um colaborador valido.")
+
+        return cls(task_ids=task_ids, operation=operation, status=status, assignee_id=assignee_id)
+
+
+@dataclass
+class BulkTaskResult:
+    operation: str
+    requested: int = 0
+    updated_ids: list[int] = field(default_factory=list)
+    unchanged_ids: list[int] = field(default_factory=list)
+    notifications: int = 0
+    tasks: list[dict] = field(default_factory=list)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "success": True,
+            "operation": self.operation,
+            "requested": self.requested,
+            "updated": len(self.updated_ids),
+            "updated_ids": self.updated_ids,
+            "unchanged_ids": self.unchanged_ids,
+            "notifications": self.notifications,
+            "tasks": self.tasks,
+        }
+
+
+# =============================================================================
+# PERMISSOES
+# =============================================================================
+
+def _is_admin(user: User) -> bool:
+    return getattr(user, "role", None) == "admin"
+
+
+def _access_clause(user: User, operation: str):
+    """SQL predicate mirroring the single-task checks for ``operation``."""
+    if _is_admin(user):
+        return sa.true()
+
+    follower_ids = sa.select(TaskFollower.task_id).where(TaskFollower.user_id == user.id)
+    if operation == "reassign":
+        # ``_user_can_transfer_task``: criador, responsavel ou acompanhante.
+        return sa.or_(
+            Task.created_by == user.id,
+            Task.assigned_to == user.id,
+            Task.id.in_(follower_ids),
+        )
+
+    user_tag_ids = sa.select(user_tags.c.tag_id).where(user_tags.c.user_id == user.id)
+    privileged = sa.or_(
+        Task.created_by == user.id,
+        Task.assigned_to == user.id,
+        Task.completed_by == user.id,
+        Task.id.in_(follower_ids),
+    )
+    tag_access = sa.or_(
+        Task.tag_id.in_(user_tag_ids),
+        Tag.nome == f"{PERSONAL_TAG_PREFIX}{user.id}",
+    )
+    return sa.or_(privileged, sa.and_(Task.is_private.is_(False), tag_access))
+
+
+def _load_task_rows(user: User, bulk_request: BulkTaskRequest) -> dict[int, Any]:
+    """Return every requested task with an ``allowed`` flag (one query)."""
+    allowed = sa.case((_access_clause(user, bulk_request.operation), 1), else_=0)
+    rows = db.session.execute(
+        sa.select(
+            Task.id,
+            Task.title,
+            Task.status,
+            Task.tag_id,
+            Task.created_by,
+            Task.assigned_to,
+            Task.completed_by,
+            Task.is_private,
+            Tag.nome.label("tag_name"),
+            allowed.label("allowed"),
+        )
+        .join(Tag, Tag.id == Task.tag_id)
+        .where(Task.id.in_(bulk_request.task_ids))
+    ).all()
+    return {row.id: row for row in rows}
+
+
+def _check_rows(
+    user: User,
+    bulk_request: BulkTaskRequest,
+    rows: dict[int, Any],
+    excluded_tags: Iterable[str],
+) -> None:
+    excluded = {name.lower() for name in excluded_tags}
+    skip_excluded = bulk_request.operation != "reassign" or not _is_admin(user)
+
+    missing = [
+        task_id
+        for task_id in bulk_request.task_ids
+        if task_id not in rows
+        or (skip_excluded and (rows[task_id].tag_name or "").lower() in excluded)
+    ]
+    if missing:
+        raise BulkTaskOperationError("not_found", "Tarefas nao encontradas.", missing)
+
+    forbidden = [task_id for task_id, row in rows.items() if not row.allowed]
+    if forbidden:
+        raise BulkTaskOperationError(
+            "forbidden", "Sem permissao para alterar algumas tarefas.", forbidden
+        )
+
+    if bulk_request.status is None or _is_admin(user):
+        return
+    invalid = [
+        task_id
+        for task_id, row in rows.items()
+        if row.status != bulk_request.status
+        and (
+            bulk_request.status not in _NON_ADMIN_TRANSITIONS.get(row.status, set())
+            # Somente o criador reabre uma tarefa concluida.
+            or (row.status == TaskStatus.DONE and row.created_by != user.id)
+        )
+    ]
+    if invalid:
+        raise BulkTaskOperationError(
+            "invalid_transition", "Mudanca de status nao permitida.", invalid
+        )
+
+
+def _check_assignee(assignee_id: int, actor: User, rows: dict[int, Any]) -> User:
+    assignee = db.session.get(User, assignee_id)
+    if assignee is None or not getattr(assignee, "ativo", True):
+        raise BulkTaskOperationError("invalid_assignee", "Colaborador indisponivel.")
+    if assignee_id == actor.id:
+        return assignee
+
+    member_tag_ids = set(
+        db.session.execute(
+            sa.select(user_tags.c.tag_id).where(user_tags.c.user_id == assignee_id)
+        ).scalars()
+    )
+    outside = [task_id for task_id, row in rows.items() if row.tag_id not in member_tag_ids]
+    if outside:
+        raise BulkTaskOperationError(
+            "invalid_assignee", "Colaborador nao disponivel para o setor da tarefa.", outside
+        )
+    return assignee
+
+
+# =============================================================================
+# NOTIFICACOES
+# =============================================================================
+
+def _active_tag_members(tag_ids: Iterable[int]) -> dict[int, set[int]]:
+    ids = set(tag_ids)
+    if not ids:
+        return {}
+    members: dict[int, set[int]] = defaultdict(set)
+    for tag_id, user_id in db.session.execute(
+        sa.select(user_tags.c.tag_id, User.id)
+        .join(User, User.id == user_tags.c.user_id)
+        .where(user_tags.c.tag_id.in_(ids), User.ativo.is_(True))
+    ):
+        members[tag_id].add(user_id)
+    return members
+
+
+def _status_recipients(
+    row, new_status: TaskStatus, assigned_to: int | None, actor_id: int, members
+) -> set[int]:
+    """Same rule as ``_get_task_notification_recipients``: responsavel ou setor."""
+    if new_status == TaskStatus.PENDING and row.status != TaskStatus.IN_PROGRESS:
+        return set()
+    if assigned_to:
+        recipients = {assigned_to} if assigned_to != actor_id else set()
+    elif not row.is_private:
+        recipients = set(members.get(row.tag_id, ())) - {actor_id}
+    else:
+        recipients = set()
+    if new_status == TaskStatus.DONE and row.created_by and row.created_by != actor_id:
+        recipients.add(row.created_by)
+    return recipients
+
+
+def _status_message(actor_name: str, row, new_status: TaskStatus, now) -> str:
+    display = now.strftime("%d/%m/%Y às %H:%M")
+    if new_status == TaskStatus.IN_PROGRESS:
+        if row.status == TaskStatus.DONE:
+            return f'{actor_name} reabriu a tarefa "{row.title}".'
+        return f'{actor_name} iniciou a tarefa "{row.title}" às {display}.'
+    if new_status == TaskStatus.DONE:
+        return f'{actor_name} concluiu a tarefa "{row.title}" às {display}.'
+    return f'{actor_name} moveu a tarefa "{row.title}" para pendente.'
+
+
+def _insert_notifications(rows: list[dict]) -> None:
+    if not rows:
+        return
+    db.session.execute(TaskNotification.__table__.insert(), rows)
+    add_unread_notifications(row["user_id"] for row in rows)
+
+
+# =============================================================================
+# OPERACOES
+# =============================================================================
+
+def _apply_status(actor: User, bulk_request: BulkTaskRequest, rows, changed_ids, now) -> list[dict]:
+    new_status = bulk_request.status
+    actor_id = actor.id
+    values: dict[str, Any] = {"status": new_status}
+    if new_status == TaskStatus.DONE:
+        values.update(completed_by=actor_id, completed_at=now)
+    else:
+        values.update(completed_by=None, completed_at=None)
+    if new_status == TaskStatus.PENDING:
+        values["assigned_to"] = None
+
+    # Admin reabrindo tarefa concluida mantem o responsavel; os demais casos
+    # de ``IN_PROGRESS`` assumem a tarefa para quem executou a acao.
+    keeps_assignee = {
+        task_id
+        for task_id in changed_ids
+        if new_status == TaskStatus.IN_PROGRESS
+        and rows[task_id].status == TaskStatus.DONE
+        and _is_admin(actor)
+    }
+    takes_assignee = [task_id for task_id in changed_ids if task_id not in keeps_assignee]
+    groups = [(takes_assignee, values)]
+    if new_status == TaskStatus.IN_PROGRESS:
+        groups = [
+            (takes_assignee, {**values, "assigned_to": actor_id}),
+            (sorted(keeps_assignee), values),
+        ]
+    for task_ids, group_values in groups:
+        if task_ids:
+            Task.query.filter(Task.id.in_(task_ids)).update(
+                group_values, synchronize_session=False
+            )
+
+    changes = []
+    members = _active_tag_members(
+        row.tag_id for task_id, row in rows.items() if task_id in changed_ids
+    )
+    actor_name = actor.name or actor.username
+    notifications: list[dict] = []
+    for task_id in changed_ids:
+        row = rows[task_id]
+        if new_status == TaskStatus.PENDING:
+            assigned_to = None
+        elif new_status == TaskStatus.IN_PROGRESS and task_id not in keeps_assignee:
+            assigned_to = actor_id
+        else:
+            assigned_to = row.assigned_to
+        changes.append((task_id, "status", row.status, new_status))
+        changes.append((task_id, "assigned_to", row.assigned_to, assigned_to))
+
+        message = _status_message(actor_name, row, new_status, now)[:255]
+        for user_id in _status_recipients(row, new_status, assigned_to, actor_id, members):
+            notifications.append(
+                {
+                    "user_id": user_id,
+                    "task_id": task_id,
+                    "type": NotificationType.TASK_STATUS.value,
+                    "message": message,
+                    "created_at": now,
+                }
+            )
+    record_bulk_task_changes(db.session, changes, actor_id)
+    return notifications
+
+
+def _apply_reassign(actor: User, assignee: User, rows, changed_ids, now) -> list[dict]:
+    Task.query.filter(Task.id.in_(changed_ids)).update(
+        {"assigned_to": assignee.id}, synchronize_session=False
+    )
+    record_bulk_task_changes(
+        db.session,
+        [(task_id, "assigned_to", rows[task_id].assigned_to, assignee.id) for task_id in changed_ids],
+        actor.id,
+    )
+    if assignee.id == actor.id:
+        return []
+    return [
+        {
+            "user_id": assignee.id,
+            "task_id": task_id,
+            "type": NotificationType.TASK.value,
+            "message": f'Tarefa "{rows[task_id].title or "Nova tarefa"}" atribuída a você.'[:255],
+            "created_at": now,
+        }
+        for task_id in changed_ids
+    ]
+
+
+def apply_bulk_task_operation(
+    actor: User,
+    bulk_request: BulkTaskRequest,
+    *,
+    serializer: Callable[[Task], dict] | None = None,
+    excluded_tags: Iterable[str] = (),
+) -> BulkTaskResult:
+    """Apply ``bulk_request`` to every task in one transaction and commit.
+
+    Raises ``BulkTaskOperationError`` (nothing written) when any task is
+    missing, not allowed for ``actor`` or cannot make the transition.
+    ``serializer`` builds the per-task payload of the response and of the
+    realtime event.
+    """
+    result = BulkTaskResult(operation=bulk_request.operation, requested=len(bulk_request.task_ids))
+    rows = _load_task_rows(actor, bulk_request)
+    _check_rows(actor, bulk_request, rows, excluded_tags)
+
+    assignee = None
+    if bulk_request.operation == "reassign":
+        assignee = _check_assignee(bulk_request.assignee_id, actor, rows)
+        changed_ids = [t for t in bulk_request.task_ids if rows[t].assigned_to != assignee.id]
+    else:
+        changed_ids = [t for t in bulk_request.task_ids if rows[t].status != bulk_request.status]
+    changed = set(changed_ids)
+    result.unchanged_ids = [t for t in bulk_request.task_ids if t not in changed]
+
+    if changed_ids:
+        now = sao_paulo_now_naive()
+        try:
+            stats_before = snapshot_task_stats(changed_ids)
+            if assignee is not None:
+                notifications = _apply_reassign(actor, assignee, rows, changed_ids, now)
+            else:
+                notifications = _apply_status(actor, bulk_request, rows, changed_ids, now)
+            apply_task_stats_changes(stats_before, snapshot_task_stats(changed_ids))
+            _insert_notifications(notifications)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        result.updated_ids = changed_ids
+        result.notifications = len(notifications)
+        logger.info(
+            "Operacao em massa em tarefas",
+            extra={
+                "operation": bulk_request.operation,
+                "actor_id": actor.id,
+                "updated": len(changed_ids),
+                "notifications": len(notifications),
+            },
+        )
+        _publish(actor, bulk_request, rows, changed_ids, notifications, serializer, result)
+    elif serializer is not None:
+        result.tasks = [serializer(task) for task in _load_tasks(bulk_request.task_ids)]
+    return result
+
+
+# =============================================================================
+# POS-COMMIT: TEMPO REAL E PUSH
+# =============================================================================
+
+def _load_tasks(task_ids: list[int]) -> list[Task]:
+    order = {task_id: index for index, task_id in enumerate(task_ids)}
+    tasks = (
+        Task.query.options(
+            joinedload(Task.tag), joinedload(Task.assignee), joinedload(Task.finisher)
+        )
+        .filter(Task.id.in_(task_ids))
+        .all()
+    )
+    return sorted(tasks, key=lambda task: order.get(task.id, 0))
+
+
+def _publish(actor, bulk_request, rows, changed_ids, notifications, serializer, result) -> None:
+    """Send one aggregated realtime event and one notification ping per user."""
+    from app.services.realtime import broadcast_tasks_bulk_updated, get_broadcaster
+
+    all_tasks = _load_tasks(bulk_request.task_ids)
+    payloads = {task.id: serializer(task) for task in all_tasks} if serializer is not None else {}
+    result.tasks = list(payloads.values())
+    changed = set(changed_ids)
+    tasks = [task for task in all_tasks if task.id in changed]
+
+    try:
+        public_items = []
+        private_items: dict[int, list[dict]] = defaultdict(list)
+        private_ids = [task.id for task in tasks if task.is_private]
+        followers: dict[int, set[int]] = defaultdict(set)
+        if private_ids:
+            for task_id, user_id in db.session.execute(
+                sa.select(TaskFollower.task_id, TaskFollower.user_id).where(
+                    TaskFollower.task_id.in_(private_ids)
+                )
+            ):
+                followers[task_id].add(user_id)
+
+        for task in tasks:
+            item = {
+                "id": task.id,
+                "old_status": rows[task.id].status.value if rows[task.id].status else None,
+                "new_status": task.status.value if task.status else None,
+                "task": payloads.get(task.id, {"id": task.id}),
+            }
+            if not task.is_private:
+                public_items.append(item)
+                continue
+            audience = {task.created_by, task.assigned_to, *followers.get(task.id, ())}
+            for user_id in audience - {None, actor.id}:
+                private_items[user_id].append(item)
+
+        broadcast_tasks_bulk_updated(bulk_request.operation, public_items, exclude_user=actor.id)
+        for user_id, items in private_items.items():
+            broadcast_tasks_bulk_updated(bulk_request.operation, items, user_id=user_id)
+
+        broadcaster = get_broadcaster()
+        per_user = Counter(row["user_id"] for row in notifications)
+        for user_id, quantity in per_user.items():
+            broadcaster.broadcast(
+                event_type="notification:created",
+                data={"user_id": user_id, "count": quantity, "bulk": True},
+                user_id=user_id,
+                scope="notifications",
+            )
+    except Exception:
+        logger.warning("Falha ao publicar operacao em massa em tarefas", exc_info=True)
+
+    if bulk_request.operation == "reassign" and notifications:
+        _send_assignment_push(actor, notifications)
+
+
+def _send_assignment_push(actor: User, notifications: list[dict]) -> None:
+    from app.services.push_notifications import send_push_notification
+
+    user_id = notifications[0]["user_id"]
+    if len(notifications) == 1:
+        body = notifications[0]["message"]
+        url = f"/tasks/view/{notifications[0]['task_id']}"
+    else:
+        actor_name = actor.name or actor.username
+        body = f"{actor_name} atribuiu {len(notifications)} tarefas a você."
+        url = "/tasks/overview/mine"
+    try:
+        send_push_notification(user_id=user_id, title="JP Contábil", body=body, url=url)
+    except Exception as exc:
+        logger.error(f"Failed to send push notification: {exc}")
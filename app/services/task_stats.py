@@ -0,0 +1,329 @@
+"""
+Read-model de estatisticas de tarefas (tabela ``task_stats``).
+
+Os contadores sao mantidos incrementalmente pelos eventos do mapper de
+``Task`` (ver ``app.models.tables``) e corrigidos periodicamente por
+``reconcile_task_stats``, agendado em ``app.scheduler``. Dashboards leem
+algumas centenas de linhas pre-agregadas em vez de varrer ``tasks``.
+
+Uso:
+    from app.services.task_stats import get_task_overview_stats
+
+    stats = get_task_overview_stats(date.today(), date.today() + timedelta(days=7))
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Iterable
+
+import sqlalchemy as sa
+
+from app import db
+from app.models.tables import (
+    TASK_STATS_NO_DUE_DATE,
+    TASK_STATS_NO_USER,
+    Tag,
+    Task,
+    TaskPriority,
+    TaskStat,
+    TaskStatus,
+    apply_task_stats_delta,
+    sao_paulo_now_naive,
+    task_stats_bucket,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TaskStatsReconcileResult:
+    buckets: int = 0
+    inserted: int = 0
+    updated: int = 0
+    deleted: int = 0
+    # Buckets alterados por um delta durante a reconciliacao (ficam para a proxima)
+    skipped: int = 0
+
+    @property
+    def drift(self) -> int:
+        return self.inserted + self.updated + self.deleted
+
+    def as_dict(self) -> dict[str, int]:
+        return {
+            "buckets": self.buckets,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "deleted": self.deleted,
+            "skipped": self.skipped,
+        }
+
+
+@dataclass
+class TaskOverviewStats:
+    """Aggregated counters for the root, non-private task workload."""
+
+    total: int = 0
+    open: int = 0
+    overdue: int = 0
+    due_soon: int = 0
+    no_due_date: int = 0
+    unassigned: int = 0
+    by_status: Counter = field(default_factory=Counter)
+    open_by_priority: Counter = field(default_factory=Counter)
+    open_by_tag: Counter = field(default_factory=Counter)
+    open_by_user: Counter = field(default_factory=Counter)
+
+
+# =============================================================================
+# RECONCILIACAO
+# =============================================================================
+
+def _expected_task_stats(task_ids: list[int] | None = None) -> Counter:
+    """Recompute the buckets straight from ``tasks`` (optionally only ``task_ids``)."""
+    query = (
+        db.session.query(
+            Task.tag_id,
+            Task.assigned_to,
+            Task.status,
+            Task.priority,
+            Task.due_date,
+            sa.func.count(Task.id),
+        )
+        .filter(Task.parent_id.is_(None))
+        .filter(Task.is_private.is_(False))
+    )
+    if task_ids is not None:
+        query = query.filter(Task.id.in_(task_ids))
+    rows = query.group_by(
+        Task.tag_id,
+        Task.assigned_to,
+        Task.status,
+        Task.priority,
+        Task.due_date,
+    ).all()
+    expected: Counter = Counter()
+    for tag_id, assigned_to, status, priority, due_date, quantity in rows:
+        bucket = task_stats_bucket(tag_id, assigned_to, status, priority, due_date, None, False)
+        if bucket is not None:
+            expected[bucket] += quantity
+    return expected
+
+
+def _insert_bucket_if_absent(connection, bucket, quantity: int, now) -> bool:
+    """Insert a bucket row unless a concurrent delta created it first."""
+    tag_id, user_id, status, priority, due_day = bucket
+    values = {
+        "tag_id": tag_id,
+        "user_id": user_id,
+        "status": status,
+        "priority": priority,
+        "due_day": due_day,
+        "task_count": quantity,
+        "updated_at": now,
+    }
+    table = TaskStat.__table__
+    dialect = connection.dialect.name
+    if dialect == "mysql":
+        stmt = table.insert().prefix_with("IGNORE").values(**values)
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects import sqlite
+
+        stmt = sqlite.insert(table).values(**values).on_conflict_do_nothing()
+    else:
+        try:
+            with connection.begin_nested():
+                connection.execute(table.insert().values(**values))
+        except sa.exc.IntegrityError:
+            return False
+        return True
+    return bool(connection.execute(stmt).rowcount)
+
+
+def reconcile_task_stats() -> TaskStatsReconcileResult:
+    """Fix any drift between ``task_stats`` and the ``tasks`` table.
+
+    Bulk updates and deletes issued through ``Query.update``/``Query.delete``
+    bypass the mapper events, so this job is the source of truth.
+
+    Every write is a compare-and-set against the counter read at the start:
+    the counters are read *before* the tasks are counted, so a delta that
+    commits while the job runs changes the counter and makes the write miss.
+    Skipped buckets are fixed on the next run instead of losing that delta.
+    """
+    result = TaskStatsReconcileResult()
+    seen = {
+        (row.tag_id, row.user_id, row.status, row.priority, row.due_day): (row.id, row.task_count)
+        for row in db.session.query(
+            TaskStat.id,
+            TaskStat.tag_id,
+            TaskStat.user_id,
+            TaskStat.status,
+            TaskStat.priority,
+            TaskStat.due_day,
+            TaskStat.task_count,
+        )
+    }
+    expected = _expected_task_stats()
+    result.buckets = len(expected)
+
+    connection = db.session.connection()
+    table = TaskStat.__table__
+    now = sao_paulo_now_naive()
+    for bucket, quantity in expected.items():
+        current = seen.pop(bucket, None)
+        if current is None:
+            if _insert_bucket_if_absent(connection, bucket, quantity, now):
+                result.inserted += 1
+            else:
+                result.skipped += 1
+            continue
+        row_id, seen_count = current
+        if seen_count == quantity:
+            continue
+        changed = connection.execute(
+            table.update()
+            .where(table.c.id == row_id, table.c.task_count == seen_count)
+            .values(task_count=quantity, updated_at=now)
+        ).rowcount
+        if changed:
+            result.updated += 1
+        else:
+            result.skipped += 1
+
+    for row_id, seen_count in seen.values():
+        changed = connection.execute(
+            table.delete().where(table.c.id == row_id, table.c.task_count == seen_count)
+        ).rowcount
+        if changed:
+            result.deleted += 1
+        else:
+            result.skipped += 1
+
+    db.session.commit()
+
+    if result.drift or result.skipped:
+        logger.info("task_stats reconciliado com divergencias", extra=result.as_dict())
+    return result
+
+
+def discount_task_stats(task_ids: Iterable[int]) -> None:
+    """Remove tasks about to be bulk-deleted from the read-model.
+
+    Must run in the same transaction as the ``DELETE`` on ``tasks``.
+    """
+    ids = list(task_ids)
+    if not ids:
+        return
+    apply_task_stats_changes(snapshot_task_stats(ids), Counter())
+
+
+def snapshot_task_stats(task_ids: Iterable[int]) -> Counter:
+    """Return the bucket counts of ``task_ids`` before a bulk ``UPDATE``.
+
+    Pair with ``apply_task_stats_changes(before, snapshot_task_stats(ids))``
+    after the statement, in the same transaction.
+    """
+    ids = list(task_ids)
+    if not ids:
+        return Counter()
+    return _expected_task_stats(ids)
+
+
+def apply_task_stats_changes(before: Counter, after: Counter) -> None:
+    """Move counters between buckets: one upsert per bucket that changed."""
+    connection = db.session.connection()
+    for bucket in set(before) | set(after):
+        delta = after.get(bucket, 0) - before.get(bucket, 0)
+        if delta:
+            apply_task_stats_delta(connection, bucket, delta)
+
+
+# =============================================================================
+# LEITURA
+# =============================================================================
+
+def count_tasks_by_status(
+    tag_id: int | None = None,
+    user_id: int | None = None,
+    *,
+    private_owner_id: int | None = None,
+) -> dict[TaskStatus, int]:
+    """Return task counts per status, optionally scoped to a tag and assignee.
+
+    The read-model only holds public tasks. With ``private_owner_id`` the
+    private root tasks created by that user are counted from ``tasks`` and
+    added, matching boards that show the viewer's own private tasks.
+    """
+    query = db.session.query(TaskStat.status, sa.func.sum(TaskStat.task_count))
+    if tag_id is not None:
+        query = query.filter(TaskStat.tag_id == tag_id)
+    if user_id is not None:
+        query = query.filter(TaskStat.user_id == user_id)
+    rows = query.group_by(TaskStat.status).all()
+    counts = {status: 0 for status in TaskStatus}
+    for status, quantity in rows:
+        counts[status] = int(quantity or 0)
+
+    if private_owner_id is not None:
+        private_query = db.session.query(Task.status, sa.func.count(Task.id)).filter(
+            Task.parent_id.is_(None),
+            Task.is_private.is_(True),
+            Task.created_by == private_owner_id,
+        )
+        if tag_id is not None:
+            private_query = private_query.filter(Task.tag_id == tag_id)
+        if user_id is not None:
+            private_query = private_query.filter(Task.assigned_to == user_id)
+        for status, quantity in private_query.group_by(Task.status).all():
+            counts[status] += int(quantity or 0)
+    return counts
+
+
+def get_task_overview_stats(
+    today: date,
+    upcoming_limit: date,
+    excluded_tag_names: Iterable[str] = (),
+) -> TaskOverviewStats:
+    """Aggregate the read-model into the KPIs used by ``relatorio_tarefas``."""
+    query = (
+        db.session.query(
+            Tag.nome,
+            TaskStat.user_id,
+            TaskStat.status,
+            TaskStat.priority,
+            TaskStat.due_day,
+            TaskStat.task_count,
+        )
+        .join(Tag, Tag.id == TaskStat.tag_id)
+        .filter(TaskStat.task_count > 0)
+    )
+    excluded = list(excluded_tag_names)
+    if excluded:
+        query = query.filter(~Tag.nome.in_(excluded))
+
+    stats = TaskOverviewStats()
+    for tag_name, user_id, status, priority, due_day, quantity in query.all():
+        stats.total += quantity
+        stats.by_status[status] += quantity
+        if status == TaskStatus.DONE:
+            continue
+
+        stats.open += quantity
+        stats.open_by_priority[priority or TaskPriority.MEDIUM] += quantity
+        stats.open_by_tag[tag_name or "Sem setor"] += quantity
+        if user_id == TASK_STATS_NO_USER:
+            stats.unassigned += quantity
+        else:
+            stats.open_by_user[user_id] += quantity
+
+        if due_day == TASK_STATS_NO_DUE_DATE:
+            stats.no_due_date += quantity
+        elif due_day < today:
+            stats.overdue += quantity
+        elif due_day <= upcoming_limit:
+            stats.due_soon += quantity
+    return stats
@@ -0,0 +1,242 @@
+"""
+Consultas na hierarquia de subtarefas via ``task_closure``.
+
+A tabela de fechamento guarda um par (ancestral, descendente, profundidade)
+para cada caminho da arvore, mantida pelos eventos do mapper de ``Task``.
+Subarvore, ancestrais, "e descendente?" e progresso agregado viram uma
+consulta indexada cada, sem CTE recursiva nem uma consulta por no.
+
+Uso:
+    from app.services.task_tree import get_subtree_ids, delete_task_trees
+
+    ids = get_subtree_ids(task.id)
+    delete_task_trees([task.id])
+    db.session.commit()
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Iterable
+
+import sqlalchemy as sa
+
+from app import db
+from app.models.tables import (
+    Task,
+    TaskAttachment,
+    TaskClosure,
+    TaskFollower,
+    TaskHistory,
+    TaskNotification,
+    TaskResponse,
+    TaskResponseParticipant,
+    TaskStatus,
+    TaskStatusHistory,
+)
+
+# Colunas Core: evita o custo do ORM em consultas que so devolvem ids.
+_closure = TaskClosure.__table__
+
+
+@dataclass
+class TaskProgress:
+    """Completion of the descendants of one task."""
+
+    total: int = 0
+    done: int = 0
+
+    @property
+    def percent(self) -> int:
+        if not self.total:
+            return 0
+        return int((self.done / self.total) * 100)
+
+    def as_dict(self) -> dict[str, int]:
+        return {"total": self.total, "done": self.done, "percent": self.percent}
+
+
+# =============================================================================
+# LEITURA
+# =============================================================================
+
+def get_subtree_ids(task_id: int) -> list[int]:
+    """Return ``task_id`` and every descendant, root first."""
+    return list(
+        db.session.execute(
+            sa.select(_closure.c.descendant_id)
+            .where(_closure.c.ancestor_id == task_id)
+            .order_by(_closure.c.depth, _closure.c.descendant_id)
+        ).scalars()
+    )
+
+
+def get_ancestor_ids(task_id: int) -> list[int]:
+    """Return the ancestors of ``task_id``, nearest parent first."""
+    return list(
+        db.session.execute(
+            sa.select(_closure.c.ancestor_id)
+            .where(_closure.c.descendant_id == task_id, _closure.c.depth > 0)
+            .order_by(_closure.c.depth)
+        ).scalars()
+    )
+
+
+def get_task_depth(task_id: int) -> int:
+    """Return how many levels ``task_id`` is below its root (0 for roots)."""
+    depth = db.session.execute(
+        sa.select(sa.func.max(_closure.c.depth)).where(_closure.c.descendant_id == task_id)
+    ).scalar()
+    return int(depth or 0)
+
+
+# Montada uma vez: a checagem costuma rodar uma vez por no em validacoes.
+_IS_DESCENDANT = sa.select(_closure.c.depth).where(
+    _closure.c.ancestor_id == sa.bindparam("ancestor_id"),
+    _closure.c.descendant_id == sa.bindparam("task_id"),
+    _closure.c.depth > 0,
+)
+
+
+def is_descendant(task_id: int, ancestor_id: int) -> bool:
+    """Return ``True`` when ``task_id`` lies strictly below ``ancestor_id``."""
+    return db.session.execute(
+        _IS_DESCENDANT, {"task_id": task_id, "ancestor_id": ancestor_id}
+    ).first() is not None
+
+
+def get_subtree_progress(task_ids: Iterable[int], *, direct_only: bool = False) -> dict[int, TaskProgress]:
+    """Return completion of the descendants of each task in one query.
+
+    ``direct_only`` restricts the rollup to direct children (the rule used
+    by ``Task.progress``).
+    """
+    ids = list(task_ids)
+    if not ids:
+        return {}
+    tasks = Task.__table__
+    depth_filter = _closure.c.depth == 1 if direct_only else _closure.c.depth > 0
+    rows = db.session.execute(
+        sa.select(
+            _closure.c.ancestor_id,
+            sa.func.count(),
+            sa.func.sum(sa.case((tasks.c.status == TaskStatus.DONE, 1), else_=0)),
+        )
+        .join(tasks, tasks.c.id == _closure.c.descendant_id)
+        .where(_closure.c.ancestor_id.in_(ids), depth_filter)
+        .group_by(_closure.c.ancestor_id)
+    ).all()
+    progress: dict[int, TaskProgress] = defaultdict(TaskProgress)
+    for ancestor_id, total, done in rows:
+        progress[ancestor_id] = TaskProgress(total=int(total), done=int(done or 0))
+    return {task_id: progress[task_id] for task_id in ids}
+
+
+# =============================================================================
+# ESCRITA
+# =============================================================================
+
+def delete_task_trees(root_ids: Iterable[int]) -> list[int]:
+    """Bulk-delete each task of ``root_ids`` with its whole subtree.
+
+    Does not commit. Returns the deleted ids. Mapper events do not fire, so
+    the read-models (``task_stats``, unread counters) are discounted here.
+    """
+    from app.services.notification_counters import delete_notifications
+    from app.services.task_stats import discount_task_stats
+
+    roots = list(root_ids)
+    if not roots:
+        return []
+    task_ids = list(
+        db.session.execute(
+            sa.select(TaskClosure.descendant_id)
+            .where(TaskClosure.ancestor_id.in_(roots))
+            .distinct()
+        ).scalars()
+    )
+    if not task_ids:
+        return []
+    parent_ids = set(
+        db.session.execute(
+            sa.select(Task.parent_id).where(Task.id.in_(roots), Task.parent_id.isnot(None))
+        ).scalars()
+    ) - set(task_ids)
+
+    # Ordem importa: relacionamentos antes das tarefas
+    for model in (
+        TaskResponseParticipant,
+        TaskResponse,
+        TaskAttachment,
+        TaskHistory,
+        TaskStatusHistory,
+        TaskFollower,
+    ):
+        model.query.filter(model.task_id.in_(task_ids)).delete(synchronize_session=False)
+
+    task_notifications = TaskNotification.query.filter(TaskNotification.task_id.in_(task_ids))
+    delete_notifications(task_notifications)
+
+    discount_task_stats(task_ids)
+
+    TaskClosure.query.filter(TaskClosure.descendant_id.in_(task_ids)).delete(
+        synchronize_session=False
+    )
+    # Filhas antes das maes: a FK ``parent_id`` nao tem ON DELETE CASCADE.
+    Task.query.filter(Task.id.in_(task_ids)).update(
+        {"parent_id": None}, synchronize_session=False
+    )
+    Task.query.filter(Task.id.in_(task_ids)).delete(synchronize_session=False)
+
+    if parent_ids:
+        still_parents = set(
+            db.session.execute(
+                sa.select(TaskClosure.ancestor_id)
+                .where(TaskClosure.ancestor_id.in_(parent_ids), TaskClosure.depth == 1)
+                .distinct()
+            ).scalars()
+        )
+        emptied = parent_ids - still_parents
+        if emptied:
+            Task.query.filter(Task.id.in_(emptied)).update(
+                {"has_children": False, "updated_at": Task.updated_at},
+                synchronize_session=False,
+            )
+    return task_ids
+
+
+def rebuild_task_closure() -> int:
+    """Recreate ``task_closure`` from ``tasks.parent_id`` and commit.
+
+    Walks the tree level by level (one ``INSERT ... SELECT`` per depth).
+    Returns the number of rows written.
+    """
+    closure = TaskClosure.__table__
+    tasks = Task.__table__
+    connection = db.session.connection()
+    connection.execute(closure.delete())
+    total = connection.execute(
+        closure.insert().from_select(
+            ["ancestor_id", "descendant_id", "depth"],
+            sa.select(tasks.c.id, tasks.c.id, sa.literal(0)),
+        )
+    ).rowcount or 0
+
+    depth = 0
+    while True:
+        inserted = connection.execute(
+            closure.insert().from_select(
+                ["ancestor_id", "descendant_id", "depth"],
+                sa.select(closure.c.ancestor_id, tasks.c.id, sa.literal(depth + 1))
+                .select_from(closure.join(tasks, tasks.c.parent_id == closure.c.descendant_id))
+                .where(closure.c.depth == depth),
+            )
+        ).rowcount or 0
+        if not inserted:
+            break
+        total += inserted
+        depth += 1
+
+    db.session.commit()
+    return total
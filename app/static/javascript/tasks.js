@@ -1132,6 +1132,218 @@ const TaskTransfer = (() => {
         open,
     };
 })();
+
+const TaskBulk = (() => {
+    const MAX_TASKS = 500;
+    let bar = null;
+    let countLabel = null;
+    let statusSelect = null;
+    let assigneeSelect = null;
+    let errorAlert = null;
+    let loading = false;
+    let assigneeRequest = 0;
+
+    function init() {
+        bar = document.querySelector('[data-bulk-bar]');
+        if (!bar) {
+            return;
+        }
+        countLabel = bar.querySelector('[data-bulk-count]');
+        statusSelect = bar.querySelector('[data-bulk-status]');
+        assigneeSelect = bar.querySelector('[data-bulk-assignee]');
+        errorAlert = bar.querySelector('[data-bulk-error]');
+
+        document.addEventListener('change', (event) => {
+            if (event.target.matches('[data-bulk-select]')) {
+                refresh();
+            }
+        });
+
+        bar.querySelector('[data-bulk-move]').addEventListener('click', () => {
+            if (!statusSelect.value) {
+                showError('Selecione o status de destino.');
+                return;
+            }
+            submit({ operation: 'move', status: statusSelect.value });
+        });
+        bar.querySelector('[data-bulk-reassign]').addEventListener('click', () => {
+            if (!assigneeSelect.value) {
+                showError('Selecione o novo responsável.');
+                return;
+            }
+            submit({ operation: 'reassign', assignee_id: parseInt(assigneeSelect.value, 10) });
+        });
+        bar.querySelector('[data-bulk-close]').addEventListener('click', async () => {
+            const total = selectedBoxes().length;
+            const confirmed = await window.portalConfirm({
+                title: 'Concluir tarefas',
+                message: `Deseja concluir ${total} tarefa(s) selecionada(s)?`,
+                variant: 'primary',
+            });
+            if (confirmed) {
+                submit({ operation: 'close' });
+            }
+        });
+        bar.querySelector('[data-bulk-clear]').addEventListener('click', clear);
+    }
+
+    function selectedBoxes() {
+        return Array.from(document.querySelectorAll('[data-bulk-select]:checked'));
+    }
+
+    function selectedTagIds() {
+        const tagIds = new Set();
+        selectedBoxes().forEach((box) => {
+            const card = box.closest('.task-card');
+            if (card && card.dataset.tagId) {
+                tagIds.add(card.dataset.tagId);
+            }
+        });
+        return Array.from(tagIds);
+    }
+
+    function hideError() {
+        errorAlert.classList.add('d-none');
+        errorAlert.textContent = '';
+    }
+
+    function showError(message) {
+        errorAlert.textContent = message;
+        errorAlert.classList.remove('d-none');
+    }
+
+    function setLoading(isLoading) {
+        loading = isLoading;
+        bar.querySelectorAll('button, select').forEach((control) => {
+            control.disabled = isLoading;
+        });
+    }
+
+    function refresh() {
+        const total = selectedBoxes().length;
+        bar.classList.toggle('d-none', total === 0);
+        countLabel.textContent = total === 1 ? '1 selecionada' : `${total} selecionadas`;
+        hideError();
+        if (total > MAX_TASKS) {
+            showError(`Selecione no máximo ${MAX_TASKS} tarefas por operação.`);
+        }
+        if (total > 0) {
+            loadAssignees();
+        }
+    }
+
+    async function loadAssignees() {
+        // So aparecem colaboradores presentes em todos os setores selecionados,
+        // a mesma regra que o servidor aplica na reatribuicao.
+        const tagIds = selectedTagIds();
+        const request = ++assigneeRequest;
+        try {
+            const lists = await Promise.all(tagIds.map(async (tagId) => {
+                const response = await fetch(`/tasks/users/${tagId}`);
+                if (!response.ok) {
+                    throw new Error('Falha ao carregar colaboradores');
+                }
+                return response.json();
+            }));
+            if (request !== assigneeRequest) {
+                return;
+            }
+            let users = lists.length ? lists[0] : [];
+            lists.slice(1).forEach((list) => {
+                const ids = new Set(list.map((user) => user.id));
+                users = users.filter((user) => ids.has(user.id));
+            });
+            populateAssignees(users);
+        } catch (error) {
+            console.error('[Tasks] Bulk assignee options failed:', error);
+            populateAssignees([]);
+        }
+    }
+
+    function populateAssignees(users) {
+        assigneeSelect.innerHTML = '';
+        const placeholder = document.createElement('option');
+        placeholder.value = '';
+        placeholder.textContent = users.length ? 'Reatribuir para...' : 'Nenhum colaborador em comum';
+        placeholder.disabled = true;
+        placeholder.selected = true;
+        assigneeSelect.appendChild(placeholder);
+        users.forEach((user) => {
+            const option = document.createElement('option');
+            option.value = String(user.id);
+            option.textContent = user.name || String(user.id);
+            assigneeSelect.appendChild(option);
+        });
+    }
+
+    function applyResult(tasks = []) {
+        tasks.forEach((task) => {
+            const card = getTaskCardById(task.id);
+            if (!card) {
+                return;
+            }
+            const column = card.closest('.kanban-list');
+            const oldStatus = column ? column.dataset.status : null;
+            if (oldStatus && task.status && oldStatus !== task.status) {
+                handleTaskStatusChanged({ id: task.id, old_status: oldStatus, new_status: task.status, task });
+            } else {
+                handleTaskUpdated(task);
+            }
+        });
+    }
+
+    async function submit(payload) {
+        if (loading) {
+            return;
+        }
+        const taskIds = selectedBoxes().map((box) => parseInt(box.value, 10));
+        if (!taskIds.length) {
+            return;
+        }
+        if (taskIds.length > MAX_TASKS) {
+            showError(`Selecione no máximo ${MAX_TASKS} tarefas por operação.`);
+            return;
+        }
+        hideError();
+        setLoading(true);
+        try {
+            const response = await fetch('/tasks/bulk', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'X-CSRFToken': csrfToken,
+                },
+                body: JSON.stringify({ task_ids: taskIds, ...payload }),
+            });
+            const data = await response.json();
+            if (!response.ok || !data.success) {
+                throw new Error(data.message || data.error || 'Falha ao atualizar as tarefas.');
+            }
+            applyResult(data.tasks);
+            clear();
+        } catch (error) {
+            console.error('[Tasks] Bulk operation failed:', error);
+            showError(error.message || 'Falha ao atualizar as tarefas.');
+        } finally {
+            setLoading(false);
+        }
+    }
+
+    function clear() {
+        selectedBoxes().forEach((box) => {
+            box.checked = false;
+        });
+        if (statusSelect) {
+            statusSelect.value = '';
+        }
+        refresh();
+    }
+
+    return {
+        init,
+        clear,
+    };
+})();
 // Global variable to store current user ID
 let currentUserId = 0;
 let currentUserRole = '';
@@ -1208,6 +1420,7 @@ document.addEventListener('DOMContentLoaded', () => {
     currentUserRole = kanbanElement ? kanbanElement.dataset.currentUserRole || '' : '';
     TaskResponses.init({ csrfToken, currentUserId });
     TaskTransfer.init();
+    TaskBulk.init();
 
     // Setup real-time event handlers
     if (window.realtimeClient) {
@@ -1468,6 +1681,12 @@ function setupRealtimeHandlers() {
         handleTaskUpdated(data);
     });
 
+    // Handle bulk operations (one event for many tasks)
+    client.on('tasks:bulk_updated', (data) => {
+        console.log('[Tasks] Bulk update:', data);
+        handleTasksBulkUpdated(data);
+    });
+
     client.on('task:response_created', (data) => {
         console.log('[Tasks] Task response created:', data);
         TaskResponses.handleRealtimeResponse(data);
@@ -1575,6 +1794,20 @@ function handleTaskStatusChanged(data) {
     }, 200);
 }
 
+/**
+ * Handle bulk update - apply each item like its single-task event
+ */
+function handleTasksBulkUpdated(data) {
+    const items = (data && data.items) || [];
+    items.forEach((item) => {
+        if (item.old_status && item.new_status && item.old_status !== item.new_status) {
+            handleTaskStatusChanged(item);
+        } else if (item.task) {
+            handleTaskUpdated(item.task);
+        }
+    });
+}
+
 /**
  * Handle task deleted - remove task card from DOM
  */
@@ -1636,10 +1869,12 @@ function createTaskCard(taskData) {
     li.setAttribute('data-is-subtask', 'false');  // Explicitly mark as non-subtask
     li.setAttribute('data-created-by', taskData.created_by || '');
     li.setAttribute('data-assigned-to', taskData.assigned_to || '');
+    li.setAttribute('data-tag-id', taskData.tag_id || '');
 
     // Simplified HTML - you should match your actual task card structure
     li.innerHTML = `
         <div class="task-header">
+            <input type="checkbox" class="form-check-input task-bulk-select" value="${taskData.id}" data-bulk-select aria-label="Selecionar tarefa">
             <h4>${escapeHtml(taskData.title)}</h4>
             <span class="task-priority priority-${taskData.priority}">${taskData.priority}</span>
         </div>
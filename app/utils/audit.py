@@ -162,6 +162,10 @@ def log_user_action(
 ):
     """Log a user action to both database and log files.
 
+    The ``AuditLog`` row and the user-actions file log are handed to the
+    batched audit writer (``app.services.audit_writer``), so the request does
+    not pay for an extra commit.
+
     Args:
         action_type: Type of action (use ActionType constants)
         resource_type: Type of resource affected (use ResourceType constants)
@@ -171,8 +175,8 @@ def log_user_action(
         new_values: Optional dict of values after the change
     """
     # Import here to avoid circular imports
-    from app import db
-    from app.models.tables import AuditLog
+    from app.models.tables import sao_paulo_now_naive
+    from app.services.audit_writer import AuditEntry, submit_audit_entry
 
     # Skip if user is not authenticated (system actions)
     if not current_user or not current_user.is_authenticated:
@@ -184,47 +188,52 @@ def log_user_action(
     request_id = getattr(g, 'request_id', None)
     endpoint = request.endpoint if request else None
 
-    # Database audit entry
-    audit_entry = AuditLog(
-        user_id=current_user.id,
-        username=current_user.username,
-        action_type=action_type,
-        resource_type=resource_type,
-        resource_id=resource_id,
-        action_description=action_description,
-        old_values=old_values,
-        new_values=new_values,
-        ip_address=ip_address,
-        user_agent=user_agent,
-        request_id=request_id,
-        endpoint=endpoint,
-    )
-
-    try:
-        db.session.add(audit_entry)
-        db.session.commit()
-    except Exception as e:
-        db.session.rollback()
-        user_actions_logger.error(f"Failed to save audit log to database: {e}")
-
-    # File log with structured extra data for JSON formatter
+    # Database audit entry (timestamp taken now, not when the batch is written)
+    audit_row = {
+        'user_id': current_user.id,
+        'username': current_user.username,
+        'action_type': action_type,
+        'resource_type': resource_type,
+        'resource_id': resource_id,
+        'action_description': action_description,
+        'old_values': old_values,
+        'new_values': new_values,
+        'ip_address': ip_address,
+        'user_agent': user_agent,
+        'request_id': request_id,
+        'endpoint': endpoint,
+        'created_at': sao_paulo_now_naive(),
+    }
+
+    # File log with structured extra data for JSON formatter; the record is
+    # built here so it keeps the request's timestamp and call site.
     log_message = (
         f"[{current_user.username}] {action_type.upper()} {resource_type} "
         f"(ID: {resource_id}) - {action_description} - IP: {ip_address}"
     )
-
-    user_actions_logger.info(
-        log_message,
-        extra={
-            'request_id': request_id,
-            'user_id': current_user.id,
-            'username': current_user.username,
-            'action_type': action_type,
-            'resource_type': resource_type,
-            'resource_id': resource_id,
-            'ip_address': ip_address,
-            'old_values': old_values,
-            'new_values': new_values,
-        }
-    )
-
+    log_record = None
+    if user_actions_logger.isEnabledFor(logging.INFO):
+        filename, lineno, func_name, _stack = user_actions_logger.findCaller()
+        log_record = user_actions_logger.makeRecord(
+            user_actions_logger.name,
+            logging.INFO,
+            filename,
+            lineno,
+            log_message,
+            None,
+            None,
+            func=func_name,
+            extra={
+                'request_id': request_id,
+                'user_id': current_user.id,
+                'username': current_user.username,
+                'action_type': action_type,
+                'resource_type': resource_type,
+                'resource_id': resource_id,
+                'ip_address': ip_address,
+                'old_values': old_values,
+                'new_values': new_values,
+            },
+        )
+
+    submit_audit_entry(AuditEntry(row=audit_row, record=log_record))
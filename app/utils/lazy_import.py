@@ -0,0 +1,72 @@
+"""Deferred imports for heavy optional dependencies.
+
+Blueprints and services used to import pandas, fpdf, python-docx, PIL, the
+Google API client and pywebpush at module level, so every worker paid for
+them on boot even if it never served a report or sent a push. Bind them with
+``lazy_import`` instead; the real import happens on the first attribute access.
+
+Uso:
+    from app.utils.lazy_import import lazy_import
+
+    pd = lazy_import("pandas")
+
+    def export(rows):
+        return pd.DataFrame(rows)  # pandas is imported here, once
+"""
+
+from __future__ import annotations
+
+import importlib
+import sys
+import threading
+from types import ModuleType
+from typing import Any
+
+_lock = threading.RLock()
+
+
+class LazyModule(ModuleType):
+    """Module stand-in that imports the real module on first attribute access.
+
+    Attribute access is delegated, so ``pd.DataFrame``, ``except
+    errors.HttpError`` or ``class PDF(fpdf.FPDF)`` inside a function all work
+    unchanged. Names bound at module level (annotations, base classes,
+    ``from x import y``) would trigger the import immediately and must stay
+    inside the functions that need them.
+    """
+
+    def __init__(self, name: str) -> None:
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+
+    def _resolve(self) -> ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with _lock:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.__dict__["_lazy_module"] is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._resolve(), attr)
+
+    def __dir__(self) -> list[str]:
+        return dir(self._resolve())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.is_loaded else "not loaded"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name: str) -> ModuleType:
+    """Return ``name`` if already imported, else a ``LazyModule`` for it."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
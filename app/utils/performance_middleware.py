@@ -4,25 +4,138 @@ This module provides helpers to measure request lifecycle timings, SQL query
 durations, external HTTP calls, template rendering, and arbitrary custom spans.
 It is designed to be light-weight and only emit detailed logs when a request
 exceeds a configured threshold.
+
+It also enforces SQL budgets: views declare one with :func:`query_budget`,
+every other endpoint falls back to ``SQL_QUERY_BUDGET_DEFAULT``, and the same
+normalized statement repeating with different parameters (the N+1
+signature) is reported with the call site that issued it. With
+``SQL_BUDGET_MODE=raise`` (the default under debug/testing) a declared
+budget that is exceeded raises :class:`QueryBudgetExceeded`; otherwise a
+structured warning is logged.
 """
 
 from __future__ import annotations
 
+import hashlib
+import os
+import re
+import sysconfig
 import threading
 import time
+import traceback
 import uuid
 from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import wraps
 from typing import Any, Dict, List, Optional
 
-from flask import Flask, g, request
+from flask import Flask, current_app, g, request
 from sqlalchemy import event
 from sqlalchemy.engine import Engine
 
 
+# Literais e listas IN variam entre execucoes da mesma consulta.
+_SQL_IN_LIST = re.compile(r"\bIN\s*\((?:[^()]|\([^()]*\))*\)", re.IGNORECASE)
+_SQL_STRING = re.compile(r"'(?:[^']|'')*'")
+_SQL_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_SQL_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s|\?|:\w+")
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_THIS_FILE = os.path.abspath(__file__)
+# Frames de bibliotecas (SQLAlchemy, Flask, stdlib) nao identificam o chamador.
+_LIBRARY_PATHS = tuple(
+    {
+        os.path.abspath(path)
+        for key, path in sysconfig.get_paths().items()
+        if key in {"stdlib", "purelib", "platlib"}
+    }
+)
+
+
+def normalize_sql(statement: str) -> str:
+    """Collapse literals, placeholders and IN lists so repeats compare equal."""
+    normalized = " ".join(statement.split())
+    normalized = _SQL_IN_LIST.sub("IN (?)", normalized)
+    normalized = _SQL_STRING.sub("?", normalized)
+    normalized = _SQL_PLACEHOLDER.sub("?", normalized)
+    return _SQL_NUMBER.sub("?", normalized)
+
+
+def _call_site() -> List[str]:
+    """Return the project frames (innermost last) of the current stack."""
+    frames = []
+    for frame in traceback.extract_stack()[:-1]:
+        filename = os.path.abspath(frame.filename)
+        if filename == _THIS_FILE or filename.startswith(_LIBRARY_PATHS) or filename.startswith("<"):
+            continue
+        if filename.startswith(_PROJECT_ROOT):
+            filename = os.path.relpath(filename, _PROJECT_ROOT)
+        frames.append(f"{filename}:{frame.lineno}:{frame.name}")
+    return frames[-6:]
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Raised when a request exceeds its declared SQL budget (raise mode)."""
+
+    def __init__(self, payload: Dict[str, Any]) -> None:
+        self.payload = payload
+        super().__init__(
+            f"SQL budget exceeded on {payload.get('endpoint')}: "
+            + "; ".join(payload.get("violations", []))
+        )
+
+
+@dataclass(frozen=True)
+class QueryBudget:
+    """SQL limits for one endpoint.
+
+    ``max_queries`` caps the statements of the whole request;
+    ``max_repeats`` caps how many times one normalized statement may run
+    (``None`` uses ``SQL_N_PLUS_ONE_THRESHOLD``).
+    """
+
+    max_queries: int
+    max_repeats: Optional[int] = None
+    declared: bool = True
+
+
+def query_budget(max_queries: int, *, max_repeats: Optional[int] = None):
+    """Declare the SQL budget of a view.
+
+    Place it right above the view function (below ``@route`` and the
+    access decorators)::
+
+        @bp.route("/tasks/overview")
+        @login_required
+        @query_budget(40)
+        def tasks_overview():
+            ...
+    """
+    budget = QueryBudget(max_queries=max_queries, max_repeats=max_repeats)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            tracker = _get_tracker()
+            if tracker is not None:
+                tracker.budget = budget
+            return view(*args, **kwargs)
+
+        wrapper.query_budget = budget  # type: ignore[attr-defined]
+        return wrapper
+
+    return decorator
+
+
 class PerformanceTracker:
     """Collects timing metrics for a single request."""
 
-    def __init__(self, threshold_ms: float, request_id: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        threshold_ms: float,
+        request_id: Optional[str] = None,
+        n_plus_one_threshold: int = 10,
+    ) -> None:
         self.threshold_ms = threshold_ms
         self.started_at = time.perf_counter()
         self.completed_at: Optional[float] = None
@@ -34,6 +147,9 @@ class PerformanceTracker:
         self.custom_spans: List[Dict[str, Any]] = []
         self.commit_durations_ms: List[float] = []
         self.request_id = request_id or uuid.uuid4().hex[:12]
+        self.budget: Optional[QueryBudget] = None
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.statement_stats: Dict[str, Dict[str, Any]] = {}
         self._lock = threading.Lock()
 
     def finish(self) -> None:
@@ -45,6 +161,7 @@ class PerformanceTracker:
         normalized_statement = " ".join(statement.split())
         if len(normalized_statement) > 200:
             normalized_statement = f"{normalized_statement[:200]}..."
+        fingerprint = hashlib.sha1(normalize_sql(statement).encode("utf-8")).hexdigest()[:12]
         with self._lock:
             self.sql_time_ms += duration_ms
             self.sql_queries.append(
@@ -54,6 +171,74 @@ class PerformanceTracker:
                     "parameters": parameters if isinstance(parameters, dict) else None,
                 }
             )
+            stats = self.statement_stats.get(fingerprint)
+            if stats is None:
+                stats = self.statement_stats[fingerprint] = {
+                    "sql": normalized_statement,
+                    "count": 0,
+                    "duration_ms": 0.0,
+                    "parameters": set(),
+                    "call_site": None,
+                }
+            stats["count"] += 1
+            stats["duration_ms"] += duration_ms
+            # Basta distinguir "mesmos parametros" de "parametros variados".
+            if len(stats["parameters"]) <= self.n_plus_one_threshold:
+                stats["parameters"].add(repr(parameters))
+            capture_site = stats["count"] == self.n_plus_one_threshold
+        if capture_site:
+            # Pilha capturada uma vez por instrucao, so quando ela ja se repete.
+            frames = _call_site()
+            stats["call_site"] = {
+                "fingerprint": hashlib.sha1("|".join(frames).encode("utf-8")).hexdigest()[:12],
+                "frames": frames,
+            }
+
+    def repeated_statements(self, min_count: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return statements repeated with different parameters (N+1 suspects)."""
+        limit = min_count or self.n_plus_one_threshold
+        with self._lock:
+            suspects = [
+                {
+                    "fingerprint": fingerprint,
+                    "sql": stats["sql"],
+                    "count": stats["count"],
+                    "distinct_parameters": len(stats["parameters"]),
+                    "duration_ms": round(stats["duration_ms"], 2),
+                    "call_site": stats["call_site"],
+                }
+                for fingerprint, stats in self.statement_stats.items()
+                if stats["count"] >= limit and len(stats["parameters"]) > 1
+            ]
+        return sorted(suspects, key=lambda item: item["count"], reverse=True)
+
+    def budget_violations(self, default_budget: int) -> Optional[Dict[str, Any]]:
+        """Compare the request with its budget; return a payload when exceeded."""
+        budget = self.budget or QueryBudget(max_queries=default_budget, declared=False)
+        violations = []
+        sql_count = len(self.sql_queries)
+        if budget.max_queries and sql_count > budget.max_queries:
+            violations.append(f"{sql_count} queries > budget {budget.max_queries}")
+        suspects = self.repeated_statements(budget.max_repeats)
+        for suspect in suspects:
+            violations.append(
+                f"N+1: {suspect['count']}x {suspect['fingerprint']} "
+                f"({suspect['distinct_parameters']} parameter sets)"
+            )
+        if not violations:
+            return None
+        return {
+            "request_id": self.request_id,
+            "endpoint": request.endpoint,
+            "path": request.path,
+            "method": request.method,
+            "declared": budget.declared,
+            "max_queries": budget.max_queries,
+            "sql_count": sql_count,
+            "sql_time_ms": round(self.sql_time_ms, 2),
+            "violations": violations,
+            "repeated_statements": suspects[:5],
+        }
 
     def record_external(self, name: str, duration_ms: float, status: Optional[int]) -> None:
         with self._lock:
@@ -201,14 +386,43 @@ def _install_sql_listeners(engine: Engine) -> None:
             tracker.record_query(statement, elapsed_ms, parameters)
 
 
+def _query_budget_mode() -> str:
+    mode = (current_app.config.get("SQL_BUDGET_MODE") or "").strip().lower()
+    if mode in {"raise", "warn", "off"}:
+        return mode
+    return "raise" if current_app.debug or current_app.testing else "warn"
+
+
+def _enforce_query_budget(tracker: PerformanceTracker, default_budget: int) -> None:
+    mode = _query_budget_mode()
+    if mode == "off":
+        return
+    payload = tracker.budget_violations(default_budget)
+    if payload is None:
+        return
+    # Sem orcamento declarado o limite padrao so avisa, mesmo em modo raise.
+    if mode == "raise" and payload["declared"]:
+        raise QueryBudgetExceeded(payload)
+    current_app.logger.warning(
+        "SQL BUDGET EXCEEDED [%s]: %s",
+        tracker.request_id,
+        payload,
+        extra={"request_id": tracker.request_id, "sql_budget": payload},
+    )
+
+
 def register_performance_middleware(app: Flask, db) -> None:
     """Register before/after hooks and instrument SQLAlchemy for telemetry."""
 
     threshold_ms = float(app.config.get("SLOW_REQUEST_THRESHOLD_MS", 750))
+    default_budget = int(app.config.get("SQL_QUERY_BUDGET_DEFAULT", 100))
+    n_plus_one_threshold = int(app.config.get("SQL_N_PLUS_ONE_THRESHOLD", 10))
 
     @app.before_request
     def _perf_before_request():
-        tracker = PerformanceTracker(threshold_ms=threshold_ms)
+        tracker = PerformanceTracker(
+            threshold_ms=threshold_ms, n_plus_one_threshold=n_plus_one_threshold
+        )
         g.performance_tracker = tracker
         g.request_id = tracker.request_id
         try:
@@ -241,7 +455,9 @@ def register_performance_middleware(app: Flask, db) -> None:
                     payload,
                     extra={"request_id": tracker.request_id},
                 )
+            _enforce_query_budget(tracker, default_budget)
         return response
 
-    _install_sql_listeners(db.engine)
+    for engine in db.engines.values():
+        _install_sql_listeners(engine)
     _instrument_templates(app)
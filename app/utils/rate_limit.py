@@ -0,0 +1,83 @@
+"""Client-side rate limiting for calls to external APIs.
+
+A single ``TokenBucket`` is shared by every thread that talks to the same
+API, so a pool of workers stays under the provider's limit as a whole
+instead of each worker assuming it has the full quota.
+
+Uso:
+    from app.utils.rate_limit import TokenBucket
+
+    bucket = TokenBucket(rate=5, capacity=10)
+
+    def fetch(url):
+        bucket.acquire()  # blocks until a request slot is free
+        return session.get(url)
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` tokens per second, up to ``capacity``.
+
+    ``acquire`` sleeps outside the lock and checks again on waking, so a
+    ``pause`` (e.g. after a 429 with ``Retry-After``) also holds the threads
+    that were already waiting.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float | None = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = clock()
+        self.waited_seconds = 0.0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Take ``tokens`` from the bucket, sleeping until they are available.
+
+        Returns the number of seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                # ``_updated`` is in the future while paused; refill starts from there.
+                paused = max(0.0, self._updated - now)
+                if not paused and self._tokens >= tokens:
+                    self._tokens -= tokens
+                    self.waited_seconds += waited
+                    return waited
+                wait = paused + max(0.0, tokens - self._tokens) / self.rate
+            self._sleep(wait)
+            waited += wait
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller for ``seconds`` and restart from an empty bucket."""
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            self._tokens = min(self._tokens, 0.0)
+            self._updated = max(self._updated, now + seconds)
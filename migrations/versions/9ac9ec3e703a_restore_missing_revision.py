@@ -0,0 +1,27 @@
+"""Placeholder for a revision whose file is missing from the repository.
+
+``ab12cd34ef56`` revises ``9ac9ec3e703a``, but that script was never
+committed, which left Alembic unable to build the revision map (so
+``flask db upgrade`` failed before running anything). Its changes were
+applied to existing databases by the startup schema checks, now the
+``b8e2f4a6c1d3`` migration, so this revision is intentionally a no-op.
+
+Revision ID: 9ac9ec3e703a
+Revises:
+Create Date: 2026-02-12 18:00:00.000000
+"""
+
+
+# revision identifiers, used by Alembic.
+revision = "9ac9ec3e703a"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    pass
+
+
+def downgrade():
+    pass
@@ -0,0 +1,74 @@
+"""Add task_closure (ancestor, descendant, depth) for the subtask tree.
+
+Backfilled level by level from ``tasks.parent_id``; afterwards the rows are
+maintained by the Task mapper events. ``has_children`` is realigned with the
+closure so parents of already-deleted subtasks stop showing the flag.
+
+Revision ID: a4e7c2b9d1f6
+Revises: f1d9b3c5a7e2
+Create Date: 2026-03-09 09:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a4e7c2b9d1f6"
+down_revision = "f1d9b3c5a7e2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    if "task_closure" in inspector.get_table_names():
+        return
+
+    op.create_table(
+        "task_closure",
+        sa.Column("ancestor_id", sa.Integer(), nullable=False),
+        sa.Column("descendant_id", sa.Integer(), nullable=False),
+        sa.Column("depth", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["ancestor_id"], ["tasks.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["descendant_id"], ["tasks.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("ancestor_id", "descendant_id"),
+    )
+    op.create_index(
+        "idx_task_closure_ancestor_depth", "task_closure", ["ancestor_id", "depth"]
+    )
+    op.create_index(
+        "idx_task_closure_descendant_depth", "task_closure", ["descendant_id", "depth"]
+    )
+
+    op.execute(
+        "INSERT INTO task_closure (ancestor_id, descendant_id, depth) "
+        "SELECT id, id, 0 FROM tasks"
+    )
+    depth = 0
+    while True:
+        inserted = bind.execute(
+            sa.text(
+                "INSERT INTO task_closure (ancestor_id, descendant_id, depth) "
+                "SELECT c.ancestor_id, t.id, :next_depth "
+                "FROM task_closure c JOIN tasks t ON t.parent_id = c.descendant_id "
+                "WHERE c.depth = :depth"
+            ),
+            {"depth": depth, "next_depth": depth + 1},
+        ).rowcount
+        if not inserted:
+            break
+        depth += 1
+
+    op.execute(
+        "UPDATE tasks SET has_children = CASE WHEN EXISTS ("
+        "SELECT 1 FROM task_closure c WHERE c.ancestor_id = tasks.id AND c.depth = 1"
+        ") THEN 1 ELSE 0 END, updated_at = updated_at"
+    )
+
+
+def downgrade():
+    op.drop_index("idx_task_closure_descendant_depth", table_name="task_closure")
+    op.drop_index("idx_task_closure_ancestor_depth", table_name="task_closure")
+    op.drop_table("task_closure")
@@ -0,0 +1,98 @@
+"""Store report rollups as per-dimension aggregates.
+
+Replaces the per-entity ``report_rollup_rows`` snapshot with
+``report_rollup_groups`` (one row per report dimension value), indexes
+``departamentos.updated_at`` for the live overlay and backfills the
+``updated_at`` columns left NULL when they were introduced, so rows that
+were never edited still carry a value the overlay can compare against.
+
+Revision ID: a7c3e9d1f5b2
+Revises: f6a0b4c2d8e7
+Create Date: 2026-04-14 09:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a7c3e9d1f5b2"
+down_revision = "f6a0b4c2d8e7"
+branch_labels = None
+depends_on = None
+
+
+UPDATED_AT_TABLES = ("tbl_empresas", "users", "departamentos")
+
+
+def _create_index_if_missing(table_name, index_name, columns):
+    inspector = sa.inspect(op.get_bind())
+    existing = {idx.get("name") for idx in inspector.get_indexes(table_name)}
+    if index_name in existing:
+        return
+    op.create_index(index_name, table_name, columns, unique=False)
+
+
+def _drop_index_if_exists(table_name, index_name):
+    inspector = sa.inspect(op.get_bind())
+    existing = {idx.get("name") for idx in inspector.get_indexes(table_name)}
+    if index_name in existing:
+        op.drop_index(index_name, table_name=table_name)
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+
+    if "report_rollup_rows" in tables:
+        op.drop_table("report_rollup_rows")
+    if "report_rollup_groups" not in tables:
+        op.create_table(
+            "report_rollup_groups",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("report_key", sa.String(length=40), nullable=False),
+            sa.Column("dimension", sa.String(length=40), nullable=False),
+            sa.Column("label", sa.String(length=255), nullable=False),
+            sa.Column("position", sa.Integer(), nullable=False, server_default=sa.text("0")),
+            sa.Column("entity_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+            sa.Column("members", sa.JSON(), nullable=False),
+            sa.Column("snapshot_date", sa.Date(), nullable=False),
+            sa.Column("refreshed_at", sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint(
+                "report_key", "dimension", "label", name="uq_report_rollup_groups_label"
+            ),
+        )
+
+    _create_index_if_missing("departamentos", "ix_departamentos_updated_at", ["updated_at"])
+
+    for table_name in UPDATED_AT_TABLES:
+        op.execute(
+            sa.text(
+                f"UPDATE {table_name} SET updated_at = CURRENT_TIMESTAMP "
+                "WHERE updated_at IS NULL"
+            )
+        )
+
+    # O formato mudou: a primeira rodada do scheduler reconstroi tudo
+    if "report_rollup_watermarks" in tables:
+        op.execute(sa.text("DELETE FROM report_rollup_watermarks"))
+
+
+def downgrade():
+    _drop_index_if_exists("departamentos", "ix_departamentos_updated_at")
+    op.drop_table("report_rollup_groups")
+    op.execute(sa.text("DELETE FROM report_rollup_watermarks"))
+    op.create_table(
+        "report_rollup_rows",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("report_key", sa.String(length=40), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column("snapshot_date", sa.Date(), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "report_key", "entity_id", name="uq_report_rollup_rows_entity"
+        ),
+    )
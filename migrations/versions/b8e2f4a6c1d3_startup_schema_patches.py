@@ -0,0 +1,379 @@
+"""Move the startup schema patches into a migration; add schema_fingerprint.
+
+``app/__init__.py`` used to inspect the database and run these ALTERs on
+every import. They are kept here unchanged in effect and idempotent: every
+step checks the live schema first, so running it against a database that
+was already patched at startup does nothing. MySQL-only statements are
+skipped on SQLite, where the startup code failed and logged them anyway.
+
+``schema_fingerprint`` stores the migration head and model-column hash
+written by ``scripts/sync_schema.py``; startup compares it in one query.
+
+Revision ID: b8e2f4a6c1d3
+Revises: a4e7c2b9d1f6
+Create Date: 2026-03-16 09:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "b8e2f4a6c1d3"
+down_revision = "a4e7c2b9d1f6"
+branch_labels = None
+depends_on = None
+
+
+# Valores vigentes quando a verificacao saiu da inicializacao.
+PROCESSO_TIPOS = (
+    "ALTERACAO",
+    "ACOMPANHAMENTO",
+    "ATA",
+    "RERATIFICACAO",
+    "TRANSFORMACAO",
+    "BAIXA",
+    "INSCRICOES",
+    "SISTEMAS_INTERNOS",
+    "IMPLANTACAO",
+    "CONSTITUICAO",
+    "ATUALIZACAO_CNPJ_RECEITA",
+    "CRIACAO_FILIAL",
+    "CLIENTE_TRANSFERIDO",
+    "BRIEFING",
+    "ONBOARDING",
+    "SUCESSO_CLIENTE",
+)
+
+PROCESSO_STATUS = (
+    "VIABILIDADE",
+    "AGUARDANDO_INICIO",
+    "DIGITACAO",
+    "EM_EXIGENCIA",
+    "CORRECAO",
+    "ASSINATURA",
+    "JUCESC",
+    "FINALIZADA",
+    "PARALISADA",
+    "DEFERIDO",
+    "REGISTRADA",
+    "EM_ANDAMENTO",
+    "AGUARDANDO_RETORNO",
+    "FORMULARIO_RECEBIDO",
+    "ENVIO_DE_ORCAMENTO_AO_CLIENTE",
+    "ACEITE_TERMO_DE_CIENCIA_ORCAMENTO",
+    "CONFIRMAR_INFORMACOES_TAREFAS_INTERNAS",
+    "ENCAMINHAR_AO_FINANCEIRO_E_SOCIETARIO",
+    "CADASTRAR_CLIENTE_NOS_SISTEMAS_UTILIZADOS",
+)
+
+INDEXES = {
+    "tbl_inventario": {
+        "idx_inventario_status_empresa": ["status", "empresa_id"],
+        "idx_inventario_encerramento": ["encerramento_fiscal"],
+        "idx_inventario_status_composite": ["status", "empresa_id"],
+    },
+    "tbl_empresas": {
+        "idx_empresas_ativo_tipo": ["ativo", "tipo_empresa"],
+        "idx_empresas_ativo_tributacao": ["ativo", "tributacao"],
+        "idx_empresas_tributacao_ativo": ["tributacao", "ativo"],
+        "idx_empresas_codigo_ativo": ["codigo_empresa", "ativo"],
+        "ix_tbl_empresas_updated_at": ["updated_at"],
+    },
+    "audit_logs": {
+        "idx_audit_user_created": ["user_id", "created_at"],
+        "idx_audit_resource_action_created": ["resource_type", "action_type", "created_at"],
+    },
+}
+
+
+def _columns(bind, table_name):
+    return {col["name"]: col for col in sa.inspect(bind).get_columns(table_name)}
+
+
+def _ensure_enum(bind, table_name, column_name, values, suffix):
+    column = _columns(bind, table_name).get(column_name)
+    if column is None:
+        return
+    if all(value in str(column.get("type", "")) for value in values):
+        return
+    enum_sql = ", ".join(f"'{value}'" for value in values)
+    op.execute(
+        f"ALTER TABLE {table_name} MODIFY COLUMN {column_name} ENUM({enum_sql}) {suffix}"
+    )
+
+
+def _patch_societario(bind):
+    _ensure_enum(bind, "societario_processos", "tipo_processo", PROCESSO_TIPOS, "NOT NULL")
+    _ensure_enum(
+        bind,
+        "societario_processos",
+        "status",
+        PROCESSO_STATUS,
+        "NOT NULL DEFAULT 'VIABILIDADE'",
+    )
+
+
+def _patch_reunioes(bind, is_mysql):
+    if "course_id" in _columns(bind, "reunioes"):
+        return
+    op.execute("ALTER TABLE reunioes ADD COLUMN course_id INTEGER NULL")
+    if is_mysql:
+        op.execute(
+            "ALTER TABLE reunioes "
+            "ADD CONSTRAINT fk_reunioes_course_id_courses "
+            "FOREIGN KEY (course_id) REFERENCES courses (id) ON DELETE SET NULL"
+        )
+
+
+def _patch_announcements(bind, is_mysql):
+    columns = _columns(bind, "announcements")
+    if "content" not in columns:
+        op.execute("ALTER TABLE announcements ADD COLUMN content TEXT NULL")
+        op.execute("UPDATE announcements SET content = '' WHERE content IS NULL")
+        if is_mysql:
+            op.execute("ALTER TABLE announcements MODIFY COLUMN content TEXT NOT NULL")
+    if "attachment_name" not in columns:
+        op.execute("ALTER TABLE announcements ADD COLUMN attachment_name VARCHAR(255) NULL")
+
+
+def _patch_client_announcements(bind, is_mysql):
+    columns = _columns(bind, "client_announcements")
+    if "code" not in columns:
+        op.execute("ALTER TABLE client_announcements ADD COLUMN code VARCHAR(50) NULL")
+    if "status" not in columns:
+        op.execute(
+            "ALTER TABLE client_announcements "
+            "ADD COLUMN status VARCHAR(20) NOT NULL DEFAULT 'Aguardando Envio'"
+        )
+        op.execute(
+            "UPDATE client_announcements SET status = 'Enviado' "
+            "WHERE status IS NULL OR status = ''"
+        )
+    if "send_date" not in columns:
+        if is_mysql:
+            op.execute("ALTER TABLE client_announcements ADD COLUMN send_date DATE NULL")
+            op.execute(
+                "UPDATE client_announcements "
+                "SET send_date = COALESCE(DATE(created_at), CURDATE()) WHERE send_date IS NULL"
+            )
+            op.execute("ALTER TABLE client_announcements MODIFY COLUMN send_date DATE NOT NULL")
+        else:
+            # SQLite nao altera NOT NULL sem recriar a tabela; o default fica na aplicacao.
+            op.execute("ALTER TABLE client_announcements ADD COLUMN send_date DATE")
+            op.execute(
+                "UPDATE client_announcements "
+                "SET send_date = COALESCE(DATE(created_at), DATE('now')) WHERE send_date IS NULL"
+            )
+    if "last_notification_date" not in columns:
+        op.execute(
+            "ALTER TABLE client_announcements ADD COLUMN last_notification_date DATE NULL"
+        )
+
+
+def _patch_announcement_attachments(bind):
+    inspector = sa.inspect(bind)
+    if not inspector.has_table("announcement_attachments"):
+        op.create_table(
+            "announcement_attachments",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("announcement_id", sa.Integer(), nullable=False),
+            sa.Column("file_path", sa.String(length=255), nullable=False),
+            sa.Column("original_name", sa.String(length=255), nullable=True),
+            sa.Column("mime_type", sa.String(length=128), nullable=True),
+            sa.Column(
+                "created_at", sa.DateTime(), nullable=False, server_default=sa.func.now()
+            ),
+            sa.ForeignKeyConstraint(
+                ["announcement_id"],
+                ["announcements.id"],
+                name="fk_announcement_attachments_announcement_id_announcements",
+                ondelete="CASCADE",
+            ),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    else:
+        columns = _columns(bind, "announcement_attachments")
+        if "mime_type" not in columns:
+            op.execute(
+                "ALTER TABLE announcement_attachments ADD COLUMN mime_type VARCHAR(128) NULL"
+            )
+        if "created_at" not in columns:
+            op.execute(
+                "ALTER TABLE announcement_attachments "
+                "ADD COLUMN created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP"
+            )
+
+    if "attachment_path" not in _columns(bind, "announcements"):
+        return
+    # Copia os anexos legados (coluna unica) que ainda nao tem linha propria.
+    op.execute(
+        "INSERT INTO announcement_attachments "
+        "(announcement_id, file_path, original_name, mime_type, created_at) "
+        "SELECT a.id, a.attachment_path, a.attachment_name, NULL, "
+        "COALESCE(a.created_at, CURRENT_TIMESTAMP) "
+        "FROM announcements a "
+        "WHERE a.attachment_path IS NOT NULL AND NOT EXISTS ("
+        "SELECT 1 FROM announcement_attachments aa WHERE aa.announcement_id = a.id)"
+    )
+
+
+def _patch_announcement_tag_links(bind):
+    inspector = sa.inspect(bind)
+    if inspector.has_table("announcement_tag_links") or not inspector.has_table("tags"):
+        return
+    op.create_table(
+        "announcement_tag_links",
+        sa.Column("announcement_id", sa.Integer(), nullable=False),
+        sa.Column("tag_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["announcement_id"],
+            ["announcements.id"],
+            name="fk_announcement_tag_links_announcement_id_announcements",
+            ondelete="CASCADE",
+        ),
+        sa.ForeignKeyConstraint(
+            ["tag_id"],
+            ["tags.id"],
+            name="fk_announcement_tag_links_tag_id_tags",
+            ondelete="CASCADE",
+        ),
+        sa.PrimaryKeyConstraint("announcement_id", "tag_id"),
+    )
+
+
+def _patch_task_notifications(bind, is_mysql):
+    columns = _columns(bind, "task_notifications")
+    if "type" not in columns:
+        op.execute(
+            "ALTER TABLE task_notifications ADD COLUMN type VARCHAR(20) NOT NULL DEFAULT 'task'"
+        )
+        op.execute("UPDATE task_notifications SET type = 'task' WHERE type IS NULL")
+    if "announcement_id" not in columns and sa.inspect(bind).has_table("announcements"):
+        op.execute("ALTER TABLE task_notifications ADD COLUMN announcement_id INTEGER NULL")
+        has_fk = any(
+            fk.get("constrained_columns") == ["announcement_id"]
+            for fk in sa.inspect(bind).get_foreign_keys("task_notifications")
+        )
+        if is_mysql and not has_fk:
+            op.execute(
+                "ALTER TABLE task_notifications "
+                "ADD CONSTRAINT fk_task_notifications_announcement_id_announcements "
+                "FOREIGN KEY (announcement_id) REFERENCES announcements (id) ON DELETE CASCADE"
+            )
+    task_id = columns.get("task_id")
+    if is_mysql and task_id is not None and not task_id.get("nullable", True):
+        op.execute("ALTER TABLE task_notifications MODIFY COLUMN task_id INTEGER NULL")
+
+
+def _patch_operational_procedures(bind):
+    columns = _columns(bind, "operational_procedures")
+    descricao = columns.get("descricao")
+    if descricao is None and "description" in columns:
+        # Bancos antigos ainda usam ``description``.
+        op.execute(
+            "ALTER TABLE operational_procedures "
+            "CHANGE COLUMN description descricao LONGTEXT NULL"
+        )
+        return
+    if descricao is not None and "longtext" not in str(descricao["type"]).lower():
+        op.execute("ALTER TABLE operational_procedures MODIFY COLUMN descricao LONGTEXT NULL")
+
+
+def _patch_empresas(bind, is_mysql):
+    columns = _columns(bind, "tbl_empresas")
+    if "ativo" not in columns:
+        op.execute("ALTER TABLE tbl_empresas ADD COLUMN ativo BOOLEAN NOT NULL DEFAULT 1")
+    if "tipo_empresa" not in columns:
+        op.execute(
+            "ALTER TABLE tbl_empresas ADD COLUMN tipo_empresa VARCHAR(20) NOT NULL DEFAULT 'Matriz'"
+        )
+    if "updated_at" not in columns:
+        op.execute("ALTER TABLE tbl_empresas ADD COLUMN updated_at DATETIME NULL")
+    if "contatos" not in columns:
+        op.execute("ALTER TABLE tbl_empresas ADD COLUMN contatos VARCHAR(255) NULL")
+        if is_mysql and sa.inspect(bind).has_table("departamentos"):
+            op.execute(
+                "UPDATE tbl_empresas e "
+                "INNER JOIN departamentos d ON d.empresa_id = e.id "
+                "SET e.contatos = d.contatos "
+                "WHERE d.tipo = 'fiscal' AND d.contatos IS NOT NULL"
+            )
+
+
+def _patch_users(bind):
+    if "updated_at" in _columns(bind, "users"):
+        return
+    op.execute("ALTER TABLE users ADD COLUMN updated_at DATETIME NULL")
+    op.create_index("ix_users_updated_at", "users", ["updated_at"])
+
+
+def _patch_inventario(bind):
+    columns = _columns(bind, "tbl_inventario")
+    for name, ddl in (
+        ("fechamento_tadeu_2025", "DECIMAL(12, 2) NULL"),
+        ("cfop_files", "JSON NULL"),
+        ("cfop_consolidado_files", "JSON NULL"),
+        ("cliente_files", "JSON NULL"),
+    ):
+        if name not in columns:
+            op.execute(f"ALTER TABLE tbl_inventario ADD COLUMN {name} {ddl}")
+
+
+def _ensure_indexes(bind):
+    inspector = sa.inspect(bind)
+    for table_name, indexes in INDEXES.items():
+        if not inspector.has_table(table_name):
+            continue
+        existing = {idx.get("name") for idx in inspector.get_indexes(table_name)}
+        columns = {col["name"] for col in inspector.get_columns(table_name)}
+        for index_name, index_columns in indexes.items():
+            if index_name in existing or any(col not in columns for col in index_columns):
+                continue
+            op.create_index(index_name, table_name, index_columns)
+
+
+def upgrade():
+    bind = op.get_bind()
+    is_mysql = bind.dialect.name == "mysql"
+    inspector = sa.inspect(bind)
+    tables = set(inspector.get_table_names())
+
+    if is_mysql and "societario_processos" in tables:
+        _patch_societario(bind)
+    if "reunioes" in tables:
+        _patch_reunioes(bind, is_mysql)
+    if "diretoria_events" in tables and "photos" not in _columns(bind, "diretoria_events"):
+        op.execute("ALTER TABLE diretoria_events ADD COLUMN photos JSON NULL")
+    if "announcements" in tables:
+        _patch_announcements(bind, is_mysql)
+        _patch_announcement_attachments(bind)
+        _patch_announcement_tag_links(bind)
+    if "client_announcements" in tables:
+        _patch_client_announcements(bind, is_mysql)
+    if "task_notifications" in tables:
+        _patch_task_notifications(bind, is_mysql)
+    if is_mysql and "operational_procedures" in tables:
+        _patch_operational_procedures(bind)
+    if "tbl_empresas" in tables:
+        _patch_empresas(bind, is_mysql)
+    if "users" in tables:
+        _patch_users(bind)
+    if "tbl_inventario" in tables:
+        _patch_inventario(bind)
+    _ensure_indexes(bind)
+
+    if "schema_fingerprint" not in tables:
+        op.create_table(
+            "schema_fingerprint",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("migration_head", sa.String(length=255), nullable=False),
+            sa.Column("columns_hash", sa.String(length=64), nullable=False),
+            sa.Column("synced_at", sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+
+
+def downgrade():
+    # Os ajustes legados nao sao revertidos: o modelo atual depende deles.
+    op.drop_table("schema_fingerprint")
@@ -0,0 +1,57 @@
+"""Add task_stats read-model table.
+
+Revision ID: c3a7e91f0b24
+Revises: ab12cd34ef56, add_task_history_clean
+Create Date: 2026-03-02 10:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c3a7e91f0b24"
+down_revision = ("ab12cd34ef56", "add_task_history_clean")
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if "task_stats" in inspector.get_table_names():
+        return
+
+    op.create_table(
+        "task_stats",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("tag_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column(
+            "status",
+            sa.Enum("PENDING", "IN_PROGRESS", "DONE", name="taskstatus"),
+            nullable=False,
+        ),
+        sa.Column(
+            "priority",
+            sa.Enum("LOW", "MEDIUM", "HIGH", name="taskpriority"),
+            nullable=False,
+        ),
+        sa.Column("due_day", sa.Date(), nullable=False),
+        sa.Column("task_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.ForeignKeyConstraint(["tag_id"], ["tags.id"], ondelete="CASCADE"),
+        sa.UniqueConstraint(
+            "tag_id", "user_id", "status", "priority", "due_day",
+            name="uq_task_stats_bucket",
+        ),
+    )
+    op.create_index("idx_task_stats_status_due_day", "task_stats", ["status", "due_day"])
+    op.create_index("idx_task_stats_user_status", "task_stats", ["user_id", "status"])
+    # Populated by the reconcile_task_stats scheduler job on first boot.
+
+
+def downgrade():
+    op.drop_index("idx_task_stats_user_status", table_name="task_stats")
+    op.drop_index("idx_task_stats_status_due_day", table_name="task_stats")
+    op.drop_table("task_stats")
@@ -0,0 +1,55 @@
+"""add tbl_inventario_files (one row per inventory attachment)
+
+Replaces the JSON array columns ``cfop_files``, ``cfop_consolidado_files``
+and ``cliente_files`` of ``tbl_inventario``. The columns stay in place
+during the transition; ``scripts/backfill_inventario_files.py`` moves their
+entries into this table.
+
+Revision ID: c3d9e1f7a2b4
+Revises: b8e2f4a6c1d3
+Create Date: 2026-03-23 09:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "c3d9e1f7a2b4"
+down_revision = "b8e2f4a6c1d3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if inspector.has_table("tbl_inventario_files"):
+        return
+    op.create_table(
+        "tbl_inventario_files",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("empresa_id", sa.Integer(), nullable=False),
+        sa.Column("category", sa.String(length=32), nullable=False),
+        sa.Column("name", sa.String(length=255), nullable=False),
+        sa.Column("mime_type", sa.String(length=120), nullable=True),
+        sa.Column("size", sa.BigInteger(), nullable=True),
+        sa.Column("sha256", sa.String(length=64), nullable=True),
+        sa.Column("path", sa.String(length=512), nullable=False),
+        sa.Column("uploaded_by", sa.Integer(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["empresa_id"], ["tbl_empresas.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["uploaded_by"], ["users.id"], ondelete="SET NULL"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "idx_inventario_files_empresa_category",
+        "tbl_inventario_files",
+        ["empresa_id", "category", "created_at"],
+    )
+    op.create_index("idx_inventario_files_sha256", "tbl_inventario_files", ["sha256"])
+
+
+def downgrade():
+    op.drop_index("idx_inventario_files_sha256", table_name="tbl_inventario_files")
+    op.drop_index("idx_inventario_files_empresa_category", table_name="tbl_inventario_files")
+    op.drop_table("tbl_inventario_files")
@@ -0,0 +1,58 @@
+"""add acessorias_sync_cursors and acessorias_sync_runs
+
+Per-empresa high-water mark and run checkpoints for the incremental
+Acessorias delivery sync (``app.services.inventario_sync``).
+
+Revision ID: d4e8f2a9b3c5
+Revises: c3d9e1f7a2b4
+Create Date: 2026-03-30 09:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d4e8f2a9b3c5"
+down_revision = "c3d9e1f7a2b4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("acessorias_sync_cursors"):
+        op.create_table(
+            "acessorias_sync_cursors",
+            sa.Column("empresa_id", sa.Integer(), nullable=False),
+            sa.Column("period_key", sa.String(length=32), nullable=False),
+            sa.Column("last_dh", sa.DateTime(), nullable=True),
+            sa.Column("last_fetch_count", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("synced_at", sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(["empresa_id"], ["tbl_empresas.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("empresa_id", "period_key"),
+        )
+    if not inspector.has_table("acessorias_sync_runs"):
+        op.create_table(
+            "acessorias_sync_runs",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("period_key", sa.String(length=32), nullable=False),
+            sa.Column("status", sa.String(length=20), nullable=False),
+            sa.Column("started_at", sa.DateTime(), nullable=False),
+            sa.Column("heartbeat_at", sa.DateTime(), nullable=False),
+            sa.Column("finished_at", sa.DateTime(), nullable=True),
+            sa.Column("processed", sa.Integer(), nullable=False, server_default="0"),
+            sa.Column("stats", sa.JSON(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index(
+            "idx_acessorias_sync_runs_period",
+            "acessorias_sync_runs",
+            ["period_key", "finished_at"],
+        )
+
+
+def downgrade():
+    op.drop_index("idx_acessorias_sync_runs_period", table_name="acessorias_sync_runs")
+    op.drop_table("acessorias_sync_runs")
+    op.drop_table("acessorias_sync_cursors")
@@ -0,0 +1,67 @@
+"""Add report rollup tables and updated_at watermarks.
+
+Revision ID: d5b2f8a1c6e3
+Revises: c3a7e91f0b24
+Create Date: 2026-03-04 09:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "d5b2f8a1c6e3"
+down_revision = "c3a7e91f0b24"
+branch_labels = None
+depends_on = None
+
+
+def _add_updated_at_if_missing(table_name, index_name):
+    inspector = sa.inspect(op.get_bind())
+    columns = {col.get("name") for col in inspector.get_columns(table_name)}
+    if "updated_at" not in columns:
+        op.add_column(table_name, sa.Column("updated_at", sa.DateTime(), nullable=True))
+    indexes = {idx.get("name") for idx in inspector.get_indexes(table_name)}
+    if index_name not in indexes:
+        op.create_index(index_name, table_name, ["updated_at"], unique=False)
+
+
+def upgrade():
+    _add_updated_at_if_missing("tbl_empresas", "ix_tbl_empresas_updated_at")
+    _add_updated_at_if_missing("users", "ix_users_updated_at")
+
+    inspector = sa.inspect(op.get_bind())
+    tables = set(inspector.get_table_names())
+    if "report_rollup_rows" not in tables:
+        op.create_table(
+            "report_rollup_rows",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("report_key", sa.String(length=40), nullable=False),
+            sa.Column("entity_id", sa.Integer(), nullable=False),
+            sa.Column("payload", sa.JSON(), nullable=False),
+            sa.Column("snapshot_date", sa.Date(), nullable=False),
+            sa.Column("refreshed_at", sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint(
+                "report_key", "entity_id", name="uq_report_rollup_rows_entity"
+            ),
+        )
+    if "report_rollup_watermarks" not in tables:
+        op.create_table(
+            "report_rollup_watermarks",
+            sa.Column("report_key", sa.String(length=40), nullable=False),
+            sa.Column("watermark", sa.DateTime(), nullable=True),
+            sa.Column("row_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+            sa.Column("last_full_refresh_at", sa.DateTime(), nullable=True),
+            sa.Column("refreshed_at", sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint("report_key"),
+        )
+
+
+def downgrade():
+    op.drop_table("report_rollup_watermarks")
+    op.drop_table("report_rollup_rows")
+    op.drop_index("ix_users_updated_at", table_name="users")
+    op.drop_column("users", "updated_at")
+    op.drop_index("ix_tbl_empresas_updated_at", table_name="tbl_empresas")
+    op.drop_column("tbl_empresas", "updated_at")
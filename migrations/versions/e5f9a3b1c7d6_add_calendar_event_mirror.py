@@ -0,0 +1,63 @@
+"""add calendar_event_mirror and calendar_sync_state
+
+Local mirror of the meeting room Google Calendar, kept current with the
+incremental ``syncToken`` API (``app.services.calendar_mirror``).
+
+Revision ID: e5f9a3b1c7d6
+Revises: d4e8f2a9b3c5
+Create Date: 2026-04-06 09:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e5f9a3b1c7d6"
+down_revision = "d4e8f2a9b3c5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("calendar_event_mirror"):
+        op.create_table(
+            "calendar_event_mirror",
+            sa.Column("calendar_id", sa.String(length=255), nullable=False),
+            sa.Column("event_id", sa.String(length=255), nullable=False),
+            sa.Column("status", sa.String(length=20), nullable=True),
+            sa.Column("summary", sa.String(length=500), nullable=True),
+            sa.Column("start_utc", sa.DateTime(), nullable=False),
+            sa.Column("end_utc", sa.DateTime(), nullable=False),
+            sa.Column("all_day", sa.Boolean(), nullable=False, server_default=sa.false()),
+            sa.Column("etag", sa.String(length=100), nullable=True),
+            sa.Column("updated", sa.String(length=40), nullable=True),
+            sa.Column("payload", sa.JSON(), nullable=False),
+            sa.Column("synced_at", sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint("calendar_id", "event_id"),
+        )
+        op.create_index(
+            "idx_calendar_event_mirror_range",
+            "calendar_event_mirror",
+            ["calendar_id", "start_utc", "end_utc"],
+        )
+    if not inspector.has_table("calendar_sync_state"):
+        op.create_table(
+            "calendar_sync_state",
+            sa.Column("calendar_id", sa.String(length=255), nullable=False),
+            sa.Column("sync_token", sa.String(length=512), nullable=True),
+            sa.Column("synced_through", sa.DateTime(), nullable=True),
+            sa.Column("last_full_sync_at", sa.DateTime(), nullable=True),
+            sa.Column("changed_at", sa.DateTime(), nullable=True),
+            sa.Column("lease_until", sa.DateTime(), nullable=True),
+            sa.Column("last_error", sa.Text(), nullable=True),
+            sa.Column("last_error_at", sa.DateTime(), nullable=True),
+            sa.PrimaryKeyConstraint("calendar_id"),
+        )
+
+
+def downgrade():
+    op.drop_table("calendar_sync_state")
+    op.drop_index("idx_calendar_event_mirror_range", table_name="calendar_event_mirror")
+    op.drop_table("calendar_event_mirror")
@@ -0,0 +1,49 @@
+"""Add user_notification_counters for unread notification badges.
+
+Revision ID: e8c4a2d7f913
+Revises: d5b2f8a1c6e3
+Create Date: 2026-03-05 09:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "e8c4a2d7f913"
+down_revision = "d5b2f8a1c6e3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    inspector = sa.inspect(op.get_bind())
+    if "user_notification_counters" in inspector.get_table_names():
+        return
+
+    op.create_table(
+        "user_notification_counters",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("unread_count", sa.Integer(), nullable=False, server_default=sa.text("0")),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+    # Backfill a partir do historico atual; depois disso os contadores sao
+    # mantidos na mesma transacao das gravacoes de notificacoes.
+    op.execute(
+        """
+        INSERT INTO user_notification_counters (user_id, unread_count, updated_at)
+        SELECT users.id,
+               (SELECT COUNT(*) FROM task_notifications
+                 WHERE task_notifications.user_id = users.id
+                   AND task_notifications.read_at IS NULL),
+               CURRENT_TIMESTAMP
+          FROM users
+        """
+    )
+
+
+def downgrade():
+    op.drop_table("user_notification_counters")
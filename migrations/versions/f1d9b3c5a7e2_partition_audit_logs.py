@@ -0,0 +1,148 @@
+"""Partition audit_logs by month and add the cold archive table.
+
+MySQL: ``audit_logs`` becomes ``PARTITION BY RANGE (TO_DAYS(created_at))``
+with one partition per month plus ``pmax``. Partitioned InnoDB tables do not
+support foreign keys and need the partition column in the primary key, so
+the ``user_id`` foreign key is dropped and the key becomes ``(id, created_at)``.
+
+Other dialects only get the archive table and the covering indexes.
+
+Revision ID: f1d9b3c5a7e2
+Revises: e8c4a2d7f913
+Create Date: 2026-03-06 09:00:00.000000
+"""
+
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f1d9b3c5a7e2"
+down_revision = "e8c4a2d7f913"
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 2
+
+
+def _add_months(value, months):
+    index = value.year * 12 + (value.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _index_names(inspector, table_name):
+    return {idx.get("name") for idx in inspector.get_indexes(table_name)}
+
+
+def _create_index_if_missing(inspector, name, table_name, columns):
+    if name not in _index_names(inspector, table_name):
+        op.create_index(name, table_name, columns, unique=False)
+
+
+def _partition_audit_logs(bind):
+    partitioned = bind.execute(
+        sa.text(
+            "SELECT COUNT(*) FROM information_schema.PARTITIONS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'audit_logs' "
+            "AND PARTITION_NAME IS NOT NULL"
+        )
+    ).scalar()
+    if partitioned:
+        return
+
+    inspector = sa.inspect(bind)
+    for fk in inspector.get_foreign_keys("audit_logs"):
+        if fk.get("name"):
+            op.drop_constraint(fk["name"], "audit_logs", type_="foreignkey")
+    op.execute("ALTER TABLE audit_logs DROP PRIMARY KEY, ADD PRIMARY KEY (id, created_at)")
+
+    oldest = bind.execute(sa.text("SELECT MIN(created_at) FROM audit_logs")).scalar()
+    today = date.today()
+    first = date((oldest or today).year, (oldest or today).month, 1)
+    last = _add_months(date(today.year, today.month, 1), MONTHS_AHEAD)
+
+    clauses = []
+    month = first
+    while month <= last:
+        upper = _add_months(month, 1)
+        clauses.append(
+            f"PARTITION p{month:%Y%m} VALUES LESS THAN (TO_DAYS('{upper.isoformat()}'))"
+        )
+        month = upper
+    clauses.append("PARTITION pmax VALUES LESS THAN MAXVALUE")
+    op.execute(
+        "ALTER TABLE audit_logs PARTITION BY RANGE (TO_DAYS(created_at)) ("
+        + ", ".join(clauses)
+        + ")"
+    )
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+
+    if "audit_logs_archive" not in inspector.get_table_names():
+        op.create_table(
+            "audit_logs_archive",
+            sa.Column("id", sa.Integer(), autoincrement=False, nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("username", sa.String(length=80), nullable=False),
+            sa.Column("action_type", sa.String(length=50), nullable=False),
+            sa.Column("resource_type", sa.String(length=50), nullable=False),
+            sa.Column("resource_id", sa.Integer(), nullable=True),
+            sa.Column("action_description", sa.String(length=255), nullable=False),
+            sa.Column("old_values", sa.JSON(), nullable=True),
+            sa.Column("new_values", sa.JSON(), nullable=True),
+            sa.Column("ip_address", sa.String(length=45), nullable=True),
+            sa.Column("user_agent", sa.Text(), nullable=True),
+            sa.Column("request_id", sa.String(length=50), nullable=True),
+            sa.Column("endpoint", sa.String(length=255), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index(
+            "idx_audit_archive_user_created", "audit_logs_archive", ["user_id", "created_at"]
+        )
+        op.create_index(
+            "idx_audit_archive_resource_action_created",
+            "audit_logs_archive",
+            ["resource_type", "action_type", "created_at"],
+        )
+        op.create_index("idx_audit_archive_created_at", "audit_logs_archive", ["created_at"])
+
+    _create_index_if_missing(
+        inspector, "idx_audit_user_created", "audit_logs", ["user_id", "created_at"]
+    )
+    _create_index_if_missing(
+        inspector,
+        "idx_audit_resource_action_created",
+        "audit_logs",
+        ["resource_type", "action_type", "created_at"],
+    )
+
+    if bind.dialect.name == "mysql":
+        _partition_audit_logs(bind)
+
+    # (user_id, created_at) cobre as buscas por usuario; o indice simples e
+    # redundante (e no MySQL so pode sair depois da FK).
+    if "idx_audit_user_id" in _index_names(sa.inspect(bind), "audit_logs"):
+        op.drop_index("idx_audit_user_id", table_name="audit_logs")
+
+
+def downgrade():
+    bind = op.get_bind()
+    if "idx_audit_user_id" not in _index_names(sa.inspect(bind), "audit_logs"):
+        op.create_index("idx_audit_user_id", "audit_logs", ["user_id"], unique=False)
+
+    if bind.dialect.name == "mysql":
+        op.execute("ALTER TABLE audit_logs REMOVE PARTITIONING")
+        op.execute("ALTER TABLE audit_logs DROP PRIMARY KEY, ADD PRIMARY KEY (id)")
+        op.create_foreign_key(
+            "audit_logs_ibfk_1", "audit_logs", "users", ["user_id"], ["id"]
+        )
+
+    op.drop_index("idx_audit_resource_action_created", table_name="audit_logs")
+    op.drop_index("idx_audit_user_created", table_name="audit_logs")
+    op.drop_table("audit_logs_archive")
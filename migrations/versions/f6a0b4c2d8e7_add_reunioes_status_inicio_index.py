@@ -0,0 +1,42 @@
+"""Add index for the meeting status progression job.
+
+``advance_meeting_statuses`` runs every minute and only looks at scheduled
+meetings that already started plus the ones in progress.
+
+Revision ID: f6a0b4c2d8e7
+Revises: e5f9a3b1c7d6
+Create Date: 2026-04-08 09:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "f6a0b4c2d8e7"
+down_revision = "e5f9a3b1c7d6"
+branch_labels = None
+depends_on = None
+
+
+def _create_index_if_missing(table_name, index_name, columns):
+    inspector = sa.inspect(op.get_bind())
+    existing = {idx.get("name") for idx in inspector.get_indexes(table_name)}
+    if index_name in existing:
+        return
+    op.create_index(index_name, table_name, columns, unique=False)
+
+
+def _drop_index_if_exists(table_name, index_name):
+    inspector = sa.inspect(op.get_bind())
+    existing = {idx.get("name") for idx in inspector.get_indexes(table_name)}
+    if index_name in existing:
+        op.drop_index(index_name, table_name=table_name)
+
+
+def upgrade():
+    _create_index_if_missing("reunioes", "idx_reunioes_status_inicio", ["status", "inicio"])
+
+
+def downgrade():
+    _drop_index_if_exists("reunioes", "idx_reunioes_status_inicio")
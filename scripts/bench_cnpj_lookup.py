@@ -0,0 +1,198 @@
+"""
+Mede a consulta de CNPJ antiga contra o servico com cache e hedging.
+
+Sobe provedores falsos locais (BrasilAPI e ReceitaWS) com latencias
+configuraveis e um custo simulado por conexao nova (o handshake TCP/TLS que
+a sessao keep-alive evita), e compara:
+
+* legado: BrasilAPI e depois ReceitaWS em sequencia, ``requests.get`` avulso;
+* servico a frio: hedge entre provedores, sessoes reaproveitadas;
+* servico a quente: mesmas consultas, respondidas pelo cache em disco;
+* BrasilAPI degradada: o provedor lento sai da ordem pela pontuacao de saude.
+
+Nada toca as APIs reais nem o banco; o cache vai para um diretorio temporario.
+
+Uso:
+    python scripts/bench_cnpj_lookup.py
+    python scripts/bench_cnpj_lookup.py --lookups 40 --handshake-ms 150 --slow-ms 3000
+"""
+
+import argparse
+import json
+import random
+import re
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from dotenv import load_dotenv
+
+# Carrega variaveis do .env
+load_dotenv()
+
+import requests  # noqa: E402
+
+from app.services.cnpj_lookup import (  # noqa: E402
+    CnpjLookupService,
+    CnpjResultCache,
+    Provider,
+    _parse_brasilapi,
+    _parse_receitaws,
+)
+
+
+class FakeProviders:
+    """Latency profile of the fake providers; mutable between scenarios."""
+
+    def __init__(self, handshake_ms: float, fast_ms: float, tail_ms: float, tail_ratio: float,
+                 receitaws_ms: float, seed: int) -> None:
+        self.handshake_ms = handshake_ms
+        self.fast_ms = fast_ms
+        self.tail_ms = tail_ms
+        self.tail_ratio = tail_ratio
+        self.receitaws_ms = receitaws_ms
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+
+    def brasilapi_delay(self) -> float:
+        with self.lock:
+            tail = self.random.random() < self.tail_ratio
+        return (self.tail_ms if tail else self.fast_ms) / 1000
+
+
+def make_handler(state: FakeProviders):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            with state.lock:
+                state.connections += 1
+            time.sleep(state.handshake_ms / 1000)
+
+        def log_message(self, fmt, *args):
+            return
+
+        def _send(self, status: int, payload: dict) -> None:
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):  # noqa: N802 - nome exigido pelo http.server
+            with state.lock:
+                state.requests += 1
+            match = re.fullmatch(r"/(brasilapi|receitaws)/(\d{14})", self.path)
+            if not match:
+                return self._send(404, {})
+            provider, cnpj = match.groups()
+            missing = cnpj.endswith("00")
+            if provider == "brasilapi":
+                time.sleep(state.brasilapi_delay())
+                if missing:
+                    return self._send(404, {"message": "CNPJ nao encontrado"})
+                return self._send(200, {"cnpj": cnpj, "razao_social": f"EMPRESA {cnpj}"})
+            time.sleep(state.receitaws_ms / 1000)
+            if missing:
+                return self._send(200, {"status": "ERROR", "message": "CNPJ rejeitado"})
+            return self._send(200, {"cnpj": cnpj, "nome": f"EMPRESA {cnpj}"})
+
+    return Handler
+
+
+def legacy_lookup(base: str, cnpj: str) -> dict | None:
+    """The previous ``consultar_cnpj`` provider chain: sequential, one connection per call."""
+    r = requests.get(f"{base}/brasilapi/{cnpj}", timeout=20, proxies={"http": None, "https": None})
+    if r.status_code == 200:
+        return r.json()
+    r = requests.get(f"{base}/receitaws/{cnpj}", timeout=20, proxies={"http": None, "https": None})
+    if r.status_code == 200:
+        data = r.json()
+        return None if data.get("status") == "ERROR" else data
+    return None
+
+
+def measure(label: str, func, cnpjs: list[str]) -> list[float]:
+    samples = []
+    for cnpj in cnpjs:
+        started = time.perf_counter()
+        func(cnpj)
+        samples.append((time.perf_counter() - started) * 1000)
+    ordered = sorted(samples)
+    p95 = ordered[max(0, int(round(len(ordered) * 0.95)) - 1)]
+    print(
+        f"  {label:<28} media {statistics.mean(samples):7.1f} ms | p50 {statistics.median(samples):7.1f} | "
+        f"p95 {p95:7.1f} | max {ordered[-1]:7.1f}"
+    )
+    return samples
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lookups", type=int, default=20, help="CNPJs distintos por cenario")
+    parser.add_argument("--handshake-ms", type=float, default=120, help="Custo simulado de cada conexao nova")
+    parser.add_argument("--fast-ms", type=float, default=150, help="Latencia normal da BrasilAPI")
+    parser.add_argument("--tail-ms", type=float, default=2500, help="Latencia da cauda lenta da BrasilAPI")
+    parser.add_argument("--tail-ratio", type=float, default=0.2, help="Fracao das chamadas na cauda")
+    parser.add_argument("--receitaws-ms", type=float, default=400, help="Latencia da ReceitaWS")
+    parser.add_argument("--slow-ms", type=float, default=3000, help="Latencia da BrasilAPI degradada")
+    parser.add_argument("--hedge-ms", type=float, default=800, help="CNPJ_HEDGE_DELAY_MS do servico")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    state = FakeProviders(args.handshake_ms, args.fast_ms, args.tail_ms, args.tail_ratio,
+                          args.receitaws_ms, args.seed)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    # Um CNPJ em cada dez nao existe em nenhum provedor (cache negativo).
+    cnpjs = [f"{i:012d}{'00' if i % 10 == 0 else '01'}" for i in range(1, args.lookups + 1)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = CnpjLookupService(
+            providers=[
+                Provider("brasilapi", base + "/brasilapi/{cnpj}", _parse_brasilapi),
+                Provider("receitaws", base + "/receitaws/{cnpj}", _parse_receitaws),
+            ],
+            cache=CnpjResultCache(str(Path(tmp) / "cnpj_cache.sqlite3")),
+            hedge_delay_ms=args.hedge_ms,
+            slow_ms=args.slow_ms * 0.8,
+        )
+
+        print(f"{args.lookups} consultas por cenario, handshake simulado de {args.handshake_ms:.0f} ms")
+        legacy = measure("legado", lambda c: legacy_lookup(base, c), cnpjs)
+        legacy_conns = state.connections
+        cold = measure("servico (frio)", service.lookup, cnpjs)
+        warm = measure("servico (cache)", service.lookup, cnpjs)
+        print(f"  conexoes abertas: legado {legacy_conns}, servico {state.connections - legacy_conns}")
+
+        print(f"BrasilAPI degradada ({args.slow_ms:.0f} ms)")
+        state.fast_ms = state.tail_ms = args.slow_ms
+        degraded = [f"{i:012d}02" for i in range(1, args.lookups + 1)]
+        measure("legado", lambda c: legacy_lookup(base, c), degraded)
+        measure("servico (frio)", lambda c: service.lookup(c, use_cache=False), degraded)
+
+        print("saude dos provedores:", json.dumps(service.snapshot()["providers"]))
+        print(f"ganho a frio: {statistics.mean(legacy) / statistics.mean(cold):.1f}x na media; "
+              f"a quente: {statistics.mean(legacy) / statistics.mean(warm):.0f}x")
+        service.executor.shutdown(wait=False, cancel_futures=True)
+    server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
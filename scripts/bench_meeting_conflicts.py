@@ -0,0 +1,128 @@
+"""
+Mede a checagem de conflitos da sala de reuniao: varredura linear x indice.
+
+Gera uma agenda sintetica (por padrao 10 mil reunioes em dias uteis, das 8h
+as 18h) e compara, para uma serie recorrente semanal de 52 semanas:
+
+* legado: para cada ocorrencia, monta a lista de intervalos com todos os
+  eventos e procura o proximo horario livre com a varredura antiga;
+* indice: um ``ScheduleIndex`` construido uma vez para a janela da serie,
+  consultado por ocorrencia.
+
+Tambem mede o pior caso do legado (um dia inteiro de reunioes emendadas) e
+confere que os dois algoritmos devolvem os mesmos horarios. Nada toca o
+banco nem o Google Calendar.
+
+Uso:
+    python scripts/bench_meeting_conflicts.py
+    python scripts/bench_meeting_conflicts.py --meetings 20000 --weeks 104
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from app.services.meeting_schedule import ScheduleIndex  # noqa: E402
+
+MIN_GAP = timedelta(minutes=2)
+
+
+def legacy_next_available(start, dur, intervals):
+    """The previous ``_next_available``: sort, then rescan after every jump."""
+    intervals = sorted(intervals, key=lambda x: x[0])
+    while True:
+        for s, e in intervals:
+            if start < e + MIN_GAP and start + dur > s - MIN_GAP:
+                start = e + MIN_GAP
+                break
+        else:
+            return start
+
+
+def build_calendar(count: int, first_day: datetime, seed: int) -> list[tuple[datetime, datetime]]:
+    """``count`` meetings of 30-120 min on weekdays between 8h and 18h."""
+    rng = random.Random(seed)
+    workdays = []
+    day = first_day
+    while len(workdays) < 400:
+        if day.weekday() < 5:
+            workdays.append(day)
+        day += timedelta(days=1)
+    meetings = []
+    for _ in range(count):
+        day = rng.choice(workdays)
+        start = day + timedelta(hours=8, minutes=15 * rng.randrange(0, 36))
+        meetings.append((start, start + timedelta(minutes=rng.choice((30, 45, 60, 90, 120)))))
+    return meetings
+
+
+def timed(func):
+    started = time.perf_counter()
+    result = func()
+    return result, (time.perf_counter() - started) * 1000
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--meetings", type=int, default=10_000, help="Reunioes na agenda sintetica")
+    parser.add_argument("--weeks", type=int, default=52, help="Ocorrencias da serie semanal")
+    parser.add_argument("--chain", type=int, default=300, help="Reunioes emendadas no pior caso")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    first_day = datetime(2026, 1, 5)
+    meetings = build_calendar(args.meetings, first_day, args.seed)
+    duration = timedelta(hours=1)
+    occurrences = [first_day + timedelta(weeks=w, hours=10) for w in range(args.weeks)]
+
+    print(f"{args.meetings} reunioes, serie semanal de {args.weeks} ocorrencias de 1h")
+
+    def run_legacy():
+        return [legacy_next_available(start, duration, list(meetings)) for start in occurrences]
+
+    def run_index():
+        index = ScheduleIndex(meetings, gap=MIN_GAP)
+        return [index.next_free(start, duration) for start in occurrences]
+
+    legacy, legacy_ms = timed(run_legacy)
+    indexed, index_ms = timed(run_index)
+    print(f"  legado {legacy_ms:9.1f} ms | indice {index_ms:7.1f} ms (inclui a construcao) | "
+          f"{legacy_ms / index_ms:.0f}x")
+    moved = sum(1 for start, slot in zip(occurrences, indexed) if slot != start)
+    print(f"  ocorrencias em conflito: {moved}")
+
+    index = ScheduleIndex(meetings, gap=MIN_GAP)
+    _, query_ms = timed(lambda: [index.next_free(start, duration) for start in occurrences])
+    print(f"  so as consultas do indice: {query_ms:.2f} ms ({len(index)} blocos)")
+
+    # Pior caso do legado: cada salto reinicia a varredura.
+    chain_start = datetime(2027, 6, 1, 0, 0)
+    chain = [
+        (chain_start + i * (timedelta(minutes=30) + MIN_GAP),
+         chain_start + i * (timedelta(minutes=30) + MIN_GAP) + timedelta(minutes=30))
+        for i in range(args.chain)
+    ]
+    calendar = meetings + chain
+    print(f"dia com {args.chain} reunioes emendadas")
+    legacy_chain, legacy_ms = timed(lambda: legacy_next_available(chain_start, duration, calendar))
+    indexed_chain, index_ms = timed(
+        lambda: ScheduleIndex(calendar, gap=MIN_GAP).next_free(chain_start, duration)
+    )
+    print(f"  legado {legacy_ms:9.1f} ms | indice {index_ms:7.1f} ms | {legacy_ms / index_ms:.0f}x")
+
+    if legacy != indexed or legacy_chain != indexed_chain:
+        print("DIVERGENCIA entre legado e indice")
+        return 1
+    print("resultados identicos")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
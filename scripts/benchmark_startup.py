@@ -0,0 +1,247 @@
+"""Benchmark de inicializacao: tempo de importacao e RSS por blueprint.
+
+Cada rodada importa ``app`` em um processo Python novo (cold start) e mede,
+para cada modulo de ``app/controllers/routes/blueprints``, o tempo e o
+crescimento de RSS da sua importacao. Os valores sao cumulativos: uma
+dependencia pesada conta para o primeiro blueprint que a importar, o que
+aponta quem a puxa para a inicializacao.
+
+Falha (codigo 1) quando:
+- algum modulo de ``HEAVY_MODULES`` foi importado na inicializacao;
+- o tempo total, o RSS final ou algum blueprint passa dos limites;
+- com ``--baseline``, algum valor piorou mais que ``--tolerance``.
+
+Uso:
+    python scripts/benchmark_startup.py
+    python scripts/benchmark_startup.py --runs 5 --max-seconds 3 --max-rss-mb 250
+    python scripts/benchmark_startup.py --write-baseline startup_baseline.json
+    python scripts/benchmark_startup.py --baseline startup_baseline.json --tolerance 0.25
+"""
+
+import argparse
+import importlib.abc
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+BLUEPRINT_PACKAGE = "app.controllers.routes.blueprints"
+
+# Dependencias que so devem ser carregadas no primeiro uso (app.utils.lazy_import).
+HEAVY_MODULES = (
+    "pandas",
+    "numpy",
+    "fpdf",
+    "docx",
+    "docx2pdf",
+    "bs4",
+    "PIL.Image",
+    "googleapiclient.discovery",
+    "google.oauth2.service_account",
+    "pywebpush",
+    "matplotlib",
+)
+
+
+# =============================================================================
+# PROCESSO FILHO
+# =============================================================================
+
+def _rss_bytes() -> int:
+    try:
+        import psutil
+
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as handle:
+            return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+
+        # Pico, nao atual; no Linux em KiB.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class _TimingLoader(importlib.abc.Loader):
+    def __init__(self, loader, samples: dict) -> None:
+        self._loader = loader
+        self._samples = samples
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        rss_before = _rss_bytes()
+        started = time.perf_counter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._samples[module.__name__] = {
+                "seconds": time.perf_counter() - started,
+                "rss_bytes": _rss_bytes() - rss_before,
+            }
+
+
+class _BlueprintFinder(importlib.abc.MetaPathFinder):
+    """Wrap the loader of every blueprint module to time its execution."""
+
+    def __init__(self, samples: dict) -> None:
+        self._samples = samples
+
+    def find_spec(self, fullname, path, target=None):
+        if not fullname.startswith(BLUEPRINT_PACKAGE + "."):
+            return None
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                if spec.loader is not None:
+                    spec.loader = _TimingLoader(spec.loader, self._samples)
+                return spec
+        return None
+
+
+def _measure_child() -> None:
+    os.environ.setdefault("DISABLE_SCHEDULER", "1")
+    os.environ.setdefault("SCHEMA_STARTUP_CHECK", "0")
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+    samples: dict = {}
+    sys.meta_path.insert(0, _BlueprintFinder(samples))
+    rss_before = _rss_bytes()
+    started = time.perf_counter()
+    import app  # noqa: F401
+
+    result = {
+        "total_seconds": time.perf_counter() - started,
+        "rss_bytes": _rss_bytes(),
+        "rss_import_bytes": _rss_bytes() - rss_before,
+        "blueprints": {name.rsplit(".", 1)[-1]: value for name, value in samples.items()},
+        "heavy_loaded": [name for name in HEAVY_MODULES if name in sys.modules],
+    }
+    print(json.dumps(result))
+
+
+# =============================================================================
+# PROCESSO PAI
+# =============================================================================
+
+def _run_once() -> dict:
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child"],
+        cwd=str(root_dir),
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if completed.returncode != 0:
+        sys.stderr.write(completed.stderr)
+        raise SystemExit(f"importacao do app falhou (codigo {completed.returncode})")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def _median_report(runs: list[dict]) -> dict:
+    names = sorted({name for run in runs for name in run["blueprints"]})
+    return {
+        "total_seconds": statistics.median(run["total_seconds"] for run in runs),
+        "rss_bytes": statistics.median(run["rss_bytes"] for run in runs),
+        "blueprints": {
+            name: {
+                "seconds": statistics.median(
+                    run["blueprints"].get(name, {}).get("seconds", 0.0) for run in runs
+                ),
+                "rss_bytes": statistics.median(
+                    run["blueprints"].get(name, {}).get("rss_bytes", 0) for run in runs
+                ),
+            }
+            for name in names
+        },
+        "heavy_loaded": sorted({name for run in runs for name in run["heavy_loaded"]}),
+    }
+
+
+def _print_report(report: dict) -> None:
+    mib = 1024 * 1024
+    print(f"{'blueprint':<24} {'import ms':>10} {'RSS MiB':>9}")
+    ordered = sorted(report["blueprints"].items(), key=lambda item: -item[1]["seconds"])
+    for name, sample in ordered:
+        print(f"{name:<24} {sample['seconds'] * 1000:>10.1f} {sample['rss_bytes'] / mib:>9.1f}")
+    print(f"{'TOTAL (import app)':<24} {report['total_seconds'] * 1000:>10.1f} {report['rss_bytes'] / mib:>9.1f}")
+    print(f"modulos pesados na inicializacao: {', '.join(report['heavy_loaded']) or 'nenhum'}")
+
+
+def _check(report: dict, args: argparse.Namespace) -> list[str]:
+    mib = 1024 * 1024
+    failures = []
+    if report["heavy_loaded"] and not args.allow_heavy:
+        failures.append(f"modulos pesados importados na inicializacao: {', '.join(report['heavy_loaded'])}")
+    if report["total_seconds"] > args.max_seconds:
+        failures.append(f"inicializacao {report['total_seconds']:.2f}s > {args.max_seconds:.2f}s")
+    if report["rss_bytes"] > args.max_rss_mb * mib:
+        failures.append(f"RSS {report['rss_bytes'] / mib:.0f} MiB > {args.max_rss_mb:.0f} MiB")
+    for name, sample in report["blueprints"].items():
+        if sample["seconds"] * 1000 > args.max_blueprint_ms:
+            failures.append(f"{name}: {sample['seconds'] * 1000:.0f} ms > {args.max_blueprint_ms:.0f} ms")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        limit = 1 + args.tolerance
+        for key, label in (("total_seconds", "tempo total"), ("rss_bytes", "RSS")):
+            if baseline.get(key) and report[key] > baseline[key] * limit:
+                failures.append(f"{label} piorou: {report[key]:.3g} > {baseline[key]:.3g} x {limit:.2f}")
+        for name, sample in report["blueprints"].items():
+            previous = baseline.get("blueprints", {}).get(name)
+            # Abaixo de 20 ms a variacao entre rodadas domina a comparacao.
+            if previous and sample["seconds"] > max(previous["seconds"] * limit, 0.02):
+                failures.append(
+                    f"{name} piorou: {sample['seconds'] * 1000:.0f} ms > "
+                    f"{previous['seconds'] * 1000:.0f} ms x {limit:.2f}"
+                )
+    return failures
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="Processos medidos (mediana)")
+    parser.add_argument("--max-seconds", type=float, default=4.0, help="Limite do tempo total de importacao")
+    parser.add_argument("--max-rss-mb", type=float, default=300.0, help="Limite do RSS apos a importacao")
+    parser.add_argument("--max-blueprint-ms", type=float, default=400.0, help="Limite por blueprint")
+    parser.add_argument("--baseline", help="JSON de uma rodada anterior para comparar")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Piora relativa aceita sobre o baseline")
+    parser.add_argument("--write-baseline", help="Grava o resultado desta rodada neste arquivo")
+    parser.add_argument("--allow-heavy", action="store_true", help="Nao falha por modulos pesados")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        _measure_child()
+        return 0
+
+    report = _median_report([_run_once() for _ in range(max(args.runs, 1))])
+    _print_report(report)
+    if args.write_baseline:
+        with open(args.write_baseline, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+        print(f"baseline gravado em {args.write_baseline}")
+
+    failures = _check(report, args)
+    for failure in failures:
+        print(f"FALHA: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
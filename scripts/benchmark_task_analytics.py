@@ -0,0 +1,200 @@
+"""Benchmark das analises de duracao de tarefas do relatorio_tarefas.
+
+Gera historicos sinteticos (10k, 100k e 1M linhas por padrao) e compara o
+calculo vetorizado de ``app.services.task_analytics`` com o loop Python que
+era usado em ``relatorio_tarefas``. Os resultados dos dois caminhos sao
+conferidos antes de medir.
+
+Uso:
+    python scripts/benchmark_task_analytics.py
+    python scripts/benchmark_task_analytics.py --sizes 100000 --skip-legacy
+"""
+
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.task_analytics import compute_task_durations  # noqa: E402
+
+STATUSES = np.array(["PENDING", "IN_PROGRESS", "DONE"], dtype=object)
+TARGET_SECONDS_AT_100K = 1.0
+
+
+def build_synthetic_data(rows: int, seed: int = 42) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Return (tasks, history) frames with ``rows`` history entries."""
+    rng = np.random.default_rng(seed)
+    task_count = max(rows // 4, 1)
+    now = pd.Timestamp(datetime(2026, 3, 1, 12, 0))
+
+    created_offsets = rng.integers(0, 180 * 86400, size=task_count)
+    tasks = pd.DataFrame(
+        {
+            "task_id": np.arange(1, task_count + 1),
+            "created_at": now - pd.to_timedelta(created_offsets, unit="s"),
+        }
+    )
+
+    task_ids = np.sort(rng.integers(1, task_count + 1, size=rows))
+    step_seconds = rng.integers(60, 5 * 86400, size=rows)
+    history = pd.DataFrame({"task_id": task_ids, "step": step_seconds})
+    history["to_status"] = STATUSES[rng.integers(0, 3, size=rows)]
+    history["from_status"] = history.groupby("task_id")["to_status"].shift(1)
+    elapsed = history.groupby("task_id")["step"].cumsum()
+    created_lookup = tasks.set_index("task_id")["created_at"]
+    history["changed_at"] = created_lookup.reindex(history["task_id"]).to_numpy() + pd.to_timedelta(
+        elapsed.to_numpy(), unit="s"
+    )
+    history = history.drop(columns="step")[["task_id", "from_status", "to_status", "changed_at"]]
+
+    done_at = history[history["to_status"] == "DONE"].groupby("task_id")["changed_at"].max()
+    tasks["completed_at"] = tasks["task_id"].map(done_at)
+    return tasks, history
+
+
+def legacy_durations(tasks: pd.DataFrame, history: pd.DataFrame, now: datetime, today):
+    """Per-row Python loop formerly inlined in relatorio_tarefas."""
+    task_meta = {
+        task_id: {
+            "created_at": None if pd.isna(created_at) else created_at,
+            "completed_at": None if pd.isna(completed_at) else completed_at,
+        }
+        for task_id, created_at, completed_at in tasks[
+            ["task_id", "created_at", "completed_at"]
+        ].itertuples(index=False)
+    }
+    time_to_completion = []
+    for meta in task_meta.values():
+        if meta["created_at"] and meta["completed_at"]:
+            seconds = (meta["completed_at"] - meta["created_at"]).total_seconds()
+            if seconds >= 0:
+                time_to_completion.append(seconds)
+
+    month_start = today.replace(day=1)
+    next_month = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    history_cutoff = now - timedelta(days=30)
+    pending_to_progress = []
+    progress_to_done = []
+    reopened_last_30 = 0
+    reopened_current_month = 0
+
+    history_map = {}
+    for task_id, from_status, to_status, changed_at in history.itertuples(index=False):
+        history_map.setdefault(task_id, []).append((from_status, to_status, changed_at))
+
+    for task_id, entries in history_map.items():
+        meta = task_meta.get(task_id)
+        if not meta:
+            continue
+        last_pending_time = meta["created_at"]
+        last_in_progress_time = None
+        for from_status, to_status, changed_at in entries:
+            if from_status == "DONE" and to_status in ("PENDING", "IN_PROGRESS"):
+                if changed_at >= history_cutoff:
+                    reopened_last_30 += 1
+                if month_start <= changed_at.date() < next_month:
+                    reopened_current_month += 1
+            if to_status == "PENDING":
+                last_pending_time = changed_at
+            elif to_status == "IN_PROGRESS":
+                if last_pending_time:
+                    seconds = (changed_at - last_pending_time).total_seconds()
+                    if seconds >= 0:
+                        pending_to_progress.append(seconds)
+                last_in_progress_time = changed_at
+            elif to_status == "DONE" and last_in_progress_time:
+                seconds = (changed_at - last_in_progress_time).total_seconds()
+                if seconds >= 0:
+                    progress_to_done.append(seconds)
+
+    return (
+        len(time_to_completion),
+        len(pending_to_progress),
+        sum(pending_to_progress),
+        len(progress_to_done),
+        sum(progress_to_done),
+        reopened_last_30,
+        reopened_current_month,
+    )
+
+
+def _summary(metrics):
+    return (
+        metrics.creation_to_completion.count,
+        metrics.pending_to_progress.count,
+        metrics.pending_to_progress.total_seconds,
+        metrics.progress_to_done.count,
+        metrics.progress_to_done.total_seconds,
+        metrics.reopened_last_30,
+        metrics.reopened_current_month,
+    )
+
+
+def _timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - started
+
+
+def run(sizes: list[int], skip_legacy: bool) -> int:
+    now = datetime(2026, 3, 1, 12, 0)
+    today = now.date()
+    failures = 0
+
+    print(f"{'linhas':>10} {'vetorizado':>12} {'loop':>12} {'ganho':>8}")
+    for rows in sizes:
+        tasks, history = build_synthetic_data(rows)
+        metrics, vector_seconds = _timed(
+            compute_task_durations, tasks, history, now=now, today=today
+        )
+
+        legacy_label = "-"
+        speedup_label = "-"
+        if not skip_legacy:
+            legacy, legacy_seconds = _timed(legacy_durations, tasks, history, now, today)
+            expected = _summary(metrics)
+            if legacy[:2] != expected[:2] or legacy[3] != expected[3] or legacy[5:] != expected[5:]:
+                print(f"  divergencia em {rows} linhas: loop={legacy} vetorizado={expected}")
+                failures += 1
+            elif not (
+                np.isclose(legacy[2], expected[2]) and np.isclose(legacy[4], expected[4])
+            ):
+                print(f"  divergencia nas somas em {rows} linhas")
+                failures += 1
+            legacy_label = f"{legacy_seconds:.3f}s"
+            speedup_label = f"{legacy_seconds / vector_seconds:.1f}x"
+
+        print(f"{rows:>10} {vector_seconds:>11.3f}s {legacy_label:>12} {speedup_label:>8}")
+        if rows == 100_000 and vector_seconds > TARGET_SECONDS_AT_100K:
+            print(f"  acima da meta de {TARGET_SECONDS_AT_100K:.1f}s para 100k linhas")
+            failures += 1
+
+    return 1 if failures else 0
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[10_000, 100_000, 1_000_000],
+        help="Quantidade de linhas de historico por rodada",
+    )
+    parser.add_argument(
+        "--skip-legacy",
+        action="store_true",
+        help="Mede apenas o caminho vetorizado",
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    sys.exit(run(args.sizes, args.skip_legacy))
@@ -0,0 +1,183 @@
+"""Benchmark das gravacoes de historico de tarefas em operacoes em massa.
+
+Cria tarefas sinteticas e altera varios campos de todas elas em um unico
+commit (como um arraste no kanban ou uma edicao em massa), contando os
+comandos SQL emitidos com as gravacoes de historico imediatas (uma por campo)
+e com o buffer por transacao (um INSERT multi-linha por tabela).
+
+Grava e depois remove os proprios registros: use um banco de desenvolvimento.
+
+Uso:
+    python scripts/benchmark_task_history_writes.py
+    python scripts/benchmark_task_history_writes.py --tasks 50 200 1000
+"""
+
+import argparse
+import sys
+import time
+import uuid
+from collections import Counter
+from datetime import timedelta
+from pathlib import Path
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from dotenv import load_dotenv
+
+# Carrega variaveis do .env
+load_dotenv()
+
+from sqlalchemy import event  # noqa: E402
+
+from app import app, db  # noqa: E402
+from app.models.tables import (  # noqa: E402
+    Tag,
+    Task,
+    TaskClosure,
+    TaskHistory,
+    TaskPriority,
+    TaskStat,
+    TaskStatus,
+    TaskStatusHistory,
+    User,
+    sao_paulo_now_naive,
+)
+
+
+class StatementCounter:
+    """Count statements per kind while active."""
+
+    def __init__(self):
+        self.counts = Counter()
+        self.active = False
+
+    def __call__(self, _conn, _cursor, statement, _parameters, _context, _executemany):
+        if not self.active:
+            return
+        head = statement.lstrip().split(None, 3)
+        kind = head[0].upper() if head else "?"
+        if kind == "INSERT" and len(head) > 2:
+            table = head[2].strip('`"').split("(")[0]
+            kind = f"INSERT {table}"
+        self.counts[kind] += 1
+        self.counts["total"] += 1
+
+
+def _bulk_update(task_ids, user_id):
+    """Change status, priority, assignee and due date of every task."""
+    tasks = Task.query.filter(Task.id.in_(task_ids)).all()
+    due = sao_paulo_now_naive().date() + timedelta(days=3)
+    for task in tasks:
+        task.status = TaskStatus.IN_PROGRESS
+        task.priority = TaskPriority.HIGH
+        task.assigned_to = user_id
+        task.due_date = due
+    db.session.commit()
+
+
+def run_round(size: int, buffered: bool, counter: StatementCounter) -> dict:
+    app.config["TASK_HISTORY_BUFFERED"] = buffered
+    marker = f"bench-{uuid.uuid4().hex[:8]}"
+    user = User(username=marker, email=f"{marker}@example.invalid", name=marker, password="x")
+    tag = Tag(nome=marker)
+    db.session.add_all([user, tag])
+    db.session.commit()
+    user_id, tag_id = user.id, tag.id
+
+    try:
+        counter.counts.clear()
+        counter.active = True
+        started = time.perf_counter()
+        db.session.add_all(
+            [Task(title=f"{marker}-{index}", tag_id=tag_id, created_by=user_id) for index in range(size)]
+        )
+        db.session.commit()
+        create_seconds = time.perf_counter() - started
+        create_counts = dict(counter.counts)
+
+        task_ids = [task_id for (task_id,) in db.session.query(Task.id).filter(Task.tag_id == tag_id)]
+        db.session.expire_all()
+        counter.counts.clear()
+        started = time.perf_counter()
+        _bulk_update(task_ids, user_id)
+        update_seconds = time.perf_counter() - started
+        update_counts = dict(counter.counts)
+        counter.active = False
+
+        history_rows = TaskHistory.query.filter(TaskHistory.task_id.in_(task_ids)).count()
+        status_rows = TaskStatusHistory.query.filter(TaskStatusHistory.task_id.in_(task_ids)).count()
+    finally:
+        counter.active = False
+        ids = db.session.query(Task.id).filter(Task.tag_id == tag_id)
+        TaskHistory.query.filter(TaskHistory.task_id.in_(ids)).delete(synchronize_session=False)
+        TaskStatusHistory.query.filter(TaskStatusHistory.task_id.in_(ids)).delete(synchronize_session=False)
+        TaskClosure.query.filter(TaskClosure.descendant_id.in_(ids)).delete(synchronize_session=False)
+        Task.query.filter(Task.tag_id == tag_id).delete(synchronize_session=False)
+        TaskStat.query.filter(TaskStat.tag_id == tag_id).delete(synchronize_session=False)
+        db.session.delete(db.session.get(Tag, tag_id))
+        db.session.delete(db.session.get(User, user_id))
+        db.session.commit()
+
+    return {
+        "create": (create_counts, create_seconds),
+        "update": (update_counts, update_seconds),
+        "history_rows": history_rows,
+        "status_rows": status_rows,
+    }
+
+
+def _history_inserts(counts: dict) -> int:
+    return counts.get("INSERT task_history", 0) + counts.get("INSERT task_status_history", 0)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--tasks",
+        type=int,
+        nargs="+",
+        default=[50, 200],
+        help="Quantidade de tarefas por rodada",
+    )
+    args = parser.parse_args(argv)
+
+    failures = 0
+    with app.app_context():
+        counter = StatementCounter()
+        event.listen(db.engine, "before_cursor_execute", counter)
+        original = app.config.get("TASK_HISTORY_BUFFERED", True)
+        print(
+            f"{'tarefas':>8} {'modo':>9} {'etapa':>7} {'comandos':>9} "
+            f"{'insert hist.':>12} {'tempo':>8}"
+        )
+        try:
+            for size in args.tasks:
+                results = {}
+                for buffered in (False, True):
+                    mode = "buffer" if buffered else "imediato"
+                    result = run_round(size, buffered, counter)
+                    results[mode] = result
+                    for step in ("create", "update"):
+                        counts, seconds = result[step]
+                        print(
+                            f"{size:>8} {mode:>9} {step:>7} {counts.get('total', 0):>9} "
+                            f"{_history_inserts(counts):>12} {seconds:>7.3f}s"
+                        )
+                before, after = results["imediato"], results["buffer"]
+                if (before["history_rows"], before["status_rows"]) != (
+                    after["history_rows"],
+                    after["status_rows"],
+                ):
+                    print(f"  divergencia de linhas de historico em {size} tarefas")
+                    failures += 1
+        finally:
+            app.config["TASK_HISTORY_BUFFERED"] = original
+            event.remove(db.engine, "before_cursor_execute", counter)
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
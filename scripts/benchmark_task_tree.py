@@ -0,0 +1,226 @@
+"""Benchmark da hierarquia de subtarefas: CTE recursiva x ``task_closure``.
+
+Cria uma arvore sintetica (padrao: 10 mil tarefas, 10 filhas por no),
+compara leitura de subarvore, verificacao "e descendente", progresso
+agregado e exclusao da arvore, e confere que as duas abordagens devolvem
+o mesmo resultado.
+
+Grava e depois remove os proprios registros: use um banco de desenvolvimento.
+
+Uso:
+    python scripts/benchmark_task_tree.py
+    python scripts/benchmark_task_tree.py --nodes 10000 --fanout 10 --repeat 20
+"""
+
+import argparse
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from dotenv import load_dotenv
+
+# Carrega variaveis do .env
+load_dotenv()
+
+import sqlalchemy as sa  # noqa: E402
+
+from app import app, db  # noqa: E402
+from app.models.tables import Tag, Task, TaskStatus, User  # noqa: E402
+from app.services.task_tree import (  # noqa: E402
+    delete_task_trees,
+    get_subtree_ids,
+    get_subtree_progress,
+    is_descendant,
+)
+
+SUBTREE_CTE = sa.text(
+    """
+    WITH RECURSIVE task_tree AS (
+        SELECT id FROM tasks WHERE id = :task_id
+        UNION ALL
+        SELECT t.id FROM tasks t
+        INNER JOIN task_tree tt ON t.parent_id = tt.id
+    )
+    SELECT id FROM task_tree
+    """
+)
+
+ANCESTOR_CTE = sa.text(
+    """
+    WITH RECURSIVE up AS (
+        SELECT id, parent_id FROM tasks WHERE id = :task_id
+        UNION ALL
+        SELECT t.id, t.parent_id FROM tasks t
+        INNER JOIN up ON t.id = up.parent_id
+    )
+    SELECT 1 FROM up WHERE id = :ancestor_id AND id <> :task_id
+    """
+)
+
+PROGRESS_CTE = sa.text(
+    """
+    WITH RECURSIVE task_tree AS (
+        SELECT id, status FROM tasks WHERE parent_id = :task_id
+        UNION ALL
+        SELECT t.id, t.status FROM tasks t
+        INNER JOIN task_tree tt ON t.parent_id = tt.id
+    )
+    SELECT COUNT(*), SUM(CASE WHEN status = 'DONE' THEN 1 ELSE 0 END) FROM task_tree
+    """
+)
+
+
+def _build_tree(marker: str, tag_id: int, user_id: int, nodes: int, fanout: int) -> list[list[int]]:
+    """Insert the tree level by level through the ORM; return ids per level."""
+    root = Task(title=f"{marker}-0", tag_id=tag_id, created_by=user_id)
+    db.session.add(root)
+    db.session.commit()
+    levels = [[root.id]]
+    created = 1
+    while created < nodes:
+        batch = []
+        for parent_id in levels[-1]:
+            for _ in range(fanout):
+                if created + len(batch) >= nodes:
+                    break
+                index = created + len(batch)
+                batch.append(
+                    Task(
+                        title=f"{marker}-{index}",
+                        tag_id=tag_id,
+                        created_by=user_id,
+                        parent_id=parent_id,
+                        status=TaskStatus.DONE if index % 3 == 0 else TaskStatus.PENDING,
+                    )
+                )
+        db.session.add_all(batch)
+        db.session.flush()
+        levels.append([task.id for task in batch])
+        db.session.commit()
+        created += len(batch)
+    db.session.expunge_all()
+    return levels
+
+
+def _time(repeat: int, fn) -> tuple[float, object]:
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), result
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=10000, help="Total de tarefas na arvore")
+    parser.add_argument("--fanout", type=int, default=10, help="Filhas por tarefa")
+    parser.add_argument("--repeat", type=int, default=20, help="Repeticoes por medicao")
+    args = parser.parse_args(argv)
+
+    failures = 0
+    with app.app_context():
+        marker = f"bench-{uuid.uuid4().hex[:8]}"
+        user = User(username=marker, email=f"{marker}@example.invalid", name=marker, password="x")
+        tag = Tag(nome=marker)
+        db.session.add_all([user, tag])
+        db.session.commit()
+        user_id, tag_id = user.id, tag.id
+
+        try:
+            started = time.perf_counter()
+            levels = _build_tree(marker, tag_id, user_id, args.nodes, args.fanout)
+            build_seconds = time.perf_counter() - started
+            root_id = levels[0][0]
+            mid_id = levels[min(2, len(levels) - 1)][0]
+            leaf_id = levels[-1][-1]
+            rollup_ids = levels[1] if len(levels) > 1 else [root_id]
+            print(
+                f"arvore: {sum(map(len, levels))} tarefas, {len(levels)} niveis, "
+                f"criada em {build_seconds:.2f}s (com manutencao do fechamento)"
+            )
+
+            def cte_subtree(task_id):
+                return sorted(row[0] for row in db.session.execute(SUBTREE_CTE, {"task_id": task_id}))
+
+            def cte_is_descendant(task_id, ancestor_id):
+                return db.session.execute(
+                    ANCESTOR_CTE, {"task_id": task_id, "ancestor_id": ancestor_id}
+                ).first() is not None
+
+            def cte_progress(task_ids):
+                result = {}
+                for task_id in task_ids:
+                    total, done = db.session.execute(PROGRESS_CTE, {"task_id": task_id}).one()
+                    result[task_id] = (int(total), int(done or 0))
+                return result
+
+            def closure_progress(task_ids):
+                return {
+                    task_id: (progress.total, progress.done)
+                    for task_id, progress in get_subtree_progress(task_ids).items()
+                }
+
+            cases = [
+                (
+                    "subarvore (raiz)",
+                    lambda: cte_subtree(root_id),
+                    lambda: sorted(get_subtree_ids(root_id)),
+                ),
+                (
+                    "subarvore (nivel 2)",
+                    lambda: cte_subtree(mid_id),
+                    lambda: sorted(get_subtree_ids(mid_id)),
+                ),
+                (
+                    "e descendente (folha)",
+                    lambda: cte_is_descendant(leaf_id, root_id),
+                    lambda: is_descendant(leaf_id, root_id),
+                ),
+                (
+                    f"progresso ({len(rollup_ids)} nos)",
+                    lambda: cte_progress(rollup_ids),
+                    lambda: closure_progress(rollup_ids),
+                ),
+            ]
+
+            print(f"{'consulta':<24} {'CTE':>10} {'closure':>10} {'ganho':>7}")
+            for label, cte_fn, closure_fn in cases:
+                cte_seconds, cte_result = _time(args.repeat, cte_fn)
+                closure_seconds, closure_result = _time(args.repeat, closure_fn)
+                speedup = cte_seconds / closure_seconds if closure_seconds else float("inf")
+                print(
+                    f"{label:<24} {cte_seconds * 1000:>8.2f}ms {closure_seconds * 1000:>8.2f}ms "
+                    f"{speedup:>6.1f}x"
+                )
+                if cte_result != closure_result:
+                    print(f"  divergencia em '{label}'")
+                    failures += 1
+        finally:
+            db.session.rollback()
+            root_ids = [
+                task_id
+                for (task_id,) in db.session.query(Task.id).filter(
+                    Task.tag_id == tag_id, Task.parent_id.is_(None)
+                )
+            ]
+            started = time.perf_counter()
+            deleted = delete_task_trees(root_ids)
+            db.session.commit()
+            print(f"exclusao da arvore: {len(deleted)} tarefas em {time.perf_counter() - started:.2f}s")
+            db.session.delete(db.session.get(Tag, tag_id))
+            db.session.delete(db.session.get(User, user_id))
+            db.session.commit()
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+"""
+Servidor HTTP local que imita a rota /deliveries da API da Acessorias.
+
+Serve para exercitar o sync de encerramento fiscal sem tocar na API real:
+cada CNPJ recebe entregas deterministicas (metade delas "Fechamento Fiscal"
+entregue), paginadas de 50 em 50 e filtradas por ``DtLastDH``. Com
+``--rate`` o servidor responde 429 acima do limite, como a API real. As
+respostas levam ``ETag`` e atendem ``If-None-Match`` com 304 (``--no-etag``
+desliga, para exercitar o TTL do cache HTTP).
+
+Uso:
+    python scripts/fake_acessorias_server.py --port 8099
+    ACESSORIAS_BASE=http://127.0.0.1:8099 ACESSORIAS_TOKEN=fake \\
+        flask shell  # >>> sync_encerramento_fiscal()
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+LAST_DH_FORMAT = "%Y-%m-%d %H:%M:%S"
+PAGE_SIZE = 50
+
+
+def build_deliveries(cnpj: str, count: int, now: datetime) -> list[dict]:
+    """Deterministic deliveries for ``cnpj``; one per hour going back from ``now``."""
+    seed = int(cnpj[-4:] or 0)
+    deliveries = []
+    for index in range(count):
+        updated = now - timedelta(hours=index)
+        deliveries.append({
+            "Nome": "Obrigacao acessoria",
+            "Status": "Pendente",
+            "EntCompetencia": "2025-12-01",
+            "EntDtPrazo": "2025-12-20",
+            "EntDtAtualizacao": updated.strftime(LAST_DH_FORMAT),
+        })
+    if seed % 2 == 0 and deliveries:
+        deliveries[-1].update({
+            "Nome": "Fechamento Fiscal",
+            "Status": "Entregue",
+            "EntDtEntrega": "2025-12-15",
+            "EntComentarios": "OK",
+        })
+    return deliveries
+
+
+class FakeAcessorias:
+    """State shared by the request handlers."""
+
+    def __init__(
+        self, deliveries_per_cnpj: int, rate: float, token: str | None, etag: bool = True
+    ) -> None:
+        self.deliveries_per_cnpj = deliveries_per_cnpj
+        self.rate = rate
+        self.token = token
+        self.etag = etag
+        self.started = datetime.now().replace(microsecond=0)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.throttled = 0
+        self.not_modified = 0
+        self.window: list[float] = []
+
+    def throttle(self) -> bool:
+        if self.rate <= 0:
+            return False
+        now = time.monotonic()
+        with self.lock:
+            self.window = [t for t in self.window if now - t < 1.0]
+            if len(self.window) >= self.rate:
+                self.throttled += 1
+                return True
+            self.window.append(now)
+        return False
+
+
+def make_handler(state: FakeAcessorias):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, fmt, *args):  # noqa: D401 - silencia o log padrao
+            return
+
+        def _send(self, status: int, payload=None, headers: dict | None = None) -> None:
+            body = json.dumps(payload if payload is not None else {}).encode()
+            if status == 200 and state.etag:
+                etag = '"%s"' % hashlib.sha256(body).hexdigest()[:16]
+                if self.headers.get("If-None-Match") == etag:
+                    with state.lock:
+                        state.not_modified += 1
+                    status, body = 304, b""
+                headers = {**(headers or {}), "ETag": etag}
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):  # noqa: N802 - nome exigido pelo http.server
+            with state.lock:
+                state.requests += 1
+            url = urlparse(self.path)
+            match = re.fullmatch(r"/deliveries/(\d+)/?", url.path)
+            if not match:
+                return self._send(404)
+            if state.token and self.headers.get("Authorization") != f"Bearer {state.token}":
+                return self._send(401)
+            if state.throttle():
+                return self._send(429, headers={"Retry-After": "1"})
+
+            params = {key: values[0] for key, values in parse_qs(url.query).items()}
+            deliveries = build_deliveries(match.group(1), state.deliveries_per_cnpj, state.started)
+            if params.get("DtLastDH"):
+                since = datetime.strptime(params["DtLastDH"], LAST_DH_FORMAT)
+                deliveries = [
+                    d for d in deliveries
+                    if datetime.strptime(d["EntDtAtualizacao"], LAST_DH_FORMAT) > since
+                ]
+            page = int(params.get("Pagina", 1))
+            chunk = deliveries[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+            return self._send(200, {"Identificador": match.group(1), "Entregas": chunk})
+
+    return Handler
+
+
+def serve(host: str, port: int, state: FakeAcessorias) -> ThreadingHTTPServer:
+    """Start the server in a daemon thread and return it (``port=0`` picks one)."""
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--deliveries", type=int, default=120, help="Entregas por CNPJ")
+    parser.add_argument("--rate", type=float, default=0, help="Requisicoes/s antes do 429 (0 = sem limite)")
+    parser.add_argument("--token", default=None, help="Exige este token Bearer (padrao: aceita qualquer um)")
+    parser.add_argument("--no-etag", action="store_true", help="Nao envia ETag nem responde 304")
+    args = parser.parse_args(argv)
+
+    state = FakeAcessorias(args.deliveries, args.rate, args.token, etag=not args.no_etag)
+    server = serve(args.host, args.port, state)
+    print(f"Acessorias falsa em http://{args.host}:{server.server_port} (Ctrl+C para sair)")
+    try:
+        while True:
+            time.sleep(5)
+            print(
+                f"  {state.requests} requisicoes | {state.not_modified} com 304 | "
+                f"{state.throttled} com 429",
+                flush=True,
+            )
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
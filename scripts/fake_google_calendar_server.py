@@ -0,0 +1,251 @@
+"""
+Servidor HTTP local que imita a API do Google Calendar usada pela sala de reunioes.
+
+Atende as rotas que o app chama (``calendars.get`` e ``events`` insert, get,
+patch, delete e list com ``syncToken``) e o endpoint de batch
+(``/batch/calendar/v3``), guardando os eventos em memoria. Cada requisicao
+HTTP custa ``--latency-ms``, o que deixa visivel a diferenca entre uma
+chamada por evento e um batch de ate 50. Com ``--fail-rate`` uma fracao dos
+inserts responde 403 ``rateLimitExceeded``, como a API real sob cota.
+
+Para apontar o app para ele, sem conta de servico:
+
+Uso:
+    python scripts/fake_google_calendar_server.py --port 8098
+    GOOGLE_CALENDAR_API_ENDPOINT=http://127.0.0.1:8098/calendar/v3/ \\
+        GOOGLE_MEETING_ROOM_EMAIL=sala@example.com flask run
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from email.parser import Parser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+from uuid import uuid4
+
+EVENTS_PATH = re.compile(r"(?:/calendar/v3)?/calendars/([^/]+)/events(?:/([^/]+))?/?")
+CALENDAR_PATH = re.compile(r"(?:/calendar/v3)?/calendars/([^/]+)/?")
+PAGE_SIZE = 250
+
+
+class FakeCalendar:
+    """In-memory calendars shared by the request handlers."""
+
+    def __init__(self, latency_ms: float = 0, fail_rate: float = 0, time_zone: str = "America/Sao_Paulo",
+                 seed: int = 7) -> None:
+        self.latency_ms = latency_ms
+        self.fail_rate = fail_rate
+        self.time_zone = time_zone
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.events: dict[str, dict[str, dict]] = {}
+        self.versions: dict[str, int] = {}
+        self.version = 0
+        self.http_requests = 0
+        self.batch_requests = 0
+        self.api_calls = 0
+        self.rate_limited = 0
+
+    # -------------------------------------------------------------------------
+    # Operacoes
+    # -------------------------------------------------------------------------
+
+    def _touch(self, event: dict) -> None:
+        self.version += 1
+        self.versions[event["id"]] = self.version
+        event["etag"] = f'"{self.version}"'
+        event["updated"] = datetime.now(timezone.utc).isoformat()
+
+    def handle(self, method: str, path: str, query: dict, body: dict | None) -> tuple[int, dict | None]:
+        """Route one API call; returns ``(status, payload)``."""
+        with self.lock:
+            self.api_calls += 1
+            match = EVENTS_PATH.fullmatch(path)
+            if match:
+                calendar_id, event_id = unquote(match.group(1)), match.group(2)
+                events = self.events.setdefault(calendar_id, {})
+                if event_id is None and method == "GET":
+                    return 200, self._list(events, query)
+                if event_id is None and method == "POST":
+                    if self.fail_rate and self.random.random() < self.fail_rate:
+                        self.rate_limited += 1
+                        return 403, {"error": {"code": 403, "message": "Rate Limit Exceeded",
+                                               "errors": [{"reason": "rateLimitExceeded"}]}}
+                    if (body or {}).get("id") in events:
+                        return 409, {"error": {"code": 409, "message": "The requested identifier already exists.",
+                                               "errors": [{"reason": "duplicate"}]}}
+                    return 200, self._insert(events, body or {}, query)
+                event = events.get(unquote(event_id or ""))
+                if event is None or (event.get("status") == "cancelled" and method != "DELETE"):
+                    return 404, {"error": {"code": 404, "message": "Not Found"}}
+                if method == "GET":
+                    return 200, event
+                if method in ("PATCH", "PUT"):
+                    event.update(body or {})
+                    self._touch(event)
+                    return 200, event
+                if method == "DELETE":
+                    event["status"] = "cancelled"
+                    self._touch(event)
+                    return 204, None
+            match = CALENDAR_PATH.fullmatch(path)
+            if match and method == "GET":
+                return 200, {"id": unquote(match.group(1)), "timeZone": self.time_zone}
+            return 404, {"error": {"code": 404, "message": f"Unknown route {method} {path}"}}
+
+    def _insert(self, events: dict, body: dict, query: dict) -> dict:
+        event = dict(body)
+        event["id"] = body.get("id") or uuid4().hex
+        event["status"] = "confirmed"
+        event["htmlLink"] = f"https://calendar.google.com/event?eid={event['id']}"
+        if query.get("conferenceDataVersion") == "1" and body.get("conferenceData"):
+            code = event["id"][:10]
+            event["hangoutLink"] = f"https://meet.google.com/{code[:3]}-{code[3:7]}-{code[7:10]}"
+        events[event["id"]] = event
+        self._touch(event)
+        return event
+
+    def _list(self, events: dict, query: dict) -> dict:
+        sync_token = query.get("syncToken")
+        since = int(sync_token[4:]) if sync_token and sync_token.startswith("tok-") else 0
+        show_deleted = sync_token is not None or query.get("showDeleted") == "true"
+        items = sorted(
+            (e for e in events.values()
+             if self.versions[e["id"]] > since and (show_deleted or e.get("status") != "cancelled")),
+            key=lambda e: self.versions[e["id"]],
+        )
+        offset = int(query.get("pageToken") or 0)
+        page_size = min(int(query.get("maxResults") or PAGE_SIZE), PAGE_SIZE)
+        page = {"kind": "calendar#events", "items": items[offset:offset + page_size]}
+        if offset + page_size < len(items):
+            page["nextPageToken"] = str(offset + page_size)
+        else:
+            page["nextSyncToken"] = f"tok-{self.version}"
+        return page
+
+
+def _split_http(raw: str) -> tuple[str, str, dict, str]:
+    """Split an ``application/http`` part into method, target, headers and body."""
+    raw = raw.replace("\r\n", "\n")
+    head, _, body = raw.partition("\n\n")
+    request_line, *header_lines = head.split("\n")
+    method, target, _ = request_line.split(" ", 2)
+    headers = {}
+    for line in header_lines:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    return method, target, headers, body
+
+
+def make_handler(state: FakeCalendar):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, fmt, *args):
+            return
+
+        def _reply(self, status: int, body: bytes, content_type: str = "application/json") -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _dispatch(self, method: str, target: str, raw_body: str) -> tuple[int, dict | None]:
+            url = urlparse(target)
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            body = json.loads(raw_body) if raw_body.strip() else None
+            return state.handle(method, url.path, query, body)
+
+        def _batch(self, raw_body: str) -> None:
+            with state.lock:
+                state.batch_requests += 1
+            boundary = "batch_" + uuid4().hex
+            message = Parser().parsestr(f"Content-Type: {self.headers['Content-Type']}\r\n\r\n{raw_body}")
+            chunks = []
+            for part in message.get_payload():
+                method, target, _, body = _split_http(part.get_payload())
+                status, payload = self._dispatch(method, target, body)
+                content = json.dumps(payload) if payload is not None else ""
+                content_id = part["Content-ID"] or ""
+                chunks.append(
+                    f"--{boundary}\r\n"
+                    "Content-Type: application/http\r\n"
+                    f"Content-ID: <response-{content_id[1:-1]}>\r\n\r\n"
+                    f"HTTP/1.1 {status} {'OK' if status < 300 else 'Error'}\r\n"
+                    "Content-Type: application/json; charset=UTF-8\r\n\r\n"
+                    f"{content}\r\n"
+                )
+            body = ("".join(chunks) + f"--{boundary}--\r\n").encode()
+            self._reply(200, body, f"multipart/mixed; boundary={boundary}")
+
+        def _handle(self, method: str) -> None:
+            with state.lock:
+                state.http_requests += 1
+            time.sleep(state.latency_ms / 1000)
+            length = int(self.headers.get("Content-Length") or 0)
+            raw_body = self.rfile.read(length).decode() if length else ""
+            if method == "POST" and urlparse(self.path).path.rstrip("/") == "/batch/calendar/v3":
+                return self._batch(raw_body)
+            status, payload = self._dispatch(method, self.path, raw_body)
+            self._reply(status, json.dumps(payload).encode() if payload is not None else b"")
+
+        def do_GET(self):  # noqa: N802 - nomes exigidos pelo http.server
+            self._handle("GET")
+
+        def do_POST(self):  # noqa: N802
+            self._handle("POST")
+
+        def do_PATCH(self):  # noqa: N802
+            self._handle("PATCH")
+
+        def do_PUT(self):  # noqa: N802
+            self._handle("PUT")
+
+        def do_DELETE(self):  # noqa: N802
+            self._handle("DELETE")
+
+    return Handler
+
+
+def serve(host: str, port: int, state: FakeCalendar) -> ThreadingHTTPServer:
+    """Start the server in a daemon thread and return it (``port=0`` picks one)."""
+    server = ThreadingHTTPServer((host, port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8098)
+    parser.add_argument("--latency-ms", type=float, default=150, help="Custo de cada requisicao HTTP")
+    parser.add_argument("--fail-rate", type=float, default=0, help="Fracao dos inserts que recebe 403")
+    parser.add_argument("--time-zone", default="America/Sao_Paulo")
+    args = parser.parse_args(argv)
+
+    state = FakeCalendar(args.latency_ms, args.fail_rate, args.time_zone)
+    server = serve(args.host, args.port, state)
+    print(f"Google Calendar falso em http://{args.host}:{server.server_port}/calendar/v3/ (Ctrl+C para sair)")
+    try:
+        while True:
+            time.sleep(5)
+            print(
+                f"  {state.http_requests} requisicoes HTTP | {state.batch_requests} batches | "
+                f"{state.api_calls} chamadas da API | {state.rate_limited} com 403",
+                flush=True,
+            )
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
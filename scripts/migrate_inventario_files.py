@@ -0,0 +1,75 @@
+"""
+Move os anexos legados do inventario (base64 no JSON) para o disco.
+
+Cada linha e migrada e confirmada separadamente; interromper o comando
+(Ctrl+C, queda do processo) nao perde nada e a proxima execucao continua
+de onde parou. Pode rodar em segundo plano com o portal no ar.
+
+Uso:
+    python scripts/migrate_inventario_files.py
+    python scripts/migrate_inventario_files.py --status
+    python scripts/migrate_inventario_files.py --batch-size 10 --limit 200
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from dotenv import load_dotenv
+
+# Carrega variaveis do .env
+load_dotenv()
+
+from app import app  # noqa: E402
+from app.services.inventario_files import (  # noqa: E402
+    count_legacy_inventario_rows,
+    migrate_legacy_inventario_files,
+)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--batch-size", type=int, default=20, help="Linhas por lote")
+    parser.add_argument("--limit", type=int, default=None, help="Maximo de linhas nesta execucao")
+    parser.add_argument("--after-id", type=int, default=0, help="Pula linhas com id ate este valor")
+    parser.add_argument("--status", action="store_true", help="So mostra quantas linhas faltam")
+    args = parser.parse_args(argv)
+
+    with app.app_context():
+        pending = count_legacy_inventario_rows()
+        print(f"linhas com anexos legados: {pending}")
+        if args.status or not pending:
+            return 0
+
+        total = min(pending, args.limit) if args.limit else pending
+        started = time.perf_counter()
+
+        def report(result) -> None:
+            elapsed = time.perf_counter() - started
+            print(
+                f"  {result.rows_scanned}/{total} linhas | {result.files_migrated} arquivos | "
+                f"{result.bytes_written / 1024 / 1024:.1f} MiB | id {result.last_id} | "
+                f"{len(result.errors)} erros | {elapsed:.0f}s",
+                flush=True,
+            )
+
+        result = migrate_legacy_inventario_files(
+            batch_size=args.batch_size,
+            limit=args.limit,
+            after_id=args.after_id,
+            progress=report,
+        )
+
+    for error in result.errors:
+        print(f"  ERRO inventario {error['inventario_id']}: {error['error']}")
+    print(f"concluido: {result.as_dict()}")
+    return 1 if result.errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
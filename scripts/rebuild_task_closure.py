@@ -0,0 +1,35 @@
+"""
+Reconstroi a tabela ``task_closure`` a partir de ``tasks.parent_id``.
+
+O fechamento e mantido pelos eventos do mapper de ``Task``; este comando o
+refaz do zero caso SQL manual ou importacoes fora do ORM o tenham desviado.
+
+Uso:
+    python scripts/rebuild_task_closure.py
+"""
+
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from dotenv import load_dotenv
+
+# Carrega variaveis do .env
+load_dotenv()
+
+from app import app  # noqa: E402
+from app.services.task_tree import rebuild_task_closure  # noqa: E402
+
+
+def main() -> int:
+    with app.app_context():
+        rows = rebuild_task_closure()
+    print(f"task_closure reconstruida: {rows} linhas")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+Recalcula os contadores de notificacoes nao lidas (user_notification_counters).
+
+Os contadores sao mantidos na mesma transacao das gravacoes de notificacoes;
+este comando os reconstroi do zero a partir de ``task_notifications`` caso
+algum caminho fora do ORM (cascatas do banco, SQL manual) os tenha desviado.
+
+Uso:
+    python scripts/repair_notification_counters.py
+    python scripts/repair_notification_counters.py --user-id 12 --user-id 40
+
+Opcoes:
+    --user-id   Restringe o reparo aos usuarios informados (pode repetir).
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from dotenv import load_dotenv
+
+# Carrega variaveis do .env
+load_dotenv()
+
+from app import app  # noqa: E402
+from app.services.notification_counters import repair_notification_counters  # noqa: E402
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Recalcula os contadores de notificacoes nao lidas por usuario."
+    )
+    parser.add_argument(
+        "--user-id",
+        type=int,
+        action="append",
+        dest="user_ids",
+        help="ID do usuario a reparar (padrao: todos).",
+    )
+    args = parser.parse_args(argv)
+
+    with app.app_context():
+        repaired = repair_notification_counters(args.user_ids)
+
+    unread_total = sum(repaired.values())
+    print(f"Contadores recalculados: {len(repaired)} usuarios, {unread_total} nao lidas")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""
+Aplica migracoes e tabelas novas e grava a impressao digital do schema.
+
+A inicializacao do app nao roda mais DDL: ela compara ``schema_fingerprint``
+com o codigo e apenas avisa quando difere. Rode este comando a cada deploy
+que traga migracoes ou modelos novos (substitui ``flask db upgrade``).
+
+Uso:
+    python scripts/sync_schema.py
+    python scripts/sync_schema.py --check   # so compara, sem DDL
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+# Adiciona o diretório raiz do projeto ao PYTHONPATH
+root_dir = Path(__file__).parent.parent
+sys.path.insert(0, str(root_dir))
+
+from dotenv import load_dotenv
+
+# Carrega variaveis do .env
+load_dotenv()
+
+# O proprio comando decide o que fazer; evita o aviso/bootstrapping da importacao.
+os.environ["SCHEMA_STARTUP_CHECK"] = "0"
+os.environ.setdefault("DISABLE_SCHEDULER", "1")
+
+from app import app, db  # noqa: E402
+from app.services.schema_fingerprint import (  # noqa: E402
+    expected_state,
+    stored_state,
+    sync_schema,
+)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Apenas compara a impressao digital; sai com 1 se estiver desatualizada",
+    )
+    args = parser.parse_args(argv)
+
+    with app.app_context():
+        expected = expected_state()
+        with db.engine.connect() as connection:
+            stored = stored_state(connection)
+        print(f"codigo: {expected.as_dict()}")
+        print(f"banco:  {stored.as_dict() if stored else None}")
+        if args.check:
+            return 0 if stored == expected else 1
+        if stored == expected:
+            print("schema em dia, nada a fazer")
+            return 0
+        result = sync_schema()
+    print(f"sincronizado ({result.mode}): {result.as_dict()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())